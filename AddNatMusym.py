@@ -7,7 +7,12 @@
 # phone: 608.662.4422 ext. 216
 #
 # Created:     2/21/2017
-# Last Modified: 4/11/2017
+# Last Modified: 10/18/2026
+#
+# 10/18/2026 Unique values are collected with a set.  The SDA requests are sent at the same time
+#            (SSURGO_Web.FetchAll) with up to 3 attempts each, and the returned values are kept
+#            in a local cache so that a rerun only requests AREASYMBOL or MUKEY values that
+#            have not been seen before.
 
 # This tool will add the NASIS National Mapunti Symbol (NATSYM) and the SSURGO Mapunit
 # Name (muname) to a user-provided spatial layer.  The NATSYM and MUNAME values are
@@ -19,7 +24,7 @@
 # what fields are available.  If both AREASYMBOL and MUKEY are available then the following
 # SQL query will be used:
 #
-#       'SELECT mapunit.mukey, nationalmusym, muname '\
+#       'SELECT mapunit.mukey, nationalmusym, muname, legend.areasymbol '\
 #       'FROM sacatalog ' \
 #       'INNER JOIN legend ON legend.areasymbol = sacatalog.areasymbol AND sacatalog.areasymbol IN (' + values + ')' \
 #       'INNER JOIN mapunit ON mapunit.lkey = legend.lkey'
@@ -27,7 +32,8 @@
 # If only MUKEY is available then the following SQL query will be used:
 #       SELECT m.mukey, m.nationalmusym, m.muname as natmusym from mapunit m where mukey in (" + values + ")
 #
-# Both queries return: ['mukey', 'natmusym','muname']
+# Both queries return: ['mukey', 'natmusym','muname'].  The AREASYMBOL query also returns the
+# areasymbol so that the values can be cached by survey.
 #
 # The tool will handle Shapefiles and Geodatabase feature classes.
 
@@ -121,7 +127,8 @@ def GetUniqueValues(theInput,theField):
         the source field.  If the source field is AREASYMBOL than the list will be
         parsed into lists not exceeding 300 AREASYMBOL values.  If the source field is
         MUKEY than the list will be parsed into lists not exceeding 1000 MUKEY values.
-        This list will ultimately be passed over to an SDA query."""
+        This list will ultimately be passed over to an SDA query.  Values that are already
+        in the local SDA cache are left out of the lists."""
 
     try:
         featureCount = int(arcpy.GetCount_management(theInput).getOutput(0))
@@ -134,44 +141,67 @@ def GetUniqueValues(theInput,theField):
         else:
             AddMsgAndPrint("\nCompiling a list of unique " + theField + " values from " + splitThousands(featureCount) + " records")
 
-        # Unique value list
-        valueList = list()
+        # Unique values and invalid areasymbols
+        valueSet = set()
+        invalidSet = set()
 
         """ ----------------- Iterate through all of the records in theInput to make a unique list-------------------"""
-        arcpy.SetProgressor("step", "Compiling a list of unique " + theField + " values", 0, featureCount,1)
         if featureCount:
+            progress = ToolTiming.Progress("Compiling a list of unique " + theField + " values", featureCount)
 
             with arcpy.da.SearchCursor(theInput, [theField]) as cur:
                 for rec in cur:
+                    valueSet.add(rec[0])
+                    progress.Update()
+
+            progress.Finish()
 
-                    if bAreaSym:
-                        if not len(rec[0]) == 5:
-                            AddMsgAndPrint("\t" + str(rec[0]) + " is not a valid AREASYMBOL",2)
-                            continue
+            if bAreaSym:
+                invalidSet = set([value for value in valueSet if value is None or not len(value) == 5])
+                valueSet = valueSet - invalidSet
 
-                    if not rec[0] in valueList:
-                        valueList.append(rec[0])
+                for value in sorted(invalidSet):
+                    AddMsgAndPrint("\t" + str(value) + " is not a valid AREASYMBOL",2)
 
-                    arcpy.SetProgressorPosition()
-            arcpy.ResetProgressor()
+            else:
+                valueSet.discard(None)
 
-            AddMsgAndPrint("\tThere are " + splitThousands(len(valueList)) + " unique " + theField + " values")
+            AddMsgAndPrint("\tThere are " + splitThousands(len(valueSet)) + " unique " + theField + " values")
 
         else:
             AddMsgAndPrint("\n\tThere are no features in layer.  Empty Geometry. EXITING",2)
             exit()
 
-        if not len(valueList):
+        if not len(valueSet):
             AddMsgAndPrint("\n\tThere were no" + theField + " values in layer. EXITING",2)
             exit()
 
+        # Get the values that were returned by SDA on an earlier run from the cache
+        valueList = sorted(valueSet)
+        dCached = sdaCache.GetMany([CacheKey(value) for value in valueList])
+        valueList = [value for value in valueList if not CacheKey(value) in dCached]
+
+        for value in dCached.values():
+            if bAreaSym:
+                for mukey, natmusym, muname in value:
+                    natmusymDict[mukey] = (natmusym, muname)
+
+            else:
+                natmusymDict[value[0]] = (value[1], value[2])
+
+        if len(dCached):
+            AddMsgAndPrint("\t" + splitThousands(len(dCached)) + " of these " + theField + " values were found in the local SDA cache")
+
+        if not len(valueList):
+            return list()
+
         # if number of Areasymbols exceed 300 than parse areasymbols
         # into lists containing no more than 300 areasymbols
         # MUKEY no more than 1000 values
         if bAreaSym:
-            return parseValuesIntoLists(valueList,300)
+            return SSURGO_Web.SplitList(valueList,300)
         else:
-            return parseValuesIntoLists(valueList)
+            return SSURGO_Web.SplitList(valueList)
 
     except:
         errorMsg()
@@ -179,178 +209,118 @@ def GetUniqueValues(theInput,theField):
         exit()
 
 ## ===============================================================================================================
-def parseValuesIntoLists(valueList,limit=1000):
-    """ This function will parse values into manageable chunks that will be sent to an SDaccess query.
-        This function returns a list containing lists of values comprised of no more than what
-        the 'limit' is set to. Default Limit set to 1000, this will be used if the value list is
-        made up of MUKEYS.  Limit will be set to 300 if value list contains areasymbols"""
+def CacheKey(value):
+    """ Returns the key of an AREASYMBOL or MUKEY value in the local SDA cache"""
 
-    try:
-        arcpy.SetProgressorLabel("\nDetermining the number of requests to send to SDaccess Server")
-
-        i = 0 # Total Count
-        j = 0 # Mukey count; resets whenever the 'limit' is reached.
-
-        listOfValueStrings = list()  # List containing lists of values
-        tempValueList = list()
+    if bAreaSym:
+        return "SDA natmusym AREASYMBOL " + str(value).upper()
 
-        for value in valueList:
-            i+=1
-            j+=1
-            tempValueList.append(str(value))
-
-            # End of mukey list has been reached
-            if i == len(valueList):
-                listOfValueStrings.append(tempValueList)
-
-            # End of mukey list NOT reached
-            else:
-                # max limit has been reached; reset tempValueList
-                if j == limit:
-                    listOfValueStrings.append(tempValueList)
-                    tempValueList = []
-                    j=0
+    return "SDA natmusym MUKEY " + str(value)
 
-        del i,j,tempValueList
+## ===================================================================================
+def ParseSDATable(jsonString):
+    """ Returns the rows of the 'Table' element of an SDA JSON response, or an empty list if
+        SDA did not return a table.  Runs in a request thread (SSURGO_Web.FetchAll)."""
 
-        if not len(listOfValueStrings):
-            AddMsgAndPrint("\tCould not Parse value list into manageable sets",2)
-            exit()
+    data = json.loads(jsonString)
 
-        else:
-            #AddMsgAndPrint("\t" + str(len(listOfValueStrings)) + " request(s) are needed to obtain NATSYM values for this layer")
-            return listOfValueStrings
+    if not "Table" in data:
+        return list()
 
-    except:
-        AddMsgAndPrint("Unhandled exception (parseValuesIntoLists)", 2)
-        errorMsg()
-        exit()
+    return data["Table"]
 
 ## ===================================================================================
 def getNATMUSYM(listsOfValues, featureLayer):
-    """POST request which uses urllib and JSON to send query to SDM Tabular Service and
-       returns data in JSON format.  Sends a list of values (either MUKEYs or Areasymbols)
-       and returns NATSYM and MUNAME values.  If MUKEYS are submitted a pair of values are returned
-       [MUKEY,NATMUSYM].  If areasymbols are submitted than a list of all of MUKEY,NATSYM
-       pairs that pertain to that areasymbol are returned.
+    """POST request which uses JSON to send queries to SDM Tabular Service and
+       returns data in JSON format.  Sends lists of values (either MUKEYs or Areasymbols)
+       and returns NATSYM and MUNAME values.  If MUKEYS are submitted a list of values is returned
+       [MUKEY,NATMUSYM,MUNAME].  If areasymbols are submitted than a list of all of MUKEY,NATSYM,MUNAME
+       values that pertain to that areasymbol are returned along with the areasymbol.
+       The requests are sent at the same time (maxThreads) and the results are added
+       to the local SDA cache.
        Adds NATMUSYM and MUNAME field to inputFeature layer if not present and populates."""
 
     try:
-        AddMsgAndPrint("\nSubmitting " + str(len(listsOfValues)) + " request(s) to Soil Data Access")
-        arcpy.SetProgressor("step", "Submitting request(s) to Soil Data Access", 0, len(listsOfValues),1)
-
-        # Total Count of values
-        iNumOfValues = 0
-        iRequestNum = 1
-
-        # master mukey:natmusym,muname dictionary
-        natmusymDict = dict()
-
         # SDMaccess URL
         URL = "https://sdmdataaccess.nrcs.usda.gov/Tabular/SDMTabularService/post.rest"
 
-        """ ---------------------------------------- Iterate through lists of unique values to submit requests for natsym ------------------------------"""
-        # Iterate through each list that has been parsed for no more than 1000 mukeys
-        for valueList in listsOfValues:
-            arcpy.SetProgressorLabel("Requesting NATSYM and MUNAME values for " + splitThousands(len(valueList)) + " " + sourceField + "(s). Request " + str(iRequestNum) + " of " + str(len(listsOfValues)))
+        if len(listsOfValues):
+            AddMsgAndPrint("\nSubmitting " + str(len(listsOfValues)) + " request(s) to Soil Data Access")
+            arcpy.SetProgressorLabel("Submitting " + str(len(listsOfValues)) + " request(s) to Soil Data Access")
 
-            iNumOfValues+=len(valueList)
-            iRequestNum+=1
+            """ ---------------------------------------- Create a request for each list of unique values ------------------------------"""
+            # Each list has been parsed for no more than 1000 mukeys or 300 areasymbols
+            requests = list()
 
-            # convert the list into a comma seperated string
-            ## values = ",".join(valueList)
-            values = str(valueList)[1:-1]
+            for valueList in listsOfValues:
 
-            # use this query if submitting request by AREASYMBOL
-            if bAreaSym:
-                sQuery = 'SELECT mapunit.mukey, nationalmusym, muname '\
-                          'FROM sacatalog ' \
-                          'INNER JOIN legend ON legend.areasymbol = sacatalog.areasymbol AND sacatalog.areasymbol IN (' + values + ') '\
-                          'INNER JOIN mapunit ON mapunit.lkey = legend.lkey'
+                # convert the list into a comma seperated string
+                values = str(valueList)[1:-1]
 
-            # use this query if submitting request by MUKEY
-            else:
-                sQuery = "SELECT m.mukey, m.nationalmusym, m.muname as natmusym from mapunit m where mukey in (" + values + ")"
-                #sQuery = "SELECT m.mukey, m.nationalmusym as natmusym from legend AS l INNER JOIN mapunit AS m ON l.lkey=m.mukey AND m.mukey in (" + mukeys + ")"
-
-            # Create request using JSON, return data as JSON
-            dRequest = dict()
-            dRequest["format"] = "JSON"
-            ##dRequest["FORMAT"] = "JSON+COLUMNNAME+METADATA"
-            dRequest["query"] = sQuery
-            jData = json.dumps(dRequest)
-
-            # Send request to SDA Tabular service using urllib2 library
-            req = urllib2.Request(URL, jData)
-
-            """ --------------------------------------  Try connecting to SDaccess to read JSON response - You get 3 Attempts ------------------------"""
-            # ---------------------------- First Attempt
-            try:
-                resp = urllib2.urlopen(req)
-            except:
-
-                # ---------------------------- Second Attempt
-                try:
-                    AddMsgAndPrint("\t2nd attempt at requesting data")
-                    resp = urllib2.urlopen(req)
-                except:
+                # use this query if submitting request by AREASYMBOL
+                if bAreaSym:
+                    sQuery = 'SELECT mapunit.mukey, nationalmusym, muname, legend.areasymbol '\
+                              'FROM sacatalog ' \
+                              'INNER JOIN legend ON legend.areasymbol = sacatalog.areasymbol AND sacatalog.areasymbol IN (' + values + ') '\
+                              'INNER JOIN mapunit ON mapunit.lkey = legend.lkey'
+
+                # use this query if submitting request by MUKEY
+                else:
+                    sQuery = "SELECT m.mukey, m.nationalmusym, m.muname as natmusym from mapunit m where mukey in (" + values + ")"
 
-                    # ---------------------------- Last Attempt
-                    try:
-                        AddMsgAndPrint("\t3rd attempt at requesting data")
-                        resp = urllib2.urlopen(req)
+                # Create request using JSON, return data as JSON
+                dRequest = dict()
+                dRequest["format"] = "JSON"
+                dRequest["query"] = sQuery
+                requests.append((tuple(valueList), URL, json.dumps(dRequest)))
 
-                    except URLError, e:
-                        AddMsgAndPrint("\n\n" + sQuery,2)
-                        if hasattr(e, 'reason'):
-                            AddMsgAndPrint("\n\t" + URL,2)
-                            AddMsgAndPrint("\tURL Error: " + str(e.reason), 2)
+            """ --------------------------------------  Send the requests to SDaccess - Each request gets 3 Attempts ------------------------"""
+            dResults = SSURGO_Web.FetchAll(requests, ParseSDATable, maxThreads=maxThreads, headers={"Content-Type":"application/json"}, retries=2)
 
-                        elif hasattr(e, 'code'):
-                            AddMsgAndPrint("\n\t" + URL,2)
-                            AddMsgAndPrint("\t" + e.msg + " (errorcode " + str(e.code) + ")", 2)
+            """ Sample Output (Table):
+                    [[u'753571', u'2tjpl', u'Amery sandy loam, 6 to 12 percent slopes'],
+                     [u'753574', u'2szdz', u'Amery sandy loam, 1 to 6 percent slopes'],
+                     [u'2809844', u'2v3f0', u'Grayling sand, 12 to 30 percent slopes']]"""
 
-                        return False
+            failedCnt = 0
+            cacheItems = list()
 
-                    except socket.timeout, e:
-                        AddMsgAndPrint("\n\t" + URL,2)
-                        AddMsgAndPrint("\tServer Timeout Error", 2)
-                        return False
+            for valueList, url, jData in requests:
+                table, errMsg = dResults[valueList]
 
-                    except socket.error, e:
-                        AddMsgAndPrint("\n\t" + URL)
-                        AddMsgAndPrint("\tNASIS Reports Website connection failure", 2)
-                        return False
+                # Request failed after 3 attempts
+                if table is None:
+                    failedCnt += 1
+                    AddMsgAndPrint("\n\t" + URL,2)
+                    AddMsgAndPrint("\tRequest for " + splitThousands(len(valueList)) + " " + sourceField + " value(s) failed: " + errMsg, 2)
+                    continue
+
+                # Nothing was returned from SDaccess
+                if not len(table):
+                    AddMsgAndPrint("\tWarning! NATMUSYM values were not returned for any of the " + sourceField + "  values.  Possibly OLD mukey values.",2)
+                    continue
 
-                    except httplib.BadStatusLine:
-                        AddMsgAndPrint("\n\t" + URL)
-                        AddMsgAndPrint("\tNASIS Reports Website connection failure", 2)
-                        return False
+                # Add the mukey:natmusym,muname Values to the master dictionary
+                for row in table:
+                    natmusymDict[row[0]] = (row[1],row[2])
 
-            jsonString = resp.read()
-            data = json.loads(jsonString)
+                # Save the values in the local cache, by areasymbol or by mukey
+                if bAreaSym:
+                    dSurveys = dict()
 
-            """ Sample Output:
-                {u'Table': [[u'mukey', u'natmusym',u'muname'],
-                        [u'ColumnOrdinal=0,ColumnSize=4,NumericPrecision=10,NumericScale=255,ProviderType=Int,IsLong=False,ProviderSpecificDataType=System.Data.SqlTypes.SqlInt32,DataTypeName=int',
-                         u'ColumnOrdinal=1,ColumnSize=6,NumericPrecision=255,NumericScale=255,ProviderType=VarChar,IsLong=False,ProviderSpecificDataType=System.Data.SqlTypes.SqlString,DataTypeName=varchar'],
-                        [u'753571', u'2tjpl', u'Amery sandy loam, 6 to 12 percent slopes'],
-                        [u'753574', u'2szdz', u'Amery sandy loam, 1 to 6 percent slopes'],
-                        [u'2809844', u'2v3f0', u'Grayling sand, 12 to 30 percent slopes']]}"""
+                    for row in table:
+                        dSurveys.setdefault(CacheKey(row[3]), list()).append(row[0:3])
 
-            # Nothing was returned from SDaccess
-            if not "Table" in data:
-                AddMsgAndPrint("\tWarning! NATMUSYM values were not returned for any of the " + sourceField + "  values.  Possibly OLD mukey values.",2)
-                continue
+                    cacheItems.extend(dSurveys.items())
 
-            # Add the mukey:natmusym,muname Values to the master dictionary
-            for pair in data["Table"]:
-                natmusymDict[pair[0]] = (pair[1],pair[2])
+                else:
+                    cacheItems.extend([(CacheKey(row[0]), row[0:3]) for row in table])
 
-            del jData,req,resp,jsonString,data
-            arcpy.SetProgressorPosition()
+            sdaCache.PutMany(cacheItems)
 
-        arcpy.ResetProgressor()
+            if failedCnt:
+                AddMsgAndPrint("\n\t" + str(failedCnt) + " of " + str(len(requests)) + " request(s) to Soil Data Access failed. Values that were returned have been cached and will not be requested again.",2)
+                return False
 
         """ -----------------------------------------  Add NATMUSYM and MUNAME to the Feature Layer if not present -----------------------------------------"""
         arcpy.SetProgressorLabel("Adding NATSYM and MUNAME fields if they don't exist")
@@ -380,7 +350,9 @@ def getNATMUSYM(listsOfValues, featureLayer):
         arcpy.SetProgressorLabel("Importing NATMUSYM and MUNAME values")
         AddMsgAndPrint("\nImporting NATMUSYM and MUNAME values",0)
         featureCount = int(arcpy.GetCount_management(featureLayer).getOutput(0))
-        arcpy.SetProgressor("step", "Importing NATMUSYM  and Mapunit Name Values into " + os.path.basename(featureLayer) + " layer", 0, featureCount,1)
+        progress = ToolTiming.Progress("Importing NATMUSYM  and Mapunit Name Values into " + os.path.basename(featureLayer) + " layer", featureCount)
+        missingSet = set()
+        missingCnt = 0
 
         """ itereate through the feature records and update the NATMUSYM and MUNAME field
             {'2809844': ('2v3f0', 'Grayling sand, 12 to 30 percent slopes'),
@@ -390,36 +362,42 @@ def getNATMUSYM(listsOfValues, featureLayer):
         with arcpy.da.UpdateCursor(featureLayer, [mukeyField,'NATMUSYM','MUNAME']) as cursor:
 
             for row in cursor:
+                progress.Update()
 
-                uNatmusym = natmusymDict.get(row[0])[0]
-                uMuName = natmusymDict.get(row[0])[1]
-                arcpy.SetProgressorLabel("Importing Values: " + row[0] + " : " + uNatmusym + "--" + uMuName)
+                # MUKEY was not returned by SDA
+                if not row[0] in natmusymDict:
+                    missingSet.add(row[0])
+                    missingCnt += 1
+                    continue
+
+                uNatmusym, uMuName = natmusymDict[row[0]]
+
+                # only rewrite records whose values have changed
+                if row[1] == uNatmusym and row[2] == uMuName:
+                    continue
 
                 try:
                     row[1] = uNatmusym
                     row[2] = uMuName
                     cursor.updateRow(row)
 
-                    del uNatmusym,uMuName
-                    arcpy.SetProgressorPosition()
-
                 except:
-                    AddMsgAndPrint("\tInvalid MUKEY: " + row[0],2)
+                    missingSet.add(row[0])
+                    missingCnt += 1
                     continue
 
-        arcpy.ResetProgressor()
+        progress.Finish()
+
+        for mukey in sorted(missingSet):
+            AddMsgAndPrint("\tInvalid MUKEY: " + str(mukey),2)
 
-        AddMsgAndPrint("\tSuccessfully populated 'NATMUSYM' and 'MUNAME' values for " + splitThousands(featureCount) + " records \n",0)
+        AddMsgAndPrint("\tSuccessfully populated 'NATMUSYM' and 'MUNAME' values for " + splitThousands(featureCount - missingCnt) + " records \n",0)
 
         if bAreaSym:
             AddMsgAndPrint("\tThere are " + splitThousands(len(natmusymDict))+ " unique mapunits")
 
         return True
 
-    except urllib2.HTTPError:
-        errorMsg()
-        return False
-
     except:
         errorMsg()
         return False
@@ -427,9 +405,9 @@ def getNATMUSYM(listsOfValues, featureLayer):
 ## ===================================================================================
 ## ====================================== Main Body ==================================
 # Import modules
-import sys, string, os, locale, arcpy, traceback, urllib2, httplib, json, re, socket
-from urllib2 import urlopen, URLError, HTTPError
+import sys, string, os, locale, arcpy, traceback, json, re
 from arcpy import env
+import SSURGO_Web, ToolTiming
 
 if __name__ == '__main__':
 
@@ -440,6 +418,12 @@ if __name__ == '__main__':
         bFGDBsapolygon = False
         bAreaSym = False
         source = inputFeature
+        maxThreads = 4          # number of simultaneous requests to Soil Data Access
+        cacheTTL = 604800       # seconds that SDA values are kept in the local cache (7 days)
+
+        # master mukey:natmusym,muname dictionary, starts with the values in the local cache
+        natmusymDict = dict()
+        sdaCache = SSURGO_Web.ResponseCache(SSURGO_Web.CachePath(), cacheTTL)
 
         """ ------------------------------------------- MUKEY field must be present ----------------------------------------------"""
         if not FindField(inputFeature,"MUKEY"):
@@ -519,5 +503,7 @@ if __name__ == '__main__':
         if not getNATMUSYM(uniqueValueList,inputFeature):
             AddMsgAndPrint("\nFailed to update NATSYM field",2)
 
+        sdaCache.Close()
+
     except:
         errorMsg()
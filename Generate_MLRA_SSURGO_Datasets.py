@@ -125,7 +125,12 @@
 #       to remove continue statements from within if statements.  So many versions were created in an effort to
 #       troubleshoot this problem that I decided to print the version of the script in the log file.
 #
-# Last Modified:  10/24/2017
+# UPDATED: 10/18/2026
+#   * Surveys are merged in Hilbert curve order of their extents (SSURGO_Order) instead of by the product of the
+#     center coordinates, which let two surveys with the same product overwrite each other.
+#   * Added option to sort the MUPOLYGON features by the same curve after the merge.
+#
+# Last Modified:  10/18/2026
 #
 # Beginning of Functions
 
@@ -1134,6 +1139,7 @@ def addAttributeIndex(table,fieldList,verbose=True):
 import arcpy, sys, string, os, time, datetime, re, csv, traceback, shutil
 from arcpy import env
 from datetime import datetime
+import SSURGO_Order
 
 if __name__ == '__main__':
 
@@ -1150,6 +1156,13 @@ if __name__ == '__main__':
     #mlraList = 1-OLY;1-ONT;1-PAL
     mlraList = arcpy.GetParameter(2)
 
+    # Parameter # 4: (Optional) Sort the merged MUPOLYGON features in Hilbert curve order
+    try:
+        bSortFeatures = arcpy.GetParameter(3) == True
+
+    except:
+        bSortFeatures = False
+
     # SSURGO FGDB template that contains empty SSURGO Tables and relationships
     # and will be copied over to the output location
     ssurgoTemplate = os.path.dirname(sys.argv[0]) + os.sep + "SSURGO_Table_Template.gdb"
@@ -1229,15 +1242,15 @@ if __name__ == '__main__':
             env.outputCoordinateSystem = spatialRef
 
             # -------------------------------------------------------------------------------- Establish Dictionaries, lists and Fieldmappings
-            # Dictionary containing approx center of SSA (key) and the SSURGO layer path (value)
-            soilShpDict = dict()  # {-4002.988250799742: 'K:\\FY2014_SSURGO_R10_download\\soils_wi063\\spatial\\soilmu_a_wi063.shp'}
+            # Dictionary containing the SSA (key) and the SSURGO layer path (value)
+            soilShpDict = dict()  # {'WI063': 'K:\\FY2014_SSURGO_R10_download\\soils_wi063\\spatial\\soilmu_a_wi063.shp'}
             muLineShpDict = dict()
             muPointShpDict = dict()
             soilSaShpDict = dict()
             featPointShpDict = dict()
             featLineShpDict = dict()
 
-            # lists containing SSURGO layer paths sorted according to the survey center key
+            # lists containing SSURGO layer paths sorted according to the survey order
             # This list will be passed over to the Merge command
             soilShpList = list() #['G:\\2014_SSURGO_Region10\\soils_ia005\\spatial\\soilmu_a_ia005.shp']
             muLineShpList = list()
@@ -1246,10 +1259,10 @@ if __name__ == '__main__':
             featPointShpList = list()
             featLineShpList = list()
 
-            # list containing the (Xcenter * Ycenter) for every SSURGO soil layer
-            extentList = list()
+            # extent of every SSURGO soil layer {'WI063': (xmin, ymin, xmax, ymax)}
+            dExtents = dict()
 
-            # Calculate survey Centers, assign directory paths to SSURGO layers
+            # Get survey extents, assign directory paths to SSURGO layers
             for SSA in mlraDatasetDict:
 
                 # Paths to individual SSURGO layers
@@ -1260,48 +1273,45 @@ if __name__ == '__main__':
                 featPointShpPath = os.path.join(os.path.join(mlraDatasetDict[SSA],"spatial"),"soilsf_p_" + SSA.lower() + ".shp")
                 featLineShpPath = os.path.join(os.path.join(mlraDatasetDict[SSA],"spatial"),"soilsf_l_" + SSA.lower() + ".shp")
 
-                # Calculate the approximate center of a given survey
+                # Extent of a given survey
                 desc = arcpy.Describe(soilShpPath)
                 shpExtent = desc.extent
-                XCntr = (shpExtent.XMin + shpExtent.XMax) / 2.0
-                YCntr = (shpExtent.YMin + shpExtent.YMax) / 2.0
-                surveyCenter = XCntr * YCntr
+                dExtents[SSA] = (shpExtent.XMin, shpExtent.YMin, shpExtent.XMax, shpExtent.YMax)
 
-                # Assign {-4002.988250799742: 'K:\\FY2014_SSURGO_R10_download\\soils_wi063\\spatial\\soilmu_a_wi063.shp'}
-                soilShpDict[surveyCenter] = soilShpPath
-                muLineShpDict[surveyCenter] = muLineShpPath
-                muPointShpDict[surveyCenter] = muPointShpPath
-                soilSaShpDict[surveyCenter] = soilSaShpPath
-                featPointShpDict[surveyCenter] = featPointShpPath
-                featLineShpDict[surveyCenter] = featLineShpPath
+                # Assign {'WI063': 'K:\\FY2014_SSURGO_R10_download\\soils_wi063\\spatial\\soilmu_a_wi063.shp'}
+                soilShpDict[SSA] = soilShpPath
+                muLineShpDict[SSA] = muLineShpPath
+                muPointShpDict[SSA] = muPointShpPath
+                soilSaShpDict[SSA] = soilSaShpPath
+                featPointShpDict[SSA] = featPointShpPath
+                featLineShpDict[SSA] = featLineShpPath
 
-                extentList.append(surveyCenter)
-                del soilShpPath, muLineShpPath, muPointShpPath, soilSaShpPath, featPointShpPath, featLineShpPath, desc, shpExtent, XCntr, YCntr, surveyCenter
+                del soilShpPath, muLineShpPath, muPointShpPath, soilSaShpPath, featPointShpPath, featLineShpPath, desc, shpExtent
 
             # ----------------------------------------------------------------------------------------------------------------------------- Begin the Merging Process
-            # Sort shapefiles by extent so that the drawing order is a little more effecient
-            extentList.sort()
+            # Order the surveys along a Hilbert curve so that neighbouring surveys are merged next to each other
+            surveyOrder = SSURGO_Order.SurveyOrder(dExtents)
 
             # There should be at least 1 survey to merge into the MUPOLYGON
             if len(soilShpDict) > 0:
 
-                # Add SSURGO paths to their designated lists according to the sortedKey
-                for surveyCenter in extentList:
+                # Add SSURGO paths to their designated lists according to the survey order
+                for SSA in surveyOrder:
 
-                    soilShpList.append(soilShpDict[surveyCenter])
-                    soilSaShpList.append(soilSaShpDict[surveyCenter])
+                    soilShpList.append(soilShpDict[SSA])
+                    soilSaShpList.append(soilSaShpDict[SSA])
 
-                    if int(arcpy.GetCount_management(muLineShpDict[surveyCenter]).getOutput(0)) > 0:
-                        muLineShpList.append(muLineShpDict[surveyCenter])
+                    if int(arcpy.GetCount_management(muLineShpDict[SSA]).getOutput(0)) > 0:
+                        muLineShpList.append(muLineShpDict[SSA])
 
-                    if int(arcpy.GetCount_management(muPointShpDict[surveyCenter]).getOutput(0)) > 0:
-                        muPointShpList.append(muPointShpDict[surveyCenter])
+                    if int(arcpy.GetCount_management(muPointShpDict[SSA]).getOutput(0)) > 0:
+                        muPointShpList.append(muPointShpDict[SSA])
 
-                    if int(arcpy.GetCount_management(featPointShpDict[surveyCenter]).getOutput(0)) > 0:
-                        featPointShpList.append(featPointShpDict[surveyCenter])
+                    if int(arcpy.GetCount_management(featPointShpDict[SSA]).getOutput(0)) > 0:
+                        featPointShpList.append(featPointShpDict[SSA])
 
-                    if int(arcpy.GetCount_management(featLineShpDict[surveyCenter]).getOutput(0)) > 0:
-                        featLineShpList.append(featLineShpDict[surveyCenter])
+                    if int(arcpy.GetCount_management(featLineShpDict[SSA]).getOutput(0)) > 0:
+                        featLineShpList.append(featLineShpDict[SSA])
 
             # No surveys to merge
             else:
@@ -1324,6 +1334,12 @@ if __name__ == '__main__':
                 #arcpy.Append_management(soilShpList, os.path.join(FGDBpath, soilFC), "NO_TEST")
 
                 AddMsgAndPrint("\t\tSuccessfully merged SSURGO Soil Mapunit Polygons",0)
+
+                if bSortFeatures:
+                    arcpy.SetProgressorLabel("Sorting SSURGO Soil Mapunit Polygons")
+                    SSURGO_Order.SortFeatures(soilFCpath)
+                    AddMsgAndPrint("\t\tSorted SSURGO Soil Mapunit Polygons in Hilbert curve order",0)
+
                 if not addAttributeIndex(soilFCpath,["AREASYMBOL","MUSYM"],False): pass
 
                 arcpy.SetProgressorPosition()
@@ -9,7 +9,11 @@
 # 608.662.4422 ext. 216
 #
 #
-# Last Modified:  10/24/2017
+# Last Modified:  10/18/2026
+#
+# 10/18/2026 Surveys are appended in Hilbert curve order of their extents (SSURGO_Order) instead of by the
+#            product of the center coordinates, which let two surveys with the same product overwrite each
+#            other. Added option to sort the MUPOLYGON features by the same curve after the append.
 
 ## ===================================================================================
 def print_exception():
@@ -737,6 +741,7 @@ def addAttributeIndex(table,fieldList,verbose=True):
 import arcpy, sys, string, os, time, datetime, re, traceback, csv
 from arcpy import env
 from datetime import datetime
+import SSURGO_Order
 
 if __name__ == '__main__':
 
@@ -753,6 +758,13 @@ if __name__ == '__main__':
     wssLibrary = arcpy.GetParameterAsText(2)
     #wssLibrary = r'O:\SSURGO_2020_new'
 
+    # Parameter # 4: (Optional) Sort the MUPOLYGON features in Hilbert curve order
+    try:
+        bSortFeatures = arcpy.GetParameter(3) == True
+
+    except:
+        bSortFeatures = False
+
     # Path to the Master Regional table that contains SSAs by region with extra extent
     #regionalTable = os.path.dirname(sys.argv[0]) + os.sep + "SSURGO_Soil_Survey_Area.gdb\junkTable"
     regionalTable = os.path.join(os.path.join(os.path.dirname(sys.argv[0]),"SSURGO_Soil_Survey_Area.gdb"),"SSA_Regional_Ownership_MASTER")
@@ -843,15 +855,15 @@ if __name__ == '__main__':
         arcpy.SetProgressorLabel("Gathering information about Soil Survey datasets...")
 
         # ------------------------------------------------------------------------------------- Establish Dictionaries, lists and Fieldmappings
-        # Dictionary containing approx center of SSA (key) and the SSURGO layer path (value)
-        soilShpDict = dict()   # {-4002.988250799742: 'K:\\FY2014_SSURGO_R10_download\\soil_wi063\\spatial\\soilmu_a_wi063.shp'}
+        # Dictionary containing the SSA (key) and the SSURGO layer path (value)
+        soilShpDict = dict()   # {'WI063': 'K:\\FY2014_SSURGO_R10_download\\soil_wi063\\spatial\\soilmu_a_wi063.shp'}
         muLineShpDict = dict()
         muPointShpDict = dict()
         soilSaShpDict = dict()
         featPointShpDict = dict()
         featLineShpDict = dict()
 
-        # lists containing SSURGO layer paths sorted according to the survey center key
+        # lists containing SSURGO layer paths sorted according to the survey order
         # This list will be passed over to the Merge command
         soilShpList = list()
         muLineShpList = list()
@@ -872,8 +884,8 @@ if __name__ == '__main__':
         # Field map object that will contain the original MUSYM; it will be calculated from musym field
         origMUSYMfm = arcpy.FieldMap()
 
-        # list containing the (Xcenter * Ycenter) for every SSURGO soil layer
-        extentList = list()
+        # extent of every SSURGO survey area layer {'WI063': (xmin, ymin, xmax, ymax)}
+        dExtents = dict()
 
         # ------------------------------------------------------------------------------------- Populate Dictionaries, lists and Fieldmappings
         arcpy.SetProgressor("step", "Gathering information about Soil Survey datasets...", 1, len(ssurgoDatasetDict), 1)
@@ -889,23 +901,19 @@ if __name__ == '__main__':
             featPointShpPath = os.path.join(os.path.join(ssurgoDatasetDict[SSA],"spatial"),"soilsf_p_" + SSA.lower() + ".shp")
             featLineShpPath = os.path.join(os.path.join(ssurgoDatasetDict[SSA],"spatial"),"soilsf_l_" + SSA.lower() + ".shp")
 
-            # Calculate the approximate center of a given survey using the SSA
+            # Extent of a given survey using the SSA
             desc = arcpy.Describe(soilSaShpPath)
             shpExtent = desc.extent
-            XCntr = (shpExtent.XMin + shpExtent.XMax) / 2.0
-            YCntr = (shpExtent.YMin + shpExtent.YMax) / 2.0
-            surveyCenter = XCntr * YCntr  # approximate center of survey
-
-            # Add survey center and SSURGO paths to respective dicts
-            # {-4002.988250799742: 'K:\\FY2014_SSURGO_R10_download\\soil_wi063\\spatial\\soilmu_a_wi063.shp'}
-            soilShpDict[surveyCenter] = soilShpPath
-            muLineShpDict[surveyCenter] = muLineShpPath
-            muPointShpDict[surveyCenter] = muPointShpPath
-            soilSaShpDict[surveyCenter] = soilSaShpPath
-            featPointShpDict[surveyCenter] = featPointShpPath
-            featLineShpDict[surveyCenter] = featLineShpPath
+            dExtents[SSA] = (shpExtent.XMin, shpExtent.YMin, shpExtent.XMax, shpExtent.YMax)
 
-            extentList.append(surveyCenter)
+            # Add SSURGO paths to respective dicts
+            # {'WI063': 'K:\\FY2014_SSURGO_R10_download\\soil_wi063\\spatial\\soilmu_a_wi063.shp'}
+            soilShpDict[SSA] = soilShpPath
+            muLineShpDict[SSA] = muLineShpPath
+            muPointShpDict[SSA] = muPointShpPath
+            soilSaShpDict[SSA] = soilSaShpPath
+            featPointShpDict[SSA] = featPointShpPath
+            featLineShpDict[SSA] = featLineShpPath
 
             # Add all field names from all of the SSURGO layers into their respective fieldMappings
 ##            soilsFM.addTable(soilShpPath)
@@ -917,7 +925,7 @@ if __name__ == '__main__':
 
             #origMUSYMfm.addInputField(soilShpPath,"musym")
 
-            del soilShpPath, muLineShpPath, muPointShpPath, soilSaShpPath, featPointShpPath, featLineShpPath, desc, shpExtent, XCntr, YCntr, surveyCenter
+            del soilShpPath, muLineShpPath, muPointShpPath, soilSaShpPath, featPointShpPath, featLineShpPath, desc, shpExtent
             arcpy.SetProgressorPosition()
 
         # Add 'orig_musym' to field map
@@ -930,32 +938,32 @@ if __name__ == '__main__':
 ##        soilsFM.addFieldMap(origMUSYMfm)
 
         # ---------------------------------------------------------------------------------------------------------- Begin the Merge Process
-        # Sort shapefiles by extent so that the drawing order is continous
-        extentList.sort()
+        # Order the surveys along a Hilbert curve so that the drawing order is continous
+        surveyOrder = SSURGO_Order.SurveyOrder(dExtents)
 
         # number of soil layers to merge should be equal to number of Regional SSAs
         #if len(soilShpDict) == len(regionalASlist):
         if len(soilShpDict) > 0:
 
-            # Add SSURGO paths to their designated lists according to the survey's center so that they draw continously
+            # Add SSURGO paths to their designated lists according to the survey order so that they draw continously
             # If the layer has features then add it to the merge list otherwise skip it.  This was added b/c it turns
             # out that empty mapunit point .shp are in line geometry and not point geometry
-            for surveyCenter in extentList:
+            for SSA in surveyOrder:
 
-                soilShpList.append(soilShpDict[surveyCenter])
-                soilSaShpList.append(soilSaShpDict[surveyCenter])
+                soilShpList.append(soilShpDict[SSA])
+                soilSaShpList.append(soilSaShpDict[SSA])
 
-                if int(arcpy.GetCount_management(muLineShpDict[surveyCenter]).getOutput(0)) > 0:
-                    muLineShpList.append(muLineShpDict[surveyCenter])
+                if int(arcpy.GetCount_management(muLineShpDict[SSA]).getOutput(0)) > 0:
+                    muLineShpList.append(muLineShpDict[SSA])
 
-                if int(arcpy.GetCount_management(muPointShpDict[surveyCenter]).getOutput(0)) > 0:
-                    muPointShpList.append(muPointShpDict[surveyCenter])
+                if int(arcpy.GetCount_management(muPointShpDict[SSA]).getOutput(0)) > 0:
+                    muPointShpList.append(muPointShpDict[SSA])
 
-                if int(arcpy.GetCount_management(featPointShpDict[surveyCenter]).getOutput(0)) > 0:
-                    featPointShpList.append(featPointShpDict[surveyCenter])
+                if int(arcpy.GetCount_management(featPointShpDict[SSA]).getOutput(0)) > 0:
+                    featPointShpList.append(featPointShpDict[SSA])
 
-                if int(arcpy.GetCount_management(featLineShpDict[surveyCenter]).getOutput(0)) > 0:
-                    featLineShpList.append(featLineShpDict[surveyCenter])
+                if int(arcpy.GetCount_management(featLineShpDict[SSA]).getOutput(0)) > 0:
+                    featLineShpList.append(featLineShpDict[SSA])
 
         # Some reason some surveys are missing......Exit
         else:
@@ -983,6 +991,11 @@ if __name__ == '__main__':
 
             AddMsgAndPrint("\tSuccessfully merged SSURGO Soil Mapunit Polygons",0)
 
+            if bSortFeatures:
+                arcpy.SetProgressorLabel("Sorting SSURGO Soil Mapunit Polygons")
+                SSURGO_Order.SortFeatures(soilFCpath)
+                AddMsgAndPrint("\tSorted SSURGO Soil Mapunit Polygons in Hilbert curve order",0)
+
             if not addAttributeIndex(soilFCpath,["AREASYMBOL","MUSYM"],False): pass
 
             arcpy.SetProgressorPosition()
@@ -127,6 +127,11 @@
 #
 #  Last updated 10/24/2017
 #
+# UPDATED: 10/18/2026
+#       importTabularData reads each text file once instead of counting the records in a first pass.
+#       The value converters for each table (blank to None, string truncation, numeric casting) are built
+#       once from the table schema (SSURGO_Tabular.py) and the converted rows are inserted in batches.
+#
 # Beginning of Functions
 
 ## ===================================================================================
@@ -460,63 +465,45 @@ def importTabularData(tabularFolder, tblAliases, queue):
                     if os.path.getsize(txtPath) > 0:
 
                         # Put all the field names in a list; used to initiate insertCursor object
+                        # The field type and length of each field is used to build the value converters
                         fieldList = arcpy.Describe(GDBtable).fields
                         nameOfFields = []
-                        fldLengths = list()
+                        fldTypes = list()
 
                         for field in fieldList:
 
                             if field.type != "OID":
                                 nameOfFields.append(field.name)
-                                if field.type.lower() == "string":
-                                    fldLengths.append(field.length)
-                                else:
-                                    fldLengths.append(0)
+                                fldTypes.append((field.type, field.length if field.type.lower() == "string" else 0))
 
                         del fieldList, field
 
-                        # The csv file might contain very huge fields, therefore increase the field_size_limit:
-                        # Exception thrown with IL177 in legend.txt.  Not sure why, only 1 record was present
-                        csv.field_size_limit(sys.maxsize)
-
-                        # Number of records in the SSURGO text file
-                        textFileRecords = sum(1 for row in csv.reader(open(txtPath, 'rb'), delimiter='|', quotechar='"'))
-
                         # Initiate Cursor to add rows
                         cursor = arcpy.da.InsertCursor(GDBtable,nameOfFields)
 
-                        # counter for number of records successfully added; used for reporting
+                        # counter for number of records read from the text file and successfully added; used for reporting.
+                        # ReadTextRows raises an error if it did not read every line of the text file.
+                        textFileRecords = 0
                         numOfRowsAdded = 0
-                        reader = csv.reader(open(txtPath, 'rb'), delimiter='|', quotechar='"')
+                        newRow = None
 
                         try:
-                            # Return a reader object which will iterate over lines in txtPath
-                            for rowInFile in reader:
-
-                                """ Cannot use this snippet of code b/c some values have exceeded their field lengths; need to truncate"""
-                                # replace all blank values with 'None' so that the values are properly inserted
-                                # into integer values otherwise insertRow fails
-                                # newRow = [None if value =='' else value for value in rowInFile]
-
-                                newRow = list()  # list containing the values that make up a specific row
-                                fldNo = 0        # list position to reference the field lengths in order to compare
-
-                                for value in rowInFile:
-                                    fldLen = fldLengths[fldNo]
-
-                                    if value == '':
-                                        value = None
-
-                                    elif fldLen > 0:
-                                        value = value[0:fldLen]
+                            # Read the text file once. Each batch of rows has already been converted:
+                            # blank values are None and strings are truncated to their field length.
+                            for rowBatch in SSURGO_Tabular.ReadTextRows(txtPath, fldTypes):
+                                textFileRecords += len(rowBatch)
 
-                                    newRow.append(value)
-                                    fldNo += 1
+                                for newRow in rowBatch:
+                                    cursor.insertRow(newRow)
+                                    numOfRowsAdded += 1
 
-                                cursor.insertRow(newRow)
-                                numOfRowsAdded += 1
+                        except SSURGO_Tabular.TextFileError, e:
+                            # a row that could not be converted or a text file that was not read to the end
+                            AddMsgAndPrint("\n\t\tError reading text file: " + txtPath,2)
+                            AddMsgAndPrint("\t\t\t" + str(e),2)
 
-                                del newRow
+                            if not e.values is None:
+                                AddMsgAndPrint("\t\t\tValues: " + "|".join(e.values),2)
 
                         except:
                             AddMsgAndPrint("\n\t\tError inserting record in table: " + GDBtable,2)
@@ -526,13 +513,13 @@ def importTabularData(tabularFolder, tblAliases, queue):
 
                         AddMsgAndPrint("\t\t--> " + iefileName + theAlias + theRecLength + " Records Added: " + str(splitThousands(numOfRowsAdded)),0)
 
-                        # compare the # of rows inserted with the number of valid rows in the text file.
+                        # compare the # of rows inserted with the number of valid rows read from the text file.
                         if numOfRowsAdded != textFileRecords:
                             AddMsgAndPrint("\t\t\t Incorrect # of records inserted into: " + GDBtable, 2 )
                             AddMsgAndPrint("\t\t\t\t TextFile records: " + str(textFileRecords),2)
                             AddMsgAndPrint("\t\t\t\t Records Inserted: " + str(numOfRowsAdded),2)
 
-                        del GDBtable, x, aliasName, iefileName, txtPath, theAlias, theRecLength, nameOfFields, textFileRecords, rowInFile, numOfRowsAdded, cursor, reader
+                        del GDBtable, x, aliasName, iefileName, txtPath, theAlias, theRecLength, nameOfFields, fldTypes, textFileRecords, newRow, numOfRowsAdded, cursor
 
                     else:
                         AddMsgAndPrint("\t\t--> " + iefileName + theAlias + theRecLength + " Records Added: 0",0)
@@ -556,7 +543,7 @@ def importTabularData(tabularFolder, tblAliases, queue):
         return False
 
     except csv.Error, e:
-        AddMsgAndPrint('\nfile %s, line %d: %s' % (txtPath, reader.line_num, e))
+        AddMsgAndPrint('\nfile %s: %s' % (txtPath, e))
         AddMsgAndPrint("\tImporting Tabular Data Failed for: " + SSA,2)
         print_exception()
         return False
@@ -913,6 +900,7 @@ def addAttributeIndex(table,fieldList,verbose=True):
 # Import modules
 import arcpy, sys, string, os, time, datetime, re, csv, traceback, shutil
 from arcpy import env
+import SSURGO_Tabular
 
 if __name__ == '__main__':
 
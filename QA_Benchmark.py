@@ -0,0 +1,509 @@
+# QA_Benchmark.py
+#
+# Python 2.7 or 3, numpy
+#
+# USDA-NRCS National Soil Survey Center
+#
+# Benchmark for the geometry code behind the SSURGO QA tools. It runs without arcpy or real
+# survey data, so QA throughput can be measured and compared on any machine with numpy.
+#
+# A synthetic soil survey mosaic is generated for each requested size. The mosaic is a grid of
+# jittered cells with densified, wiggled soil lines. Neighboring cells share exactly the same
+# vertices. The columns of cells are split into survey areas (AREASYMBOL) and each cell gets a
+# random MUSYM. The following problems are injected:
+#
+#   slivers      narrow spikes on soil lines (QA_SliverFinder)
+#   duplicates   repeated vertices, zero length segments (QA_VertexFlags, QA_CommonPoints)
+#   islands      holes filled by an island polygon
+#   multiparts   islands that are a second part of the neighboring polygon
+#   seams        soil line nodes moved along the survey boundary (QA_EdgeMatch_lines)
+#
+# Each polygon is written as WKB, the same as a SHAPE@WKB cursor row (OID, WKB, AREASYMBOL, MUSYM).
+# The benchmark times the arcpy-free part of each QA tool, from the cursor rows to the output rows.
+# The cores call the same QA_Geometry and QA_Checks functions as the tools:
+#
+#   ReadPolygonArrays          decoding WKB rows into PolygonArrays batches
+#   QA_SliverFinder            vertex angles for each polygon and the sliver rows
+#   QA_VertexFlags             polygon statistics and the QA_VertexStats rows
+#   QA_VertexFlags_Near        near vertex check
+#   QA_VertexReport            polygon statistics summed by MUSYM and the report rows
+#   QA_CommonPoints            duplicate vertices by AREASYMBOL:MUSYM
+#   QA_CommonLines             shared segments with the same MUSYM, by survey
+#   QA_EdgeMatch_lines         survey boundary nodes without a match
+#
+# Vertices per second and peak memory for every core are appended to a JSON history file.
+# When the throughput drops more than the threshold below the best earlier result for the same
+# machine, Python version, core and size, or the peak memory grows more than the memory threshold above the
+# lowest earlier peak, the core is reported as a regression and the exit status is 1.
+#
+# Usage:
+#   python QA_Benchmark.py --vertices 1000 100000 1000000 --repeat 3
+#
+# Peak memory comes from tracemalloc (Python 3) in a separate run of each core. Python 2 has no
+# tracemalloc, so each core is run again in a new process that builds the same mosaic and the
+# growth of its peak resident memory (ru_maxrss) during the core is recorded. Where the resource
+# module is missing (Windows) the peak memory is not available. Peaks are only compared with
+# earlier runs that measured memory the same way.
+#
+# 10-18-2026 Original coding
+# 10-18-2026 The cores call QA_Checks instead of copies of the tool code. Peak memory under Python 2
+#            is measured for each core in its own process. Added the memory regression threshold.
+#            Runs are only compared with earlier runs of the same Python version.
+
+from __future__ import print_function
+
+import sys, os, math, time, json, struct, platform, argparse, subprocess
+import numpy as np
+import QA_Geometry, QA_Checks
+
+try:
+    import tracemalloc
+
+except ImportError:
+    tracemalloc = None
+
+try:
+    import resource
+
+except ImportError:
+    resource = None
+
+## ===================================================================================
+def PolygonWKB(parts):
+    # Return the little-endian WKB for a Polygon (one part) or MultiPolygon. parts is a
+    # list of parts, each a list of (n, 2) ring arrays with the exterior ring first.
+    #
+    polygons = list()
+
+    for rings in parts:
+        wkb = [struct.pack("<BII", 1, 3, len(rings))]
+
+        for ring in rings:
+            wkb.append(struct.pack("<I", len(ring)))
+            wkb.append(np.ascontiguousarray(ring, dtype="<f8").tobytes())
+
+        polygons.append(b"".join(wkb))
+
+    if len(polygons) == 1:
+        return polygons[0]
+
+    return struct.pack("<BII", 1, 6, len(polygons)) + b"".join(polygons)
+
+## ===================================================================================
+def MakeMosaic(numVertices, numSurveys=4, seed=0, edgePoints=8, cellSize=100.0):
+    # Generate a synthetic survey mosaic with about numVertices vertices. Returns the list
+    # of cursor rows (OID, WKB, AREASYMBOL, MUSYM) and a dictionary with the number of
+    # injected problems of each type.
+    #
+    rng = np.random.RandomState(seed)
+    k = edgePoints
+    ringLen = 4 * (k + 1) + 1
+    numCells = max(numSurveys * 2, numVertices // ringLen)
+    nCols = max(numSurveys, int(round(math.sqrt(numCells))))
+    nRows = max(2, numCells // nCols)
+    numCells = nRows * nCols
+
+    # Lattice nodes. The outer boundary is left straight.
+    nodes = np.zeros((nRows + 1, nCols + 1, 2))
+    nodes[:, :, 0] = np.arange(nCols + 1)[np.newaxis, :] * cellSize
+    nodes[:, :, 1] = np.arange(nRows + 1)[:, np.newaxis] * cellSize
+    nodes[1:-1, 1:-1] += rng.uniform(-0.05, 0.05, (nRows - 1, nCols - 1, 2)) * cellSize
+
+    # Soil lines between the nodes, horizontal lines wiggle up and down
+    t = np.linspace(0.0, 1.0, k + 2)[:, np.newaxis]
+    hEdges = nodes[:, :-1, np.newaxis, :] * (1.0 - t) + nodes[:, 1:, np.newaxis, :] * t
+    vEdges = nodes[:-1, :, np.newaxis, :] * (1.0 - t) + nodes[1:, :, np.newaxis, :] * t
+    hEdges[1:-1, :, 1:-1, 1] += rng.uniform(-0.02, 0.02, (nRows - 1, nCols, k)) * cellSize
+
+    # Slivers: a narrow spike in the middle of some inner horizontal soil lines
+    numSlivers = max(1, numCells // 200)
+    j = (k + 1) // 2
+    spikeRows = rng.randint(1, nRows, numSlivers)
+    spikeCols = rng.randint(0, nCols, numSlivers)
+    tip = hEdges[spikeRows, spikeCols, j].copy()
+    hEdges[spikeRows, spikeCols, j - 1] = tip + [-0.01 * cellSize, 0.0]
+    hEdges[spikeRows, spikeCols, j + 1] = tip + [0.01 * cellSize, 0.0]
+    hEdges[spikeRows, spikeCols, j] = tip + [0.0, 0.2 * cellSize]
+
+    # Clockwise ring for every cell: top, right, bottom and left side
+    top = hEdges[1:, :, :-1]
+    right = vEdges[:, 1:, ::-1][:, :, :-1]
+    bottom = hEdges[:-1, :, ::-1][:, :, :-1]
+    left = vEdges[:, :-1, :-1]
+    rings = np.concatenate([top, right, bottom, left, top[:, :, :1]], axis=2).reshape(numCells, ringLen, 2)
+
+    # Survey areas are strips of columns
+    colSurveys = np.arange(nCols) * numSurveys // nCols
+    cellSurveys = np.tile(colSurveys, nRows)
+    cellMusyms = rng.randint(1, 13, numCells)
+
+    # Seams: move the soil line node at the survey boundary on the east side only. The node
+    # stays on the boundary of the west survey, halfway to the next vertex.
+    seamCols = np.nonzero(colSurveys[1:] != colSurveys[:-1])[0] + 1
+    numSeams = 0
+
+    for c in seamCols:
+        for r in rng.choice(np.arange(1, nRows), max(1, nRows // 20), replace=False):
+            node = (vEdges[r, c, 0] + vEdges[r, c, 1]) / 2.0
+            rings[r * nCols + c, 3 * (k + 1)] = node
+            rings[(r - 1) * nCols + c, 0] = node
+            rings[(r - 1) * nCols + c, -1] = node
+            numSeams += 1
+
+    # Islands and multipart polygons
+    numIslands = max(1, numCells // 50)
+    islandCells = rng.choice(numCells, numIslands, replace=False)
+    dHoles = dict()
+    dParts = dict()
+    islands = list()
+    numMultipart = 0
+
+    for i, cell in enumerate(sorted(islandCells)):
+        center = (nodes[cell // nCols, cell % nCols] + nodes[cell // nCols + 1, cell % nCols + 1]) / 2.0
+        square = center + np.array([[-1, 1], [1, 1], [1, -1], [-1, -1], [-1, 1]]) * 0.15 * cellSize
+        dHoles[cell] = square[::-1]
+
+        if i % 4 == 3 and cell % nCols + 1 < nCols and cellSurveys[cell + 1] == cellSurveys[cell]:
+            dParts.setdefault(cell + 1, list()).append([square])
+            numMultipart += 1
+
+        else:
+            islands.append((cellSurveys[cell], rng.randint(13, 16), [[square]]))
+
+    # Duplicate vertices
+    numDups = max(1, numCells // 100)
+    dupCells = set(rng.choice(numCells, numDups, replace=False))
+
+    rows = list()
+
+    for cell in range(numCells):
+        ring = rings[cell]
+
+        if cell in dupCells:
+            ring = np.insert(ring, 2, ring[2], axis=0)
+
+        parts = [[ring]]
+
+        if cell in dHoles:
+            parts[0].append(dHoles[cell])
+
+        parts.extend(dParts.get(cell, []))
+        rows.append((len(rows) + 1, PolygonWKB(parts), "SYN%03d" % (cellSurveys[cell] + 1), str(cellMusyms[cell])))
+
+    for survey, musym, parts in islands:
+        rows.append((len(rows) + 1, PolygonWKB(parts), "SYN%03d" % (survey + 1), str(musym)))
+
+    injected = {"slivers":numSlivers, "duplicates":numDups, "islands":numIslands, "multiparts":numMultipart, "seams":numSeams}
+    return rows, injected
+
+## ===================================================================================
+def CountVertices(rows):
+    # Total number of vertices in the cursor rows
+    numVertices = 0
+
+    for batch in QA_Geometry.ReadPolygonArrays(rows):
+        numVertices += len(batch.xy)
+
+    return numVertices
+
+## ===================================================================================
+def RunReadPolygonArrays(rows):
+    numPolys = 0
+
+    for batch in QA_Geometry.ReadPolygonArrays(rows):
+        numPolys += len(batch.oids)
+
+    return numPolys
+
+## ===================================================================================
+def RunSliverFinder(rows, minAngle=10):
+    # Per-polygon decode and angle test, as in QA_SliverFinder
+    flags = list()
+
+    for row in rows:
+        xy, ringOffsets, ringParts = QA_Geometry.DecodePolygonRings(row[1])
+        polyFlags, flagPolys = QA_Checks.SliverFlags(xy, ringOffsets, ringParts, minAngle)
+        flags.extend([(pnts, row[0], theAngle, bExterior) for pnts, theAngle, bExterior in polyFlags])
+
+    lineRows, pointRows = QA_Checks.SliverRows(flags, "d")
+    return len(lineRows)
+
+## ===================================================================================
+def RunVertexFlags(rows, minDist=0.5, acreFactor=4046.85643):
+    iShort = 0
+
+    for batch in QA_Geometry.ReadPolygonArrays(rows):
+        findings = QA_Checks.PolygonFindings(batch, minDist, acreFactor)
+
+        for i in range(len(batch.oids)):
+            statsRow, midPnts = QA_Checks.VertexStatsRow(int(batch.oids[i]), findings[i])
+            iShort += len(midPnts)
+
+    return iShort
+
+## ===================================================================================
+def RunNearVertices(rows, minDist=0.5):
+    nearXY = list()
+    nearSegments = list()
+    iVertices = 0
+
+    for batch in QA_Geometry.ReadPolygonArrays(rows):
+        nearXY.append(batch.xy)
+        nearSegments.append(QA_Geometry.RingSegments(batch.ringOffsets) + iVertices)
+        iVertices += len(batch.xy)
+
+    iA, iB, dist = QA_Geometry.FindNearVertices(np.concatenate(nearXY), np.concatenate(nearSegments), minDist)
+    return len(iA)
+
+## ===================================================================================
+def RunVertexReport(rows, acreFactor=4046.85643):
+    # Statistics summed by MUSYM, as in QA_VertexReport
+    dStats = dict()
+
+    for batch in QA_Geometry.ReadPolygonArrays([(row[0], row[1], row[3]) for row in rows]):
+        QA_Checks.SummarizeByValue(batch, QA_Geometry.GetPolygonStatistics(batch), dStats)
+
+    reportRows, totals = QA_Checks.VertexReportRows(dStats, acreFactor)
+    return len(reportRows)
+
+## ===================================================================================
+def RunCommonPoints(rows):
+    # Duplicate vertices keyed by AREASYMBOL:MUSYM, as in QA_CommonPoints
+    finder = QA_Checks.CommonPointFinder()
+
+    for batch in QA_Geometry.ReadPolygonArrays(rows):
+        finder.Add(batch)
+
+    return len(finder.Find())
+
+## ===================================================================================
+def RunCommonLines(rows):
+    # Shared boundaries between polygons with the same MUSYM, one survey at a time as in
+    # QA_CommonLines
+    dSurveys = dict()
+
+    for row in rows:
+        dSurveys.setdefault(row[2], QA_Geometry.PolygonArrays()).Add(row[0], row[1], (row[3],))
+
+    iLines = 0
+
+    for areaSym in sorted(dSurveys.keys()):
+        iLines += len(QA_Checks.FindCommonLines(dSurveys[areaSym].Finish()))
+
+    return iLines
+
+## ===================================================================================
+def RunEdgeMatch(rows, tolerance=0.001):
+    dSurveys = dict()
+    polySurveys = list()
+    batch = QA_Geometry.PolygonArrays()
+
+    for fid, wkb, areaSym, musym in rows:
+        if batch.Add(fid, wkb):
+            polySurveys.append(dSurveys.setdefault(areaSym, len(dSurveys)))
+
+    batch.Finish()
+    errPts, errSurveys = QA_Geometry.FindEdgeMatchErrors(batch.xy, batch.ringOffsets, batch.ringPolys, polySurveys, tolerance)
+    return len(errPts)
+
+## ===================================================================================
+# Cores in the order they are run
+coreList = [("ReadPolygonArrays", RunReadPolygonArrays), ("QA_SliverFinder", RunSliverFinder), \
+("QA_VertexFlags", RunVertexFlags), ("QA_VertexFlags_Near", RunNearVertices), ("QA_VertexReport", RunVertexReport), \
+("QA_CommonPoints", RunCommonPoints), \
+("QA_CommonLines", RunCommonLines), ("QA_EdgeMatch_lines", RunEdgeMatch)]
+
+## ===================================================================================
+def MemoryMethod():
+    # How the peak memory of a core is measured, see PeakMemory
+    if tracemalloc is not None:
+        return "tracemalloc"
+
+    if resource is not None:
+        return "maxrss"
+
+    return None
+
+## ===================================================================================
+def MaxRSS():
+    # Peak resident memory of this process in MB. ru_maxrss is in bytes on macOS and
+    # kilobytes everywhere else.
+    maxRSS = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if sys.platform == "darwin":
+        return maxRSS / 1048576.0
+
+    return maxRSS / 1024.0
+
+## ===================================================================================
+def PeakMemory(name, func, rows, numVertices, numSurveys, seed):
+    # Return the peak memory in MB used by one core, or None when it can't be measured
+    #
+    if tracemalloc is not None:
+        # separate run, tracing slows down the allocations
+        tracemalloc.start()
+        func(rows)
+        peak = tracemalloc.get_traced_memory()[1] / 1048576.0
+        tracemalloc.stop()
+        return peak
+
+    if resource is not None:
+        # ru_maxrss only ever grows for the life of a process, so the core is run in a new
+        # process that builds the same mosaic (see MeasureCore)
+        cmd = [sys.executable, os.path.abspath(__file__), "--measure", name, "--vertices", str(numVertices), "--surveys", str(numSurveys), "--seed", str(seed)]
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+        output = proc.communicate()[0]
+
+        if proc.returncode == 0:
+            return json.loads(output.decode("ascii").strip().splitlines()[-1])["peak_mb"]
+
+    return None
+
+## ===================================================================================
+def MeasureCore(name, numVertices, numSurveys, seed):
+    # Run in the new process started by PeakMemory. Prints the growth of the peak resident
+    # memory while the core runs, above the memory used by the mosaic.
+    #
+    func = dict(coreList)[name]
+    rows, injected = MakeMosaic(numVertices, numSurveys, seed)
+    before = MaxRSS()
+    func(rows)
+    print(json.dumps({"peak_mb":MaxRSS() - before}))
+
+## ===================================================================================
+def TimeCore(func, rows, repeat):
+    # Return the best elapsed time in seconds and the number of findings
+    #
+    seconds = None
+
+    for i in range(repeat):
+        start = time.time()
+        findings = func(rows)
+        elapsed = time.time() - start
+
+        if seconds is None or elapsed < seconds:
+            seconds = elapsed
+
+    return seconds, findings
+
+## ===================================================================================
+def ReadHistory(historyPath):
+    if os.path.isfile(historyPath):
+        with open(historyPath, "r") as f:
+            return json.load(f)
+
+    return list()
+
+## ===================================================================================
+def SameSetup(run, host, numVertices, core):
+    # True when an earlier run is on the same machine and Python version and has the core
+    # for the same mosaic size
+    return run["host"] == host and run["python"].split(".")[:2] == platform.python_version().split(".")[:2] and \
+    run["target_vertices"] == numVertices and core in run["results"]
+
+## ===================================================================================
+def BestEarlier(history, host, numVertices, core):
+    # Best earlier throughput for the same machine, Python version, mosaic size and core
+    best = None
+
+    for run in history:
+        if not SameSetup(run, host, numVertices, core):
+            continue
+
+        vps = run["results"][core]["vertices_per_second"]
+
+        if best is None or vps > best:
+            best = vps
+
+    return best
+
+## ===================================================================================
+def LowestEarlierPeak(history, host, numVertices, core, memoryMethod):
+    # Lowest earlier peak memory for the same setup (SameSetup), measured the same way
+    lowest = None
+
+    for run in history:
+        if not SameSetup(run, host, numVertices, core) or run.get("memory") != memoryMethod:
+            continue
+
+        peak = run["results"][core]["peak_mb"]
+
+        if peak is not None and (lowest is None or peak < lowest):
+            lowest = peak
+
+    return lowest
+
+## ===================================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the geometry code behind the SSURGO QA tools on synthetic survey mosaics")
+    parser.add_argument("--vertices", type=int, nargs="+", default=[1000, 100000, 1000000], help="approximate mosaic sizes in vertices (1000 to 10000000)")
+    parser.add_argument("--surveys", type=int, default=4, help="number of survey areas in each mosaic")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the mosaic")
+    parser.add_argument("--repeat", type=int, default=1, help="number of timed runs for each core, the best is kept")
+    parser.add_argument("--cores", nargs="+", default=[name for name, func in coreList], help="cores to run")
+    parser.add_argument("--history", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "QA_Benchmark_History.json"), help="JSON history file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="fraction below the best earlier throughput that counts as a regression")
+    parser.add_argument("--memory-threshold", type=float, default=0.5, help="fraction above the lowest earlier peak memory that counts as a regression")
+    parser.add_argument("--min-memory", type=float, default=1.0, help="peak memory in MB that is never counted as a regression")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure is not None:
+        # peak memory of one core in a new process (PeakMemory)
+        MeasureCore(args.measure, args.vertices[0], args.surveys, args.seed)
+        return 0
+
+    memoryMethod = MemoryMethod()
+
+    history = ReadHistory(args.history)
+    host = platform.node()
+    regressions = list()
+
+    for numVertices in args.vertices:
+        rows, injected = MakeMosaic(numVertices, args.surveys, args.seed)
+        actualVertices = CountVertices(rows)
+        print("\nMosaic of " + format(actualVertices, ",d") + " vertices, " + format(len(rows), ",d") + " polygons, injected " + \
+        ", ".join([key + " " + str(injected[key]) for key in sorted(injected)]))
+        print("%-22s %10s %15s %10s %10s" % ("Core", "Seconds", "Vertices/sec", "Peak MB", "Findings"))
+
+        run = {"timestamp":time.strftime("%Y-%m-%dT%H:%M:%S"), "host":host, "python":platform.python_version(), "numpy":np.__version__, \
+        "target_vertices":numVertices, "vertices":actualVertices, "polygons":len(rows), "seed":args.seed, "surveys":args.surveys, \
+        "memory":memoryMethod, "injected":injected, "results":dict()}
+
+        for name, func in coreList:
+            if not name in args.cores:
+                continue
+
+            seconds, findings = TimeCore(func, rows, args.repeat)
+            peak = PeakMemory(name, func, rows, numVertices, args.surveys, args.seed)
+            vps = actualVertices / max(seconds, 1e-9)
+            best = BestEarlier(history, host, numVertices, name)
+            lowestPeak = LowestEarlierPeak(history, host, numVertices, name, memoryMethod)
+            run["results"][name] = {"seconds":seconds, "vertices_per_second":vps, "peak_mb":peak, "findings":findings}
+            status = ""
+
+            if best is not None and vps < best * (1.0 - args.threshold):
+                status = "  REGRESSION (best " + format(int(best), ",d") + ")"
+                regressions.append((numVertices, name))
+
+            if peak is not None and lowestPeak is not None and peak > max(lowestPeak * (1.0 + args.memory_threshold), args.min_memory):
+                status += "  MEMORY REGRESSION (lowest %.1f MB)" % lowestPeak
+                regressions.append((numVertices, name + " memory"))
+
+            print("%-22s %10.3f %15s %10s %10s%s" % (name, seconds, format(int(vps), ",d"), ("" if peak is None else "%.1f" % peak), findings, status))
+
+        history.append(run)
+
+    with open(args.history, "w") as f:
+        json.dump(history, f, indent=1, sort_keys=True)
+
+    print("\nResults appended to " + args.history)
+
+    if len(regressions) > 0:
+        print(str(len(regressions)) + " regression(s): " + ", ".join([name + " (" + str(size) + ")" for size, name in regressions]))
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# QA_Cache.py
+#
+# ArcGIS 10.1
+#
+# USDA-NRCS National Soil Survey Center
+#
+# Sidecar result cache for incremental runs of the QA tools (QA_SliverFinder, QA_VertexFlags
+# and QA_CommonPoints).
+#
+# The findings for each polygon are saved to a SQLite file next to the geodatabase, along with
+# a hash of the polygon geometry (QA_Geometry.GeometryHash) and its attribute values. On the next
+# run the tool still reads the whole layer, but only the polygons with a new hash or new attribute
+# values are checked again. The findings for all other polygons come from the cache. A tool that
+# compares polygons with each other (QA_CommonPoints) also re-checks every polygon that shares an
+# attribute value with a changed or deleted polygon.
+#
+# Each tool keeps its own rows for each input featureclass, under a check name that includes the
+# tool parameters. The rows always match the polygons of the last run: polygons that are no longer
+# in the layer (or in the selected set) are removed from the cache when it is saved.
+#
+# None of the functions in this module use arcpy.
+#
+# 10-18-2026 Original coding
+
+import os, json, sqlite3
+
+## ===================================================================================
+def CachePath(workspace):
+    # Return the path of the cache file for a workspace or featuredataset. The cache for a
+    # geodatabase is saved next to it (Soils.gdb -> Soils_QA_Cache.sqlite). A folder of
+    # shapefiles gets a QA_Cache.sqlite file in that folder.
+    #
+    path = workspace.rstrip("\\/")
+
+    while os.path.dirname(path) != path:
+        root, ext = os.path.splitext(path)
+
+        if ext.lower() in (".gdb", ".mdb"):
+            return root + "_QA_Cache.sqlite"
+
+        path = os.path.dirname(path)
+
+    return os.path.join(workspace, "QA_Cache.sqlite")
+
+## ===================================================================================
+class QACache(object):
+    # Findings for one QA check on one featureclass. Typical use:
+    #
+    #   cache = QA_Cache.QACache(QA_Cache.CachePath(env.workspace), theCatalogPath, "QA_SliverFinder:10")
+    #
+    #   findings = cache.Lookup(oid, geomHash, values)
+    #
+    #   if findings is None:
+    #       findings = ...check the polygon...
+    #       cache.Update(oid, geomHash, values, findings)
+    #
+    #   cache.Save()
+    #
+    # values and findings must be lists, tuples, strings and numbers that can be saved as JSON.
+    # Tuples are returned as lists.
+    #
+    def __init__(self, cachePath, layerKey, checkKey):
+        self.cachePath = cachePath
+        self.layerKey = layerKey
+        self.checkKey = checkKey
+        self.reused = 0
+        self._seen = set()
+        self._changed = dict()
+        self._cached = dict()
+
+        self._conn = sqlite3.connect(cachePath)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS qa_results (layer TEXT NOT NULL, qacheck TEXT NOT NULL, " \
+        "oid INTEGER NOT NULL, geomhash TEXT NOT NULL, attributes TEXT, findings TEXT, PRIMARY KEY (layer, qacheck, oid))")
+
+        sql = "SELECT oid, geomhash, attributes, findings FROM qa_results WHERE layer = ? AND qacheck = ?"
+
+        for oid, geomHash, attributes, findings in self._conn.execute(sql, (layerKey, checkKey)):
+            self._cached[oid] = (geomHash, attributes, findings)
+
+    def __len__(self):
+        return len(self._cached)
+
+    def Lookup(self, oid, geomHash, values=()):
+        # Return the cached findings for a polygon, or None if the polygon is new or its
+        # geometry or attribute values have changed since the last run
+        self._seen.add(oid)
+        cached = self._cached.get(oid)
+
+        if cached is None or cached[0] != geomHash or cached[1] != json.dumps(values):
+            return None
+
+        self.reused += 1
+        return json.loads(cached[2])
+
+    def PreviousValues(self, oid):
+        # Return the attribute values of a polygon from the last run, or None
+        cached = self._cached.get(oid)
+
+        if cached is None:
+            return None
+
+        return json.loads(cached[1])
+
+    def Update(self, oid, geomHash, values, findings):
+        # Save the new findings for a polygon that was checked in this run
+        self._seen.add(oid)
+        self._changed[oid] = (geomHash, json.dumps(values), json.dumps(findings))
+
+    def Missing(self):
+        # Return a dictionary of {oid: attribute values} for the polygons from the last run
+        # that were not seen in this run
+        return dict([(oid, json.loads(cached[1])) for oid, cached in self._cached.items() if not oid in self._seen])
+
+    def Save(self):
+        # Write the changes to the cache file in a single transaction and close it
+        missing = [(self.layerKey, self.checkKey, oid) for oid in self._cached if not oid in self._seen]
+        changed = [(self.layerKey, self.checkKey, oid) + row for oid, row in self._changed.items()]
+
+        with self._conn:
+            self._conn.executemany("DELETE FROM qa_results WHERE layer = ? AND qacheck = ? AND oid = ?", missing)
+            self._conn.executemany("INSERT OR REPLACE INTO qa_results VALUES (?, ?, ?, ?, ?, ?)", changed)
+
+        self._conn.close()
+        return len(changed), len(missing)
@@ -13,6 +13,10 @@
 # Upated 4/6/2108 by Adolfo Diaz
 # converted dictionary keys "FORMAT" and "QUERY" to lower case in the JSON request.
 # Also updated the tool to exclude non-SSURGO valid fields using the validation code.
+#
+# 10/18/2026 Attribute columns are read in one pass and each distinct value is classified once using
+# precompiled patterns (ClassifyValue). Errors are reported by field and error code (L, BF, C, N) with
+# the count and IDs of the polygons instead of one message per polygon.
 
 class MyError(Exception):
     pass
@@ -137,7 +141,8 @@ def CheckAreasymbols(asList):
             # Loop through and compare to the original list from the spatial
             if len(asList) > len(valList):
                 # Incomplete match, look at each to find the problem(s)
-                missingList = [x for x in asList if not x in valList]
+                valSet = set(valList)
+                missingList = [x for x in asList if not x in valSet]
                 PrintMsg("\n\tAreasymbols with no match in Web Soil Survey: " + ", ".join(missingList), 1)
                 return False
 
@@ -158,126 +163,125 @@ def CheckAreasymbols(asList):
         PrintMsg(err, 2)
         return False
 
+## ===================================================================================
+def ClassifyValue(fld, val):
+    # Return the error code for one attribute value, or "" if the value is correctly formatted
+    #
+    # L = wrong length; BF = bad format (2C3I); C = wrong case; N = NULL value
+    #
+    # AREASYMBOL must be 2 letters followed by 3 digits, in uppercase. Any other field (MUSYM...)
+    # must not be blank and may only contain letters, digits and -+._ (no leading or trailing spaces)
+
+    if val is None:
+        return "N"
+
+    if fld == "AREASYMBOL":
+        if len(val) != 5:
+            return "L"
+
+        if reAreasymbol.match(val) is None:
+            return "BF"
+
+        if val.upper() != val:
+            return "C"
+
+        return ""
+
+    if len(val) == 0:
+        return "L"
+
+    if reMusym.match(val) is None:
+        return "BF"
+
+    return ""
+
+## ===================================================================================
+def ClassifyColumn(fld, values):
+    # Classify a whole column of attribute values. Each distinct value is only checked once.
+    #
+    # Returns a dictionary of {error code: list of row indexes} and the set of correctly
+    # formatted values
+
+    dCodes = dict()
+
+    for val in set(values):
+        dCodes[val] = ClassifyValue(fld, val)
+
+    goodValues = set([val for val, code in dCodes.items() if code == ""])
+    dErrors = dict()
+
+    if len(goodValues) < len(dCodes):
+        # only go back through the rows when there is at least one bad value
+        for i, val in enumerate(values):
+            code = dCodes[val]
+
+            if code != "":
+                dErrors.setdefault(code, list()).append(i)
+
+    return dErrors, goodValues
+
 ## ===================================================================================
 def ProcessLayer(inLayer, inFields, bValidate):
     # Create a summary for each survey
     #
     # inLayer = selected featurelayer or featureclass that will be processed
     #
-    # length of 5
-    # Check for [0:2] is text and [2:5] is integer
-    # Check for uppercase
-    # Check for spaces or other non-printable characters
-    # string.letters, string.punctuation and string.digits.
-
-    # valid format
+    # The attribute columns are read in one pass and each distinct value is classified with
+    # ClassifyValue. Bad values are reported by field and error code with the polygon IDs.
 
     try:
         bGood = True
-
-        validText = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
-        validNum = "0123456789"
-        validMusym = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-+._"
         fieldList = ["OID@","AREASYMBOL"]
 
         for fld in inFields:
             if fld not in fieldList:
                 fieldList.append(fld)
 
-        polygonList = list()
         asList = list()
+        oidName = arcpy.Describe(inLayer).OIDFieldName
 
-        iCnt = int(arcpy.GetCount_management(inLayer).getOutput(0))
-        arcpy.SetProgressor("step", "Checking input features...", 0, iCnt, 1)
+        arcpy.SetProgressorLabel("Reading attribute values...")
 
         with arcpy.da.SearchCursor(inLayer, fieldList) as sCursor:
-            # Select polgyons with the current attribute value and process the geometry for each
-            for row in sCursor:
-                # Process a polygon record
-                fid = row[0]
-                chk1 = ""   # L = wrong length; BF = bad format (2C3I); C = wrong case
-                chk2 = ""
-
-                for i in range(1, len(fieldList)):
-                    # Skip first field which is OBJECTID
-                    fld = fieldList[i]
-                    val = row[i]
-
-                    if not val is None:
-
-                        if fld == "AREASYMBOL":
-                            # Handle Areasymbol differently because it has more specific criteria
-                            if len(val) == 5:
-                                # length is OK
-                                if not val[0] in validText or not val[1] in validText:
-                                    # First 2 characters should be text
-                                    chk1 = "BF"
-
-                                elif not val[2] in validNum or not val[3] in validNum or not val[3] in validNum:
-                                    # Last 3 characters should be integer
-                                    chk1 = "BF"
-
-                                elif val.upper() != val:
-                                    chk1 = "C"
-                            else:
-                                # Bad length, should be 5 characters
-                                chk1 = "L"
-
-                            if chk1 != "":
-                                bGood = False
-                                PrintMsg("\tBad " + fld + " for polygon " + str(fid) + ": '" + val + "'", 2)
-                                polygonList.append(fid)
-
-                            else:
-                                # Should be a correctly formatted areasymbol value
-                                if not val in asList:
-                                    asList.append(val.encode('ascii'))
-
-                        # Check other attribute
-                        # All we know is it is text field, don't know specifics
-                        else:
-                            chk2 = ""
-
-                            if len(val) > 0:
-                                # length is OK
-
-                                if len(val) > len(val.strip()):
-                                    #PrintMsg("\tsym for polygon " + str(fid)  + str(fid) + ":  '" + str(muSym) + "'", 0)
-                                    chk2 = False
-                                    polygonList.append(fid)
-
-                                else:
-                                    for c in val:
-                                        if not c in validMusym:
-                                            bGood2 = False
-                                            #PrintMsg("\tBad musym for polygon " + str(fid) + ":  '" + str(muSym) + "'", 0)
-                                            polygonList.append(fid)
-                                            chk2 = False
-                                            break
-
-                            else:
-                                # Blank value for musym
-                                #PrintMsg("\tMissing musym for polygon " + str(fid), 0)
-                                chk2 = "L"
-
-                            if chk2 != "":
-                                bGood = False
-                                PrintMsg("\tBad " + fld + " for polygon " + str(fid) + ": '" + val + "'", 2)
-
-                                if not fid in polygonList:
-                                    # Add problem polygon to list for end report
-                                    polygonList.append(fid)
-
-                    else:
-                        PrintMsg("\tBad " + fld + " for polygon " + str(fid) + ": '" + str(val) + "'", 2)
-                        polygonList.append(fid)
-
-                arcpy.SetProgressorPosition()
-
-        arcpy.ResetProgressor()
+            rows = [row for row in sCursor]
+
+        if len(rows) > 0:
+            columns = zip(*rows)
+
+        else:
+            columns = [()] * len(fieldList)
+
+        del rows
+        PrintMsg(" \nChecking " + Number_Format(len(columns[0]), 0, True) + " polygons", 0)
+        arcpy.SetProgressorLabel("Checking attribute values...")
+
+        oids = columns[0]
+        polygonSet = set()
+
+        for i in range(1, len(fieldList)):
+            fld = fieldList[i]
+            values = columns[i]
+            dErrors, goodValues = ClassifyColumn(fld, values)
+
+            if fld == "AREASYMBOL":
+                asList = sorted([val.encode('ascii') for val in goodValues])
+
+            for code in sorted(dErrors.keys()):
+                bGood = False
+                fids = sorted([oids[j] for j in dErrors[code]])
+                badValues = sorted(set([values[j] for j in dErrors[code]]))
+                polygonSet.update(fids)
+
+                if code == "N":
+                    PrintMsg("\tBad " + fld + " for " + Number_Format(len(fids), 0, True) + " polygons (" + dErrorCodes[code] + ")", 2)
+
+                else:
+                    PrintMsg("\tBad " + fld + " for " + Number_Format(len(fids), 0, True) + " polygons (" + dErrorCodes[code] + "): " + ", ".join(["'" + val + "'" for val in badValues]), 2)
+
+                PrintMsg("\t\t" + '"' + oidName + '"' + " IN (" + str(fids)[1:-1] + ")", 0)
 
         if bGood == False:
-            PrintMsg(" \nThe following polygon IDs have attribute formatting errors: " + str(polygonList)[1:-1] + " \n ", 2)
+            PrintMsg(" \nThe following polygon IDs have attribute formatting errors: " + str(sorted(polygonSet))[1:-1] + " \n ", 2)
 
         if bValidate:
             # Run the list of correctly formatted areasymbol values to make sure they exist in Web Soil Survey
@@ -315,10 +319,15 @@ def Number_Format(num, places=0, bCommas=True):
 
 ## ===================================================================================
 ## MAIN
-import sys, string, os, locale, time, math, operator, traceback, collections, arcpy, json,urllib2
+import sys, string, os, locale, time, math, operator, traceback, collections, arcpy, json,urllib2, re
 from urllib2 import urlopen, URLError, HTTPError
 from arcpy import env
 
+# Attribute formats, see ClassifyValue
+reAreasymbol = re.compile(r"[A-Za-z]{2}[0-9]{3}\Z")
+reMusym = re.compile(r"[A-Za-z0-9\-+._]+\Z")
+dErrorCodes = {"L":"wrong length", "BF":"bad format", "C":"wrong case", "N":"NULL value"}
+
 try:
     # Set formatting for numbers
     locale.setlocale(locale.LC_ALL, "")
@@ -0,0 +1,279 @@
+# QA_Checks.py
+#
+# ArcGIS 10.1, numpy
+#
+# USDA-NRCS National Soil Survey Center
+#
+# The geometry QA checks, from the decoded polygon arrays (QA_Geometry) to the findings and the
+# rows that are written to the QA output. The single process tools, QA_ParallelRunner and
+# QA_Benchmark all call these functions, so a shard, a benchmark run and the tool itself report
+# the same findings. None of the functions in this module use arcpy.
+#
+#   SliverFlags, SliverRows                QA_SliverFinder
+#   PolygonFindings, VertexStatsRow        QA_VertexFlags
+#   CommonPointFinder                      QA_CommonPoints
+#   SummarizeByValue, VertexReportRows     QA_VertexReport
+#   FindCommonLines                        QA_CommonLines
+#
+# 10-18-2026 Original coding. The checks were moved here from the tools so that QA_ParallelRunner
+#            and QA_Benchmark no longer carry their own copies.
+
+import numpy as np
+import QA_Geometry
+
+# MIN_DIST of a polygon without a measurable segment. The tables have always used this
+# arbitrarily high value instead of inf.
+MAX_SEGMENT = 1000000.0
+
+## ===================================================================================
+def SliverFlags(xy, ringOffsets, ringParts, minAngle, ringPolys=None):
+    # Return the vertex angles that are less than or equal to minAngle and the polygon index
+    # of each one. Each flag is [[previous, vertex, next point], angle, True if on an exterior ring].
+    # ringPolys is required when the rings of more than one polygon are stored together.
+    #
+    flags = list()
+    angles, iPrev, iVert, iNext = QA_Geometry.GetVertexAngles(xy, ringOffsets)
+    angles = np.round(angles)
+    iFlagged = np.nonzero(angles <= minAngle)[0]
+
+    if len(iFlagged) == 0:
+        return flags, np.zeros(0, dtype=int)
+
+    # identify flagged vertices that fall on an interior ring
+    bExterior = QA_Geometry.ExteriorRings(ringParts, ringPolys)
+    ringIndex = np.searchsorted(ringOffsets, iVert[iFlagged], "right") - 1
+
+    for i, ring in zip(iFlagged, ringIndex):
+        pnt0 = xy[iPrev[i]]
+        pnt1 = xy[iVert[i]]
+        pnt2 = xy[iNext[i]]
+        flags.append([[(pnt0[0], pnt0[1]), (pnt1[0], pnt1[1]), (pnt2[0], pnt2[1])], int(angles[i]), bool(bExterior[ring])])
+
+    if ringPolys is None:
+        return flags, np.zeros(len(flags), dtype=int)
+
+    return flags, np.asarray(ringPolys)[ringIndex]
+
+## ===================================================================================
+def SliverRows(flags, sDegree):
+    # Return the rows for the sliver line and sliver vertex outputs, smallest angles first:
+    # (line coordinates, (POLYID, ANGLE)) and ((x, y), (POLYID, ANGLE as text)).
+    # flags is a list of (pnts, POLYID, angle, exterior ring) in the order they were read.
+    #
+    flags = [([tuple(pnt) for pnt in pnts], fid, theAngle, bExterior) for pnts, fid, theAngle, bExterior in flags]
+
+    # A sliver on a hole is normally also flagged on the exterior ring of the island polygon
+    # that fills it. Only keep the interior ring locations that have no matching exterior ring
+    # location, such as islands belonging to other survey areas that are not in the input layer.
+    exteriorPnts = set([pnts[1] for pnts, fid, theAngle, bExterior in flags if bExterior])
+    flags = [flag for flag in flags if flag[3] or not flag[0][1] in exteriorPnts]
+    flags.sort(key=lambda flag: (flag[2], flag[1]))
+
+    lineRows = [(pnts, (fid, theAngle)) for pnts, fid, theAngle, bExterior in flags]
+    pointRows = [(pnts[1], (fid, str(theAngle) + sDegree)) for pnts, fid, theAngle, bExterior in flags]
+    return lineRows, pointRows
+
+## ===================================================================================
+def PolygonFindings(batch, minDist, acreFactor):
+    # Summarize each polygon in a PolygonArrays batch. Returns a list with one item per polygon:
+    # [[ACRES, VERTICES, AVI, MIN_DIST, parts], [[x, y, length] for each short exterior segment]]
+    #
+    stats = QA_Geometry.GetPolygonStatistics(batch, minDist)
+    minSegments = np.minimum(stats.minSegment, MAX_SEGMENT)
+    findings = [[[stats.area[i] / acreFactor, int(stats.vertices[i]), stats.avi[i], float(minSegments[i]), int(stats.parts[i])], []] for i in range(len(batch.oids))]
+
+    # get midpoint of each short line segment for vertex flag placement
+    # Interior rings are skipped, the same segment is flagged on the island polygon
+    for i in np.nonzero(stats.shortExterior)[0]:
+        findings[stats.shortPolys[i]][1].append([stats.shortX[i], stats.shortY[i], stats.shortLength[i]])
+
+    return findings
+
+## ===================================================================================
+def VertexStatsRow(fid, polyFindings):
+    # Return the QA_VertexStats row [POLYID, ACRES, VERTICES, AVI, MIN_DIST, MULTIPART] for one
+    # polygon and its flag point rows ((x, y), (POLYID, LENGTH)). MULTIPART is 0 for a single
+    # part polygon, otherwise the number of parts.
+    #
+    (acres, vertices, avi, minSegment, iPartCnt), midPnts = polyFindings
+
+    if iPartCnt == 1:
+        iPartCnt = 0
+
+    statsRow = [fid, acres, vertices, avi, min(minSegment, MAX_SEGMENT), iPartCnt]
+    return statsRow, [((x, y), (fid, segLength)) for x, y, segLength in midPnts]
+
+## ===================================================================================
+class CommonPointFinder(object):
+    # Collects the distinct vertices of every ring by attribute value, batch by batch, and finds
+    # the vertices that are shared by polygons with the same value (QA_CommonPoints). The value
+    # of a polygon is its cursor values joined with ':', for example AREASYMBOL:MUSYM.
+    #
+    #   dValues     attribute value: value number
+    #
+    def __init__(self, bOids=False):
+        # bOids = keep the OID of each vertex so that the common points can be returned by polygon
+        self.dValues = dict()
+        self._bOids = bOids
+        self._vertices = list()
+        self._valCodes = list()
+        self._vertexOids = list()
+
+    def Add(self, batch):
+        # Add the vertices of a PolygonArrays batch. Returns the attribute value of each polygon.
+        polyValues = [":".join([("" if v is None else v) for v in values]) for values in batch.values]
+        polyCodes = np.array([self.dValues.setdefault(val, len(self.dValues)) for val in polyValues], dtype=np.int64)
+
+        # each vertex is only counted once per ring, the closing vertex is skipped
+        iPrev, iVert, iNext, iRing = QA_Geometry.RingVertices(batch.xy, batch.ringOffsets)
+        self._vertices.append(batch.xy[iVert])
+        self._valCodes.append(polyCodes[batch.ringPolys[iRing]])
+
+        if self._bOids:
+            self._vertexOids.append(batch.oids[batch.ringPolys[iRing]])
+
+        return polyValues
+
+    def Find(self, values=None):
+        # Return the common points as a list of (value, x, y, OID). values limits the check to
+        # those attribute values. The OID is None unless the finder was created with bOids.
+        if len(self._vertices) == 0:
+            return list()
+
+        vertices = np.concatenate(self._vertices)
+        valCodes = np.concatenate(self._valCodes)
+
+        if values is None:
+            iDups, dupCounts = QA_Geometry.FindDuplicateVertices(valCodes, vertices)
+
+        else:
+            iCheck = np.nonzero(QA_Geometry.IsIn(valCodes, [self.dValues[val] for val in values if val in self.dValues]))[0]
+            iDups, dupCounts = QA_Geometry.FindDuplicateVertices(valCodes[iCheck], vertices[iCheck])
+            iDups = iCheck[iDups]
+
+        valList = [None] * len(self.dValues)
+
+        for val, i in self.dValues.items():
+            valList[i] = val
+
+        if self._bOids:
+            vertexOids = np.concatenate(self._vertexOids)
+            return [(valList[valCodes[i]], vertices[i, 0], vertices[i, 1], int(vertexOids[i])) for i in iDups]
+
+        return [(valList[valCodes[i]], vertices[i, 0], vertices[i, 1], None) for i in iDups]
+
+## ===================================================================================
+def AddValueStats(dStats, val, valStats):
+    # Add the statistics of one attribute value to dStats
+    # dStats[val] = [polygons, area, vertices, perimeter, minimum segment, multipart polygons]
+    #
+    if val in dStats:
+        totals = dStats[val]
+        totals[0] += valStats[0]
+        totals[1] += valStats[1]
+        totals[2] += valStats[2]
+        totals[3] += valStats[3]
+        totals[4] = min(totals[4], valStats[4])
+        totals[5] += valStats[5]
+
+    else:
+        dStats[val] = list(valStats)
+
+## ===================================================================================
+def SummarizeByValue(batch, stats, dStats):
+    # Add the polygon statistics (QA_Geometry.GetPolygonStatistics) of a batch to the totals
+    # for each value of the first cursor value (QA_VertexReport). See AddValueStats.
+    #
+    if len(batch.oids) == 0:
+        return
+
+    # factor the attribute values for this batch and sum the statistics for each one
+    dKeys = dict()
+    keyIndex = np.array([dKeys.setdefault(values[0], len(dKeys)) for values in batch.values], dtype=int)
+    numKeys = len(dKeys)
+    polygonCnts = np.bincount(keyIndex, minlength=numKeys)
+    areas = np.bincount(keyIndex, weights=stats.area, minlength=numKeys)
+    pointCnts = np.bincount(keyIndex, weights=stats.vertices.astype(float), minlength=numKeys)
+    perimeters = np.bincount(keyIndex, weights=stats.perimeter, minlength=numKeys)
+    partCnts = np.bincount(keyIndex, weights=stats.multipart.astype(float), minlength=numKeys)
+
+    # minimum segment for each key from the runs of the sorted keys (ufunc.at is numpy 1.8+)
+    order = np.argsort(keyIndex, kind="mergesort")
+    sortedKeys = keyIndex[order]
+    starts = np.nonzero(np.concatenate(([True], sortedKeys[1:] != sortedKeys[:-1])))[0]
+    minSegments = np.minimum(np.minimum.reduceat(stats.minSegment[order], starts), MAX_SEGMENT)
+
+    for val, i in dKeys.items():
+        AddValueStats(dStats, val, [int(polygonCnts[i]), areas[i], int(pointCnts[i]), perimeters[i], float(minSegments[i]), int(partCnts[i])])
+
+## ===================================================================================
+def VertexReportRows(dStats, acreFactor):
+    # Return the QA_VertexReport rows sorted by value and the totals for the whole layer.
+    # Each row is [value, polygons, ACRES, VERTICES, AVI, MIN_DIST, MULTIPART] and the totals are
+    # [polygons, acres, vertices, average segment, minimum segment, multipart polygons].
+    #
+    rows = list()
+    totals = [0, 0.0, 0, -1, MAX_SEGMENT, 0]
+    totalPerimeter = 0.0
+
+    for val in sorted(dStats.keys()):
+        polygonCnt, sumArea, pointCnt, sumPerimeter, iSeg, iPartCnt = dStats[val]
+        iSeg = min(iSeg, MAX_SEGMENT)
+        sumAcres = sumArea / acreFactor
+        avgInterval = sumPerimeter / pointCnt
+        rows.append([val, polygonCnt, sumAcres, pointCnt, avgInterval, iSeg, iPartCnt])
+        totals = [totals[0] + polygonCnt, totals[1] + sumAcres, totals[2] + pointCnt, totals[3], min(totals[4], iSeg), totals[5] + iPartCnt]
+        totalPerimeter += sumPerimeter
+
+    if totals[2] > 0:
+        totals[3] = totalPerimeter / totals[2]
+
+    return rows, totals
+
+## ===================================================================================
+def FindCommonLines(batch, tolerance=0.0):
+    # Return the shared boundaries between two polygons of a batch that have the same value
+    # for the first cursor value (QA_CommonLines), one line for each run of shared segments.
+    # Each row is (line coordinates, (LEFT_FID, RIGHT_FID, left value, right value)).
+    #
+    comLines = list()
+
+    # Match the segments shared by two polygons and keep those where both polygons have the same value
+    segA, segB, segOpen = QA_Geometry.FindSharedSegments(batch.xy, batch.ringOffsets, tolerance)
+    polyA = batch.ringPolys[np.searchsorted(batch.ringOffsets, segA, "right") - 1]
+    polyB = batch.ringPolys[np.searchsorted(batch.ringOffsets, segB, "right") - 1]
+    polyValues = [values[0] for values in batch.values]
+
+    # number each distinct value once, the segments are then compared as integer arrays
+    dCodes = dict()
+    codes = np.array([dCodes.setdefault(val, len(dCodes)) for val in polyValues], dtype=np.int64)
+    bCommon = (polyA != polyB) & (codes[polyA] == codes[polyB])
+
+    if not bCommon.any():
+        return comLines
+
+    # A polygon lies to the left of its ring when the ring runs counter-clockwise,
+    # or to the right when the ring is a hole
+    bExterior = QA_Geometry.ExteriorRings(batch.ringParts, batch.ringPolys)
+    ringAreas = QA_Geometry.SignedRingAreas(batch.xy, batch.ringOffsets)
+    bLeft = (ringAreas > 0) == bExterior
+
+    # Join the common segments into lines, one set for each pair of polygons
+    dPairs = dict()
+
+    for i in np.nonzero(bCommon)[0]:
+        dPairs.setdefault((polyA[i], polyB[i]), list()).append(segA[i])
+
+    for pair in sorted(dPairs.keys()):
+        for line in QA_Geometry.ChainSegments(dPairs[pair], batch.ringOffsets):
+            ring = np.searchsorted(batch.ringOffsets, line[0], "right") - 1
+
+            if bLeft[ring]:
+                leftPoly, rightPoly = pair
+
+            else:
+                rightPoly, leftPoly = pair
+
+            comLines.append((batch.xy[line], (int(batch.oids[leftPoly]), int(batch.oids[rightPoly]), polyValues[leftPoly], polyValues[rightPoly])))
+
+    return comLines
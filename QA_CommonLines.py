@@ -25,6 +25,14 @@
 # 10-25-2013
 #
 # 10-31-2013
+#
+# 10-18-2026 Replaced the PolygonToLine (IDENTIFY_NEIGHBORS) processing for each survey with shared boundaries
+#            found directly from the polygon vertices (QA_Geometry.FindSharedSegments). The layer is read once
+#            for all surveys and no scratch featureclasses are created, so the sleep and schemalock tests
+#            between surveys are gone. Shared boundaries are matched vertex-to-vertex.
+# 10-18-2026 Common lines are written as WKB by QA_Output.QAWriter instead of building arcpy Polyline objects.
+# 10-18-2026 The common lines of each survey are found by QA_Checks.FindCommonLines, the same code that
+#            QA_Benchmark runs.
 
 ## ===================================================================================
 class MyError(Exception):
@@ -177,11 +185,9 @@ import sys, string, os, traceback, locale, tempfile, time
 # Create the Geoprocessor object
 import arcpy
 from arcpy import env
-from time import sleep
+import QA_Geometry, QA_Checks, QA_Output
 
 try:
-    # Check out ArcInfo license for PolygonToLine
-    arcpy.SetProduct("ArcInfo")
     arcpy.OverwriteOutput = True
 
     # Script arguments...
@@ -270,56 +276,68 @@ try:
 
         iVals = len(asList)
 
-        # set name and location for temporary output features
-        comFC = os.path.join(env.scratchGDB, "xxComLines")      # temporary featureclass containing all lines
-
         # set name and location for permanent QA featureclass
         comFC2 = os.path.join(theWorkspace, "QA_CommonLines")   # permanent output featureclass containing common-lines
 
         # set final output to shapefile if input is shapefile and make the new field name compatible with the database type
         #
-        # need to test shapefile option some more
-        #
         if inputFC.endswith(".shp"):
             comFC2 = comFC2 + ".shp"
-            fld1Name = fld1Name[0:10]
+            outFld1 = fld1Name[0:10]
+
+        else:
+            outFld1 = fld1Name
 
         if arcpy.Exists(comFC2):
-            # Having problems removing this when two successive runs are made with this tool.
-            #
-            try:
-                sleep(3)
+            if arcpy.TestSchemaLock(comFC2):
+                arcpy.Delete_management(comFC2)
 
-                if arcpy.TestSchemaLock(comFC2):
-                    arcpy.Delete_management(comFC2)
+            else:
+                raise MyError, "Unable to overwrite existing featureclass '" + comFC2+ "' (schemalock)"
 
-                else:
-                    raise MyError, "Unable to overwrite existing featureclass '" + comFC2+ "' (schemalock)"
+        # set output map layer name
+        comFL = "QA Common Lines  (" + outFld1.title() + ")"                                  # common-line featurelayer added to ArcMap
 
-            except:
-                errorMsg()
-                raise MyError, "Unable to overwrite existing featureclass '" + comFC2
+        # Read the soils layer once. The geometry of each polygon is decoded into the survey area it
+        # belongs to, along with the attribute value that will be compared.
+        #
+        arcpy.SetProgressorLabel("Reading polygon geometry...")
+        dSurveys = dict()
 
-        if arcpy.Exists(comFC):
-            # Having problems removing this when two successive runs are made with this tool.
-            #
-            try:
-                sleep()
+        if asList == ["*"]:
+            # Processing entire layer instead of by AREASYMBOL
+            theFields = ["OID@","SHAPE@WKB",fld1Name]
+            dSurveys[descInput.baseName] = QA_Geometry.PolygonArrays()
+
+        else:
+            theFields = ["OID@","SHAPE@WKB",fld1Name,fld2Name]
+            asList = [str(AS) for AS in asList]
+
+            for AS in asList:
+                dSurveys[AS] = QA_Geometry.PolygonArrays()
 
-                if arcpy.TestSchemaLock(comFC):
-                    arcpy.Delete_management(comFC)
+        with arcpy.da.SearchCursor(inputFC, theFields) as cursor:
+            for row in cursor:
+                if asList == ["*"]:
+                    AS = descInput.baseName
 
                 else:
-                    raise MyError, "Unable to overwrite existing featureclass '" + comFC + "' (schemalock)"
+                    AS = row[3]
 
-            except:
-                raise MyError, "Unable to overwrite existing featureclass '" + comFC
+                    if not AS in dSurveys:
+                        continue
 
-        # set output map layer name
-        comFL = "QA Common Lines  (" + fld1Name.title() + ")"                                  # common-line featurelayer added to ArcMap
+                dSurveys[AS].Add(row[0], row[1], (row[2],))
+
+        # Add left and right fields for common line test attribute
+        if inputFC.endswith(".shp"):
+            # Need to limit fieldname to 10 characters because of DBF restrictions
+            lFld = "L_" + fld1Name[0:8]
+            rFld = "R_" + fld1Name[0:8]
 
-        # Use a temporary featureclass to make selections against
-        selLayer = "SelectLayer"
+        else:
+            lFld = "L_" + fld1Name
+            rFld = "R_" + fld1Name
 
         # Counter for total number of common-line problems
         iCL = 0
@@ -329,171 +347,59 @@ try:
         iCnt = 0
         missList = list()
         comList = list()
+        comLines = list()  # polyline coordinates, (left polygon id, right polygon id, left value, right value)
 
         # Iterate through the list of soil survey areas by AREASYMBOL
         #
-
-        for AS in asList:
+        for AS in sorted(dSurveys.keys()):
             iCnt += 1
-            iProblems = 0
-
-            if arcpy.Exists(comFL):
-                arcpy.Delete_management(comFL)
-
-            # clean up output from previous runs
-            if arcpy.Exists(comFC):
-                try:
-                    sleep(3)
-                    if arcpy.TestSchemaLock (comFC):
-                        arcpy.Delete_management(comFC, "Featureclass")
-
-                    else:
-                        PrintMsg(" \nFailed to get schemalock on " + comFC, 0)
-
-                except:
-                    errorMsg()
-                    raise MyError, "Unable to overwrite existing featureclass '" + comFC + "'"
-
-            if arcpy.Exists(selLayer):
-                #
-                #
-                try:
-                    arcpy.Delete_management(selLayer, "Featurelayer")
+            batch = dSurveys.pop(AS).Finish()
+            iSel = len(batch.oids)
 
-                except:
-                    raise MyError, "Failed to delete temporary layer"
+            # format lead spacing for console message
+            sp = " " * (4 -  len(str(iCnt)))
 
-            # Read soils layer to get polygon OID and associated attribute value,
-            # load this information into 'dAtt' dictionary. This will be used to
-            # populate the left and right attributes of the new polyline featureclass.
-
-            dAtt = dict()
-            theFields = ["OID@",fld1Name]
+            if iSel == 0:
+                # Skip this survey, no match for AREASYMBOL
+                missList.append(AS)
+                PrintMsg(" \n" + sp + str(iCnt) + ". " + fld2Name + " " + AS + ": no features found for this survey", 0)
+                continue
 
-            if AS == "*":
-                # Processing entire layer instead of by AREASYMBOL
-                fldQuery = ""
-                AS = descInput.baseName
+            PrintMsg(" \n" + sp + str(iCnt) + ". " + fld2Name + " " + AS + ": processing " + Number_Format(iSel, 0, True) + " features", 0)
+            PrintMsg("\t\tIdentifying adjacent polygon boundaries with the same '" +  fld1Name + "' value...", 0)
 
-            else:
-                # Processing just this AREASYMBOL
-                fldQuery = arcpy.AddFieldDelimiters(comFC, fld2Name) + " = '" + AS + "'"
-
-            arcpy.MakeFeatureLayer_management(inputFC, selLayer, fldQuery)
-            iSel = int(arcpy.GetCount_management(selLayer).getOutput(0))
-
-            # format spacing for message
-            if iSel > 0:
-                # Go ahead and process this survey
-
-                # format lead spacing for console message
-                sp = " " * (4 -  len(str(iCnt)))
-                PrintMsg(" \n" + sp + str(iCnt) + ". " + fld2Name + " " + AS + ": processing " + Number_Format(iSel, 0, True) + " features", 0)
-
-                # Populating dAtt dictionary from a featurelayer causes problems because it may not include the
-                # neccesary information for the adjacent polygon. This may slow things down a bit, but
-                # it will prevent errors. WAIT! This shouldn't matter if we are only checking within the
-                # survey area.
-
-                # Save primary values for each polygon in the entire featureclass
-                with arcpy.da.SearchCursor(selLayer, ["OID@",fld1Name]) as cursor:
-                    for row in cursor:
-                        dAtt[row[0]] = row[1]
-
-                # Convert the selected mapunit polygon features to a temporary polyline featurelayer
-                PrintMsg("\t\tConverting polygon input to a polyline featureclass...", 0)
-                env.XYTolerance = xyTol
-                arcpy.PolygonToLine_management(selLayer, comFC, "IDENTIFY_NEIGHBORS")
-                # Assign field names for left polygon id and right polygon id
-                lPID = "LEFT_FID"
-                rPID = "RIGHT_FID"
-                theQuery = "(" + arcpy.AddFieldDelimiters(comFC, "LEFT_FID") + " > -1 AND " + arcpy.AddFieldDelimiters(comFC, "RIGHT_FID") + " > -1 )" # include these records for copying to final
-                sQuery = "(" + arcpy.AddFieldDelimiters(comFC, "LEFT_FID") + " > -1 AND " + arcpy.AddFieldDelimiters(comFC, "RIGHT_FID") + " > -1 )"  # exclude these records from cursor
-                PrintMsg("\t\tIdentifying adjacent polygon boundaries with the same '" +  fld1Name + "' value...", 0)
-
-                # Add left and right fields for common line test attribute
-                if inputFC.endswith(".shp"):
-                    # Need to limit fieldname to 10 characters because of DBF restrictions
-                    lFld = "L_" + fld1Name[0:8]
-                    rFld = "R_" + fld1Name[0:8]
+            # Shared boundaries between polygons that have the same value, joined into lines
+            surveyLines = QA_Checks.FindCommonLines(batch, xyTol)
+            iProblems = len(surveyLines)
 
-                else:
-                    lFld = "L_" + fld1Name
-                    rFld = "R_" + fld1Name
-
-                # modified addfield items to allow for width of Areasymbol values
-                arcpy.AddField_management(comFC, lFld, "TEXT", "", "", fldLength, lFld, "NULLABLE")
-                arcpy.AddField_management(comFC, rFld, "TEXT", "", "", fldLength, rFld, "NULLABLE")
-
-                # Open common line featureclass and use cursor to add original polygon attributes from dictionary
-                #
-                theFields = [lPID,rPID,lFld,rFld]
-                #PrintMsg(" \n" + comFC + " specified cursor fields: " + str(theFields), 0)
-
-                with arcpy.da.UpdateCursor(comFC, theFields, sQuery) as cursor:
-                    #iCnt = 0
-
-                    for row in cursor:
-                        #PrintMsg("\tUpdating " + rFld + " and " + lFld + " with " + str(dAtt[row[0]]) + " and " + str(dAtt[row[1]]), 0)
-                        row[2] = dAtt[row[0]]
-                        row[3] = dAtt[row[1]]
-                        cursor.updateRow(row)
-
-                #
-                # Identify outer boundary and lines that are common lines and copy them to
-                # the final featureclass.
-                # This query will select commonlines only internal to the survey area
-                #sQuery = theQuery + " AND " + lFld + " = " + rFld
-
-                # Using the xxComLines featureclass, this query will select commonlines plus
-                # overlapping boundaries between adjacent surveys
-                sQuery = theQuery + " AND " + arcpy.AddFieldDelimiters(comFC, lFld) + " = " + arcpy.AddFieldDelimiters(comFC, rFld)
-
-                #PrintMsg(" \nSelecting commonlines in " + comFC + " using query: " + sQuery, 0)
-                tmpFL = "Temp Featurelayer"
-                arcpy.MakeFeatureLayer_management(comFC, tmpFL, sQuery)
-
-                # Get featurecount for final output
-                iProblems = int(arcpy.GetCount_management(tmpFL).getOutput(0))
-
-                if iProblems > 0:
-                    # Found at least one common-line problem.
-                    # Report finding, create CommonLine featureclass and display in ArcMap
-                    iCL += iProblems
-                    comList.append(AS)
-                    PrintMsg("\t\tFound " + str(iProblems) + " common line problems for " + inputName + " " + inputDT.lower(), 2)
-
-                    if arcpy.Exists(comFC2):
-                        # output featureclass already exists with common lines from another survey area
-                        arcpy.Append_management(tmpFL, comFC2)
+            if iProblems == 0:
+                continue
 
-                    else:
-                        # first set of common lines identified, use them to create a new featureclass
-                        arcpy.CopyFeatures_management(tmpFL, comFC2)
+            comLines.extend(surveyLines)
 
-                    if arcpy.Exists(tmpFL):
-                        arcpy.Delete_management(tmpFL)
+            # Found at least one common-line problem.
+            iCL += iProblems
+            comList.append(AS)
+            PrintMsg("\t\tFound " + str(iProblems) + " common line problems for " + inputName + " " + inputDT.lower(), 2)
 
-                if arcpy.Exists(comFC):
-                    # Having problems removing this when two successive runs are made with this tool.
-                    #
-                    try:
-                        sleep(3)
+        if iCL > 0:
+            # Report findings, create CommonLine featureclass and display in ArcMap
+            sr = descInput.spatialReference
+            arcpy.CreateFeatureclass_management(os.path.dirname(comFC2), os.path.basename(comFC2), "POLYLINE", "", "DISABLED", "DISABLED", sr)
+            arcpy.AddField_management(comFC2, "LEFT_FID", "LONG")
+            arcpy.AddField_management(comFC2, "RIGHT_FID", "LONG")
 
-                        if arcpy.TestSchemaLock(comFC):
-                            arcpy.Delete_management(comFC)
+            # modified addfield items to allow for width of Areasymbol values
+            arcpy.AddField_management(comFC2, lFld, "TEXT", "", "", fldLength, lFld, "NULLABLE")
+            arcpy.AddField_management(comFC2, rFld, "TEXT", "", "", fldLength, rFld, "NULLABLE")
 
-                        else:
-                            raise MyError, "Unable to overwrite existing featureclass '" + comFC + "' (schemalock)"
+            writer = QA_Output.QAWriter()
+            writer.AddOutput("lines", comFC2, "POLYLINE", ["LEFT_FID","RIGHT_FID",lFld,rFld])
 
-                    except:
-                        errorMsg()
-                        raise MyError, "Unable to overwrite existing featureclass '" + comFC
+            for coords, values in comLines:
+                writer.Add("lines", coords, values)
 
-            else:
-                # Skip this survey, no match for AREASYMBOL
-                missList.append(AS)
-                PrintMsg(" \n" + sp + str(iCnt) + ". " + fld2Name + " " + AS + ": no features found for this survey", 0)
+            writer.Write("Saving common lines...")
 
         # End of iteration through AREASYMBOL list
 
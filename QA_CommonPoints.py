@@ -10,6 +10,24 @@
 # Polygon tool used to identify locations where polygons with the same attribute intersect.
 # By definition this will include polygons that self intersect by looping around.
 #
+# 10-18-2026 The layer is now read once instead of once for each attribute value. Every distinct ring vertex
+# is keyed by attribute value and exact x,y and the duplicates are found with a single sort
+# (QA_Geometry.FindDuplicateVertices). Previously the start vertex of the exterior ring of a polygon with
+# holes was skipped.
+#
+# 10-18-2026 Added optional incremental mode (parameter 4). The common points of each polygon are saved to a
+# QA_Cache file next to the geodatabase along with a hash of the polygon geometry and its attribute value.
+# On the next run only the attribute values that have a new, edited or deleted polygon are checked again.
+#
+# 10-18-2026 Common points are written by QA_Output.QAWriter, with one progressor update per batch instead of
+# per point.
+#
+# 10-18-2026 The progressor is only updated every half second (ToolTiming.Progress). The read, duplicate
+# vertex and write phases are timed and a JSON timing report is saved at the end of the run when SSURGO_TIMING_REPORT is set.
+#
+# 10-18-2026 The vertices are collected and the common points found by QA_Checks.CommonPointFinder, the same
+# code that QA_ParallelRunner and QA_Benchmark run.
+#
 class MyError(Exception):
     pass
 
@@ -158,10 +176,13 @@ def MakeOutLayer(inLayer, sr, inField1, inField2, fldLength):
 ##
 
 import os, sys, traceback, collections
+import numpy as np
 import arcpy
 from arcpy import env
+import QA_Geometry, QA_Checks, QA_Cache, QA_Output, ToolTiming
 
 try:
+    timer = ToolTiming.RunTimer("QA_CommonPoints")
 
     # single polygon featurelayer as input parameter
     inLayer = arcpy.GetParameterAsText(0)
@@ -176,8 +197,13 @@ try:
     # single point featurelayer as output parameter
     #xx = arcpy.GetParameter(2)
 
-    # open da searchcursor on featurelayer
-    flds = ["OID@","SHAPE@"]
+    # Optional. Only check the attribute values that have changed since the last run
+    try:
+        bUseCache = arcpy.GetParameter(4) == True
+
+    except:
+        bUseCache = False
+
     #allDupsList = []
     dDups = dict()
 
@@ -201,9 +227,6 @@ try:
         inputName = desc.Name
         inputFC = desc.FeatureClass.catalogPath
 
-    # Use a searchcursor to create a list of unique values for the specified input field or column
-    PrintMsg(" \nGetting unique values for " + inField1 + "...", 0)
-
     # get the first input field object
     #chkFields = arcpy.ListFields(inputFC)
     chkFields = arcpy.ListFields(inLayer)
@@ -232,85 +255,126 @@ try:
         fld2Name = ""
         fld2NameU = ""
 
-    # Create list of values
-    fldList = [fld1Name]
-
+    # Read the layer once. The distinct vertices of every ring are saved along with a number
+    # that identifies the attribute value of the polygon.
     if inField2 == "":
-        valList = [row[0] for row in arcpy.da.SearchCursor(inLayer, fldList)]
+        flds = ["OID@","SHAPE@WKB",fld1Name]
 
     else:
-        fldList = [fld2Name, fld1Name]
-        valList = [row[0] + ":" + row[1] for row in arcpy.da.SearchCursor(inLayer, fldList)]
+        flds = ["OID@","SHAPE@WKB",fld2Name,fld1Name]
 
+    finder = QA_Checks.CommonPointFinder(bUseCache)   # vertices by attribute value, with their OIDs for the cache
 
-    valUnique = set(valList)   # remove duplicate attribute values
-    valList = list(valUnique)
-    valList.sort()    # sort the list to control the processing order, this is not really necessary
-    PrintMsg(" \nFound " + Number_Format(len(valList), 0, True) + " unique values", 0)
-    iVals = len(valList)
+    if bUseCache:
+        # Attribute values with a new, edited or deleted polygon are checked again. The common points
+        # of the other polygons are read from the cache.
+        cache = QA_Cache.QACache(QA_Cache.CachePath(env.workspace), desc.catalogPath, "QA_CommonPoints:" + fld2Name + ":" + fld1Name)
+        PrintMsg(" \nUsing QA cache " + cache.cachePath + " (" + Number_Format(len(cache), 0, True) + " polygons from the last run)", 0)
+        recheckValues = set()
+        polyList = list()     # (OID, geometry hash, attribute value, cached common points) for each polygon
+        dPolyPnts = dict()    # OID: new common points
 
-    # Process records using a series of search cursors while tracking progress
-    arcpy.SetProgressorLabel("Reading polygon geometry...")
-    arcpy.SetProgressor("step", "Reading polygon geometry...",  0, iVals, 1)
+    # Process records using a single search cursor while tracking progress
+    progress = ToolTiming.Progress("Reading polygon geometry...", iSelection)
     PrintMsg(" \nProcessing " + Number_Format(iSelection, 0, True) + " polygons in '" + inLayer + "'", 0)
+    iPolys = 0
+    readPhase = timer.Phase("read geometry").Start()
 
-    iCnt = 0
+    with arcpy.da.SearchCursor(inLayer, flds) as cursor:
+        for batch in QA_Geometry.ReadPolygonArrays(cursor):
 
-    # Create a selection on the input featurelayer for each unique value
-    for val in valList:
-        #arcpy.SetProgressorLabel("Reading polygon geometry for '" + str(val) + "'...")
+            # attribute value for each polygon, using AREASYMBOL:MUSYM when there are two fields
+            polyValues = finder.Add(batch)
 
-        if inField2 != "":
-            val1, val2 = val.split(":")
-            theSQL = arcpy.AddFieldDelimiters(inLayer, inField1) + " = '" + val2 + "' AND " + arcpy.AddFieldDelimiters(inLayer, inField2) + " = '" + val1 + "'" # create SQL for each value
+            if bUseCache:
+                for i, geomHash in enumerate(QA_Geometry.PolygonHashes(batch)):
+                    fid = int(batch.oids[i])
+                    val = polyValues[i]
+                    commonPnts = cache.Lookup(fid, geomHash, [val])
+
+                    if commonPnts is None:
+                        # new or edited polygon, check both the new and the previous attribute value
+                        recheckValues.add(val)
+                        prevValues = cache.PreviousValues(fid)
+
+                        if not prevValues is None:
+                            recheckValues.add(prevValues[0])
+
+                    polyList.append((fid, geomHash, val, commonPnts))
+
+            iPolys += len(batch.oids)
+            timer.Count("vertices", len(batch.xy))
+            progress.Update(iPolys)
+
+    readPhase.Stop()
+    timer.Count("polygons", iPolys)
+    PrintMsg(" \nFound " + Number_Format(len(finder.dValues), 0, True) + " unique values", 0)
+
+    if bUseCache:
+        # polygons that have been deleted since the last run
+        for prevValues in cache.Missing().values():
+            recheckValues.add(prevValues[0])
+
+        PrintMsg(" \nChecking " + Number_Format(len(recheckValues), 0, True) + " attribute values with new, edited or deleted polygons", 0)
+
+    # get duplicate coordinate pairs within the list of vertices for each attribute value
+    # using a single sort on the packed (value, x, y) keys
+    iCnt = 0
+
+    with timer.Phase("find common points"):
+        if bUseCache:
+            # only the vertices for the attribute values that need to be checked again
+            commonPoints = finder.Find(recheckValues)
 
         else:
-            theSQL = arcpy.AddFieldDelimiters(inLayer, inField1) + " = '" + val + "'" # create SQL for each value
+            commonPoints = finder.Find()
 
+    for val, x, y, fid in commonPoints:
+        # if duplicate vertices are found for this attribute value, add the list to the dictionary.
+        # dictionary key is the attribute value
+        if val in dDups:
+            dDups[val].append((x, y))
 
-        pntList = []  # clear point list for the new value
+        else:
+            dDups[val] = [(x, y)]
 
-        with arcpy.da.SearchCursor(inLayer, flds, theSQL) as cursor:
-            for row in cursor:
+        iCnt += 1   # keep track of the total number of common-points
 
-                for part in row[1]:
-                    # look for duplicate points within each polygon part
-                    #
-                    bRing = True  # helps prevent from-node from being counted as a duplicate of to-node
+        if bUseCache:
+            dPolyPnts.setdefault(fid, list()).append((x, y))
 
-                    for pnt in part:
-                        if pnt:
-                            if not bRing:
-                                # add vertice or to-node coordinates to list
-                                pntList.append((pnt.X,pnt.Y))
+    del finder
 
-                            bRing = False
+    if bUseCache:
+        # update the cache for every polygon that was checked again and add the cached
+        # common points for all other attribute values. The cache is saved and closed even
+        # when there are no vertices, so that deleted polygons are removed from it.
+        iReused = 0
 
-                        else:
-                            # interior ring encountered
-                            ring = pntList.pop()  # removes first node from list
-                            bRing = True  # prevents island from-node from being identified as a duplicate of the to-node
+        for fid, geomHash, val, commonPnts in polyList:
+            if val in recheckValues:
+                cache.Update(fid, geomHash, [val], dPolyPnts.get(fid, []))
 
-            # get duplicate coordinate pairs within the list of vertices for the current attribute value
-            dupList = [x for x, y in collections.Counter(pntList).items() if y > 1]
+            else:
+                iReused += 1
 
-            if len(dupList) > 0:
-                # if duplicate vertices are found in this polygon, add the list to the dictionary.
-                # dictionary key is the attribute value
-                dDups[val] = dupList
-                iCnt += len(dupList)   # keep track of the total number of common-points
+                for x, y in commonPnts:
+                    dDups.setdefault(val, list()).append((x, y))
+                    iCnt += 1
 
-                if val == " ":
-                    PrintMsg(" \n\tFound common points for " + inField1 + ":  <NULL>", 0)
+        iChanged, iRemoved = cache.Save()
+        PrintMsg(" \n" + Number_Format(iReused, 0, True) + " unchanged polygons were read from the QA cache", 0)
 
-                else:
-                    PrintMsg(" \n\tFound common points for " + inField1 + ":  '" + val + "'", 0)
+    timer.Count("flags", iCnt)
 
-                arcpy.SetProgressorLabel("Reading polygon geometry ( flagged " + Number_Format(iCnt) + " locations )...")
+    for val in sorted(dDups.keys()):
+        if val.strip() in ("", ":"):
+            PrintMsg(" \n\tFound common points for " + inField1 + ":  <NULL>", 0)
 
-        arcpy.SetProgressorPosition()
+        else:
+            PrintMsg(" \n\tFound common points for " + inField1 + ":  '" + val + "'", 0)
 
-    arcpy.ResetProgressor()  # completely finished reading all polygon geometry
+    progress.Finish()  # completely finished reading all polygon geometry
 
     # if common-points were found, create a point shapefile containing the attribute value for each point
     #
@@ -323,21 +387,18 @@ try:
         if outLayer == "":
             raise MyError, "Failed to create common-points layer"
 
-        # Process records using cursor, track progress
-        arcpy.SetProgressorLabel("Opening output featureclass...")
-        arcpy.SetProgressor("step", "Writing point geometry..." , 0, iCnt, 1)
+        # for each value that has a reported common-point, get the list of coordinates from
+        # the dDups dictionary and write to the output Common_Points featureclass
+        writer = QA_Output.QAWriter()
+        writer.AddOutput("points", outLayer, "POINT", [newFld1])
 
-        # open new output points featureclass and add common point locations
-        with arcpy.da.InsertCursor(outLayer, ["SHAPE@XY", newFld1]) as cursor:
-            # for each value that has a reported common-point, get the list of coordinates from
-            # the dDups dictionary and write to the output Common_Points featureclass
-            for val in dDups.keys():
+        for val in dDups.keys():
+            for coords in dDups[val]:
+                writer.Add("points", coords, (val,))
 
-                for coords in dDups[val]:
-                    cursor.insertRow([coords, val]) # write both geometry and the single attribute value to the output layer
-                    arcpy.SetProgressorPosition()
+        with timer.Phase("write output"):
+            writer.Write("Writing point geometry...")
 
-        arcpy.ResetProgressor()
         arcpy.SetProgressorLabel("Process complete...")
 
         try:
@@ -354,8 +415,11 @@ try:
                 outLayerName = "QA Common Points (" + fld1NameU.title() + ")"
 
             arcpy.env.addOutputsToMap = True
-            arcpy.MakeFeatureLayer_management(outLayer, outLayerName)
-            arcpy.ApplySymbologyFromLayer_management (outLayerName, layerFile)
+
+            with timer.Phase("geoprocessing"):
+                arcpy.MakeFeatureLayer_management(outLayer, outLayerName)
+                arcpy.ApplySymbologyFromLayer_management (outLayerName, layerFile)
+
             arcpy.SetParameter(3, outLayerName)
             PrintMsg(" \nAdded " + outLayerName + " to ArcMap TOC", 0)
 
@@ -367,6 +431,12 @@ try:
     else:
         PrintMsg(" \nNo common-point issues found with '" + inLayer + "' \n ", 0)
 
+    PrintMsg(timer.Summary(), 0)
+    reportPath = timer.Save()
+
+    if reportPath != "":
+        PrintMsg("Timing report saved to " + reportPath + " \n ", 0)
+
 except MyError, e:
     # Example: raise MyError, "this is an error message"
     PrintMsg(str(e) + " \n", 2)
@@ -12,6 +12,13 @@
 #
 # ArcGIS 10.1 compatible
 #
+# 10-18-2026 Replaced the Dissolve, PolygonToLine, SelectLayerByLocation, DeleteFeatures and
+# FeatureVerticesToPoints (DANGLE) chain through the scratch geodatabase. The selected surveys are read
+# once and survey boundary nodes are matched across the seam in memory using a grid index
+# (QA_Geometry.FindEdgeMatchErrors). Errors are written directly to QA_EdgeMatch_Errors_p.
+#
+# 10-18-2026 The error points are written by QA_Output.QAWriter like the other QA tools.
+#
 ## ===================================================================================
 class MyError(Exception):
     pass
@@ -165,10 +172,9 @@ import sys, string, os, traceback, locale, tempfile, time
 # Create the Geoprocessor object
 import arcpy
 from arcpy import env
+import QA_Geometry, QA_Output
 
 try:
-    # Check out ArcInfo license for PolygonToLine
-    arcpy.SetProduct("ArcInfo")
     arcpy.OverwriteOutput = True
 
     # Script arguments...
@@ -227,22 +233,18 @@ try:
             raise MyError("Problem getting field info for " + inField)
 
 
-        # set name and location for temporary and permanent output features
-        diss_Bound = os.path.join(env.scratchGDB, "xxDissBound") # temporary featureclass containing survey areas derived from soil poly dissolve
-        soil_lines = os.path.join(env.scratchGDB, "xxSoilLines") # temporary featureclass containing soil polys converted to lines
-        misMatch = os.path.join(env.scratchGDB, "Survey_Join_Error_p") # temporary output featureclass containing dangling vertices (join errors)
+        # set name and location for permanent output features
         misMatch2 = os.path.join(env.workspace, "QA_EdgeMatch_Errors_p")
         finalFL = "QA_EdgeMatch_Errors_p"
 
 
         # set final output to shapefile if input is shapefile and make the new field name compatible with the database type
         if inputFC.endswith(".shp"):
-            misMatch = misMatch + ".shp"
-            fldName = fldName[0:10]
-
+            misMatch2 = misMatch2 + ".shp"
+            outFldName = fldName[0:10]
 
-        # set output map layer name
-        selSoilsFL = "Selected Soils (by " +fldName + ")"
+        else:
+            outFldName = fldName
 
 
         # Build selection query string from AREASYMBOL list (ssaList)
@@ -261,65 +263,48 @@ try:
             raise MyError("Unable to build Selection Query String from Areasymbol Parameter")
 
 
-        # Make feature layer of selected surveys based on ssaList parameter
-        ## THIS IS CREATED IN SOURCE WORKSPACE, NOT scratchWorkspace ##
-        arcpy.MakeFeatureLayer_management(inputFC, selSoilsFL, sQuery)
-
-
 ######## ----- Main Algorithm for Checking MisMatches Begins Here ----- ##
         try:
-            # Dissolve soils to create boundaries
-            arcpy.Dissolve_management(selSoilsFL, diss_Bound, inField)
-            PrintMsg("Dissolved input to create boundary", 0)
-
-            # Convert Soil polys to line for Selected surveys
-            arcpy.PolygonToLine_management(selSoilsFL, soil_lines, "IDENTIFY_NEIGHBORS")
-            PrintMsg("Converted Soils to lines", 0)
-
-            # Make soil_lines a Feature Layer
-            arcpy.MakeFeatureLayer_management(soil_lines, "soil_linesFL")
-
-            # Build whereclause for Select by Attribute
-            whereclause = """%s = -1""" % arcpy.AddFieldDelimiters("soil_linesFL", 'LEFT_FID')
-            PrintMsg("Built where clause " + whereclause, 0)
-
-            # Select soil_lines cooincident with dissolved boundary layer
-            arcpy.SelectLayerByLocation_management("soil_linesFL", "SHARE_A_LINE_SEGMENT_WITH", diss_Bound)
-            PrintMsg("Selected lines based on boundary", 0)
-
-            selBoundaryLines = str(arcpy.GetCount_management("soil_linesFL").getOutput(0))
-
-            PrintMsg("Select by location selected " + selBoundaryLines + " features", 0)
-
-            if selBoundaryLines > 0 :
-                arcpy.SelectLayerByAttribute_management("soil_linesFL","REMOVE_FROM_SELECTION", whereclause)
-                PrintMsg("Removed perimeter lines from selection", 0)
-
-                # Delete interior soil survey boundaries in soil_lines feature layer
-                arcpy.DeleteFeatures_management("soil_linesFL")
-                PrintMsg("Deleted features",0)
-
-                # Convert only dangling vertices to permanent feature class
-                arcpy.FeatureVerticesToPoints_management(soil_lines, misMatch,"DANGLE")
-                PrintMsg("Converted dangling vertices to points")
-
-            else :
-                raise myError("Trouble selecting boundaries in soil lines layer")
-
-
-            iProblems = int(arcpy.GetCount_management(misMatch).getOutput(0))
+            # Read the selected surveys once. Polygon geometry is decoded into numpy arrays
+            # and each polygon is given a number for its survey area.
+            dSurveys = dict()
+            surveyList = list()
+            polySurveys = list()
+            batch = QA_Geometry.PolygonArrays()
+
+            with arcpy.da.SearchCursor(inputFC, ["OID@","SHAPE@WKB",fldName], sQuery) as cursor:
+                for fid, wkb, areaSym in cursor:
+                    if batch.Add(fid, wkb):
+                        if not areaSym in dSurveys:
+                            dSurveys[areaSym] = len(surveyList)
+                            surveyList.append(areaSym)
+
+                        polySurveys.append(dSurveys[areaSym])
+
+            batch.Finish()
+            PrintMsg("Read " + str(len(batch.oids)) + " polygons from " + str(len(surveyList)) + " survey areas", 0)
+
+            # Find soil line nodes on each survey boundary without a matching node across the seam
+            tolerance = descInput.spatialReference.XYTolerance
+            errPts, errSurveys = QA_Geometry.FindEdgeMatchErrors(batch.xy, batch.ringOffsets, batch.ringPolys, polySurveys, tolerance)
+            iProblems = len(errPts)
             PrintMsg("Errors found: " + str(iProblems),1)
 
             if iProblems > 0:
                 # Found at least one dangling node problem.
                 # Report finding, create MisMatch featureclass and display in ArcMap
-                arcpy.CopyFeatures_management(misMatch, misMatch2)
-                PrintMsg("copied to misMatch2", 0)
+                if arcpy.Exists(misMatch2):
+                    arcpy.Delete_management(misMatch2)
 
-                # Add new field to track 'fixes'
-                arcpy.Delete_management(misMatch)
-                PrintMsg("Deleted misMatch", 0)
+                arcpy.CreateFeatureclass_management(os.path.dirname(misMatch2), os.path.basename(misMatch2), "POINT", "", "DISABLED", "DISABLED", descInput.spatialReference)
+                arcpy.AddField_management(misMatch2, outFldName, "TEXT", "", "", fldLength)
 
+                writer = QA_Output.QAWriter()
+                writer.AddOutput("errors", misMatch2, "POINT", [outFldName])
+                writer.AddPoints("errors", batch.xy[errPts], [[surveyList[i] for i in errSurveys]])
+                writer.Write("Writing edge match errors...")
+
+                # Add new field to track 'fixes'
                 arcpy.AddField_management(misMatch2, "Status", "TEXT", "", "", 10, "Status")
                 PrintMsg("Added Fields")
 
@@ -345,7 +330,6 @@ try:
 
             else:
                 PrintMsg(" \nNo common-attribute line problems found for " + inputName, 1)
-                arcpy.Delete_management(misMatch)
 
 
         except:
@@ -0,0 +1,972 @@
+# QA_Geometry.py
+#
+# ArcGIS 10.1, numpy
+#
+# USDA-NRCS National Soil Survey Center
+#
+# Shared geometry functions used by the SSURGO QA tools.
+#
+# Polygon geometry is read from the cursor as WKB (SHAPE@WKB) and decoded directly into
+# numpy coordinate arrays so that the per-vertex arcpy.Point objects are never created.
+# None of the functions in this module use arcpy, so they can be run and checked on any
+# machine that has numpy installed.
+#
+# 10-18-2026 Original coding. Vectorized vertex angle calculation for QA_SliverFinder.
+# 10-18-2026 Added flat ring-offset decoder so that interior rings are handled in the same pass.
+# 10-18-2026 Added PolygonArrays batches and GetPolygonStatistics, the shared geometry statistics
+#            used by QA_VertexFlags, QA_VertexReport and QA_VertexCount.
+# 10-18-2026 Added FindDuplicateVertices (sort on packed integer keys) for QA_CommonPoints.
+# 10-18-2026 Added FindSharedSegments and ChainSegments, shared boundaries for QA_CommonLines.
+# 10-18-2026 Added PointGrid and SegmentGrid (spatial hash) and FindEdgeMatchErrors for QA_EdgeMatch_lines.
+# 10-18-2026 Added FindNearPairs and FindNearVertices (grid hash) for the QA_VertexFlags near vertex check.
+# 10-18-2026 Added GeometryHash, PolygonHashes and PolygonArrays.Subset for the QA_Cache incremental checks.
+# 10-18-2026 Added LineStringWKB for the QA_Output writer.
+# 10-18-2026 Added WKBPartCount, the part count from the WKB header only, for QA_MultipartPolygons.
+# 10-18-2026 Added IsIn. np.in1d was removed in numpy 2.4 and np.isin is not in the older numpy.
+# 10-18-2026 Added ExtentGrid, an extent index that can be added to, for the RTSD batch project checkout.
+
+import struct, hashlib
+import numpy as np
+
+## ===================================================================================
+def _Bytes(a):
+    # Raw bytes of an array. ndarray.tobytes is numpy 1.9 and later (ArcGIS 10.3), the older
+    # tostring was removed in numpy 2.3.
+    if hasattr(a, "tobytes"):
+        return a.tobytes()
+
+    return a.tostring()
+
+## ===================================================================================
+def IsIn(a, values):
+    # Boolean array, True where an element of a is in values. np.isin is numpy 1.13 and later,
+    # np.in1d was removed in numpy 2.4.
+    if hasattr(np, "isin"):
+        return np.isin(a, values)
+
+    return np.in1d(a, values)
+
+## ===================================================================================
+def DecodePolygonWKB(wkb):
+    # Decode a Polygon or MultiPolygon WKB string into a list of parts. Each part is
+    # a list of rings (exterior ring first) and each ring is an (n, 2) array of x,y
+    # coordinates. Z and M values, if present, are dropped.
+    #
+    parts = list()
+    _ReadPolygons(bytearray(wkb), 0, parts)
+    return [[ring.astype(float) for ring in rings] for rings in parts]
+
+## ===================================================================================
+def DecodePolygonRings(wkb):
+    # Decode a Polygon or MultiPolygon WKB string into flat ring arrays:
+    #
+    #   xy          (n, 2) array with the coordinates of every ring, one ring after another
+    #   ringOffsets (r + 1) array, ring i is xy[ringOffsets[i]:ringOffsets[i + 1]]
+    #   ringParts   (r) array with the part number of each ring. The first ring of each
+    #               part is the exterior ring, the rest are interior rings (holes).
+    #
+    parts = list()
+    _ReadPolygons(bytearray(wkb), 0, parts)
+    rings = [ring for part in parts for ring in part]
+    ringOffsets = np.zeros(len(rings) + 1, dtype=int)
+    ringOffsets[1:] = np.cumsum([len(ring) for ring in rings])
+    ringParts = np.repeat(np.arange(len(parts)), [len(part) for part in parts])
+
+    if len(rings) > 0:
+        xy = np.concatenate(rings).astype(float)
+
+    else:
+        xy = np.zeros((0, 2))
+
+    return xy, ringOffsets, ringParts
+
+## ===================================================================================
+def WKBPartCount(wkb):
+    # Return the number of parts (exterior rings) of a Polygon or MultiPolygon WKB string
+    # without decoding any coordinates. Only the first header is read: a MultiPolygon has
+    # one polygon per part and the holes of each part are inside its polygon, so they are
+    # never counted. A polygon with no rings has 0 parts. Returns None for NULL geometry.
+    #
+    if wkb is None:
+        return None
+
+    buf = bytearray(wkb[0:9])
+    bo, geomType, nDims, offset = _ReadHeader(buf, 0)
+    count = struct.unpack_from(bo + "I", buf, offset)[0]
+
+    if geomType == 6:
+        return count
+
+    if geomType != 3:
+        raise ValueError("Unsupported WKB geometry type: " + str(geomType))
+
+    return min(count, 1)
+
+## ===================================================================================
+def LineStringWKB(xy):
+    # Return the little-endian WKB for a LineString with the (n, 2) coordinates in xy, as a
+    # bytearray for the SHAPE@WKB token of an insert cursor
+    #
+    xy = np.ascontiguousarray(xy, dtype="<f8").reshape(-1, 2)
+    return bytearray(struct.pack("<BII", 1, 2, len(xy)) + _Bytes(xy))
+
+## ===================================================================================
+def ExteriorRings(ringParts, ringPolys=None):
+    # Return a boolean array that is True for each ring that is the exterior ring of a part.
+    # ringPolys is required when the rings of more than one polygon are stored together.
+    #
+    ringParts = np.asarray(ringParts)
+    bExterior = np.ones(len(ringParts), dtype=bool)
+    bExterior[1:] = ringParts[1:] != ringParts[:-1]
+
+    if ringPolys is not None:
+        ringPolys = np.asarray(ringPolys)
+        bExterior[1:] |= ringPolys[1:] != ringPolys[:-1]
+
+    return bExterior
+
+## ===================================================================================
+class PolygonArrays(object):
+    # The geometry of a batch of polygons stored as flat numpy arrays:
+    #
+    #   oids        (p) array of polygon OIDs
+    #   values      list with the extra cursor values for each polygon
+    #   xy          (n, 2) array with the coordinates of every ring of every polygon
+    #   ringOffsets (r + 1) array, ring i is xy[ringOffsets[i]:ringOffsets[i + 1]]
+    #   ringPolys   (r) array with the index (into oids) of the polygon that owns each ring
+    #   ringParts   (r) array with the part number of each ring within its polygon
+    #   badOids     list of OIDs with NULL or empty geometry. These are not in oids.
+    #
+    def __init__(self):
+        self.oids = list()
+        self.values = list()
+        self.badOids = list()
+        self.numVertices = 0
+        self._rings = list()
+        self._ringPolys = list()
+        self._ringParts = list()
+
+    def Add(self, oid, wkb, values=()):
+        # Decode one polygon and add it to the batch
+        if wkb is None:
+            self.badOids.append(oid)
+            return False
+
+        parts = list()
+        _ReadPolygons(bytearray(wkb), 0, parts)
+
+        if len(parts) == 0:
+            self.badOids.append(oid)
+            return False
+
+        iPoly = len(self.oids)
+        self.oids.append(oid)
+        self.values.append(values)
+
+        for iPart, rings in enumerate(parts):
+            for ring in rings:
+                self._rings.append(ring)
+                self._ringPolys.append(iPoly)
+                self._ringParts.append(iPart)
+                self.numVertices += len(ring)
+
+        return True
+
+    def Finish(self):
+        # Convert the accumulated rings into the flat arrays
+        ringLens = [len(ring) for ring in self._rings]
+        self.ringOffsets = np.zeros(len(ringLens) + 1, dtype=int)
+        self.ringOffsets[1:] = np.cumsum(ringLens)
+        self.ringPolys = np.array(self._ringPolys, dtype=int)
+        self.ringParts = np.array(self._ringParts, dtype=int)
+        self.oids = np.array(self.oids, dtype=int)
+
+        if len(self._rings) > 0:
+            self.xy = np.concatenate(self._rings).astype(float)
+
+        else:
+            self.xy = np.zeros((0, 2))
+
+        self._rings = list()
+        self._ringPolys = list()
+        self._ringParts = list()
+        return self
+
+    def Subset(self, polys):
+        # Return a new PolygonArrays batch with only the polygons in polys (sorted indexes
+        # into oids). Used to re-check the polygons that have changed since the last run.
+        polys = np.asarray(polys, dtype=int)
+        subset = PolygonArrays()
+        subset.oids = self.oids[polys]
+        subset.values = [self.values[i] for i in polys]
+
+        newIndex = np.zeros(len(self.oids), dtype=int)
+        newIndex[polys] = np.arange(len(polys))
+        bRings = IsIn(self.ringPolys, polys)
+        ringLens = np.diff(self.ringOffsets)
+        subset.ringOffsets = np.zeros(bRings.sum() + 1, dtype=int)
+        subset.ringOffsets[1:] = np.cumsum(ringLens[bRings])
+        subset.ringPolys = newIndex[self.ringPolys[bRings]]
+        subset.ringParts = self.ringParts[bRings]
+        subset.xy = self.xy[np.repeat(bRings, ringLens)]
+        subset.numVertices = len(subset.xy)
+        return subset
+
+## ===================================================================================
+def ReadPolygonArrays(rows, maxVertices=1000000):
+    # Generator that decodes cursor rows into PolygonArrays batches of about maxVertices
+    # vertices each. Each row must be (OID, WKB, ...), any additional values are saved
+    # to PolygonArrays.values. Typical use:
+    #
+    #   with arcpy.da.SearchCursor(inLayer, ["OID@", "SHAPE@WKB"], "", outputSR) as sCursor:
+    #       for batch in QA_Geometry.ReadPolygonArrays(sCursor):
+    #
+    batch = PolygonArrays()
+
+    for row in rows:
+        batch.Add(row[0], row[1], tuple(row[2:]))
+
+        if batch.numVertices >= maxVertices:
+            yield batch.Finish()
+            batch = PolygonArrays()
+
+    if len(batch.oids) > 0 or len(batch.badOids) > 0:
+        yield batch.Finish()
+
+## ===================================================================================
+def GeometryHash(xy, ringOffsets, ringParts):
+    # Return a hex digest that identifies the geometry of one polygon: the coordinates,
+    # the length of each ring and the part that each ring belongs to. Any edit to the
+    # polygon (a moved, added or removed vertex) changes the hash.
+    #
+    h = hashlib.sha1()
+    h.update(_Bytes(np.diff(ringOffsets).astype(np.int64)))
+    h.update(_Bytes(np.asarray(ringParts, dtype=np.int64)))
+    h.update(_Bytes(np.ascontiguousarray(xy, dtype=float)))
+    return h.hexdigest()
+
+## ===================================================================================
+def PolygonHashes(batch):
+    # Return a list with the GeometryHash of each polygon in a PolygonArrays batch
+    #
+    numPolys = len(batch.oids)
+    polyRings = np.searchsorted(batch.ringPolys, np.arange(numPolys + 1))
+    hashes = list()
+
+    for i in range(numPolys):
+        r0 = polyRings[i]
+        r1 = polyRings[i + 1]
+        v0 = batch.ringOffsets[r0]
+        v1 = batch.ringOffsets[r1]
+        hashes.append(GeometryHash(batch.xy[v0:v1], batch.ringOffsets[r0:r1 + 1], batch.ringParts[r0:r1]))
+
+    return hashes
+
+## ===================================================================================
+class PolygonStats(object):
+    # Per-polygon geometry statistics for one PolygonArrays batch. All per-polygon arrays
+    # are in the same order as PolygonArrays.oids. Lengths and areas are in the units of the
+    # coordinates.
+    #
+    #   vertices    vertex count, including the closing vertex of each ring
+    #   parts       number of parts (exterior rings)
+    #   multipart   True for polygons with more than one part
+    #   perimeter   total length of all rings
+    #   area        area of the exterior rings less the area of the holes
+    #   avi         average vertex interval (perimeter / vertices)
+    #   minSegment  shortest segment length
+    #
+    # Segments shorter than the minimum distance are reported by their midpoints:
+    #
+    #   shortPolys, shortX, shortY, shortLength, shortExterior
+    #
+    pass
+
+## ===================================================================================
+def RingSegments(ringOffsets):
+    # Return the xy index of the first vertex of every segment. A segment joins vertex
+    # i to vertex i + 1 of the same ring.
+    #
+    ringOffsets = np.asarray(ringOffsets, dtype=int)
+    numPnts = ringOffsets[-1]
+
+    if numPnts < 2:
+        return np.zeros(0, dtype=int)
+
+    bSegment = np.ones(numPnts - 1, dtype=bool)
+    ringEnds = ringOffsets[1:-1] - 1
+    bSegment[ringEnds[ringEnds >= 0]] = False
+    return np.nonzero(bSegment)[0]
+
+## ===================================================================================
+def SignedRingAreas(xy, ringOffsets):
+    # Return the signed area of every ring. Counter-clockwise rings are positive.
+    #
+    ringOffsets = np.asarray(ringOffsets, dtype=int)
+    iFrom = RingSegments(ringOffsets)
+    iTo = iFrom + 1
+    cross = xy[iFrom, 0] * xy[iTo, 1] - xy[iTo, 0] * xy[iFrom, 1]
+    segRings = np.searchsorted(ringOffsets, iFrom, "right") - 1
+    return np.bincount(segRings, weights=cross, minlength=len(ringOffsets) - 1) / 2.0
+
+## ===================================================================================
+def GetPolygonStatistics(batch, minDist=0.0):
+    # Calculate the PolygonStats for a PolygonArrays batch using vectorized reductions.
+    # Segments shorter than minDist are reported.
+    #
+    numPolys = len(batch.oids)
+    xy = batch.xy
+    ringOffsets = batch.ringOffsets
+    ringPolys = batch.ringPolys
+    bExterior = ExteriorRings(batch.ringParts, ringPolys)
+    stats = PolygonStats()
+
+    ringLens = np.diff(ringOffsets)
+    stats.vertices = np.bincount(ringPolys, weights=ringLens, minlength=numPolys).astype(int)
+    stats.parts = np.bincount(ringPolys[bExterior], minlength=numPolys)
+    stats.multipart = stats.parts > 1
+
+    # Segments join consecutive vertices within the same ring
+    iFrom = RingSegments(ringOffsets)
+    iTo = iFrom + 1
+    dx = xy[iTo, 0] - xy[iFrom, 0]
+    dy = xy[iTo, 1] - xy[iFrom, 1]
+    segLength = np.hypot(dx, dy)
+    segRings = np.searchsorted(ringOffsets, iFrom, "right") - 1
+    segPolys = ringPolys[segRings]
+
+    stats.perimeter = np.bincount(segPolys, weights=segLength, minlength=numPolys)
+
+    # Shoelace formula for each ring. Ring orientation is ignored, holes are subtracted.
+    cross = xy[iFrom, 0] * xy[iTo, 1] - xy[iTo, 0] * xy[iFrom, 1]
+    ringArea = np.abs(np.bincount(segRings, weights=cross, minlength=len(ringLens))) / 2.0
+    ringArea[~bExterior] *= -1
+    stats.area = np.bincount(ringPolys, weights=ringArea, minlength=numPolys)
+
+    stats.avi = np.zeros(numPolys)
+    bHasVertices = stats.vertices > 0
+    stats.avi[bHasVertices] = stats.perimeter[bHasVertices] / stats.vertices[bHasVertices]
+
+    # Segments are stored polygon by polygon, so the minimum can be reduced over each run
+    segCounts = np.bincount(segPolys, minlength=numPolys)
+    segStarts = np.cumsum(segCounts) - segCounts
+    stats.minSegment = np.empty(numPolys)
+    stats.minSegment.fill(np.inf)
+    bHasSegments = segCounts > 0
+
+    if bHasSegments.any():
+        stats.minSegment[bHasSegments] = np.minimum.reduceat(segLength, segStarts[bHasSegments])
+
+    bShort = segLength < minDist
+    stats.shortPolys = segPolys[bShort]
+    stats.shortX = (xy[iFrom[bShort], 0] + xy[iTo[bShort], 0]) / 2.0
+    stats.shortY = (xy[iFrom[bShort], 1] + xy[iTo[bShort], 1]) / 2.0
+    stats.shortLength = segLength[bShort]
+    stats.shortExterior = bExterior[segRings[bShort]]
+
+    return stats
+
+## ===================================================================================
+def FindSharedSegments(xy, ringOffsets, tolerance=0.0):
+    # Match the segments of all rings that share both end points, regardless of direction.
+    # This is the shared boundary (common line) between two adjacent polygons.
+    #
+    # Segment end points are converted to integer keys (see CoordinateKeys), each segment
+    # is normalized so that the lower end point comes first and the segments are sorted
+    # once on the four keys. Zero-length segments are ignored.
+    #
+    # Returns three arrays of segment start indexes (see RingSegments): the first and second
+    # segment of each matched pair and the segments that were not matched (outer boundary).
+    #
+    iFrom = RingSegments(ringOffsets)
+    iTo = iFrom + 1
+    fx = CoordinateKeys(xy[iFrom, 0], tolerance)
+    fy = CoordinateKeys(xy[iFrom, 1], tolerance)
+    tx = CoordinateKeys(xy[iTo, 0], tolerance)
+    ty = CoordinateKeys(xy[iTo, 1], tolerance)
+
+    bKeep = (fx != tx) | (fy != ty)
+    iFrom, fx, fy, tx, ty = iFrom[bKeep], fx[bKeep], fy[bKeep], tx[bKeep], ty[bKeep]
+
+    bSwap = (fx > tx) | ((fx == tx) & (fy > ty))
+    x1 = np.where(bSwap, tx, fx)
+    y1 = np.where(bSwap, ty, fy)
+    x2 = np.where(bSwap, fx, tx)
+    y2 = np.where(bSwap, fy, ty)
+
+    if len(iFrom) == 0:
+        empty = np.zeros(0, dtype=int)
+        return empty, empty, empty
+
+    order = np.lexsort((y2, x2, y1, x1))
+    x1, y1, x2, y2 = x1[order], y1[order], x2[order], y2[order]
+    bNew = np.ones(len(order), dtype=bool)
+    bNew[1:] = (x1[1:] != x1[:-1]) | (y1[1:] != y1[:-1]) | (x2[1:] != x2[:-1]) | (y2[1:] != y2[:-1])
+    starts = np.nonzero(bNew)[0]
+    counts = np.diff(np.append(starts, len(order)))
+
+    # only the first two segments of an overlapping set are paired
+    pairs = starts[counts >= 2]
+    singles = starts[counts == 1]
+
+    return iFrom[order[pairs]], iFrom[order[pairs + 1]], iFrom[order[singles]]
+
+## ===================================================================================
+def ChainSegments(iFrom, ringOffsets):
+    # Join segments (see RingSegments) that follow each other along the same ring into
+    # lines, including a line that runs through the start of a closed ring.
+    #
+    # Returns a list with one array of xy vertex indexes for each line.
+    #
+    iFrom = np.unique(np.asarray(iFrom, dtype=int))
+    ringOffsets = np.asarray(ringOffsets, dtype=int)
+    lines = list()
+
+    if len(iFrom) == 0:
+        return lines
+
+    rings = np.searchsorted(ringOffsets, iFrom, "right") - 1
+    breaks = np.nonzero((np.diff(iFrom) != 1) | (np.diff(rings) != 0))[0] + 1
+    runStarts = np.append(0, breaks)
+    runEnds = np.append(breaks, len(iFrom)) - 1
+
+    # group the runs by ring
+    dRuns = dict()
+
+    for i in range(len(runStarts)):
+        ring = rings[runStarts[i]]
+        dRuns.setdefault(ring, list()).append([iFrom[runStarts[i]], iFrom[runEnds[i]]])
+
+    for ring in sorted(dRuns.keys()):
+        runs = dRuns[ring]
+        ringStart = ringOffsets[ring]
+        ringEnd = ringOffsets[ring + 1]
+
+        if len(runs) > 1 and runs[0][0] == ringStart and runs[-1][1] == ringEnd - 2:
+            # last run continues through the closing vertex into the first run
+            head = runs.pop(0)
+            tail = runs.pop()
+            lines.append(np.concatenate((np.arange(tail[0], ringEnd), np.arange(ringStart + 1, head[1] + 2))))
+
+        for first, last in runs:
+            lines.append(np.arange(first, last + 2))
+
+    return lines
+
+## ===================================================================================
+def _GroupRuns(*keys):
+    # Sort on one or more integer key arrays (most significant first) and return the sort
+    # order plus the start position of each run of equal keys within the sorted order.
+    #
+    order = np.lexsort(keys[::-1])
+    bNew = np.zeros(len(order), dtype=bool)
+    bNew[0:1] = True
+
+    for key in keys:
+        sKey = key[order]
+        bNew[1:] |= sKey[1:] != sKey[:-1]
+
+    return order, np.nonzero(bNew)[0]
+
+## ===================================================================================
+class PointGrid(object):
+    # Grid (spatial hash) index of a set of points for fixed distance searches. The points
+    # are sorted once by grid cell; a search only looks at the cells within the distance.
+    #
+    def __init__(self, xy, cellSize):
+        self.xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        self.cellSize = float(cellSize)
+        cx = np.floor(self.xy[:, 0] / self.cellSize).astype(np.int64)
+        cy = np.floor(self.xy[:, 1] / self.cellSize).astype(np.int64)
+        self.order = np.lexsort((cy, cx))
+        self.cx = cx[self.order]
+        self.cy = cy[self.order]
+
+    def Cell(self, cx, cy):
+        # Return the point indexes in grid cell cx, cy
+        lo = np.searchsorted(self.cx, cx, "left")
+        hi = np.searchsorted(self.cx, cx, "right")
+        col = self.cy[lo:hi]
+        return self.order[lo + np.searchsorted(col, cy, "left"):lo + np.searchsorted(col, cy, "right")]
+
+    def Near(self, x, y, dist):
+        # Return the indexes of the points within dist of x, y
+        n = int(np.ceil(dist / self.cellSize))
+        cx = int(np.floor(x / self.cellSize))
+        cy = int(np.floor(y / self.cellSize))
+        cells = [self.Cell(i, j) for i in range(cx - n, cx + n + 1) for j in range(cy - n, cy + n + 1)]
+        near = np.concatenate(cells)
+        d = np.hypot(self.xy[near, 0] - x, self.xy[near, 1] - y)
+        return near[d <= dist]
+
+## ===================================================================================
+class SegmentGrid(object):
+    # Grid (spatial hash) index of line segments for fixed distance searches. Each segment
+    # is entered in every grid cell covered by its bounding box.
+    #
+    def __init__(self, xy1, xy2, cellSize):
+        self.xy1 = np.asarray(xy1, dtype=float).reshape(-1, 2)
+        self.xy2 = np.asarray(xy2, dtype=float).reshape(-1, 2)
+        self.cellSize = float(cellSize)
+        lo = np.floor(np.minimum(self.xy1, self.xy2) / self.cellSize).astype(np.int64)
+        hi = np.floor(np.maximum(self.xy1, self.xy2) / self.cellSize).astype(np.int64)
+        nx = hi[:, 0] - lo[:, 0] + 1
+        ny = hi[:, 1] - lo[:, 1] + 1
+        numCells = nx * ny
+
+        # expand each segment into one entry per covered cell
+        segs = np.repeat(np.arange(len(numCells)), numCells)
+        iCell = np.arange(len(segs)) - np.repeat(np.cumsum(numCells) - numCells, numCells)
+        cx = lo[segs, 0] + iCell // ny[segs]
+        cy = lo[segs, 1] + iCell % ny[segs]
+        order = np.lexsort((cy, cx))
+        self.segs = segs[order]
+        self.grid = PointGrid(np.zeros((0, 2)), cellSize)
+        self.grid.order = np.arange(len(order))
+        self.grid.cx = cx[order]
+        self.grid.cy = cy[order]
+
+    def Near(self, x, y, dist):
+        # Return the indexes of the segments within dist of x, y
+        n = int(np.ceil(dist / self.cellSize))
+        cx = int(np.floor(x / self.cellSize))
+        cy = int(np.floor(y / self.cellSize))
+        cells = [self.grid.Cell(i, j) for i in range(cx - n, cx + n + 1) for j in range(cy - n, cy + n + 1)]
+        near = np.unique(self.segs[np.concatenate(cells)])
+        return near[PointToSegmentDistance(x, y, self.xy1[near], self.xy2[near]) <= dist]
+
+## ===================================================================================
+class ExtentGrid(object):
+    # Grid (spatial hash) index of feature extents that can be added to after it is built.
+    # Each extent is entered in every grid cell it covers. Overlapping returns the features
+    # whose extents overlap a search extent, the caller then tests the geometry itself.
+    #
+    def __init__(self, cellSize):
+        self.cellSize = float(cellSize)
+        self.extents = list()
+        self.values = list()
+        self._cells = dict()
+
+    def _CellRange(self, xmin, ymin, xmax, ymax):
+        return int(np.floor(xmin / self.cellSize)), int(np.floor(ymin / self.cellSize)), \
+        int(np.floor(xmax / self.cellSize)), int(np.floor(ymax / self.cellSize))
+
+    def Add(self, extent, value):
+        # extent is (xmin, ymin, xmax, ymax). Returns the index of the new feature.
+        i = len(self.extents)
+        self.extents.append(tuple(extent))
+        self.values.append(value)
+        cx1, cy1, cx2, cy2 = self._CellRange(*extent)
+
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                self._cells.setdefault((cx, cy), list()).append(i)
+
+        return i
+
+    def Overlapping(self, extent):
+        # Return the sorted indexes of the features whose extents overlap extent
+        xmin, ymin, xmax, ymax = extent
+        cx1, cy1, cx2, cy2 = self._CellRange(*extent)
+        found = set()
+
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                found.update(self._cells.get((cx, cy), ()))
+
+        return sorted([i for i in found if self.extents[i][0] <= xmax and self.extents[i][2] >= xmin \
+        and self.extents[i][1] <= ymax and self.extents[i][3] >= ymin])
+
+## ===================================================================================
+def PointToSegmentDistance(x, y, xy1, xy2):
+    # Distance from point x, y to each of the segments xy1 -> xy2
+    #
+    d = xy2 - xy1
+    segLen2 = d[:, 0] ** 2 + d[:, 1] ** 2
+    t = np.zeros(len(d))
+    bLen = segLen2 > 0
+    t[bLen] = ((x - xy1[bLen, 0]) * d[bLen, 0] + (y - xy1[bLen, 1]) * d[bLen, 1]) / segLen2[bLen]
+    t = np.clip(t, 0.0, 1.0)
+    return np.hypot(xy1[:, 0] + t * d[:, 0] - x, xy1[:, 1] + t * d[:, 1] - y)
+
+## ===================================================================================
+def FindEdgeMatchErrors(xy, ringOffsets, ringPolys, polySurveys, tolerance):
+    # Find survey boundary nodes that have no matching node in the neighbouring survey.
+    #
+    # polySurveys is an integer survey number (factored AREASYMBOL) for each polygon and
+    # tolerance is the search distance (normally the XY tolerance) used to match nodes and
+    # to decide whether a node lies on the boundary of another survey.
+    #
+    # A node is a vertex where a soil line inside a survey (a segment shared by two polygons
+    # of the same survey) ends on the survey boundary. The node is an error when there is
+    # no node of another survey (the end of one of its soil lines) within the tolerance but
+    # the boundary of another survey is, so nodes on the outer perimeter of the surveys are
+    # not reported. A vertex of another survey that no soil line ends on is not a match.
+    # This is the same test as the DANGLE check on the merged soil lines.
+    #
+    # Returns the xy index and survey number of each error.
+    #
+    ringOffsets = np.asarray(ringOffsets, dtype=int)
+    polySurveys = np.asarray(polySurveys, dtype=np.int64)
+    segA, segB, segOpen = FindSharedSegments(xy, ringOffsets)
+    survA = polySurveys[ringPolys[np.searchsorted(ringOffsets, segA, "right") - 1]]
+    survB = polySurveys[ringPolys[np.searchsorted(ringOffsets, segB, "right") - 1]]
+    bInterior = survA == survB
+
+    interiorSegs = segA[bInterior]
+    interiorSurv = survA[bInterior]
+    boundarySegs = np.concatenate((segA[~bInterior], segB[~bInterior], segOpen))
+    boundarySurv = polySurveys[ringPolys[np.searchsorted(ringOffsets, boundarySegs, "right") - 1]]
+
+    # end points of the interior and survey boundary segments
+    iPts = np.concatenate((interiorSegs, interiorSegs + 1))
+    iSurv = np.concatenate((interiorSurv, interiorSurv))
+    bPts = np.concatenate((boundarySegs, boundarySegs + 1))
+    bSurv = np.concatenate((boundarySurv, boundarySurv))
+
+    # nodes are interior end points that are also boundary end points of the same survey
+    allPts = np.concatenate((iPts, bPts))
+    allSurv = np.concatenate((iSurv, bSurv))
+    bBoundary = np.concatenate((np.zeros(len(iPts), dtype=bool), np.ones(len(bPts), dtype=bool)))
+    kx = CoordinateKeys(xy[allPts, 0])
+    ky = CoordinateKeys(xy[allPts, 1])
+
+    if len(allPts) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=np.int64)
+
+    order, starts = _GroupRuns(allSurv, kx, ky)
+    groups = np.zeros(len(order), dtype=int)
+    groups[starts[1:]] = 1
+    groups = np.cumsum(groups)
+    hasBoundary = np.bincount(groups, weights=bBoundary[order].astype(float)) > 0
+    hasInterior = np.bincount(groups, weights=(~bBoundary[order]).astype(float)) > 0
+    nodes = order[starts[hasBoundary & hasInterior]]
+    nodePts = allPts[nodes]
+    nodeSurv = allSurv[nodes]
+
+    if len(nodes) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=np.int64)
+
+    # nodes at the same location as a node of another survey are matched
+    locOrder, locStarts = _GroupRuns(kx[nodes], ky[nodes])
+    locGroups = np.zeros(len(locOrder), dtype=int)
+    locGroups[locStarts[1:]] = 1
+    locGroups = np.cumsum(locGroups)
+    bShared = np.minimum.reduceat(nodeSurv[locOrder], locStarts) != np.maximum.reduceat(nodeSurv[locOrder], locStarts)
+    bMatched = np.zeros(len(nodes), dtype=bool)
+    bMatched[locOrder] = bShared[locGroups]
+
+    # remaining nodes are checked against the nodes of the other surveys within the tolerance
+    errPts = list()
+    errSurv = list()
+    iCheck = np.nonzero(~bMatched)[0]
+
+    if len(iCheck) > 0 and tolerance > 0:
+        pntGrid = PointGrid(xy[nodePts], tolerance)
+        segLength = np.hypot(xy[boundarySegs + 1, 0] - xy[boundarySegs, 0], xy[boundarySegs + 1, 1] - xy[boundarySegs, 1])
+        cellSize = max(tolerance, np.median(segLength) if len(segLength) > 0 else tolerance)
+        segGrid = SegmentGrid(xy[boundarySegs], xy[boundarySegs + 1], cellSize)
+
+        for i in iCheck:
+            x, y = xy[nodePts[i]]
+            near = pntGrid.Near(x, y, tolerance)
+
+            if (nodeSurv[near] != nodeSurv[i]).any():
+                continue
+
+            near = segGrid.Near(x, y, tolerance)
+
+            if (boundarySurv[near] != nodeSurv[i]).any():
+                errPts.append(nodePts[i])
+                errSurv.append(nodeSurv[i])
+
+    return np.array(errPts, dtype=int), np.array(errSurv, dtype=np.int64)
+
+## ===================================================================================
+def _ReadHeader(buf, offset):
+    # Read WKB byte order and geometry type. Returns struct prefix, base geometry type,
+    # number of ordinates per vertex and the new offset.
+    #
+    if buf[offset] == 1:
+        bo = "<"
+
+    else:
+        bo = ">"
+
+    geomType = struct.unpack_from(bo + "I", buf, offset + 1)[0]
+
+    # EWKB style flags
+    hasZ = bool(geomType & 0x80000000)
+    hasM = bool(geomType & 0x40000000)
+    geomType = geomType & 0x0FFFFFFF
+
+    # ISO style type codes (1000 = Z, 2000 = M, 3000 = ZM)
+    if geomType >= 3000:
+        hasZ = hasM = True
+
+    elif geomType >= 2000:
+        hasM = True
+
+    elif geomType >= 1000:
+        hasZ = True
+
+    nDims = 2 + int(hasZ) + int(hasM)
+    return bo, geomType % 1000, nDims, offset + 5
+
+## ===================================================================================
+def _ReadPolygons(buf, offset, parts):
+    # Append the parts of a Polygon or MultiPolygon to the parts list and return the
+    # offset to the end of the geometry.
+    #
+    bo, geomType, nDims, offset = _ReadHeader(buf, offset)
+
+    if geomType == 6:
+        # MultiPolygon, each polygon carries its own header
+        numPolys = struct.unpack_from(bo + "I", buf, offset)[0]
+        offset += 4
+
+        for i in range(numPolys):
+            offset = _ReadPolygons(buf, offset, parts)
+
+        return offset
+
+    if geomType != 3:
+        raise ValueError("Unsupported WKB geometry type: " + str(geomType))
+
+    numRings = struct.unpack_from(bo + "I", buf, offset)[0]
+    offset += 4
+    rings = list()
+    dt = np.dtype(bo + "f8")
+
+    for i in range(numRings):
+        numPnts = struct.unpack_from(bo + "I", buf, offset)[0]
+        offset += 4
+        coords = np.frombuffer(buf, dt, numPnts * nDims, offset).reshape(numPnts, nDims)
+        rings.append(coords[:, 0:2])
+        offset += numPnts * nDims * 8
+
+    parts.append(rings)
+    return offset
+
+## ===================================================================================
+def GetRingAngles(xy):
+    # Return the angle in degrees (0 - 180) formed at every vertex of a single ring.
+    #
+    # xy is an (n, 2) array of ring coordinates. If the ring is closed (last vertex
+    # repeats the first) the closing vertex is dropped, so element i of the result is
+    # the angle at vertex i. See GetVertexAngles.
+    #
+    pnts = np.asarray(xy, dtype=float)
+    return GetVertexAngles(pnts, [0, len(pnts)])[0]
+
+## ===================================================================================
+def RingVertices(xy, ringOffsets, minPnts=1):
+    # Index the distinct vertices of every ring. The closing vertex of each closed ring
+    # is skipped and rings with fewer than minPnts distinct vertices are ignored.
+    #
+    # Returns four arrays with one element per vertex: the xy index of the previous
+    # vertex, the vertex itself and the next vertex (wrapping around the start of the
+    # ring) and the ring number.
+    #
+    ringOffsets = np.asarray(ringOffsets, dtype=int)
+    starts = ringOffsets[:-1]
+    counts = ringOffsets[1:] - starts
+
+    # number of distinct vertices in each ring
+    numPnts = counts.copy()
+    bValid = counts > 1
+    iFirst = starts[bValid]
+    iLast = iFirst + counts[bValid] - 1
+    bClosed = (xy[iFirst, 0] == xy[iLast, 0]) & (xy[iFirst, 1] == xy[iLast, 1])
+    numPnts[bValid] -= bClosed.astype(int)
+
+    rings = np.nonzero(numPnts >= max(minPnts, 1))[0]
+    starts = starts[rings]
+    numPnts = numPnts[rings]
+
+    ringIndex = np.repeat(np.arange(len(numPnts)), numPnts)
+    ringStart = starts[ringIndex]
+    ringLen = numPnts[ringIndex]
+    iLocal = np.arange(len(ringIndex)) - np.repeat(np.cumsum(numPnts) - numPnts, numPnts)
+
+    iVert = ringStart + iLocal
+    iPrev = ringStart + (iLocal - 1) % ringLen
+    iNext = ringStart + (iLocal + 1) % ringLen
+
+    return iPrev, iVert, iNext, rings[ringIndex]
+
+## ===================================================================================
+def GetVertexAngles(xy, ringOffsets):
+    # Calculate the angle in degrees (0 - 180) formed at every vertex of every ring in
+    # one pass. The angle is measured between the segments to the previous and next
+    # vertices, wrapping around the start of each ring. A zero-length segment returns 0.
+    #
+    # The closing vertex of each closed ring is skipped and rings with fewer than 3
+    # distinct vertices are ignored. Returns four arrays: the angles and the xy index of
+    # the previous vertex, the vertex itself and the next vertex for each angle.
+    #
+    iPrev, iVert, iNext, iRing = RingVertices(xy, ringOffsets, 3)
+
+    toPrev = xy[iPrev] - xy[iVert]
+    toNext = xy[iNext] - xy[iVert]
+    cross = toPrev[:, 0] * toNext[:, 1] - toPrev[:, 1] * toNext[:, 0]
+    dot = toPrev[:, 0] * toNext[:, 0] + toPrev[:, 1] * toNext[:, 1]
+
+    return np.degrees(np.arctan2(np.abs(cross), dot)), iPrev, iVert, iNext
+
+## ===================================================================================
+def CoordinateKeys(coords, tolerance=0.0):
+    # Convert an array of coordinate values to int64 keys. With a tolerance of zero the
+    # key is the exact bit pattern of the value, so keys only match for identical
+    # coordinates. Otherwise the values are snapped to a grid of the tolerance size.
+    #
+    coords = np.ascontiguousarray(coords, dtype=float)
+
+    if tolerance > 0:
+        return np.floor(coords / tolerance + 0.5).astype(np.int64)
+
+    # adding 0.0 turns -0.0 into 0.0 so that both have the same key
+    return (coords + 0.0).view(np.int64)
+
+## ===================================================================================
+def FindDuplicateVertices(keys, xy, tolerance=0.0):
+    # Find vertices that share the same key value and location. keys is an integer array
+    # with one value per vertex (for example a factored MUSYM value).
+    #
+    # The vertices are sorted once on the packed (key, x, y) integer values and runs of
+    # equal values are counted. Returns the index of the first vertex of each duplicated
+    # location and the number of vertices found there.
+    #
+    keys = np.asarray(keys, dtype=np.int64)
+    xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+    kx = CoordinateKeys(xy[:, 0], tolerance)
+    ky = CoordinateKeys(xy[:, 1], tolerance)
+
+    if len(keys) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+    order = np.lexsort((ky, kx, keys))
+    sKeys = keys[order]
+    sx = kx[order]
+    sy = ky[order]
+
+    bNew = np.ones(len(order), dtype=bool)
+    bNew[1:] = (sKeys[1:] != sKeys[:-1]) | (sx[1:] != sx[:-1]) | (sy[1:] != sy[:-1])
+    starts = np.nonzero(bNew)[0]
+    counts = np.diff(np.append(starts, len(order)))
+    bDup = counts > 1
+
+    return order[starts[bDup]], counts[bDup]
+
+## ===================================================================================
+def FindNearPairs(xy, tolerance, blockSize=1000000):
+    # Find every pair of points closer than tolerance. The points are sorted once by grid
+    # cell (cell size of at least the tolerance) and each point is only compared with the
+    # points in its own cell and in four of the eight neighbouring cells; the other four
+    # are covered when the search is made from the other side. The work grows with the
+    # number of points instead of its square. Points are processed in blocks to limit the
+    # size of the candidate pair arrays.
+    #
+    # Returns the point indexes of both ends of each pair and the distance between them.
+    #
+    xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+    numPnts = len(xy)
+
+    if numPnts < 2 or tolerance <= 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+
+    # grid cell numbers packed into one int64 key. The row is offset by one so that the
+    # neighbouring row of the first and last cell in a column never falls in another column.
+    # For very large extents the cells are made bigger until the packed key fits.
+    cellSize = float(tolerance)
+    xyMin = xy.min(axis=0)
+
+    while True:
+        cx = np.floor((xy[:, 0] - xyMin[0]) / cellSize).astype(np.int64)
+        cy = np.floor((xy[:, 1] - xyMin[1]) / cellSize).astype(np.int64) + 1
+        numRows = int(cy.max()) + 2
+
+        if (float(cx.max()) + 2.0) * numRows < 2.0 ** 62:
+            break
+
+        cellSize *= 2.0
+
+    cellKeys = cx * numRows + cy
+    order = np.argsort(cellKeys, kind="mergesort")
+    sKeys = cellKeys[order]
+    pairsA = list()
+    pairsB = list()
+    pairsDist = list()
+
+    # same cell, then the cells above, right-below, right and right-above
+    for offset in (0, 1, numRows - 1, numRows, numRows + 1):
+        for start in range(0, numPnts, blockSize):
+            pos = np.arange(start, min(start + blockSize, numPnts))
+            last = np.searchsorted(sKeys, sKeys[pos] + offset, "right")
+
+            if offset == 0:
+                # only the points after this one in the same cell
+                first = pos + 1
+
+            else:
+                first = np.searchsorted(sKeys, sKeys[pos] + offset, "left")
+
+            counts = np.maximum(last - first, 0)
+            total = int(counts.sum())
+
+            if total == 0:
+                continue
+
+            iA = np.repeat(pos, counts)
+            iB = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(total)
+            iA = order[iA]
+            iB = order[iB]
+            dist = np.hypot(xy[iB, 0] - xy[iA, 0], xy[iB, 1] - xy[iA, 1])
+            bNear = dist < tolerance
+            pairsA.append(iA[bNear])
+            pairsB.append(iB[bNear])
+            pairsDist.append(dist[bNear])
+
+    if len(pairsA) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+
+    return np.concatenate(pairsA), np.concatenate(pairsB), np.concatenate(pairsDist)
+
+## ===================================================================================
+def FindNearVertices(xy, iFrom, tolerance):
+    # Find vertices that are closer than tolerance to another vertex that they are not
+    # joined to by a segment. These are the pinch points between non-adjacent vertices of
+    # the same ring or of neighbouring polygons that collapse under a cluster tolerance.
+    #
+    # xy is every vertex in the layer and iFrom the first vertex of every segment
+    # (RingSegments). Vertices at the same location, such as those shared by neighbouring
+    # polygons, are treated as one point. Short segments are reported by GetPolygonStatistics
+    # and are left out here.
+    #
+    # Returns the xy index of a vertex at each end of each pair and the distance between them.
+    #
+    xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+    iFrom = np.asarray(iFrom, dtype=int)
+
+    if len(xy) < 2:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+
+    # number each distinct location
+    order, starts = _GroupRuns(CoordinateKeys(xy[:, 0]), CoordinateKeys(xy[:, 1]))
+    bNew = np.zeros(len(order), dtype=int)
+    bNew[starts] = 1
+    locations = np.zeros(len(order), dtype=np.int64)
+    locations[order] = np.cumsum(bNew) - 1
+    firstVertex = order[starts]
+    numLocations = len(starts)
+
+    iA, iB, dist = FindNearPairs(xy[firstVertex], tolerance)
+
+    # drop the pairs that are the two ends of a segment
+    a = locations[iFrom]
+    b = locations[iFrom + 1]
+    segKeys = np.minimum(a, b) * numLocations + np.maximum(a, b)
+    pairKeys = np.minimum(iA, iB).astype(np.int64) * numLocations + np.maximum(iA, iB)
+    bKeep = ~IsIn(pairKeys, segKeys)
+
+    return firstVertex[iA[bKeep]], firstVertex[iB[bKeep]], dist[bKeep]
@@ -23,6 +23,11 @@
 # 10-17-2012
 # Modified to export MUKEY values to output text file to eliminate possibility of updating wrong mapunit in NASIS.
 # 10-31-2013
+#
+# 10-18-2026
+# Process one or more AREASYMBOL values with a single pass through the input layer. The NASIS
+# reports for all of the surveys are requested at the same time (SSURGO_Web) and a report file
+# is written for each survey. Added option to spread the rounding residual by largest remainder.
 
 ## ===================================================================================
 class MyError(Exception):
@@ -201,180 +206,112 @@ def GetWC(theFC):
         errorMsg()
 
 ## ===================================================================================
-def NASIS_List(theAreasymbol, theURL, theParameter):
-    # Create a dictionary of NASIS MUSYM values
+def NASIS_List(thePage):
+    # Create a dictionary of NASIS MUSYM values from the 'WEB-Mapunits by area symbol' report page
+    # Runs in a request thread (SSURGO_Web.FetchAll), so arcpy is not used here. A report line
+    # with more than one value raises a ValueError with the line.
     #
-    try:
-        dNASIS = dict()
-
-        # Add theAreasymbol to the end of theParameters string
-        theParameter = theParameter + theAreasymbol
-
-        theURL = theURL + '&' + theParameter
-        theParameter = None
-        theReport = urllib.urlopen(theURL, theParameter)
+    dNASIS = dict()
+    mapunitCnt = 0
 
-        mapunitCnt = 0
+    for theValue in thePage.splitlines():
+        theValue = theValue[theValue.rfind(">") + 1:].strip()
 
-        for theValue in theReport:
-            theValue = theValue[theValue.rfind(">") + 1:].strip()
+        if len(theValue) > 0:
 
-            if len(theValue) > 0:
+            if len(theValue.split()) > 1:
+                raise ValueError(theValue)
 
-                if len(theValue.split()) > 1:
-                    PrintMsg(theValue, 2)
-                    return None
+            mapunitCnt += 1
 
-                mapunitCnt += 1
+            if not theValue in dNASIS:
+                dNASIS[theValue] = mapunitCnt
 
-                if not dNASIS.has_key(theValue):
-                    dNASIS[theValue] = mapunitCnt
-                    #PrintMsg("\tAdding " + theValue + " to NASIS list" ,0)
-
-        #PrintMsg("Found " + str(mapunitCnt) + " mapunits in NASIS", 1)
-        del theReport
-        return dNASIS
-
-    except IOError:
-        err = "IOError. Failed to retrieve MUSYM values from LIMS server"
-        arcpy.AddError(err + " \n")
-        return dNASIS
-
-    except:
-        errorMsg()
-        return dNASIS
+    return dNASIS
 
 ## ===================================================================================
-def Layer_List(theInput, theAreasymbol, bFiltered):
-    # Retrieve list of MUSYM and MUKEY values from input layer
+def Layer_List(theInput, asList):
+    # Retrieve MUSYM values and the area of each MUKEY from the input layer for all of the
+    # surveys in asList, using a single cursor
+    #
+    # Returns two dictionaries by AREASYMBOL: {AREASYMBOL: set of MUSYM values} and
+    # {AREASYMBOL: {MUKEY: area}}
 
     try:
-        # Check 'theInput' argument. Determine whether it is table, featurelayer
-        # or featureclass.
-        # Again, relying upon ArcTool interface to filter out incorrect types.
-        #
         theDesc = arcpy.Describe(theInput)
         theDataType = theDesc.DataType
-        theSQL = ""
-        dMusyms =dict()
-        dMukeys = dict
+        dMusyms = dict()
+        dMukeys = dict()
 
-        if bFiltered:
-            theWCList = GetWC(theInput)
+        theWCList = GetWC(theInput)
 
-            if theWCList is None:
-                return dMusyms, dMukeys
+        if theWCList is None:
+            return dMusyms, dMukeys
 
-            theWC = theWCList[0]
-            theDL1 = theWCList[1]
-            theDL2 = theWCList[2]
-            DAreasymbolField = theDL1 + "AREASYMBOL" + theDL2
-            theSQL = DAreasymbolField + " = '" + theAreasymbol + "'"
+        theDL1 = theWCList[1]
+        theDL2 = theWCList[2]
+        DAreasymbolField = theDL1 + "AREASYMBOL" + theDL2
+        theSQL = DAreasymbolField + " IN (" + ", ".join(["'" + theAreasymbol + "'" for theAreasymbol in asList]) + ")"
 
         # Make sure input layer has MUSYM field
         #
-        if theDataType.upper() == "FEATURELAYER":
-            theFeatureclass = theDesc.Featureclass
-            theName = theInput
-            theWS = os.path.dirname(theFeatureclass.CatalogPath)
-            env.workspace = theWS
-            musymField = FindField(theInput, "MUSYM")
-            mukeyField = FindField(theInput, "MUKEY")
-            theShapeField = theFeatureclass.ShapeFieldName
-            theFields = [musymField, mukeyField, "SHAPE@AREA"]
-
-            if musymField == "":
-                return dMusyms, dMukeys
+        areasymField = FindField(theInput, "AREASYMBOL")
+        musymField = FindField(theInput, "MUSYM")
+        mukeyField = FindField(theInput, "MUKEY")
 
-            else:
-                # Make sure entire featureclass is being checked unless filtered by AREASYMBOL
-                # Apply selection if needed
-                layerCnt = int(arcpy.GetCount_management(theInput).getOutput(0))
-                totalCnt = int(arcpy.GetCount_management(theFeatureclass.CatalogPath).getOutput(0))
+        if musymField == "" or areasymField == "":
+            return dMusyms, dMukeys
 
-                if layerCnt == 0 or totalCnt == 0:
-                    PrintMsg("Error. Zero records selected for comparison in featurelayer (" + theInput + ")", 2)
-                    return dMusyms, dMukeys
+        theFields = [areasymField, musymField, mukeyField, "SHAPE@AREA"]
 
-                if layerCnt != totalCnt:
-                    PrintMsg(" \nChecking " + Number_Format(layerCnt, 0, True) + " of " + \
-                                   Number_Format(totalCnt, 0, True) + " selected features in featurelayer (" + theInput + ")", 1)
+        if theDataType.upper() == "FEATURELAYER":
+            # Make sure entire featureclass is being checked unless filtered by AREASYMBOL
+            layerCnt = int(arcpy.GetCount_management(theInput).getOutput(0))
+            totalCnt = int(arcpy.GetCount_management(theDesc.Featureclass.CatalogPath).getOutput(0))
 
-                else:
-                    PrintMsg(" \nAll " + Number_Format(totalCnt, 0, True) + \
-                                   " features are being checked in featurelayer: " + theInput, 1)
+            if layerCnt == 0 or totalCnt == 0:
+                PrintMsg("Error. Zero records selected for comparison in featurelayer (" + theInput + ")", 2)
+                return dMusyms, dMukeys
 
-                theCursor = arcpy.da.SearchCursor(theName, theFields, theSQL)
+            if layerCnt != totalCnt:
+                PrintMsg(" \nChecking " + Number_Format(layerCnt, 0, True) + " of " + \
+                               Number_Format(totalCnt, 0, True) + " selected features in featurelayer (" + theInput + ")", 1)
+
+            else:
+                PrintMsg(" \nAll " + Number_Format(totalCnt, 0, True) + \
+                               " features are being checked in featurelayer: " + theInput, 1)
 
         else:
-            # Input layer is a featureclass
             totalCnt = int(arcpy.GetCount_management(theDesc.CatalogPath).getOutput(0))
-            theWS = os.path.dirname(theInput)
-            theName = os.path.basename(theInput)
-            env.workspace = theWS
-            musymField = FindField(theInput, "MUSYM")
-            mukeyField = FindField(theInput, "MUKEY")
-            theShapeField = theDesc.ShapeFieldName
-            theFields = [musymField, mukeyField, "SHAPE@AREA"]
-
-            if musymField == "":
-                return dMusyms, dMukeys
-
-            if bFiltered:
-                # Create featurelayer from featureclass
-                layerCnt = int(arcpy.GetCount_management(theInput).getOutput(0))
-                PrintMsg(" \n" + Number_Format(layerCnt, 0, True) + " of " + \
-                           Number_Format(totalCnt) + " records are being checked in " + theDataType.lower() + ": " + theName, 1)
+            PrintMsg(" \n" + Number_Format(totalCnt) + " records in " + theDataType.lower() + ": " + os.path.basename(theInput), 1)
 
-                theCursor = arcpy.da.SearchCursor(theInput, theFields, theSQL )
-
-        # Use cursor to populate dictionary with list of MUSYM values in featurelayer
+        # Use cursor to populate the dictionaries for every survey in one pass
         #
-        dMusyms = dict()
-        dMukeys = dict()
-        mapunitCnt = 0
-
-        if theCursor is None:
-            PrintMsg("\tFailed to create database cursor on Input Layer", 2)
-            return dMusyms, dMukeys
-
-        if arcpy.Exists(theInput):
+        for theAreasymbol in asList:
+            dMusyms[theAreasymbol] = set()
+            dMukeys[theAreasymbol] = dict()
 
+        with arcpy.da.SearchCursor(theInput, theFields, theSQL) as theCursor:
             for theRec in theCursor:
-                # theFields = [theField, mukeyField, theShapeField]
-                # read each table record and load dictionary
-                theMUSYM = str(theRec[0])
-                theMUKEY = str(theRec[1])
-                theArea = theRec[2]
-
-                if not theMUSYM in dMusyms:
-                    mapunitCnt += 1
-                    dMusyms[theMUSYM] = theMUSYM
-                    dMukeys[theMUKEY] = theArea
+                # read each table record and add the area to the mapunit
+                theAreasymbol = str(theRec[0]).strip().upper()
+                theMUSYM = str(theRec[1])
+                theMUKEY = str(theRec[2])
+                theArea = theRec[3]
 
-                else:
-                    dMusyms[theMUSYM] = theMUSYM
-                    dMukeys[theMUKEY] = dMukeys[theMUKEY] + theArea
-
-            del theCursor
-            del theRec
+                if not theAreasymbol in dMusyms:
+                    continue
 
-            if bFiltered and theDataType.upper() == "FEATURELAYER":
-                arcpy.SelectLayerByAttribute_management (theInput, "CLEAR_SELECTION")
-
-            return dMusyms, dMukeys
+                dMusyms[theAreasymbol].add(theMUSYM)
+                dAreas = dMukeys[theAreasymbol]
+                dAreas[theMUKEY] = dAreas.get(theMUKEY, 0.0) + theArea
 
-
-        else:
-            PrintMsg(" \nCould not find Input Layer (" + theName + ")", 2)
-            return dMusyms, dMukeys
+        return dMusyms, dMukeys
 
     except:
         PrintMsg(" \nProblem retrieving MUSYM values from theInput layer", 2)
         errorMsg()
-        del theCursor
-        del theRec
-        return dMusyms, dMukeys
+        return dict(), dict()
 
 ## ===================================================================================
 def CompareMusym(dNASIS, dMusyms):
@@ -410,7 +347,7 @@ def CompareMusym(dNASIS, dMusyms):
         #
         missingNASIS = []
 
-        for theMUSYM in dMusyms.keys():
+        for theMUSYM in dMusyms:
             if not theMUSYM in dNASIS:
                 missingNASIS.append(theMUSYM)
 
@@ -428,44 +365,25 @@ def CompareMusym(dNASIS, dMusyms):
         return False
 
 ## ===================================================================================
-def GetNRI_Acres(theAreasymbol, theURL, theParameter):
-    # Retrieve NRI acres for the specified soil survey area
+def GetNRI_Acres(thePage):
+    # Retrieve NRI acres for a soil survey area from the 'WEB-area acres' report page
+    # Runs in a request thread (SSURGO_Web.FetchAll), so arcpy is not used here.
     #
-    try:
-        PrintMsg(" \nRetrieving NRI acres for survey area '" + theAreasymbol + "' from NASIS", 1)
+    theAcres = 0
+    sFind = '<div id="ReportData">'  # HTML string containing NRI acres value. Only line with data.
 
-        # Add theAreasymbol to the end of theParameter string
-        theParameter = theParameter + theAreasymbol
-        theURL = theURL + theParameter
-        theParameter = None
-        theReport = urllib.urlopen(theURL, theParameter)
+    for theValue in thePage.splitlines():
+        iFind = theValue.rfind(sFind)
 
-        theAcres = 0
-        iCnt = 0
-        sFind = '<div id="ReportData">'  # HTML string containing NRI acres value. Only line with data.
+        if iFind > -1:
+            theValue = theValue[20:]
+            theAcres = int(theValue.split("=")[1])
+            break
 
-        for theValue in theReport:
-            iFind = theValue.rfind(sFind)
-
-            if iFind > -1:
-                theValue = theValue[20:]
-                theAcres = int(theValue.split("=")[1])
-                break
-
-        del theReport
-        return theAcres
-
-    except IOError:
-        PrintMsg("IOError. Failed to retrieve NRI acres from NASIS", 2)
-        errorMsg()
-        return 0
-
-    except:
-        errorMsg()
-        return 0
+    return theAcres
 
 ## ===================================================================================
-def GetMapunitAcres(dMukeys, NRI_Acres, theUnits, theRptFile):
+def GetMapunitAcres(dMukeys, NRI_Acres, theUnits, theRptFile, bLargestRemainder=False):
     #
     # Create text file containing MUKEY and ACRES
     #
@@ -474,6 +392,8 @@ def GetMapunitAcres(dMukeys, NRI_Acres, theUnits, theRptFile):
     #
     # dMukeys contains the spatial area in square meters or feet, depending upon the coordinate system
     # 10-17-2012 alter output to incorporate areasymbol and mukey instead of musym
+    # 10-18-2026 bLargestRemainder spreads the rounding residual one acre at a time over the
+    #            mapunits with the largest fractions instead of putting it all on the largest mapunit
 
     theTotalAcres = 0
     dMusyms2 = dict()  # create dictionary containing acres for each MUSYM value
@@ -499,7 +419,11 @@ def GetMapunitAcres(dMukeys, NRI_Acres, theUnits, theRptFile):
         PrintMsg(" \nTotal spatial acres = " + Number_Format(theTotalAcres, 1, True), 1)
         PrintMsg("Total NRI acres = " + Number_Format(NRI_Acres, 1, True), 1)
 
-        theAdj = NRI_Acres / theTotalAcres
+        if theTotalAcres <= 0:
+            PrintMsg("Error. Total spatial acres is zero, acres not calculated", 2)
+            return False
+
+        theAdj = float(NRI_Acres) / theTotalAcres
         theTotalAcres2 = 0
         theMaxMUSYM = ""
         theMaxAcres = 0
@@ -511,21 +435,42 @@ def GetMapunitAcres(dMukeys, NRI_Acres, theUnits, theRptFile):
         else:
             PrintMsg("Acreage conversion factor (spatial to NRI): " + str(theAdj), 1)
 
-        for theMUKEY in sorted(dMusyms2.keys()):
-            theAcres = int(round(theAdj * dMusyms2[theMUKEY]))
-            dMukeys[theMUKEY] = theAcres
-            theTotalAcres2 = theAcres + theTotalAcres2
+        if bLargestRemainder:
+            # Round every mapunit down and then add one acre to the mapunits with the largest
+            # fractions until the total matches the NRI acres
+            dFractions = dict()
+
+            for theMUKEY in sorted(dMusyms2.keys()):
+                theValue = theAdj * dMusyms2[theMUKEY]
+                theAcres = int(theValue)
+                dMukeys[theMUKEY] = theAcres
+                dFractions[theMUKEY] = theValue - theAcres
+                theTotalAcres2 = theAcres + theTotalAcres2
+
+            muAdj = min(max(int(NRI_Acres) - theTotalAcres2, 0), len(dFractions))
+            remainderList = sorted(dFractions.keys(), key=lambda theMUKEY: (-dFractions[theMUKEY], theMUKEY))
+
+            for theMUKEY in remainderList[0:muAdj]:
+                dMukeys[theMUKEY] += 1
+
+            PrintMsg("Largest remainder rounding added one acre to " + Number_Format(muAdj, 0, True) + " of " + Number_Format(len(dFractions), 0, True) + " mapunits", 1)
+
+        else:
+            for theMUKEY in sorted(dMusyms2.keys()):
+                theAcres = int(round(theAdj * dMusyms2[theMUKEY]))
+                dMukeys[theMUKEY] = theAcres
+                theTotalAcres2 = theAcres + theTotalAcres2
 
-            if theAcres > theMaxAcres:
-                theMaxAcres = theAcres
-                theMaxMUSYM = theMUKEY
+                if theAcres > theMaxAcres:
+                    theMaxAcres = theAcres
+                    theMaxMUSYM = theMUKEY
 
-        # Apply adjustment acres to largest mapunit
-        beforeSize = dMukeys[theMaxMUSYM]
-        muAdj = int(NRI_Acres) - theTotalAcres2
-        dMukeys[theMaxMUSYM] = dMukeys[theMaxMUSYM] + muAdj
+            # Apply adjustment acres to largest mapunit
+            beforeSize = dMukeys[theMaxMUSYM]
+            muAdj = int(NRI_Acres) - theTotalAcres2
+            dMukeys[theMaxMUSYM] = dMukeys[theMaxMUSYM] + muAdj
 
-        if muAdj <> 0:
+        if muAdj <> 0 and not bLargestRemainder:
             if muAdj > 0:
                 PrintMsg("Adjusting largest mapunit '" + theMaxMUSYM.strip() + "' up from " + Number_Format(beforeSize, 0, True) + " acres to " + Number_Format(dMukeys[theMaxMUSYM], 0, True) + " acres", 1)
 
@@ -558,6 +503,75 @@ def GetMapunitAcres(dMukeys, NRI_Acres, theUnits, theRptFile):
         errorMsg()
         return False
 
+## ===================================================================================
+def ProcessSurvey(theAreasymbol, dMusyms, dMukeys, dReports, theUnits, theRptFile):
+    # Check the mapunits and apportion the NRI acres for one survey, using the NASIS reports
+    # that were already retrieved for all surveys
+    #
+    try:
+        if len(dMukeys) == 0:
+            PrintMsg("Error. No mapunits found in the input layer for " + theAreasymbol, 2)
+            return False
+
+        if bCorrelated:
+            # Dictionary of MUSYM values retrieved from NASIS
+            #
+            thePage, errMsg = dReports[("MUSYM", theAreasymbol)]
+
+            if thePage is None:
+                PrintMsg("Failed to retrieve MUSYM values from LIMS server (" + errMsg + ")", 2)
+                return False
+
+            try:
+                dNASIS = NASIS_List(thePage)
+
+            except ValueError, e:
+                PrintMsg(str(e), 2)
+                return False
+
+            if len(dNASIS) == 0:
+                return False
+
+            # Compare MUSYM values in each dictionary
+            #
+            if not CompareMusym(dNASIS, dMusyms):
+                PrintMsg("Please fix problem with missing mapunits and then rerun tool", 2)
+                return False
+
+        # Get NRI county acreage value from NASIS
+        #
+        PrintMsg(" \nRetrieving NRI acres for survey area '" + theAreasymbol + "' from NASIS", 1)
+        thePage, errMsg = dReports[("NRI", theAreasymbol)]
+
+        if thePage is None:
+            PrintMsg("Failed to retrieve NRI acres from NASIS (" + errMsg + ")", 2)
+            return False
+
+        NRI_Acres = GetNRI_Acres(thePage)
+
+        # Test 'theAreasymbol' argument for standard 5 character length
+        #
+        if len(theAreasymbol) > 5:
+            PrintMsg(" \nWarning, the specified AREASYMBOL is greater than 5 characters in length", 0)
+
+        # Calculate adjusted NRI acres for each MUKEY
+        #
+        if NRI_Acres > 0:
+            bAdjusted = GetMapunitAcres(dMukeys, NRI_Acres, theUnits, theRptFile, bLargestRemainder)
+
+            if bAdjusted:
+                PrintMsg(" \nOutput file: " + theRptFile, 1)
+
+            return bAdjusted
+
+        else:
+            PrintMsg("Error. NRI acreage for " + theAreasymbol + " not populated in NASIS\n", 2)
+            return False
+
+    except:
+        errorMsg()
+        return False
+
 ## ===================================================================================
 def Number_Format(num, places=0, bCommas=True):
     try:
@@ -577,8 +591,9 @@ def Number_Format(num, places=0, bCommas=True):
 ## ===================================================================================
 ## ====================================== Main Body ==================================
 # Import modules
-import sys, string, os, locale, arcpy, traceback, urllib
+import sys, string, os, locale, arcpy, traceback
 from arcpy import env
+import SSURGO_Web
 
 try:
     # Create geoprocessor object
@@ -587,13 +602,24 @@ try:
     # Get input parameters
     #
     theInput = arcpy.GetParameterAsText(0)
-    theAreasymbol = arcpy.GetParameterAsText(1).upper()
+    asList = [theAreasymbol.strip().upper() for theAreasymbol in arcpy.GetParameterAsText(1).split(";") if theAreasymbol.strip() != ""]   # one or more AREASYMBOL values
     bCorrelated = arcpy.GetParameter(2)
-    bFiltered = True
 
-    # Define output text file
+    # Optional. Spread the rounding residual by largest remainder
+    try:
+        bLargestRemainder = arcpy.GetParameter(3) == True
+
+    except:
+        bLargestRemainder = False
+
+    maxThreads = 4      # number of simultaneous NASIS report requests
+
+    # Define output text file. Each survey gets its own file when more than one survey is processed.
     theRptFile = r"C:\temp\musymacres.txt"
 
+    if len(asList) == 0:
+        raise MyError, "No AREASYMBOL values specified"
+
     # Make sure input has a projected coordinate system
     theDesc = arcpy.Describe(theInput)
     theCSType = theDesc.SpatialReference.Type.upper()
@@ -605,90 +631,55 @@ try:
 
     # First compare spatial mapunits with NASIS mapunits to make sure nothing is missing
     #
-    # Create dictionary of MUSYM values retrieved from input layer
+    # Create dictionaries of MUSYM values and MUKEY areas for every survey in one pass through the input layer
     #
     theURL = r"https://nasis.sc.egov.usda.gov/NasisReportsWebSite/limsreport.aspx?"
     theParameter = "report_name=WEB-Mapunits%20by%20area%20symbol&area_sym="
-    dMusyms, dMukeys = Layer_List(theInput, theAreasymbol, bFiltered)
+    acresParameter = "report_name=WEB-area+acres&asymbol="
+    dMusyms, dMukeys = Layer_List(theInput, asList)
 
     if len(dMukeys) > 0:
+        # Request the NASIS mapunit lists and NRI acres for all of the surveys at the same time
+        requests = list()
 
-        if bCorrelated:
-            # Create dictionary of MUSYM values retrieved from NASIS
-            #
-            dNASIS = NASIS_List(theAreasymbol, theURL, theParameter)
-
-            if not dNASIS is None:
-                if len(dNASIS) > 0:
-
-                    # Compare MUSYM values in each dictionary
-                    #
-                    bSame = CompareMusym(dNASIS, dMusyms)
+        for theAreasymbol in asList:
+            if bCorrelated:
+                requests.append((("MUSYM", theAreasymbol), theURL + '&' + theParameter + theAreasymbol, None))
 
-                    if bSame:
+            requests.append((("NRI", theAreasymbol), theURL + acresParameter + theAreasymbol, None))
 
-                        # Get NRI county acreage value from NASIS
-                        #
-                        theParameter = "report_name=WEB-area+acres&asymbol="
+        PrintMsg(" \nRetrieving NASIS reports for " + Number_Format(len(asList), 0, True) + " survey area(s)...", 0)
+        arcpy.SetProgressorLabel("Retrieving NASIS reports...")
+        dReports = SSURGO_Web.FetchAll(requests, lambda thePage: thePage, maxThreads=maxThreads)
 
-                        NRI_Acres = GetNRI_Acres(theAreasymbol, theURL, theParameter)
+        arcpy.SetProgressor("step", "Calculating mapunit acres...", 0, len(asList), 1)
+        badList = list()
 
-                        # Test 'theAreasymbol' argument for standard 5 character length
-                        #
-                        if len(theAreasymbol) > 5:
-                            PrintMsg(" \nWarning, the specified AREASYMBOL is greater than 5 characters in length", 0)
+        for theAreasymbol in asList:
+            PrintMsg(" \n" + theAreasymbol + ": Mapunit acres", 0)
+            PrintMsg("---------------------------------------------------------------------------------------", 0)
+            arcpy.SetProgressorLabel("Calculating mapunit acres for " + theAreasymbol)
 
-                        # Calculate adjusted NRI acres for each MUSYM
-                        #
-                        if NRI_Acres > 0:
+            if len(asList) > 1:
+                rptFile = os.path.splitext(theRptFile)[0] + "_" + theAreasymbol + ".txt"
 
-                            # get dictionary containing MUKEY
-                            #bAdjusted = GetMapunitAcres(dMusyms, NRI_Acres, theUnits, theRptFile)
-                            bAdjusted = GetMapunitAcres(dMukeys, NRI_Acres, theUnits, theRptFile)
-
-                            if bAdjusted:
-                                PrintMsg(" \nOutput file: " + theRptFile, 1)
-
-                            PrintMsg(" \n" + os.path.basename(sys.argv[0]) + " script finished\n" , 1)
-
-                        else:
-                            PrintMsg("Error. NRI acreage for " + theAreasymbol + " not populated in NASIS\n", 2)
-
-                    else:
-                        PrintMsg("Please fix problem with missing mapunits and then rerun tool", 2)
-
-        else:
-            # process without checking for matching mapunits (NASIS and spatial data)
-            # Get NRI county acreage value from NASIS
-            #
-            theParameter = "report_name=WEB-area+acres&asymbol="
-            NRI_Acres = GetNRI_Acres(theAreasymbol, theURL, theParameter)
+            else:
+                rptFile = theRptFile
 
-            # Test 'theAreasymbol' argument for standard 5 character length
-            #
-            if len(theAreasymbol) > 5:
-                PrintMsg(" \nWarning, the specified AREASYMBOL is greater than 5 characters in length", 0)
+            if not ProcessSurvey(theAreasymbol, dMusyms[theAreasymbol], dMukeys[theAreasymbol], dReports, theUnits, rptFile):
+                badList.append(theAreasymbol)
 
-            # Calculate adjusted NRI acres for each MUSYM
-            #
-            if NRI_Acres > 0:
-                #bAdjusted = GetMapunitAcres(dMusyms, NRI_Acres, theUnits, theRptFile)
-                bAdjusted = GetMapunitAcres(dMukeys, NRI_Acres, theUnits, theRptFile)
+            arcpy.SetProgressorPosition()
 
-                if bAdjusted:
-                    PrintMsg(" \nOutput file: " + theRptFile, 1)
+        if len(badList) > 0:
+            PrintMsg(" \nMapunit acres were not calculated for: " + ", ".join(badList), 2)
 
-                PrintMsg(" \n" + os.path.basename(sys.argv[0]) + " script finished\n" , 1)
-
-            else:
-                PrintMsg("Error. NRI acreage for " + theAreasymbol + " not populated in NASIS\n", 2)
+        PrintMsg(" \n" + os.path.basename(sys.argv[0]) + " script finished\n" , 1)
 
 # Exceptions block
 #
 except MyError, e:
-    PrintMsg(str(err) + " \n", 2)
+    PrintMsg(str(e) + " \n", 2)
 
 except:
     errorMsg()
-
-
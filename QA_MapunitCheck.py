@@ -28,27 +28,13 @@
 #
 # 10-21-2013 - Using new NASIS report that allows specification of the different MUSTATUS types
 # 10-31-2013 - Renamed this script from 'Get_Mukey.py'...
-
-from HTMLParser import HTMLParser
-from htmlentitydefs import name2codepoint
-
-# create a subclass and override the data handler methods
-
-class MyHTMLParser(HTMLParser):
-    # create an HTMLParser class, mainly designed to get the data block within
-    # the html returned by the NASIS Online report.
-
-    # initialize the data block variable
-    dataDict = dict()
-
-    def handle_data(self, data):
-
-        if str(data).strip():
-            # load the data into a dictionary
-            musym, mukey = data.split()
-            musym = musym.strip()
-            mukey = mukey.replace(",","").strip()
-            self.dataDict[musym] = mukey
+#
+# 10-18-2026 - The NASIS legends for all of the selected surveys are requested at the same time over a few
+#              keep-alive connections (SSURGO_Web.NASISLegends) and saved to a local cache for cacheTTL seconds.
+#              Spatial MUSYM values are read in one cursor pass into sets, and the MUKEY update runs as a single
+#              update cursor for all of the surveys that passed the check.
+# 10-18-2026 - The cached legends are not used when MUKEY values are being updated, or when the optional
+#              'Refresh NASIS legends' parameter (7) is checked, so a legend fixed in NASIS is read again.
 
 ## ===================================================================================
 class MyError(Exception):
@@ -178,67 +164,20 @@ def setScratchWorkspace():
         errorMsg()
         return False
 
-## ===================================================================================
-def NASIS_List(theAreasymbol, theURL, theParameters, muStatus):
-    # Create a dictionary of NASIS MUSYM values
-    # Sometimes having problem getting first mapunit (ex. Adda in IN071)
-    try:
-        #PrintMsg(" \nRetrieving MUSYM values for survey area '" + theAreasymbol + "' from NASIS", 1)
-
-        # Problem with NASIS 6.0. It doesn't recognize the parameter for some unknown reason
-        # Seems to work if we put the entire URL and Parameter into one string and set
-        # the Parameter value to None
-        #
-        # Use muStatus to set the mapunit status option for the report
-        # 1:provisional, 2:approved, 3:correlated, 4:additional
-        # In theory, should only be #3 correlated for SSURGO downloads
-        #
-        theURL = theURL + theParameters + theAreasymbol + muStatus
-        #PrintMsg(" \n" + theURL + " \n", 0)
-        theParameters = None
-        resp = urlopen(theURL, None )
-        thePage = resp.read()
-        parser = MyHTMLParser()
-        parser.dataDict.clear()
-        parser.feed(thePage)
-        parser.close()
-        dNASIS = parser.dataDict
-
-        mapunitCnt = 0
-
-        if len(dNASIS) == 0:
-            PrintMsg("\tRetrieved zero mapunit records from NASIS online report (check criteria in NASIS?)", 2)
-
-        else:
-            PrintMsg(" \n\tRetrieved " + str(len(dNASIS)) + " correlated mapunits from NASIS", 1)
-
-        return dNASIS
-
-    except IOError:
-        errorMsg()
-        return dict()
-
-    except:
-        errorMsg()
-        return dict()
-
 ## ===================================================================================
 def CompareMusym(dNASIS, musymList, theAreasymbol, dBadSurveys):
     #
     # Compare database contents with layer contents
     #
+    # musymList is the set of MUSYM values for this survey in the spatial layer
+    #
     # Save errors to a dictionary: key=Areasymbol, SpatialCount, NASISCount, Note, NASISExtra, SpatialExtra
     #
     try:
         #
         # Compare database MUSYM values with Layer MUSYM values
         #
-        missingLayer = list()
-
-        for theMUSYM in dNASIS:
-            if not theMUSYM in musymList:
-                #PrintMsg("\tMissing map layer musym: '" + theMUSYM + "'", 0)
-                missingLayer.append(theMUSYM)
+        missingLayer = sorted(set(dNASIS) - musymList)
 
         musymCnt = len(missingLayer)
 
@@ -259,13 +198,12 @@ def CompareMusym(dNASIS, musymList, theAreasymbol, dBadSurveys):
         #
         missingNASIS = list()
 
-        for theMUSYM in musymList:
-            if not theMUSYM in dNASIS:
-                if theMUSYM.strip() == "":
-                    raise MyError, "\tInput spatial layer contains one or more features with a missing MUSYM value"
+        for theMUSYM in sorted(musymList - set(dNASIS)):
+            if theMUSYM.strip() == "":
+                raise MyError, "\tInput spatial layer contains one or more features with a missing MUSYM value"
 
-                elif theMUSYM != "NOTCOM":                  # Remove this if NOTCOMs are NOT excluded from the check
-                    missingNASIS.append(theMUSYM)
+            elif theMUSYM != "NOTCOM":                  # Remove this if NOTCOMs are NOT excluded from the check
+                missingNASIS.append(theMUSYM)
 
         dbCnt = len(missingNASIS)
 
@@ -301,27 +239,31 @@ def CompareMusym(dNASIS, musymList, theAreasymbol, dBadSurveys):
         return False, dBadSurveys
 
 ## ===================================================================================
-def UpdateMukeys(theInput, dNASIS, theAreasymbol):
-    # Update layer MUKEY values for the specified AREASYMBOL value
+def UpdateMukeys(theInput, dUpdates):
+    # Update layer MUKEY values for all of the surveys in dUpdates {AREASYMBOL: dNASIS}
+    # using a single update cursor
     try:
 
-        fieldList = ["MUSYM", "MUKEY"]
+        fieldList = ["AREASYMBOL", "MUSYM", "MUKEY"]
         queryField = arcpy.AddFieldDelimiters(theInput, "AREASYMBOL")
-        sql = ""
-
-        if theAreasymbol != "":
-            sql = queryField + " = '" + theAreasymbol + "'"
 
-        else:
+        if len(dUpdates) == 0:
             return False
 
+        sql = queryField + " IN (" + ",".join(["'" + theAreasymbol + "'" for theAreasymbol in sorted(dUpdates)]) + ")"
+
         with arcpy.da.UpdateCursor (theInput, fieldList, sql) as outCursor:
 
             for outRow in outCursor:
-                musym = outRow[0]
+                dNASIS = dUpdates.get((outRow[0] or "").strip())
+
+                if dNASIS is None:
+                    continue
+
+                musym = outRow[1]
 
-                if musym in dNASIS:             # Remove this to if NOTCOMs are NOT excluded from the check
-                    outRow[1] = dNASIS[musym]
+                if musym in dNASIS and outRow[2] != dNASIS[musym]:             # Remove this to if NOTCOMs are NOT excluded from the check
+                    outRow[2] = dNASIS[musym]
                     outCursor.updateRow(outRow)
 
         return True
@@ -346,13 +288,7 @@ def CreateMapunitDictionary(theInput, sql):
             for row in cursor:
                 areasym = row[0].encode('ascii').strip()
                 musym = row[1].encode('ascii').strip()
-
-                if areasym in dMapunits:
-                    if not musym in dMapunits[areasym]:
-                        dMapunits[areasym].append(musym)
-
-                else:
-                    dMapunits[areasym] = [musym]
+                dMapunits.setdefault(areasym, set()).add(musym)
 
         #PrintMsg(" \nFinished loading mapunit dictionary", 1)
 
@@ -386,6 +322,7 @@ import sys, string, os, locale, arcpy, traceback,  collections
 from urllib2 import Request, urlopen, URLError, HTTPError
 
 from arcpy import env
+import SSURGO_Web
 
 try:
     # Create geoprocessor object
@@ -401,6 +338,13 @@ try:
     mx3 = arcpy.GetParameter(5)   # correlated
     mx4 = arcpy.GetParameter(6)   # additional
 
+    # Optional. Request every legend from NASIS instead of reading the legends saved by an earlier run.
+    try:
+        bRefresh = arcpy.GetParameter(7) == True
+
+    except:
+        bRefresh = False
+
     # Set scratchworkspace and scratchfolder environment
     if not setScratchWorkspace():
         raise MyError, "Failure to set ArcGIS scratch environment"
@@ -442,6 +386,8 @@ try:
     # New NASIS report that allows user to specify any of the MUSTATUS values
     theURL = r"https://nasis.sc.egov.usda.gov/NasisReportsWebSite/limsreport.aspx?"
     theParameters = "report_name=WEB-MapunitsAreaMustatus&area_sym="
+    cacheTTL = 3600     # seconds that a NASIS legend is read from the local cache before it is requested again
+    maxThreads = 4      # number of simultaneous NASIS report requests
 
     if mx1 is True:
         mx1 = "1"
@@ -501,9 +447,21 @@ try:
         if arcpy.Exists(rptFile):
             os.remove(rptFile)
 
+    # Get the NASIS legends for all of the surveys at once
     arcpy.ResetProgressor()
-    arcpy.SetProgressor("step", "Comparing NASIS information with spatial layer...",  0, (iNum -1), 1)
+    arcpy.SetProgressorLabel("Retrieving " + Number_Format(iNum, 0, True) + " legends from NASIS...")
+    cache = SSURGO_Web.ResponseCache(SSURGO_Web.CachePath(), cacheTTL)
+
+    # MUKEY values are only written from legends that were just read from NASIS
+    dLegends = SSURGO_Web.NASISLegends([theAreasymbol for theAreasymbol in asValues], theURL + theParameters, muStatus, cache, maxThreads, bRefresh or bUpdate == True)
+    cache.Close()
+
+    if cache.hits > 0:
+        PrintMsg(" \nRead " + Number_Format(cache.hits, 0, True) + " of " + Number_Format(iNum, 0, True) + " NASIS legends from the local cache (" + cache.cachePath + ")", 0)
+
+    arcpy.SetProgressor("step", "Comparing NASIS information with spatial layer...",  0, iNum, 1)
     iCnt = 0
+    dUpdates = dict()   # NASIS legends for the surveys whose MUKEY values will be updated
 
     for theAreasymbol in asValues:
         # Process each soil survey identified by Areasymbol
@@ -512,15 +470,24 @@ try:
         iCnt += 1
         arcpy.SetProgressorLabel("Checking survey " + theAreasymbol.upper() + "  (" + Number_Format(iCnt, 0, True) + " of " + Number_Format(len(asList), 0, True) + ")")
 
-        # Create dictionary of MUSYM values retrieved from input layer
-        musymList = dMapunits[theAreasymbol]
+        # Set of MUSYM values retrieved from input layer
+        musymList = dMapunits.get(theAreasymbol, set())
 
         if len(musymList) > 0:
             PrintMsg("\tFound " + str(len(musymList)) + " mapunits in spatial layer", 1)
 
-            # Create dictionary of MUSYM values retrieved from NASIS
+            # Dictionary of MUSYM values retrieved from NASIS
             #
-            dNASIS = NASIS_List(theAreasymbol, theURL, theParameters, muStatus)
+            dNASIS, errMsg = dLegends[theAreasymbol]
+
+            if errMsg != "":
+                PrintMsg("\tFailed to retrieve the NASIS legend report: " + errMsg, 2)
+
+            elif len(dNASIS) == 0:
+                PrintMsg("\tRetrieved zero mapunit records from NASIS online report (check criteria in NASIS?)", 2)
+
+            else:
+                PrintMsg(" \n\tRetrieved " + str(len(dNASIS)) + " correlated mapunits from NASIS", 1)
 
             if len(dNASIS) > 0:
 
@@ -533,9 +500,8 @@ try:
 
                 if bUpdate:
                     if bGood:
-                        # go ahead and update MUKEY values for the specified AREASYMBOL
-                        PrintMsg(" \n\tUpdating MUKEY values...", 0)
-                        bUpdated = UpdateMukeys(theInput, dNASIS, theAreasymbol)
+                        # go ahead and update MUKEY values for the specified AREASYMBOL, once all surveys are checked
+                        dUpdates[theAreasymbol] = dNASIS
 
                     else:
                         # mismatch between NASIS and the maplayer MUSYM values! skip the update
@@ -554,6 +520,11 @@ try:
 
         arcpy.SetProgressorPosition()
 
+    if len(dUpdates) > 0:
+        PrintMsg(" \nUpdating MUKEY values for " + Number_Format(len(dUpdates), 0, True) + " survey(s)...", 0)
+        arcpy.SetProgressorLabel("Updating MUKEY values...")
+        bUpdated = UpdateMukeys(theInput, dUpdates)
+
     arcpy.SetProgressorLabel("Processing complete for all " + Number_Format(len(asList), 0, True) + " surveys")
 
     if len(badSurveys) > 0:
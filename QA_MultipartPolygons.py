@@ -6,6 +6,11 @@
 #
 # Adapted from Vertex Report tool
 # 11-05-2013
+#
+# 10-18-2026 All of the selected surveys are checked in one pass instead of one SHAPE@ cursor per
+# AREASYMBOL. Only the part counts are read: from the record headers for a shapefile
+# (SSURGO_Shapefile) or from the WKB header of each polygon (QA_Geometry.WKBPartCount). Holes are
+# not counted as parts.
 
 class MyError(Exception):
     pass
@@ -134,54 +139,62 @@ def setScratchWorkspace():
         return False
 
 ## ===================================================================================
-def ProcessLayer(inLayer, areaSym):
-    # Create a summary for each soil survey
+def FindMultipartPolygons(inLayer, theCatalogPath, asList):
+    # Find the multipart polygons for all of the selected surveys in one pass. Only the number
+    # of parts (exterior rings) of each polygon is read, so holes are not counted as parts.
     #
-    # inLayer = selected featurelayer or featureclass that will be processed
-    try:
+    # A shapefile is read directly by SSURGO_Shapefile, using the NumParts value from each record
+    # header. Any other layer is read with a single cursor and only the header of each WKB
+    # geometry is decoded (QA_Geometry.WKBPartCount).
+    #
+    # Returns two dictionaries, {AREASYMBOL: [multipart OIDs]} and {AREASYMBOL: [NULL geometry OIDs]}
+    #
+    dMultipart = dict()
+    dBadPolys = dict()
 
-        iMultipart = 0
-        fieldList = ["OID@","SHAPE@"]
-        sql = '"AREASYMBOL" = ' + "'" + areaSym + "'"
-        saList = list()
-        polyList = list()
-        desc = arcpy.Describe(inLayer)
-        oidName = desc.OIDFieldName
+    for areaSym in asList:
+        dMultipart[areaSym] = list()
+        dBadPolys[areaSym] = list()
 
-        with arcpy.da.SearchCursor(inLayer, fieldList, sql) as sCursor:
-            # Select polgyons with the current attribute value and process the geometry for each
+    if theCatalogPath.lower().endswith(".shp"):
+        shp = SSURGO_Shapefile.ShapefileReader(theCatalogPath)
 
-            for row in sCursor:
-                # Process a polygon record. row[1] is the same as feat or SHAPE
-                fid, feat = row
+        try:
+            partCounts = shp.ExteriorRingCounts()
+            areaSymbols = shp.dbf.Column(inFieldName)
 
-                if not feat is None:
-                    iPartCnt = feat.partCount
+        finally:
+            shp.Close()
 
-                    if iPartCnt > 1:
-                        iMultipart += 1
-                        saList.append(fid)
-                        polyList.append(fid)
+        for fid in range(len(partCounts)):
+            areaSym = areaSymbols[fid]
 
-                else:
-                    raise MyError, "NULL geometry for polygon #" + str(fid)
+            if not areaSym in dMultipart:
+                continue
 
-        if iMultipart > 0:
-            PrintMsg("\t" + areaSym + " has " + Number_Format(iMultipart, 0, True) + " multipart polygons: " + '"' + oidName + '"' + " IN (" + str(polyList)[1:-1] + ")", 1)
+            if partCounts[fid] > 1:
+                dMultipart[areaSym].append(fid)
 
-        else:
-            PrintMsg(" \n\t" + areaSym + " has no multipart polygons", 0)
+            elif partCounts[fid] < 0:
+                dBadPolys[areaSym].append(fid)
 
-        return iMultipart, saList
+        return dMultipart, dBadPolys, len(partCounts)
 
-    except MyError, e:
-        # Example: raise MyError, "This is an error message"
-        PrintMsg(str(e) + " \n", 2)
-        return -1, idList
+    sql = '"' + inFieldName + '" IN (' + ", ".join(["'" + areaSym + "'" for areaSym in asList]) + ")"
+    iCnt = 0
 
-    except:
-        errorMsg()
-        return -1, idList
+    with arcpy.da.SearchCursor(inLayer, ["OID@", "SHAPE@WKB", inFieldName], sql) as sCursor:
+        for fid, wkb, areaSym in sCursor:
+            iCnt += 1
+            iPartCnt = QA_Geometry.WKBPartCount(wkb)
+
+            if iPartCnt is None or iPartCnt == 0:
+                dBadPolys[areaSym].append(fid)
+
+            elif iPartCnt > 1:
+                dMultipart[areaSym].append(fid)
+
+    return dMultipart, dBadPolys, iCnt
 
 ## ===================================================================================
 def Number_Format(num, places=0, bCommas=True):
@@ -247,7 +260,7 @@ def elapsedTime(start):
 
         if eDay > 0 or eHour > 0 or eMinute > 0:
             if eMinute > 1:
-                eMsg = eMsg + str(eMinute) + " minutes inLayer"
+                eMsg = eMsg + str(eMinute) + " minutes "
             else:
                 eMsg = eMsg + str(eMinute) + " minute "
 
@@ -269,6 +282,7 @@ def elapsedTime(start):
 ## MAIN
 import sys, string, os, locale, time, math, operator, traceback, collections, arcpy
 from arcpy import env
+import QA_Geometry, SSURGO_Shapefile
 
 try:
     # Set formatting for numbers
@@ -316,32 +330,31 @@ try:
     problemList = list()
     goodList = list()
     idList = list()
+    oidName = desc.OIDFieldName
 
-    for areaSym in asList:
-        #PrintMsg(" \n\tProcessing soil survey: " + areaSym, 0)
-        saList = list()
+    dMultipart, dBadPolys, iCnt = FindMultipartPolygons(fc, theCatalogPath, asList)
+    PrintMsg(" \nChecked " + Number_Format(iCnt, 0, True) + " polygons in " + elapsedTime(begin), 0)
 
-        if theDataType == "FEATURELAYER":
-            iMultiPart, saList = ProcessLayer(fc, areaSym)
-            idList.extend(saList)
-
-        elif theDataType in ["FEATURECLASS", "SHAPEFILE"]:
-            iMultiPart, saList = ProcessLayer(inLayer, areaSym)
-            idList.extend(saList)
+    for areaSym in asList:
+        saList = dMultipart[areaSym]
+        idList.extend(saList)
 
-        if iMultiPart == -1:
+        if len(dBadPolys[areaSym]) > 0:
+            PrintMsg(" \n\t" + areaSym + " has NULL geometry for polygon #" + str(dBadPolys[areaSym][0]), 2)
             errorList.append(areaSym)
 
-        elif iMultiPart > 0:
+        elif len(saList) > 0:
+            PrintMsg("\t" + areaSym + " has " + Number_Format(len(saList), 0, True) + " multipart polygons: " + '"' + oidName + '"' + " IN (" + str(saList)[1:-1] + ")", 1)
             problemList.append(areaSym)
 
         else:
+            PrintMsg(" \n\t" + areaSym + " has no multipart polygons", 0)
             goodList.append(areaSym)
 
     if len(problemList) > 0:
         PrintMsg("The following surveys have multipart polygons: " + ", ".join(problemList) + " \n ", 2)
         # Select the polygons that are multipart
-        sql = '"OBJECTID" IN ' + "(" + str(idList)[1:-1] + ")"
+        sql = '"' + oidName + '" IN ' + "(" + str(idList)[1:-1] + ")"
         #PrintMsg(" \n" + sql, 0)
 
         if theDataType == "FEATURELAYER":
@@ -0,0 +1,113 @@
+# QA_Output.py
+#
+# ArcGIS 10.1, arcpy
+#
+# USDA-NRCS National Soil Survey Center
+#
+# Shared writer for the QA_* output featureclasses.
+#
+# The QA tools used to build arcpy.Point, arcpy.Array and arcpy.Polyline objects for every flagged
+# location and to update the progressor for every row. The writer keeps the flagged features as
+# plain coordinates while the layer is being checked and writes every output of the run once the
+# check is done. Lines go to the insert cursor as WKB (SHAPE@WKB) and points as an x,y tuple
+# (SHAPE@XY), so no geometry objects are created. The progressor is moved once per batch.
+#
+# Typical use:
+#
+#   writer = QA_Output.QAWriter()
+#   writer.AddOutput("lines", lineFC, "POLYLINE", ["POLYID", "ANGLE"])
+#   writer.AddOutput("points", pointFC, "POINT", ["POLYID", "ANGLE"])
+#
+#   for ...:
+#       writer.Add("lines", [(x0, y0), (x1, y1), (x2, y2)], (fid, angle))
+#       writer.Add("points", (x1, y1), (fid, angle))
+#
+#   writer.Write()
+#
+# 10-18-2026 Original coding
+# 10-18-2026 Rows are written with one insert cursor per output. Writing to in_memory and appending
+#            was tried and dropped: it wrote every row twice and no gain could be measured.
+
+import arcpy
+import numpy as np
+import QA_Geometry
+
+## ===================================================================================
+class QAWriter(object):
+
+    def __init__(self, batchSize=10000):
+        self.batchSize = batchSize
+        self._outputs = list()
+        self._dOutputs = dict()
+
+    def AddOutput(self, name, outPath, geomType, fieldNames):
+        # Register an existing featureclass (geomType "POINT" or "POLYLINE") and the
+        # attribute fields that will be written along with the geometry
+        geomType = geomType.upper()
+
+        if geomType == "POINT":
+            shapeToken = "SHAPE@XY"
+
+        elif geomType == "POLYLINE":
+            shapeToken = "SHAPE@WKB"
+
+        else:
+            raise ValueError("Unsupported QA output geometry type: " + geomType)
+
+        output = {"name":name, "path":outPath, "geomType":geomType, "fields":[shapeToken] + list(fieldNames), "rows":list()}
+        self._outputs.append(output)
+        self._dOutputs[name] = output
+
+    def Add(self, name, coords, values=()):
+        # Add one feature. coords is an (x, y) pair for a point output or a sequence of
+        # (x, y) pairs for a line output.
+        output = self._dOutputs[name]
+
+        if output["geomType"] == "POINT":
+            output["rows"].append(((float(coords[0]), float(coords[1])),) + tuple(values))
+
+        else:
+            output["rows"].append((QA_Geometry.LineStringWKB(coords),) + tuple(values))
+
+    def AddPoints(self, name, xy, columns=()):
+        # Add many point features at once. xy is an (n, 2) array and columns is a list with
+        # one sequence of n values for each attribute field.
+        output = self._dOutputs[name]
+        xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        pnts = zip(xy[:, 0].tolist(), xy[:, 1].tolist())
+        columns = [np.asarray(column).tolist() for column in columns]
+        output["rows"].extend([(pnt,) + values for pnt, values in zip(pnts, zip(*columns) if len(columns) > 0 else [()] * len(xy))])
+
+    def Count(self, name=None):
+        # Number of features waiting for one output, or for all of them
+        if name is None:
+            return sum([len(output["rows"]) for output in self._outputs])
+
+        return len(self._dOutputs[name]["rows"])
+
+    def Write(self, label="Writing QA output..."):
+        # Write every output in the order they were added and clear the buffers.
+        # Returns the number of features written.
+        total = self.Count()
+        arcpy.SetProgressorLabel(label)
+        arcpy.SetProgressor("step", label, 0, max(total, 1), self.batchSize)
+        iCnt = 0
+
+        for output in self._outputs:
+            rows = output["rows"]
+
+            if len(rows) == 0:
+                continue
+
+            with arcpy.da.InsertCursor(output["path"], output["fields"]) as cursor:
+                for first in range(0, len(rows), self.batchSize):
+                    for row in rows[first:first + self.batchSize]:
+                        cursor.insertRow(row)
+
+                    iCnt += len(rows[first:first + self.batchSize])
+                    arcpy.SetProgressorPosition(iCnt)
+
+            output["rows"] = list()
+
+        arcpy.ResetProgressor()
+        return iCnt
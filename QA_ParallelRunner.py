@@ -0,0 +1,707 @@
+# QA_ParallelRunner.py
+#
+# ArcGIS 10.1, arcpy, numpy
+#
+# USDA-NRCS National Soil Survey Center
+#
+# Runs one of the geometry QA checks on a pool of worker processes. The input layer is split
+# into shards by survey area (AREASYMBOL) or, for a single survey, by OBJECTID range. Each worker
+# reads its own shard from the featureclass and runs the same QA_Geometry code as the single
+# process tool. The shard results are merged in shard order and written to the usual QA output.
+#
+#   Slivers             QA_Slivers_<angle>d and QA_SliverPoints_<angle>d (QA_SliverFinder)
+#   Vertex Flags        QA_VertexStats and QA_VertexFlags_<distance> (QA_VertexFlags)
+#   Common Points       QA_Common_Points_<field>_AREASYMBOL (QA_CommonPoints)
+#   Multipart Polygons  selection of the multipart polygons (QA_MultipartPolygons)
+#   Vertex Report       QA_VertexReport_<field> (QA_VertexReport)
+#
+# The selected set or definition query on the input layer is honored. A shard of whole surveys
+# is passed to the workers as an AREASYMBOL IN (...) where clause, with the definition query of
+# the layer added. When one survey is split, or the layer has a selected set, the OBJECTIDs of
+# each shard are passed as a where clause of OBJECTID ranges.
+#
+# Common points are only found between polygons of the same survey, so that check is always
+# split by survey area. The near vertex option of QA_VertexFlags is not available here because
+# it compares vertices across the whole layer.
+#
+# Worker processes cannot be started from ArcMap's own process. Run this tool with the
+# 'Run Python script in process' option turned off, or run it from the command line:
+#
+#   python QA_ParallelRunner.py --layer C:\Data\Soils.gdb\MUPOLYGON --check "Vertex Report" --field MUSYM
+#
+# 10-18-2026 Original coding
+# 10-18-2026 Output features are written by QA_Output.QAWriter
+# 10-18-2026 Shards of whole surveys are read with an AREASYMBOL where clause (ShardWhereClause)
+# 10-18-2026 The shards run the same QA_Checks functions as the single process tools instead of copies of them.
+#            MIN_DIST is limited to 1,000,000 as in the tools. Added the command line arguments.
+
+class MyError(Exception):
+    pass
+
+## ===================================================================================
+def PrintMsg(msg, severity=0):
+    # Adds tool message to the geoprocessor
+    #
+    #Split the message on \n first, so that if it's multiple lines, a GPMessage will be added for each line
+    try:
+        for string in msg.split('\n'):
+            #Add a geoprocessing message (in case this is run as a tool)
+            if bPrint:
+                print string
+
+            if severity == 0:
+                arcpy.AddMessage(string)
+
+            elif severity == 1:
+                arcpy.AddWarning(string)
+
+            elif severity == 2:
+                arcpy.AddMessage("    ")
+                arcpy.AddError(string)
+
+    except:
+        pass
+
+## ===================================================================================
+def errorMsg():
+    try:
+        tb = sys.exc_info()[2]
+        tbinfo = traceback.format_tb(tb)[0]
+        theMsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
+        PrintMsg(theMsg, 2)
+
+    except:
+        PrintMsg("Unhandled error in errorMsg method", 2)
+        pass
+
+## ===================================================================================
+def Number_Format(num, places=0, bCommas=True):
+    try:
+    # Format a number according to locality and given places
+        #locale.setlocale(locale.LC_ALL, "")
+        if bCommas:
+            theNumber = locale.format("%.*f", (places, num), True)
+
+        else:
+            theNumber = locale.format("%.*f", (places, num), False)
+        return theNumber
+
+    except:
+        errorMsg()
+        return ""
+
+## ===================================================================================
+def GetShards(inLayer, surveyField, numShards, bSplitSurvey=True):
+    # Read the OBJECTID (and survey) of every polygon in the layer and split them into at most
+    # numShards (surveys, oids) shards. Whole surveys are assigned to the shard with the fewest
+    # polygons, largest survey first. A single survey is split into OBJECTID ranges unless
+    # bSplitSurvey is False; the surveys of a split shard are an empty list.
+    #
+    dSurveys = dict()
+
+    if surveyField == "":
+        fieldList = ["OID@"]
+
+    else:
+        fieldList = ["OID@", surveyField]
+
+    with arcpy.da.SearchCursor(inLayer, fieldList) as cursor:
+        for row in cursor:
+            if surveyField == "":
+                dSurveys.setdefault("", list()).append(row[0])
+
+            else:
+                dSurveys.setdefault(row[1], list()).append(row[0])
+
+    if len(dSurveys) > 1:
+        shards = [(list(), list()) for i in range(numShards)]
+        loads = [0] * numShards
+
+        for areaSym in sorted(dSurveys.keys(), key=lambda key: (-len(dSurveys[key]), key)):
+            i = loads.index(min(loads))
+            shards[i][0].append(areaSym)
+            shards[i][1].extend(dSurveys[areaSym])
+            loads[i] += len(dSurveys[areaSym])
+
+        shards = [(sorted(surveys), sorted(oids)) for surveys, oids in shards if len(oids) > 0]
+
+    elif len(dSurveys) == 1 and surveyField != "" and (numShards == 1 or not bSplitSurvey):
+        areaSym, oids = dSurveys.items()[0]
+        shards = [([areaSym], sorted(oids))]
+
+    else:
+        oids = sorted([oid for oids in dSurveys.values() for oid in oids])
+
+        if not bSplitSurvey:
+            shardSize = max(1, len(oids))
+
+        else:
+            shardSize = max(1, int(math.ceil(len(oids) / float(numShards))))
+
+        shards = [(list(), oids[i:i + shardSize]) for i in range(0, len(oids), shardSize)]
+
+    # Each shard is sorted so that larger shards are started first
+    shards.sort(key=lambda shard: (-len(shard[1]), shard[1][0]))
+    return shards, len(dSurveys)
+
+## ===================================================================================
+def ShardWhereClause(surveyField, surveys, oidField, oids, layerWhere=""):
+    # Build the where clause that reads one shard. A shard of whole surveys is read by survey,
+    # with the definition query of the input layer (layerWhere) added. A shard that is part
+    # of a survey, or that has a NULL survey, is read by OBJECTID (OIDWhereClause).
+    #
+    if len(surveys) == 0 or None in surveys:
+        return OIDWhereClause(oidField, oids)
+
+    sql = surveyField + " IN (" + ",".join(["'" + areaSym.replace("'", "''") + "'" for areaSym in surveys]) + ")"
+
+    if layerWhere != "":
+        sql = "(" + layerWhere + ") AND " + sql
+
+    return sql
+
+## ===================================================================================
+def OIDWhereClause(oidField, oids):
+    # Build a where clause for a sorted list of OBJECTIDs. Runs of consecutive values become
+    # a range and the remaining values are listed with IN.
+    #
+    oids = np.asarray(oids, dtype=np.int64)
+    bBreak = np.ones(len(oids), dtype=bool)
+    bBreak[1:] = np.diff(oids) != 1
+    starts = oids[bBreak]
+    ends = oids[np.append(np.nonzero(bBreak)[0][1:] - 1, len(oids) - 1)]
+    sqlList = list()
+    singles = list()
+
+    for first, last in zip(starts, ends):
+        if first == last:
+            singles.append(str(first))
+
+        else:
+            sqlList.append("(" + oidField + " >= " + str(first) + " AND " + oidField + " <= " + str(last) + ")")
+
+    if len(singles) > 0:
+        sqlList.append(oidField + " IN (" + ",".join(singles) + ")")
+
+    return " OR ".join(sqlList)
+
+## ===================================================================================
+def ProcessShard(task):
+    # Worker process. Run the QA check on one shard and return the results as plain Python
+    # and numpy values so that they can be sent back to the main process.
+    #
+    # task = (shardNo, qaCheck, catalogPath, whereClause, srString, theValue, acreFactor, extraFields)
+    # Returns (shardNo, badOids, results, errorMessage)
+    #
+    shardNo, qaCheck, catalogPath, whereClause, srString, theValue, acreFactor, extraFields = task
+
+    try:
+        outputSR = arcpy.SpatialReference()
+        outputSR.loadFromString(srString)
+        arcpy.env.geographicTransformations = "WGS_1984_(ITRF00)_To_NAD_1983"
+        fieldList = ["OID@","SHAPE@WKB"] + extraFields
+        badOids = list()
+
+        if qaCheck == "Slivers":
+            results = list()
+
+        elif qaCheck == "Vertex Flags":
+            results = (list(), list())
+
+        elif qaCheck == "Common Points":
+            results = QA_Checks.CommonPointFinder()
+
+        else:
+            results = dict()
+
+        with arcpy.da.SearchCursor(catalogPath, fieldList, whereClause, outputSR) as sCursor:
+            for batch in QA_Geometry.ReadPolygonArrays(sCursor):
+                badOids.extend(batch.badOids)
+
+                if qaCheck == "Slivers":
+                    ShardSlivers(batch, theValue, results)
+
+                elif qaCheck == "Vertex Flags":
+                    ShardVertexFlags(batch, theValue, acreFactor, results)
+
+                elif qaCheck == "Common Points":
+                    results.Add(batch)
+
+                elif qaCheck == "Multipart Polygons":
+                    ShardMultipart(batch, results)
+
+                elif qaCheck == "Vertex Report":
+                    ShardVertexReport(batch, results)
+
+        if qaCheck == "Common Points":
+            # (value, x, y) for each common point
+            results = [(val, x, y) for val, x, y, fid in results.Find()]
+
+        return shardNo, badOids, results, ""
+
+    except:
+        return shardNo, list(), None, traceback.format_exc()
+
+## ===================================================================================
+def ShardSlivers(batch, minAngle, results):
+    # Flag vertex angles less than or equal to minAngle (QA_Checks.SliverFlags). Each result is
+    # (3 coordinate pairs, POLYID, angle, exterior ring)
+    #
+    flags, flagPolys = QA_Checks.SliverFlags(batch.xy, batch.ringOffsets, batch.ringParts, minAngle, batch.ringPolys)
+
+    for (pnts, theAngle, bExterior), i in zip(flags, flagPolys):
+        results.append((pnts, int(batch.oids[i]), theAngle, bExterior))
+
+## ===================================================================================
+def ShardVertexFlags(batch, minDist, acreFactor, results):
+    # QA_VertexStats rows and short segment midpoints (QA_Checks.PolygonFindings)
+    #
+    statsRows, midPoints = results
+    findings = QA_Checks.PolygonFindings(batch, minDist, acreFactor)
+
+    for i in range(len(batch.oids)):
+        statsRow, midPnts = QA_Checks.VertexStatsRow(int(batch.oids[i]), findings[i])
+        statsRows.append(statsRow)
+        midPoints.extend(midPnts)
+
+## ===================================================================================
+def ShardMultipart(batch, results):
+    # Multipart polygons by survey (QA_MultipartPolygons)
+    #
+    bExterior = QA_Geometry.ExteriorRings(batch.ringParts, batch.ringPolys)
+    parts = np.bincount(batch.ringPolys[bExterior], minlength=len(batch.oids))
+
+    for i in np.nonzero(parts > 1)[0]:
+        results.setdefault(batch.values[i][0], list()).append(int(batch.oids[i]))
+
+## ===================================================================================
+def ShardVertexReport(batch, results):
+    # Polygon statistics summed by attribute value (QA_Checks.SummarizeByValue)
+    #
+    QA_Checks.SummarizeByValue(batch, QA_Geometry.GetPolygonStatistics(batch), results)
+
+## ===================================================================================
+def MakeOutputLayer(outName, geomType, outputSR, fieldList):
+    # Create a new QA featureclass (or table when geomType is "") in the output workspace.
+    # fieldList is a list of AddField parameter lists: [name, type, precision, scale, length, alias]
+    #
+    outPath = os.path.join(env.workspace, outName + ext)
+
+    if arcpy.Exists(outPath):
+        arcpy.Delete_management(outPath)
+
+    if geomType == "":
+        arcpy.CreateTable_management(env.workspace, outName + ext)
+
+    else:
+        arcpy.CreateFeatureclass_management(env.workspace, outName + ext, geomType, "", "DISABLED", "DISABLED", outputSR)
+
+    for fld in fieldList:
+        arcpy.AddField_management(outPath, *fld)
+
+    # Add new field to track status of each feature
+    if geomType != "":
+        arcpy.AddField_management(outPath, "Status", "TEXT", "", "", 10, "Status")
+
+    return outPath
+
+## ===================================================================================
+def SaveSlivers(shardResults, outputSR, minAngle):
+    # Merge the sliver angles from all shards and save them in the same featureclasses
+    # as QA_SliverFinder, smallest angles first. The hole locations are matched with the
+    # island polygon flags of every shard.
+    #
+    sDegree = chr(176).decode(locale.getpreferredencoding())
+    lineRows, pointRows = QA_Checks.SliverRows([flag for results in shardResults for flag in results], sDegree)
+
+    if len(lineRows) == 0:
+        PrintMsg(" \nNo polygon angles less than " + Number_Format(minAngle, 0, False) + " degrees were found \n ", 0)
+        return ""
+
+    PrintMsg("Saved " + Number_Format(len(lineRows), 0, True) + " sliver locations to the following 'QA' layers: ", 1)
+    sAngle = Number_Format(minAngle, 0, False)
+    lineLayer = MakeOutputLayer("QA_Slivers_" + sAngle + "d", "POLYLINE", outputSR, [["POLYID", "TEXT", "", "", 20, "POLYID"], ["ANGLE", "DOUBLE", "12", "3"]])
+    pointLayer = MakeOutputLayer("QA_SliverPoints_" + sAngle + "d", "POINT", outputSR, [["POLYID", "LONG"], ["ANGLE", "TEXT", "", "", 8, "ANGLE"]])
+    PrintMsg(" \n\t1. Output slivers layer: " + lineLayer, 0)
+    PrintMsg("\t2. Output sliver points layer: " + pointLayer, 0)
+
+    writer = QA_Output.QAWriter()
+    writer.AddOutput("slivers", lineLayer, "POLYLINE", ["POLYID", "ANGLE"])
+    writer.AddOutput("vertices", pointLayer, "POINT", ["POLYID", "ANGLE"])
+
+    for coords, values in lineRows:
+        writer.Add("slivers", coords, values)
+
+    for coords, values in pointRows:
+        writer.Add("vertices", coords, values)
+
+    writer.Write("Saving sliver locations...")
+
+    outLayerName = "QA Sliver Vertex (" + sAngle + chr(176).decode(locale.getpreferredencoding()) + " angle)"
+    arcpy.MakeFeatureLayer_management(pointLayer, outLayerName)
+    arcpy.ApplySymbologyFromLayer_management(outLayerName, os.path.join(os.path.dirname(sys.argv[0]), "Red_SliverVertex.lyr"))
+    return outLayerName
+
+## ===================================================================================
+def SaveVertexFlags(shardResults, outputSR, minDist):
+    # Merge the polygon statistics and short segment midpoints from all shards and save them
+    # in the same table and featureclass as QA_VertexFlags
+    #
+    statsRows = sorted([row for results in shardResults for row in results[0]])
+    midPoints = sorted([pnt for results in shardResults for pnt in results[1]], key=lambda pnt: (pnt[1][0], pnt[0]))
+
+    statsTbl = MakeOutputLayer("QA_VertexStats", "", outputSR, [["POLYID", "LONG","","","", "PolygonID"], \
+    ["ACRES", "DOUBLE", "12", "1","", "Acres"], ["VERTICES", "LONG", "12","","", "Vertex Count"], \
+    ["AVI", "DOUBLE", "12", "1", "", "Avg Segment (" + unitAbbrev + ")"], ["MIN_DIST", "DOUBLE", "12", "3", "", "Min Segment (" + unitAbbrev + ")"], \
+    ["MULTIPART", "SHORT", "", "", "", "Is Multipart"]])
+    bHasMultiPart = False
+
+    with arcpy.da.InsertCursor(statsTbl, ["POLYID","ACRES","VERTICES","AVI","MIN_DIST","MULTIPART"]) as iCursor:
+        for statsRow in statsRows:
+            if statsRow[5] != 0:
+                bHasMultiPart = True
+
+            iCursor.insertRow(statsRow)
+
+    PrintMsg(" \nOutput polygon statistics table: " + statsTbl, 0)
+
+    if bHasMultiPart:
+        PrintMsg("Input layer has multipart polygons that require editing (explode)", 2)
+
+    if len(midPoints) == 0:
+        PrintMsg(" \nNo short segments detected (less than " + Number_Format(minDist, 3, False) + " " + theUnits + ") \n ", 0)
+        return ""
+
+    PrintMsg("Flagged " + Number_Format(len(midPoints), 0, True) + " segments shorter than " + str(minDist) + " " + theUnits, 2)
+    pointLayer = MakeOutputLayer("QA_VertexFlags_" + str(minDist).replace(".", "_"), "POINT", outputSR, [["POLYID", "LONG"], ["LENGTH_" + unitAbbrev.upper(), "DOUBLE", "12", "3"]])
+
+    writer = QA_Output.QAWriter()
+    writer.AddOutput("flags", pointLayer, "POINT", ["POLYID","LENGTH_" + unitAbbrev.upper()])
+
+    for pnt, values in midPoints:
+        writer.Add("flags", pnt, values)
+
+    writer.Write("Saving midpoint of each short segment...")
+
+    outLayerName = "QA Vertex Flag Points (" + str(minDist) + " " + unitAbbrev + ")"
+    arcpy.MakeFeatureLayer_management(pointLayer, outLayerName)
+    arcpy.ApplySymbologyFromLayer_management(outLayerName, os.path.join(os.path.dirname(sys.argv[0]), "RedDot.lyr"))
+    return outLayerName
+
+## ===================================================================================
+def SaveCommonPoints(shardResults, outputSR, inField, surveyField):
+    # Merge the common points from all shards and save them in the same featureclass as
+    # QA_CommonPoints, ordered by attribute value and location
+    #
+    commonPoints = sorted([pnt for results in shardResults for pnt in results])
+
+    if len(commonPoints) == 0:
+        PrintMsg(" \nNo common points found for " + inField.name + " \n ", 0)
+        return ""
+
+    fldName = inField.baseName
+    PrintMsg("Total of " + Number_Format(len(commonPoints), 0, True) + " 'common points' found", 2)
+
+    for val in sorted(set([pnt[0] for pnt in commonPoints])):
+        PrintMsg("\tFound common points for " + inField.name + ":  '" + val + "'", 0)
+
+    fldLength = inField.length + arcpy.ListFields(theCatalogPath, surveyField)[0].length + 1
+    pointLayer = MakeOutputLayer("QA_Common_Points_" + fldName + "_" + surveyField, "POINT", outputSR, [[fldName, "TEXT", "", "", fldLength, inField.aliasName]])
+
+    writer = QA_Output.QAWriter()
+    writer.AddOutput("points", pointLayer, "POINT", [fldName])
+
+    for val, x, y in commonPoints:
+        writer.Add("points", (x, y), (val,))
+
+    writer.Write("Writing point geometry...")
+
+    outLayerName = "QA Common Points (" + fldName + ")"
+    arcpy.MakeFeatureLayer_management(pointLayer, outLayerName)
+    arcpy.ApplySymbologyFromLayer_management(outLayerName, os.path.join(os.path.dirname(sys.argv[0]), "GreenDot.lyr"))
+    return outLayerName
+
+## ===================================================================================
+def SaveMultipart(shardResults):
+    # Merge the multipart polygons from all shards, report them by survey and select them
+    # in the input layer (QA_MultipartPolygons)
+    #
+    dMultipart = dict()
+
+    for results in shardResults:
+        for areaSym, oids in results.items():
+            dMultipart.setdefault(areaSym, list()).extend(oids)
+
+    if len(dMultipart) == 0:
+        PrintMsg(" \nNo multipart polygons found \n ", 0)
+        return ""
+
+    idList = list()
+
+    for areaSym in sorted(dMultipart.keys()):
+        oids = sorted(dMultipart[areaSym])
+        idList.extend(oids)
+        PrintMsg("\t" + str(areaSym) + " has " + Number_Format(len(oids), 0, True) + " multipart polygons: " + '"' + oidName + '"' + " IN (" + str(oids)[1:-1] + ")", 1)
+
+    PrintMsg("The following surveys have multipart polygons: " + ", ".join([str(areaSym) for areaSym in sorted(dMultipart.keys())]) + " \n ", 2)
+    sql = OIDWhereClause(arcpy.AddFieldDelimiters(theCatalogPath, oidName), sorted(idList))
+    outLayerName = desc.name + " MultiPolygons"
+    arcpy.MakeFeatureLayer_management(theCatalogPath, outLayerName, sql)
+    PrintMsg("Selected all " + Number_Format(len(idList), 0, True) + " polygons that are multipart \n ", 0)
+    return outLayerName
+
+## ===================================================================================
+def SaveVertexReport(shardResults, outputSR, inField):
+    # Merge the statistics for each attribute value from all shards, print the report and save
+    # it to the QA_VertexReport table
+    #
+    dStats = dict()
+
+    for results in shardResults:
+        for val, valStats in results.items():
+            QA_Checks.AddValueStats(dStats, val, valStats)
+
+    reportRows, totals = QA_Checks.VertexReportRows(dStats, acreFactor)
+
+    fldName = inField.baseName
+    statsTbl = MakeOutputLayer("QA_VertexReport_" + fldName, "", outputSR, [[fldName, inField.type, inField.precision, inField.scale, inField.length, inField.aliasName], \
+    ["ACRES", "DOUBLE", "12", "1","", "Acres"], ["VERTICES", "LONG", "12","","", "Vertex Count"], \
+    ["AVI", "DOUBLE", "12", "1", "", "Avg Segment (" + unitAbbrev + ")"], ["MIN_DIST", "DOUBLE", "12", "3", "", "Min Segment (" + unitAbbrev + ")"], \
+    ["MULTIPART", "SHORT", "", "", "", "Is Multipart?"]])
+
+    formatList = (20,15,15,15,15,15,15)
+    hdrList = [fldName.capitalize(),"Polygons","Acres","Vertices","Avg_Length","Min_Length","IsMultiPart"]
+    dashedLine = "    |----------------------------------------------------------------------------------------------------------|"
+    PrintMsg(" \nFound " + Number_Format(len(dStats), 0, True) + " unique values for " + fldName + " \n ", 0)
+    PrintMsg("".join([(" " * (formatList[i] - len(hdrList[i])) + hdrList[i]) for i in range(7)]), 0)
+    PrintMsg(dashedLine, 0)
+    with arcpy.da.InsertCursor(statsTbl, [fldName,"ACRES","VERTICES","AVI","MIN_DIST","MULTIPART"]) as iCursor:
+        for val, polygonCnt, sumAcres, pointCnt, avgInterval, iSeg, iPartCnt in reportRows:
+            iCursor.insertRow([val, sumAcres, pointCnt, avgInterval, iSeg, iPartCnt])
+
+            if val is None or val.strip() == "":
+                # if some values aren't populated, insert string 'NULL' into report table
+                val = "<NULL>"
+
+            statsMsg = [val, Number_Format(polygonCnt, 0, True), Number_Format(sumAcres, 1, True), Number_Format(pointCnt, 0, True), Number_Format(avgInterval, 3, True), Number_Format(iSeg, 3, True), str(iPartCnt)]
+            PrintMsg("".join([(" " * (formatList[i] - len(statsMsg[i])) + statsMsg[i]) for i in range(7)]), 0)
+
+    if totals[5] > 0:
+        sMultipart = "Has Multipart!"
+
+    else:
+        sMultipart = "No Multipart"
+
+    totalMsg = ["", Number_Format(totals[0], 0, True), Number_Format(totals[1], 1, True), Number_Format(totals[2], 0, True), Number_Format(totals[3], 3, True), Number_Format(totals[4], 3, True), sMultipart]
+    PrintMsg(dashedLine, 0)
+    PrintMsg("".join([(" " * (formatList[i] - len(totalMsg[i])) + totalMsg[i]) for i in range(7)]), 0)
+
+    if totals[5] > 0:
+        PrintMsg("Input layer has multipart polygons that require editing (explode)", 2)
+
+    PrintMsg(" \nPolygon statistics saved to " + statsTbl, 0)
+    return statsTbl
+
+## ===================================================================================
+## MAIN
+import sys, string, os, locale, math, time, traceback, argparse, multiprocessing, arcpy
+import numpy as np
+from arcpy import env
+import QA_Geometry, QA_Checks, QA_Output
+
+bPrint = False   # also print the messages, when run from the command line
+
+if __name__ == '__main__':
+
+    try:
+        # Set formatting for numbers
+        locale.setlocale(locale.LC_ALL, "")
+
+        # Process arguments
+        if len(sys.argv) > 1 and sys.argv[1].startswith("-"):
+            # Command line, the same arguments as the tool parameters
+            parser = argparse.ArgumentParser(description="Run one of the geometry QA checks on a pool of worker processes")
+            parser.add_argument("--layer", required=True, help="input polygon featureclass")
+            parser.add_argument("--check", required=True, choices=["Slivers", "Vertex Flags", "Common Points", "Multipart Polygons", "Vertex Report"], help="QA check to run")
+            parser.add_argument("--value", type=float, help="minimum angle (Slivers) or minimum segment length (Vertex Flags)")
+            parser.add_argument("--field", default="", help="attribute field for Common Points and Vertex Report")
+            parser.add_argument("--processes", type=int, help="number of worker processes, defaults to the number of processors")
+            args = parser.parse_args()
+            bPrint = True
+            bTool = False
+            inLayer, qaCheck, theValue, inFieldName, numProcs = args.layer, args.check, args.value, args.field, args.processes
+
+        else:
+            bTool = True
+
+            # Target Featureclass or featurelayer
+            inLayer = arcpy.GetParameterAsText(0)
+
+            # QA check to run: Slivers, Vertex Flags, Common Points, Multipart Polygons, Vertex Report
+            qaCheck = arcpy.GetParameterAsText(1)
+
+            # Minimum angle (Slivers) or minimum segment length (Vertex Flags)
+            theValue = arcpy.GetParameter(2)
+
+            # Attribute field for Common Points and Vertex Report
+            inFieldName = arcpy.GetParameterAsText(3)
+
+            # Number of worker processes. Defaults to the number of processors.
+            numProcs = arcpy.GetParameter(4)
+
+        if qaCheck in ("Slivers", "Vertex Flags") and theValue is None:
+            raise MyError, "A minimum " + ("angle" if qaCheck == "Slivers" else "segment length") + " is required for " + qaCheck
+
+        if numProcs is None or numProcs < 1:
+            numProcs = multiprocessing.cpu_count()
+
+        env.overwriteOutput = True
+        begin = time.time()
+
+        # Describe input layer
+        desc = arcpy.Describe(inLayer)
+        theCatalogPath = desc.catalogPath
+        oidName = desc.OIDFieldName
+        inputSR = desc.spatialReference
+
+        # Set output workspace. If input layer is in a featuredataset, move up one level to the geodatabase
+        if arcpy.Describe(os.path.dirname(theCatalogPath)).dataType.upper() == "FEATUREDATASET":
+            env.workspace = os.path.dirname(os.path.dirname(theCatalogPath))
+
+        else:
+            env.workspace = os.path.dirname(theCatalogPath)
+
+        if arcpy.Describe(env.workspace).dataType.upper() == "FOLDER":
+            ext = ".shp"
+
+        else:
+            ext = ""
+
+        # Geographic coordinates are switched to Web Mercatur (meters) as in the single process tools
+        if inputSR.type.upper() != "PROJECTED":
+            if inputSR.GCS.datumName in ("D_North_American_1983","D_WGS_1984"):
+                PrintMsg(" \nInput layer coordinate system is not projected, switching to Web Mercatur (meters)", 1)
+                outputSR = arcpy.SpatialReference(3857)
+
+            else:
+                raise MyError, "Unable to handle input coordinate system: " + inputSR.name
+
+        else:
+            outputSR = inputSR
+
+        theUnits = outputSR.linearUnitName.lower().replace("foot", "feet").replace("meter", "meters")
+
+        if theUnits.startswith("meter"):
+            unitAbbrev = "m"
+            acreFactor = 4046.85643
+
+        else:
+            unitAbbrev = "ft"
+            acreFactor = 43560.0
+
+        # The survey field is used to split the layer. Without it the layer is split by OBJECTID.
+        surveyField = ""
+
+        for fld in arcpy.ListFields(theCatalogPath):
+            if fld.baseName.upper() == "AREASYMBOL":
+                surveyField = fld.name
+
+        inField = None
+
+        if qaCheck in ("Common Points", "Vertex Report"):
+            if inFieldName == "":
+                raise MyError, "An attribute field is required for " + qaCheck
+
+            inField = [fld for fld in arcpy.ListFields(theCatalogPath) if fld.name.upper() == inFieldName.upper() or fld.baseName.upper() == inFieldName.upper()][0]
+
+        if qaCheck == "Common Points":
+            if surveyField == "":
+                raise MyError, "Common Points requires an AREASYMBOL field"
+
+            extraFields = [surveyField, inField.name]
+
+        elif qaCheck == "Vertex Report":
+            extraFields = [inField.name]
+
+        elif qaCheck == "Multipart Polygons":
+            extraFields = [surveyField] if surveyField != "" else []
+
+        else:
+            extraFields = []
+
+        # Common points are only found within a survey, so a single survey can't be split
+        shards, numSurveys = GetShards(inLayer, surveyField, numProcs, qaCheck != "Common Points")
+
+        if len(shards) == 0:
+            raise MyError, "No polygons found in " + inLayer
+
+        # A selected set can't be expressed by survey, so those shards are read by OBJECTID
+        if getattr(desc, "FIDSet", "") not in ("", None):
+            shards = [(list(), oids) for surveys, oids in shards]
+
+        iSelection = sum([len(oids) for surveys, oids in shards])
+        PrintMsg(" \nRunning " + qaCheck + " on " + Number_Format(iSelection, 0, True) + " polygons from " + Number_Format(numSurveys, 0, True) + " survey(s) in " + str(len(shards)) + " shard(s) using " + str(min(numProcs, len(shards))) + " processes...", 0)
+
+        oidField = arcpy.AddFieldDelimiters(theCatalogPath, oidName)
+        sqlSurveyField = arcpy.AddFieldDelimiters(theCatalogPath, surveyField) if surveyField != "" else ""
+        layerWhere = getattr(desc, "whereClause", "") or ""
+        srString = outputSR.exportToString()
+        tasks = [(i, qaCheck, theCatalogPath, ShardWhereClause(sqlSurveyField, surveys, oidField, oids, layerWhere), srString, theValue, acreFactor, extraFields) for i, (surveys, oids) in enumerate(shards)]
+
+        # When this runs inside ArcGIS, sys.executable is not python, so the worker processes
+        # are started with the python in the ArcGIS python installation.
+        if not os.path.basename(sys.executable).lower().startswith("python"):
+            multiprocessing.set_executable(os.path.join(sys.exec_prefix, "pythonw.exe"))
+
+        arcpy.SetProgressor("step", "Running " + qaCheck + " in " + str(len(tasks)) + " shards...", 0, len(tasks), 1)
+        pool = multiprocessing.Pool(min(numProcs, len(tasks)))
+        shardResults = [None] * len(tasks)
+        badOids = list()
+
+        try:
+            for shardNo, shardBad, results, errMsg in pool.imap_unordered(ProcessShard, tasks):
+                if errMsg != "":
+                    raise MyError, "Shard " + str(shardNo + 1) + " failed: \n" + errMsg
+
+                shardResults[shardNo] = results
+                badOids.extend(shardBad)
+                arcpy.SetProgressorPosition()
+
+        finally:
+            pool.terminate()
+
+        arcpy.ResetProgressor()
+
+        if len(badOids) > 0:
+            raise MyError, "NULL geometry for polygon(s): " + ", ".join([str(oid) for oid in sorted(badOids)])
+
+        # Merge the results in shard order and save the QA output
+        if qaCheck == "Slivers":
+            outLayer = SaveSlivers(shardResults, outputSR, theValue)
+
+        elif qaCheck == "Vertex Flags":
+            outLayer = SaveVertexFlags(shardResults, outputSR, theValue)
+
+        elif qaCheck == "Common Points":
+            outLayer = SaveCommonPoints(shardResults, outputSR, inField, surveyField)
+
+        elif qaCheck == "Multipart Polygons":
+            outLayer = SaveMultipart(shardResults)
+
+        elif qaCheck == "Vertex Report":
+            outLayer = SaveVertexReport(shardResults, outputSR, inField)
+
+        else:
+            raise MyError, "Unknown QA check: " + qaCheck
+
+        if outLayer != "" and bTool:
+            arcpy.SetParameter(5, outLayer)
+
+        PrintMsg(" \n" + qaCheck + " completed in " + Number_Format(time.time() - begin, 1, True) + " seconds \n ", 0)
+
+    except MyError, e:
+        # Example: raise MyError, "This is an error message"
+        PrintMsg(str(e) + " \n", 2)
+
+    except:
+        errorMsg()
@@ -22,6 +22,27 @@
 # 10-31-2013
 #
 # 11-06-2013 Altered output workspace for QA layers to be always be in the geodatabase, not the featuredataset
+#
+# 10-18-2026 Polygon geometry is now read as WKB and the vertex angles for each ring are calculated
+# in a single numpy operation (QA_Geometry.GetRingAngles). The angle at the first vertex of each ring is
+# now included and every part of a multipart polygon is checked, not just the last one.
+#
+# 10-18-2026 Interior rings are now checked in the same read. Each polygon is decoded into flat ring
+# arrays (QA_Geometry.DecodePolygonRings) and all rings go through the same angle test. Hole locations
+# that duplicate a location on the island polygon's exterior ring are dropped.
+#
+# 10-18-2026 Added optional incremental mode (parameter 5). The flagged angles for each polygon are saved
+# to a QA_Cache file next to the geodatabase along with a hash of the polygon geometry. On the next run
+# only the polygons whose geometry has changed are checked again.
+#
+# 10-18-2026 Both output featureclasses are written in one pass by QA_Output.QAWriter. The sliver lines are
+# inserted as WKB and the vertices as x,y pairs instead of building arcpy Point, Array and Polyline objects.
+#
+# 10-18-2026 The progressor is only updated every half second (ToolTiming.Progress). The read, check and
+# write phases are timed and a JSON timing report is saved at the end of the run when SSURGO_TIMING_REPORT is set.
+# 10-18-2026 The angle check time is added up in ProcessLayer and recorded once, not timed for each polygon.
+# 10-18-2026 The angle test and the output rows come from QA_Checks (SliverFlags, SliverRows), the same code
+# that QA_ParallelRunner and QA_Benchmark run.
 
 class MyError(Exception):
     pass
@@ -77,54 +98,12 @@ def CreateWebMercaturSR():
         errorMsg()
 
 ## ===================================================================================
-def GetAngleFromPoints(pntList, iPnt):
-    # Calculate angle from 3 pairs of cartesian coordinates
-    #
-    try:
-        #x1 = pntList[0][0]
-        #y1 = pntList[0][1]
-        #x2 = pntList[1][0]
-        #y2 = pntList[1][1]
-        #x3 = pntList[2][0]
-        #y3 = pntList[2][1]
-
-        # A->B
-        dx = pntList[1 + iPnt][0] - pntList[0 + iPnt][0]
-        dy = pntList[1 + iPnt][1] - pntList[0 + iPnt][1]
-        mAB = math.sqrt(dx**2 + dy**2)
-
-        # B->C
-        dx = pntList[2 + iPnt][0] - pntList[1 + iPnt][0]
-        dy = pntList[2 + iPnt][1] - pntList[1 + iPnt][1]
-        mBC = math.sqrt(dx**2 + dy**2)
-
-        # C->A
-        dx = pntList[0 + iPnt][0] - pntList[2 + iPnt][0]
-        dy = pntList[0 + iPnt][1] - pntList[2 + iPnt][1]
-        mCA = math.sqrt(dx**2 + dy**2)
-
-        if mAB == 0 or mBC == 0:
-            PrintMsg("Failed to calculate angle at point " + str(iPnt), 0)
-            return 0
-
-        p = round((mAB**2 + mBC**2 - mCA**2 ) / (2 * mAB * mBC),10)
-        theAngle = int(round(math.degrees(math.acos(p)), 0))
-
-        #if theAngle > 180:
-        #    theAngle -= 180
-
-        return theAngle
-
-    except:
-        errorMsg()
-        return -1
-
-## ===================================================================================
-def ProcessLayer(inLayer, outputSR, minAngle, iSelection):
+def ProcessLayer(inLayer, outputSR, minAngle, iSelection, bUseCache):
 #def ProcessLayer(inLayer, outputSR, outLayer, minAngle):
     # All the real work is performed within this function
     #
     # inLayer = selected featurelayer or featureclass that will be processed
+    # bUseCache = only check polygons that have changed since the last run (QA_Cache)
 
     try:
         #
@@ -134,95 +113,88 @@ def ProcessLayer(inLayer, outputSR, minAngle, iSelection):
 
         # Process input featurelayer polygon geometry using search cursor
         #
-        arcpy.SetProgressorLabel("Reading polygon geometry...")
-        arcpy.SetProgressor("step", "Reading polygon geometry...",  0, iSelection, 1)
-        iErr = 0
-        fieldList = ["OID@", "SHAPE@"]
-        dLines = dict()
-        dTest = dict()  # this dictionary will only contain the common key and the angle (for sorting by angle)
-        iPnt = 0
+        progress = ToolTiming.Progress("Reading polygon geometry...", iSelection)
+        iPolys = 0
+        fieldList = ["OID@", "SHAPE@WKB"]
+        sliverFlags = list()  # (3 coordinate pairs, POLYID, angle, exterior ring) for each flagged angle
         badPolys = list()
 
+        if bUseCache:
+            # cached results are only valid for the same angle and output coordinate system
+            cache = QA_Cache.QACache(QA_Cache.CachePath(env.workspace), theCatalogPath, "QA_SliverFinder:" + str(minAngle) + ":" + outputSR.name)
+            PrintMsg(" \nUsing QA cache " + cache.cachePath + " (" + Number_Format(len(cache), 0, True) + " polygons from the last run)", 0)
+
+        readPhase = timer.Phase("read geometry").Start()
+        checkTime = 0.0   # time spent in QA_Checks.SliverFlags, recorded once after the read
+
         with arcpy.da.SearchCursor(inLayer, fieldList,"",outputSR) as sCursor:
             # open searchcursor on input layer and read geometry one record at a time
+            # geometry is read as WKB and decoded into numpy coordinate arrays
+
+            for fid, wkb in sCursor:
+                iPolys += 1
 
-            for row in sCursor:
-                iPnt = 0
-                iPart = 0
-                fid, feat = row # do I need to worry about NULL geometry here?
-
-                if not feat is None:
-                    # Polygon has a geometry object
-                    if feat.partCount > 0:
-                        # has at least one polygon
-                        #PrintMsg(" \nPolygon #" + str(fid) + " with " + str(feat.partCount) + " parts and " + Number_Format(feat.pointCount, 0, False) + " points", 0)
-
-                        for part in feat:
-                            # accumulate 3 points for each segment
-                            pntList = []  # initialize points list for polygon
-                            #PrintMsg("\tPart " + str(iPart) + " has " + str(len(part)) + " vertices", 0)
-
-                            for pnt in part:
-                                if pnt:
-                                    # add vertice or to-node coordinates to list
-                                    #PrintMsg(str(iPnt) + ", " + Number_Format(pnt.X, 1, False) + ", " + Number_Format(pnt.Y, 1, False), 1)
-                                    pntList.append((pnt.X,pnt.Y))
-                                    iPnt += 1
-
-                                else:
-                                    # interior ring encountered, don't process any more
-                                    # This means that islands that belong to other survey areas will NOT be checked for slivers
-                                    #PrintMsg(" \nIsland Polygon encountered", 1)
-                                    break
-
-                            # add vertex 1 to wrap around again
-                            pntList.append(pntList[1])
-                            #PrintMsg("Wrap" + ", " + Number_Format(pntList[1][0], 1, False) + ", " + Number_Format(pntList[1][1], 1, False), 1)
-                            iPart += 1
-
-                        numPnts = len(pntList) - 2  # Problem with only 3 of 4 angles being detected
-
-                        for iPnt in range(numPnts):
-                            try:
-                                theAngle = GetAngleFromPoints(pntList, iPnt)
-
-                                if theAngle <= minAngle:
-                                    iErr += 1
-                                    arcpy.SetProgressorLabel("Reading polygon geometry (" + str(iErr) + " locations flagged)")
-                                    # save these 3 coordinate pairs to the dictionary for later use
-                                    dLines[iErr] = ( [(pntList[0 + iPnt][0], pntList[0 + iPnt][1]), (pntList[1 + iPnt][0], pntList[1 + iPnt][1]), (pntList[2 + iPnt][0], pntList[2 + iPnt][1])], fid, theAngle)
-                                    dTest[iErr] = theAngle
-                                    iPnt += 1
-
-                            except:
-                                break
-
-                        arcpy.SetProgressorPosition()
-
-                    else:
-                        # Geometry error: Polygon Part with no parts
-                        badPolys.append(str(fid))
-                        #return False
-
-                else:
+                if wkb is None:
                     # Geometry error: Polygon with NULL geometry
                     badPolys.append(str(fid))
-                    #return False
+                    continue
 
-        arcpy.ResetProgressor()
+                # split the vertex stream into rings so that exterior and interior rings
+                # are all checked in the same read
+                xy, ringOffsets, ringParts = QA_Geometry.DecodePolygonRings(wkb)
+
+                if len(ringParts) == 0:
+                    # Geometry error: Polygon Part with no parts
+                    badPolys.append(str(fid))
+                    continue
+
+                flags = None
+
+                if bUseCache:
+                    geomHash = QA_Geometry.GeometryHash(xy, ringOffsets, ringParts)
+                    flags = cache.Lookup(fid, geomHash)
+
+                timer.Count("vertices", len(xy))
+
+                if flags is None:
+                    # new or edited polygon
+                    checkStart = time.time()
+                    flags, flagPolys = QA_Checks.SliverFlags(xy, ringOffsets, ringParts, minAngle)
+                    checkTime += time.time() - checkStart
+
+                    if bUseCache:
+                        cache.Update(fid, geomHash, (), flags)
+
+                for pntList, theAngle, bExterior in flags:
+                    sliverFlags.append((pntList, fid, theAngle, bExterior))
+
+                progress.Update(iPolys, "Reading polygon geometry (" + str(len(sliverFlags)) + " locations flagged)")
+
+        progress.Finish()
+        readPhase.Stop()
+        timer.AddTime("check angles", checkTime)
+        timer.Count("polygons", iPolys)
+        timer.Count("flags", len(sliverFlags))
 
         # If errors are found in the polygon geometry, report and then return an error
         if len(badPolys) > 0:
             PrintMsg("Bad polygon geometry detected for the following polygons: " + ", ".join(badPolys) + " \n ", 2)
             return False
 
-        # Create a copy of the dLines dictionary, sorted by angle
-        # This dictionary will be used to create the output layers, smallest angles first
-        dAngles = OrderedDict(sorted(dTest.items(), key=lambda x: x[1]))
+        if bUseCache:
+            iReused = cache.reused
+            iChanged, iRemoved = cache.Save()
+            PrintMsg(" \nChecked " + Number_Format(iChanged, 0, True) + " new or edited polygons, " + Number_Format(iReused, 0, True) + " unchanged polygons were read from the QA cache", 0)
+
+        # Sliver lines and vertices sorted by angle, smallest angles first. Hole locations that
+        # are also flagged on the island polygon are dropped (QA_Checks.SliverRows).
+        sDegree = chr(176).decode(locale.getpreferredencoding())
+        lineRows, pointRows = QA_Checks.SliverRows(sliverFlags, sDegree)
+        iErr = len(lineRows)
 
         # Create output line featureclass containing acute angles that were flagged
         #
-        if len(dLines) > 0:
+        if iErr > 0:
             arcpy.env.addOutputsToMap = False
             # Found acute angles below specification
             PrintMsg("Saved " + Number_Format(iErr, 0, True) + " sliver locations to the following 'QA' layers: ", 1)
@@ -231,56 +203,41 @@ def ProcessLayer(inLayer, outputSR, minAngle, iSelection):
             outLayer = MakeLineLayer(theCatalogPath, outputSR, minAngle)
             outLayer2 = MakePointLayer(theCatalogPath, outputSR, minAngle)
 
-            # combine output to both featureclasses in the same with statement
-            with arcpy.da.InsertCursor(os.path.join(env.workspace, outLayer), ["SHAPE@", "POLYID", "ANGLE"]) as lineCursor:
-
-                # for each value that has a reported common-point, get the list of coordinates and the
-                # calculated angle from dLines dictionary and write to the output slivers featureclass
-                #for key, val in dLines.items():
-
-                iCnt = 0
-                for key in dAngles:
-                    pntList, fid, theAngle = dLines[key]
-                    #PrintMsg("\tFID = " + str(fid), 0)
-                    pnt0 = arcpy.Point(pntList[0][0],pntList[0][1])
-                    pnt1 = arcpy.Point(pntList[1][0],pntList[1][1])
-                    pnt2 = arcpy.Point(pntList[2][0],pntList[2][1])
-                    array = arcpy.Array([pnt0, pnt1, pnt2])
-                    polyLine = arcpy.Polyline(array)
-                    rowLine = (polyLine, fid, theAngle)
-                    lineCursor.insertRow(rowLine)
+            # Run through the sorted angles once, saving the 3 coordinate pairs of each sliver to the
+            # line featureclass and the vertex with the angle (as text with degrees) to the point featureclass
+            writer = QA_Output.QAWriter()
+            writer.AddOutput("slivers", os.path.join(env.workspace, outLayer), "POLYLINE", ["POLYID", "ANGLE"])
+            writer.AddOutput("vertices", os.path.join(env.workspace, outLayer2), "POINT", ["POLYID", "ANGLE"])
+
+            for coords, values in lineRows:
+                writer.Add("slivers", coords, values)
+
+            for coords, values in pointRows:
+                writer.Add("vertices", coords, values)
+
+            with timer.Phase("write output"):
+                writer.Write("Saving sliver locations...")
 
             # create new featurelayer from sliver polylines
             layerPath = os.path.dirname(sys.argv[0])
             layerFile1 = os.path.join(layerPath,"Yellow_Line.lyr")
             outLayerName = "QA Slivers (" + Number_Format(minAngle, 0, False) + chr(176).decode(locale.getpreferredencoding()) + " angle)"
 
-            arcpy.MakeFeatureLayer_management(outLayer, outLayerName)
-            arcpy.ApplySymbologyFromLayer_management (outLayerName, layerFile1)
+            with timer.Phase("geoprocessing"):
+                arcpy.MakeFeatureLayer_management(outLayer, outLayerName)
+                arcpy.ApplySymbologyFromLayer_management (outLayerName, layerFile1)
+
             arcpy.SetParameter(3, outLayerName)
             PrintMsg(" \n ", 0)
 
-            # Run through dictionary a second time, but now loading vertex locations into point featureclass
-            #
-            with arcpy.da.InsertCursor(os.path.join(env.workspace, outLayer2), ["SHAPE@", "POLYID", "ANGLE"]) as pntCursor:
-
-                # for each value that has a reported common-point, get the list of coordinates and the
-                # calculated angle from dLines dictionary and write to the output slivers featureclass
-                for key in dAngles:
-                    pntList, fid, theAngle = dLines[key]
-                    #PrintMsg("\tFID = " + str(fid), 0)
-                    pnt1 = arcpy.Point(pntList[1][0],pntList[1][1])
-                    # write out angle as text with degrees
-                    sAngle = str(theAngle) + chr(176).decode(locale.getpreferredencoding())
-                    rowPnt = (pnt1, fid, sAngle)
-                    pntCursor.insertRow(rowPnt)
-
             # create new featurelayer from sliver vertices
             layerPath = os.path.dirname(sys.argv[0])
             layerFile2 = os.path.join(layerPath,"Red_SliverVertex.lyr")
             outLayerName2 = "QA Sliver Vertex (" + Number_Format(minAngle, 0, False) + chr(176).decode(locale.getpreferredencoding()) + " angle)"
-            arcpy.MakeFeatureLayer_management(outLayer2, outLayerName2)
-            arcpy.ApplySymbologyFromLayer_management (outLayerName2, layerFile2)
+            with timer.Phase("geoprocessing"):
+                arcpy.MakeFeatureLayer_management(outLayer2, outLayerName2)
+                arcpy.ApplySymbologyFromLayer_management (outLayerName2, layerFile2)
+
             arcpy.SetParameter(4, outLayerName2)
 
             # add new line layer to top of TOC
@@ -495,10 +452,12 @@ def Number_Format(num, places=0, bCommas=True):
 
 ## ===================================================================================
 ## MAIN
-import sys, string, os, locale, math, operator, traceback
+import sys, string, os, locale, math, operator, traceback, time
 from collections import OrderedDict
+import numpy as np
 import arcpy
 from arcpy import env
+import QA_Geometry, QA_Checks, QA_Cache, QA_Output, ToolTiming
 
 try:
     # Set formatting for numbers
@@ -519,6 +478,13 @@ try:
     # Output featurelayer containing slivers (polylines with 3 vertices)
     #outLayer = arcpy.GetParameterAsText(3)
 
+    # Optional. Only check the polygons that have changed since the last run
+    try:
+        bUseCache = arcpy.GetParameter(5) == True
+
+    except:
+        bUseCache = False
+
     env.overwriteOutput = True
 
     # Setup: Get all required information from input layer
@@ -618,7 +584,13 @@ try:
     #
 
     # run process
-    bProcessed = ProcessLayer(inLayer, outputSR, minAngle, iSelection)
+    timer = ToolTiming.RunTimer("QA_SliverFinder")
+    bProcessed = ProcessLayer(inLayer, outputSR, minAngle, iSelection, bUseCache)
+    PrintMsg(" \n" + timer.Summary(), 0)
+    reportPath = timer.Save()
+
+    if reportPath != "":
+        PrintMsg("Timing report saved to " + reportPath + " \n ", 0)
 
     try:
         del inLayer
@@ -8,6 +8,8 @@
 #
 # Returns total vertice count for input layer
 #
+# 10-18-2026 Vertex count now comes from the shared QA_Geometry statistics (SHAPE@WKB)
+#
 
 ## ===================================================================================
 class MyError(Exception):
@@ -92,17 +94,17 @@ def ProcessPolygons(theInputLayer, bUseSelected):
             # open cursor with exploded geometry
             PrintMsg("If selected set or query definition is present, only those features will be processed", 0)
 
-            with arcpy.da.SearchCursor(theInputLayer, ["OID@","SHAPE@"], "","",False) as theCursor:
-                for fid, feat in theCursor:
-
-                    if not feat is None:
-                        iVertCnt += feat.pointCount
-                        iParts += feat.partCount
+            with arcpy.da.SearchCursor(theInputLayer, ["OID@","SHAPE@WKB"], "","",False) as theCursor:
+                for batch in QA_Geometry.ReadPolygonArrays(theCursor):
 
-                    else:
-                        PrintMsg("Empty geometry found for polygon #" + str(fid) + " \n ", 2)
+                    if len(batch.badOids) > 0:
+                        PrintMsg("Empty geometry found for polygon #" + str(batch.badOids[0]) + " \n ", 2)
                         return -1
 
+                    stats = QA_Geometry.GetPolygonStatistics(batch)
+                    iVertCnt += int(stats.vertices.sum())
+                    iParts += int(stats.parts.sum())
+
 
             PrintMsg(" \n" + Number_Format(iVertCnt, 0, True) + " vertices in featurelayer \n " , 0)
 
@@ -111,15 +113,15 @@ def ProcessPolygons(theInputLayer, bUseSelected):
             # Don't really see a performance difference, but this way all features get counted.
             # Using 'exploded' geometry option for cursor
 
-            with arcpy.da.SearchCursor(theFC, ["OID@","SHAPE@"], "","",False) as theCursor:
-                for fid, feat in theCursor:
+            with arcpy.da.SearchCursor(theFC, ["OID@","SHAPE@WKB"], "","",False) as theCursor:
+                for batch in QA_Geometry.ReadPolygonArrays(theCursor):
 
-                    if not feat is None:
-                      iVertCnt += feat.pointCount
-                      iParts += feat.partCount
+                    if len(batch.badOids) > 0:
+                        raise MyError, "NULL geometry for polygon #" + str(batch.badOids[0])
 
-                    else:
-                        raise MyError, "NULL geometry for polygon #" + str(fid)
+                    stats = QA_Geometry.GetPolygonStatistics(batch)
+                    iVertCnt += int(stats.vertices.sum())
+                    iParts += int(stats.parts.sum())
 
             PrintMsg(" \n" + Number_Format(iVertCnt, 0, True) + " vertices present in the entire " + theDataType.lower() + " \n ", 0)
 
@@ -142,6 +144,7 @@ def ProcessPolygons(theInputLayer, bUseSelected):
 ## ===================================================================================
 
 import sys, string, os, arcpy, locale, traceback, time, math, operator
+import QA_Geometry
 
 try:
     # Set formatting for numbers
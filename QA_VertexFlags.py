@@ -14,6 +14,20 @@
 # 05-15-2013 Renamed for SSURGO QA and converted to arcpy with da cursors (ArcGIS 10.1). Major rewrite.
 # 06-07-2013 Problem with pre-existing join at line 240. Possibley failing to remove old join with shapefile input.
 # 10-31-2013
+# 10-18-2026 Geometry is read as WKB and summarized by QA_Geometry.GetPolygonStatistics instead of
+# looping over every point. Statistics now include all rings of each polygon.
+# 10-18-2026 Added optional near vertex check (parameter 4). Every vertex in the layer is compared with
+# the vertices around it using a grid (QA_Geometry.FindNearVertices). Pairs of vertices closer than the
+# minimum distance that are not joined by a segment are saved to QA_NearVertices_<distance>.
+# 10-18-2026 Added optional incremental mode (parameter 5). The statistics and short segments of each polygon
+# are saved to a QA_Cache file next to the geodatabase along with a hash of the polygon geometry. On the next
+# run only the polygons whose geometry has changed are summarized again.
+# 10-18-2026 Flag points and near vertex points are written by QA_Output.QAWriter, with one progressor update
+# per batch instead of per polygon.
+# 10-18-2026 The progressor is only updated every half second (ToolTiming.Progress). The read, summarize, near
+# vertex and write phases are timed and a JSON timing report is saved at the end of the run when SSURGO_TIMING_REPORT is set.
+# 10-18-2026 The polygon summary and the output rows come from QA_Checks (PolygonFindings, VertexStatsRow), the same
+# code that QA_ParallelRunner and QA_Benchmark run.
 
 class MyError(Exception):
     pass
@@ -69,10 +83,12 @@ def CreateWebMercaturSR():
         errorMsg()
 
 ## ===================================================================================
-def ProcessLayer(inLayer, outputSR, outLayer, minDist, iSelection):
+def ProcessLayer(inLayer, outputSR, outLayer, minDist, iSelection, bNearVertex, bUseCache):
     # All the real work is performed within this function
     #
     # inLayer = selected featurelayer or featureclass that will be processed
+    # bNearVertex = also check every vertex in the layer for non-adjacent vertices closer than minDist
+    # bUseCache = only summarize polygons that have changed since the last run (QA_Cache)
     try:
         # Create table to store geometry statistics for each polygon
         # Later this table will be joined to the input layer on POLYID
@@ -94,120 +110,115 @@ def ProcessLayer(inLayer, outputSR, outLayer, minDist, iSelection):
         else:
             return False
 
+        # Get conversion factor for acres
+        if theUnits == "meters":
+            acreFactor = 4046.85643
+
+        elif theUnits == "feet_us":
+            acreFactor = 43560.0
+
+        else:
+            PrintMsg(" \nFailed to calculate acre value using unit: " + theUnits, 2)
+            return False
+
         # Process input featurelayer polygon geometry using search cursor
+        # Geometry is read as WKB and summarized in batches by QA_Geometry
         #
-        arcpy.SetProgressorLabel("Reading polygon geometry...")
-        arcpy.SetProgressor("step", "Reading polygon geometry...",  0, iSelection, 1)
+        progress = ToolTiming.Progress("Reading polygon geometry...", iSelection)
         iCnt = 0
-        fieldList = ["OID@","SHAPE@","SHAPE@AREA","SHAPE@LENGTH"]
+        iPolys = 0
+        fieldList = ["OID@","SHAPE@WKB"]
         dPoints = dict()
         bHasMultiPart = False
 
-        with arcpy.da.SearchCursor(inLayer, fieldList,"",outputSR) as sCursor:
-            #SearchCursor (in_table, field_names, {where_clause}, {spatial_reference}, {explode_to_points}, {sql_clause})
-
-            for fid, feat, theArea, thePerimeter in sCursor:
-                # Process a polygon record. row[1] is the same as feat
-                #fid, feat, theArea, thePerimeter = row # do I need to worry about NULL geometry here?
-
-                if not feat is None:
-                    # check to make sure geometry object contains a single-part polygon
-                    iPartCnt = feat.partCount
-
-                    if iPartCnt == 1:
-                        iPartCnt = 0
-
-                    elif iPartCnt == 0:
-                        raise MyError, "Bad geometry for polygon #" + str(fid)
-
-                    else:
-                      bHasMultiPart = True
-
-                    # get the total number of points for this polygon
-                    iPnts = feat.pointCount
-                    iSeg = 1000000  # use an arbitrarily high segment length as the minimum for comparison
-
-                    for part in feat:
-                        # accumulate 2 points for each segment
-                        pntList = []  # initialize points list for polygon
-                        pnt0 = part[0]
-
-                        for pnt in part:
-                            try:
-                                pntList.append((pnt.X,pnt.Y))
-
-                            except:
-                                pass
-
-                            if pnt:
-                                # add vertice or to-node coordinates to list
+        # vertex coordinates, polygon id and segments of every batch for the near vertex check
+        nearXY = list()
+        nearPolys = list()
+        nearSegments = list()
+        iVertices = 0
 
-                                if len(pntList) == 2:
-                                    # calculate current segment length using 2 points
-                                    dist = math.hypot(pntList[0][0] - pntList[1][0], pntList[0][1] - pntList[1][1] )
-                                    #PrintMsg("\tLen: " + str(dist), 0)
+        if bUseCache:
+            # cached results are only valid for the same distance and output coordinate system
+            cache = QA_Cache.QACache(QA_Cache.CachePath(env.workspace), theCatalogPath, "QA_VertexFlags:" + str(minDist) + ":" + outputSR.name)
+            PrintMsg(" \nUsing QA cache " + cache.cachePath + " (" + Number_Format(len(cache), 0, True) + " polygons from the last run)", 0)
 
-                                    if dist < iSeg:
-                                        iSeg = dist
+        readPhase = timer.Phase("read geometry").Start()
 
-                                    if dist < minDist:
-                                        iCnt += 1
-
-                                        # get midpoint of short line segment for vertex flag placement
-                                        xm = (pntList[0][0] + pntList[1][0]) / 2.0
-                                        ym = (pntList[0][1] + pntList[1][1]) / 2.0
-                                        midPnt = [(xm,ym), fid, dist]
-
-                                        # print line segment that is less than specified distance
-                                        #PrintMsg("\t\tPolygon " + str(fid) + ":  " + str(midPnt), 0)
+        with arcpy.da.SearchCursor(inLayer, fieldList,"",outputSR) as sCursor:
+            #SearchCursor (in_table, field_names, {where_clause}, {spatial_reference}, {explode_to_points}, {sql_clause})
 
-                                        if fid in dPoints:
-                                            # add this point to the existing list for this polygon
-                                            dPoints[fid].append(midPnt)
+            for batch in QA_Geometry.ReadPolygonArrays(sCursor):
 
-                                        else:
-                                            # create new dictionary entry for this polygon
-                                            dPoints[fid] = [midPnt]
-                                            arcpy.SetProgressorLabel("Reading polygon geometry ( " + Number_Format(len(dPoints)) + " locations flagged )...")
+                if len(batch.badOids) > 0:
+                    # bad polygon geometry
+                    raise MyError, "NULL geometry for polygon #" + str(batch.badOids[0])
 
-                                    # then drop the first point from the list
-                                    pntList.pop(0)
+                if bUseCache:
+                    # only the new or edited polygons are summarized
+                    hashes = QA_Geometry.PolygonHashes(batch)
+                    findings = [cache.Lookup(int(batch.oids[i]), hashes[i]) for i in range(len(batch.oids))]
+                    changed = [i for i in range(len(batch.oids)) if findings[i] is None]
 
-                                # add the next point
-                                #pntList.append((pnt.X,pnt.Y))
+                    if len(changed) > 0:
+                        with timer.Phase("summarize polygons"):
+                            changedFindings = QA_Checks.PolygonFindings(batch.Subset(changed), minDist, acreFactor)
 
-                            else:
-                                # interior ring or end of polygon encountered,
-                                #PrintMsg("\tInterior Ring...", 0)
-                                pntList = []  # reset points list for interior ring
-                                break
+                        for i, polyFindings in zip(changed, changedFindings):
+                            findings[i] = polyFindings
+                            cache.Update(int(batch.oids[i]), hashes[i], (), polyFindings)
 
                 else:
-                    # bad polygon geometry
-                    raise MyError, "NULL geometry for polygon #" + str(fid)
+                    with timer.Phase("summarize polygons"):
+                        findings = QA_Checks.PolygonFindings(batch, minDist, acreFactor)
 
                 #POLYID,ACRES,VERTICES,AVI,MIN_DIST,MULTIPART
-                if theUnits == "meters":
-                    acres = theArea / 4046.85643
-
-                elif theUnits == "feet_us":
-                    acres = theArea / 43560.0
-
-                else:
-                    PrintMsg(" \nFailed to calculate acre value using unit: " + theUnits, 2)
-                    return False
-
-                avi = thePerimeter / iPnts
-                outRow = [fid, acres,iPnts,avi,iSeg,iPartCnt]
-                iCursor.insertRow(outRow)
-                arcpy.SetProgressorPosition()
+                for i in range(len(batch.oids)):
+                    fid = int(batch.oids[i])
+                    outRow, midPnts = QA_Checks.VertexStatsRow(fid, findings[i])
+                    iCursor.insertRow(outRow)
+
+                    if outRow[5] != 0:
+                        bHasMultiPart = True
+
+                    if len(midPnts) > 0:
+                        # save midpoint of each short line segment for vertex flag placement
+                        dPoints[fid] = midPnts
+                        iCnt += len(midPnts)
+
+                if bNearVertex:
+                    ringLengths = np.diff(batch.ringOffsets)
+                    nearXY.append(batch.xy)
+                    nearPolys.append(np.repeat(batch.oids[batch.ringPolys], ringLengths))
+                    nearSegments.append(QA_Geometry.RingSegments(batch.ringOffsets) + iVertices)
+                    iVertices += len(batch.xy)
+
+                iPolys += len(batch.oids)
+                timer.Count("vertices", len(batch.xy))
+                progress.Update(iPolys, "Reading polygon geometry ( " + Number_Format(len(dPoints)) + " polygons flagged )...")
 
-        del outRow
         del iCursor
+        progress.Finish()
+        readPhase.Stop()
+        timer.Count("polygons", iPolys)
+        timer.Count("flags", iCnt)
+
+        if bUseCache:
+            iReused = cache.reused
+            iChanged, iRemoved = cache.Save()
+            PrintMsg(" \nSummarized " + Number_Format(iChanged, 0, True) + " new or edited polygons, " + Number_Format(iReused, 0, True) + " unchanged polygons were read from the QA cache", 0)
 
         if bHasMultiPart:
             PrintMsg("Input layer has multipart polygons that require editing (explode)", 2)
 
+        if bNearVertex and iVertices > 0:
+            with timer.Phase("near vertices"):
+                bNear = ProcessNearVertices(np.concatenate(nearXY), np.concatenate(nearPolys), np.concatenate(nearSegments), outputSR, minDist)
+
+            if not bNear:
+                return False
+
+            del nearXY, nearPolys, nearSegments
+
         if outLayer != "" and len(dPoints) > 0:
             # pairs of close vertices were flagged and need to be exported as midpoints in a new featureclass
             PrintMsg("Flagged " + Number_Format(iCnt, 0, True) + " segments shorter than " + str(minDist) + " " + theUnits, 2)
@@ -215,35 +226,32 @@ def ProcessLayer(inLayer, outputSR, outLayer, minDist, iSelection):
             # add flagged midpoints to new points featureclass
             outLayer = MakePointsLayer(outputSR, minDist, unitAbbrev)
 
-            arcpy.SetProgressorLabel("Saving midpoint of each short segment...")
-            arcpy.SetProgressor("step", "Saving midpoint of each short segment...",  0, iCnt, 1)
-
-            with arcpy.da.InsertCursor(os.path.join(env.workspace, outLayer), ["SHAPE@","POLYID","LENGTH_" + unitAbbrev]) as pntCursor:
-
-                # for each value that has a reported common-point, get the list of coordinates from
-                # the dDups dictionary and write to the output Common_Points featureclass
-                for fid in dPoints.keys():
-                    pnts = dPoints[fid]
+            writer = QA_Output.QAWriter()
+            writer.AddOutput("flags", os.path.join(env.workspace, outLayer), "POINT", ["POLYID","LENGTH_" + unitAbbrev])
 
-                    for pnt in pnts:
-                        #PrintMsg("\t" + str(fid) + ": " + str(pnt[0]) + ", " + str(pnt[1]) + ", " + str(pnt[2]), 0)
-                        pntCursor.insertRow(pnt)
+            for fid in dPoints.keys():
+                for pnt, values in dPoints[fid]:
+                    writer.Add("flags", pnt, values)
 
-                    arcpy.SetProgressorPosition()
+            with timer.Phase("write output"):
+                writer.Write("Saving midpoint of each short segment...")
 
             # create join between input polygon layer and QA_VertexStats table
             # "QA_VertexStats"
             PrintMsg(" \nOutput polygon statistics table: " + os.path.basename(statsTbl) + " (joined to input layer)", 0)
-            arcpy.AddIndex_management (statsTbl, "POLYID", "Indx_PolyID", "UNIQUE", "NON_ASCENDING")
-            arcpy.AddJoin_management (inLayer, fidFld, statsTbl, "POLYID", "KEEP_ALL")
-
-            # create new featurelayer from vertex flag points
-            layerPath = os.path.dirname(sys.argv[0])
-            layerFile = os.path.join(layerPath,"RedDot.lyr")
-            outLayerName = "QA Vertex Flag Points (" + str(minDist) + " " + unitAbbrev + ")"
-            arcpy.MakeFeatureLayer_management(outLayer, outLayerName)
-            arcpy.env.addOutputsToMap = True
-            arcpy.ApplySymbologyFromLayer_management (outLayerName, layerFile)
+
+            with timer.Phase("geoprocessing"):
+                arcpy.AddIndex_management (statsTbl, "POLYID", "Indx_PolyID", "UNIQUE", "NON_ASCENDING")
+                arcpy.AddJoin_management (inLayer, fidFld, statsTbl, "POLYID", "KEEP_ALL")
+
+                # create new featurelayer from vertex flag points
+                layerPath = os.path.dirname(sys.argv[0])
+                layerFile = os.path.join(layerPath,"RedDot.lyr")
+                outLayerName = "QA Vertex Flag Points (" + str(minDist) + " " + unitAbbrev + ")"
+                arcpy.MakeFeatureLayer_management(outLayer, outLayerName)
+                arcpy.env.addOutputsToMap = True
+                arcpy.ApplySymbologyFromLayer_management (outLayerName, layerFile)
+
             arcpy.SetParameter(3, outLayerName)
             PrintMsg(" \n ", 0)
             arcpy.ResetProgressor()
@@ -266,9 +274,55 @@ def ProcessLayer(inLayer, outputSR, outLayer, minDist, iSelection):
         return False
 
 ## ===================================================================================
-def MakePointsLayer(outputSR, minDist, unitAbbrev):
+def ProcessNearVertices(xy, vertexPolys, iFrom, outputSR, minDist):
+    # Find every pair of vertices in the layer that are closer than minDist but are not the two
+    # ends of a segment. These catch the pinch points between non-adjacent vertices of the same
+    # polygon or of neighbouring polygons, which collapse when a cluster tolerance is applied.
+    # Vertices shared by neighbouring polygons count as one location.
+    #
+    # A point is saved halfway between each pair of vertices.
+    try:
+        PrintMsg(" \nChecking " + Number_Format(len(xy), 0, True) + " vertices for near vertices...", 0)
+        arcpy.SetProgressorLabel("Checking for near vertices...")
+
+        iA, iB, dist = QA_Geometry.FindNearVertices(xy, iFrom, minDist)
+        iCnt = len(iA)
+        timer.Count("near vertex pairs", iCnt)
+
+        if iCnt == 0:
+            PrintMsg(" \nNo near vertices detected (less than " + Number_Format(minDist, 3, False) + " " + theUnits + ") \n ", 0)
+            return True
+
+        PrintMsg("Flagged " + Number_Format(iCnt, 0, True) + " pairs of near vertices closer than " + str(minDist) + " " + theUnits, 2)
+
+        nearLayer = MakePointsLayer(outputSR, minDist, unitAbbrev, "QA_NearVertices_")
+
+        if nearLayer == "":
+            return False
+
+        writer = QA_Output.QAWriter()
+        writer.AddOutput("near", os.path.join(env.workspace, nearLayer), "POINT", ["POLYID","NEAR_POLYID","LENGTH_" + unitAbbrev])
+        writer.AddPoints("near", (xy[iA] + xy[iB]) / 2.0, [vertexPolys[iA].astype(int), vertexPolys[iB].astype(int), dist])
+        writer.Write("Saving near vertex points...")
+
+        # create new featurelayer from near vertex points
+        layerFile = os.path.join(os.path.dirname(sys.argv[0]),"RedDot.lyr")
+        nearLayerName = "QA Near Vertex Points (" + str(minDist) + " " + unitAbbrev + ")"
+        arcpy.MakeFeatureLayer_management(nearLayer, nearLayerName)
+        arcpy.env.addOutputsToMap = True
+        arcpy.ApplySymbologyFromLayer_management (nearLayerName, layerFile)
+
+        return True
+
+    except:
+        errorMsg()
+        return False
+
+## ===================================================================================
+def MakePointsLayer(outputSR, minDist, unitAbbrev, thePrefix="QA_VertexFlags_"):
     # Create points shapefile in memory containing midpoint coordinates for short line segments.
     # Return table to ProcessLayer so that records can be added.
+    # Near vertex points (thePrefix "QA_NearVertices_") also get the id of the second polygon.
     #
     try:
         # Set workspace to that of the input polygon featureclass
@@ -289,7 +343,7 @@ def MakePointsLayer(outputSR, minDist, unitAbbrev):
             PrintMsg(" \n" + loc + " is a " + dt + " datatype", 2)
             return ""
 
-        pointsLayer = "QA_VertexFlags_" + str(minDist).replace(".", "_") + ext
+        pointsLayer = thePrefix + str(minDist).replace(".", "_") + ext
         PrintMsg(" \nOutput points layer: " + os.path.join(env.workspace,pointsLayer), 1)
         arcpy.CreateFeatureclass_management(env.workspace, pointsLayer, "POINT", "", "DISABLED","DISABLED", outputSR)
 
@@ -299,6 +353,10 @@ def MakePointsLayer(outputSR, minDist, unitAbbrev):
             try:
                 # "POLYID","SEGNO","LENGTH"
                 arcpy.AddField_management(pointsLayer, "POLYID", "LONG")
+
+                if thePrefix == "QA_NearVertices_":
+                    arcpy.AddField_management(pointsLayer, "NEAR_POLYID", "LONG")
+
                 arcpy.AddField_management(pointsLayer, "LENGTH" + "_" + unitAbbrev.upper(), "DOUBLE", "12", "3")
                 # Add new field to track status of each point
                 arcpy.AddField_management(pointsLayer, "Status", "TEXT", "", "", 10, "Status")
@@ -444,7 +502,9 @@ def Number_Format(num, places=0, bCommas=True):
 ## ===================================================================================
 ## MAIN
 import sys, string, os, locale, math, operator, traceback, arcpy
+import numpy as np
 from arcpy import env
+import QA_Geometry, QA_Checks, QA_Cache, QA_Output, ToolTiming
 
 try:
     # Set formatting for numbers
@@ -464,6 +524,20 @@ try:
     # Output featurelayer containing flagged vertices (too close to neighbor)
     outLayer = arcpy.GetParameterAsText(3)
 
+    # Optional. Also check for non-adjacent vertices closer than minDist anywhere in the layer
+    try:
+        bNearVertex = arcpy.GetParameter(4) == True
+
+    except:
+        bNearVertex = False
+
+    # Optional. Only summarize the polygons that have changed since the last run
+    try:
+        bUseCache = arcpy.GetParameter(5) == True
+
+    except:
+        bUseCache = False
+
     env.overwriteOutput = True
 
     # An initial description of the input is required
@@ -580,7 +654,13 @@ try:
     #
 
     # run process
-    bProcessed = ProcessLayer(inLayer, outputSR, outLayer, minDist, iSelection)
+    timer = ToolTiming.RunTimer("QA_VertexFlags")
+    bProcessed = ProcessLayer(inLayer, outputSR, outLayer, minDist, iSelection, bNearVertex, bUseCache)
+    PrintMsg(" \n" + timer.Summary(), 0)
+    reportPath = timer.Save()
+
+    if reportPath != "":
+        PrintMsg("Timing report saved to " + reportPath + " \n ", 0)
 
     try:
         del inLayer
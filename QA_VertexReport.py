@@ -22,6 +22,16 @@
 # the unique values.
 #
 # 10-31-2013
+#
+# 10-18-2026 Geometry is read as WKB and summarized by QA_Geometry.GetPolygonStatistics instead of
+# looping over every point.
+#
+# 10-18-2026 ProcessLayerBySum reads the layer once with the summary field included and accumulates
+# the statistics for each value, instead of selecting and reading the layer once per value. This also
+# resolves the 07-22-2013 selected set issue, the selection is no longer replaced.
+#
+# 10-18-2026 The statistics for each value and the report rows come from QA_Checks (SummarizeByValue,
+# VertexReportRows), the same code that QA_ParallelRunner runs.
 
 class MyError(Exception):
     pass
@@ -205,7 +215,7 @@ def ProcessLayer(inLayer, inField, outputSR):
         minDist = 1000
         bHasMultiPart = False
 
-        fieldList = ["OID@","SHAPE@","SHAPE@AREA","SHAPE@LENGTH"]
+        fieldList = ["OID@","SHAPE@WKB"]
         formatList = (15,15,15,15,15,20)
         hdrList = ["Polygons","Acres","Vertices","Avg_Length","Min_Length","IsMultiPart"]
         dashedLine = "    |------------------------------------------------------------------------------------------|"
@@ -227,82 +237,45 @@ def ProcessLayer(inLayer, inField, outputSR):
         pointCnt = 0
         sumPerimeter = 0
 
-        with arcpy.da.SearchCursor(inLayer, fieldList, "", outputSR) as sCursor:
-            # Select polgyons with the current attribute value and process the geometry for each
-            iPartCnt = 0
-
-            for row in sCursor:
-                # Process a polygon record. row[1] is the same as feat or SHAPE
-                fid, feat, theArea, thePerimeter = row # do I need to worry about NULL geometry here?
-
-                if not feat is None:
-                    polygonCnt += 1
-                    iPnts = feat.pointCount
-                    pointCnt += iPnts
-                    iPartCnt = feat.partCount
-
-                    if feat.partCount > 1:
-                        iPartCnt += 1
-                        bHasMultiPart = True
-
-                    elif iPartCnt == 0:
-                        # bad polygon
-                        raise MyError, "Bad geometry for polygon #" + str(fid)
-
-                    sumArea += theArea
-                    sumPerimeter += thePerimeter
-
-                    for part in feat:
-                        # accumulate 2 points for each segment
-                        pntList = []  # initialize points list for polygon
+        # convert mapunit area to acres
+        if theUnits == "meters":
+            acreFactor = 4046.85643
 
-                        for pnt in part:
-                            if pnt:
-                                # add vertice or to-node coordinates to list
+        elif theUnits == "feet_us":
+            acreFactor = 43560.0
 
-                                if len(pntList) == 2:
-                                    # calculate current segment length using 2 points
-                                    dist = math.hypot(pntList[0][0] - pntList[1][0], pntList[0][1] - pntList[1][1] )
-
-                                    if dist < iSeg:
-                                        iSeg = dist
-
-                                    # then drop the first point from the list
-                                    pntList.pop(0)
-
-                                # add the next point
-                                pntList.append((pnt.X,pnt.Y))
-
-                            else:
-                                # interior ring encountered
-                                #PrintMsg("\t\t\tInterior Ring...", 0)
-                                pntList = []  # reset points list for interior ring
+        else:
+            PrintMsg(" \nFailed to calculate acre value using unit: " + theUnits, 2)
+            return False
 
-                else:
-                    raise MyError, "NULL geometry for polygon #" + str(fid)
+        with arcpy.da.SearchCursor(inLayer, fieldList, "", outputSR) as sCursor:
+            # Geometry is read as WKB and summarized in batches by QA_Geometry
+            iPartCnt = 0
 
-                # convert mapunit area to acres
-                if theUnits == "meters":
-                    sumAcres = sumArea / 4046.85643
+            for batch in QA_Geometry.ReadPolygonArrays(sCursor):
 
-                elif theUnits == "feet_us":
-                    sumAcres = sumArea / 43560.0
+                if len(batch.badOids) > 0:
+                    raise MyError, "NULL geometry for polygon #" + str(batch.badOids[0])
 
-                else:
-                    PrintMsg(" \nFailed to calculate acre value using unit: " + theUnits, 2)
-                    return False
+                stats = QA_Geometry.GetPolygonStatistics(batch)
+                polygonCnt += len(batch.oids)
+                pointCnt += int(stats.vertices.sum())
+                sumArea += stats.area.sum()
+                sumPerimeter += stats.perimeter.sum()
+                iPartCnt += int(stats.multipart.sum())
 
-                # calculate average vertex interval for this polygon
-                avi = sumPerimeter / pointCnt
+                if len(batch.oids) > 0:
+                    iSeg = min(iSeg, stats.minSegment.min())
 
-                if iSeg < minDist:
-                    minDist = iSeg
+                arcpy.SetProgressorPosition(polygonCnt)
 
-                #outRow = [sumAcres, pointCnt,avi,iSeg,iPartCnt]
+            sumAcres = sumArea / acreFactor
 
-                #iCursor.insertRow(outRow)
+            if iPartCnt > 0:
+                bHasMultiPart = True
 
-                arcpy.SetProgressorPosition()
+            if iSeg < minDist:
+                minDist = iSeg
 
             # calculate average vertex interval for the current value
             avgInterval = sumPerimeter / pointCnt
@@ -385,34 +358,56 @@ def ProcessLayerBySum(inLayer, inField, outputSR):
         else:
             return False
 
-        # Create a list of unique values for the inField
-        fieldList = [inField.name]
-        fldType = inField.type
-        valList = [row[0] for row in arcpy.da.SearchCursor(inLayer, fieldList)]
-        uniqueList = list(set(valList))
-        uniqueList.sort()
-        del valList
+        # conversion factor for acres
+        if theUnits == "meters":
+            acreFactor = 4046.85643
+
+        elif theUnits == "feet_us":
+            acreFactor = 43560.0
 
-        if len(uniqueList) > 0:
+        else:
+            PrintMsg(" \nFailed to calculate acre value using unit: " + theUnits, 2)
+            return False
+
+        # Read the layer once, accumulating the polygon statistics for each inField value.
+        # The selected set or definition query on the input layer is used as-is.
+        # dStats[val] = [polygons, area, vertices, perimeter, minimum segment, multipart polygons]
+        maxV = 100000  # set a polygon-vertex limit that will trigger a warning
+        bigPolyList = list()  # add the polygon id to this list if it exceeds the limit
+        dStats = dict()
+        fieldList = ["OID@","SHAPE@WKB",inField.name]
+        iCnt = int(arcpy.GetCount_management(inLayer).getOutput(0))
+        arcpy.SetProgressorLabel("Reading polygon geometry...")
+        arcpy.SetProgressor("step", "Reading polygon geometry...",  0, iCnt, 1)
+        iPolys = 0
+
+        with arcpy.da.SearchCursor(inLayer, fieldList, "", outputSR) as sCursor:
+            # Geometry is read as WKB and summarized in batches by QA_Geometry
+
+            for batch in QA_Geometry.ReadPolygonArrays(sCursor):
+
+                if len(batch.badOids) > 0:
+                    raise MyError, "Null geometry for polygon #" + str(batch.badOids[0])
+
+                stats = QA_Geometry.GetPolygonStatistics(batch)
+                QA_Checks.SummarizeByValue(batch, stats, dStats)
+
+                for i in np.nonzero(stats.vertices > maxV)[0]:
+                    bigPolyList.append(str(batch.oids[i]))
+
+                iPolys += len(batch.oids)
+                arcpy.SetProgressorPosition(iPolys)
+
+        # report rows sorted by value and the summary for the entire dataset
+        reportRows, totals = QA_Checks.VertexReportRows(dStats, acreFactor)
+        polygonTotal, totalAcres, pointTotal, avgInterval, minDist, iPartTotal = totals
+        bHasMultiPart = iPartTotal > 0
+
+        if len(reportRows) > 0:
             # only proceed if list contains unique values to be processed
-            PrintMsg(" \nFound " + Number_Format(len(uniqueList), 0, True) + " unique values for " + inFieldName + " \n ", 0)
-
-            # if the input is a featurelayer, need to see if there is a selection set or definition query that needs to be maintained
-            #
-            # initialize summary variables for entire dataset
-            polygonTotal = 0
-            totalArea = 0
-            totalAcres = 0
-            pointTotal = 0
-            totalPerimeter = 0
-            minDist = 1000000
-            bHasMultiPart = False
-            maxV = 100000  # set a polygon-vertex limit that will trigger a warning
-            bigPolyList = list()  # add the polygon id to this list if it exceeds the limit
-
-            fieldList = ["OID@","SHAPE@","SHAPE@AREA","SHAPE@LENGTH"]
-            newFieldName = arcpy.ParseFieldName(inField.name).split(",")[3].strip()
+            PrintMsg(" \nFound " + Number_Format(len(reportRows), 0, True) + " unique values for " + inFieldName + " \n ", 0)
 
+            newFieldName = arcpy.ParseFieldName(inField.name).split(",")[3].strip()
             formatList = (20,15,15,15,15,15,15)
             hdrList = [newFieldName.capitalize(),"Polygons","Acres","Vertices","Avg_Length","Min_Length","IsMultiPart"]
             dashedLine = "    |----------------------------------------------------------------------------------------------------------|"
@@ -424,125 +419,19 @@ def ProcessLayerBySum(inLayer, inField, outputSR):
             PrintMsg(newHdr, 0)
             PrintMsg(dashedLine, 0)
 
-            for val in uniqueList:
-                arcpy.SetProgressorLabel("Reading polygon geometry for " + inField.name + " value:  " + str(val)  + "...")
-
-                #if fldType != "OID":
-                theSQL = arcpy.AddFieldDelimiters(inLayer, inField.name) + " = '" + val + "'"
-
-                #else:
-                #    theSQL =  inField.name  + " = " + str(val)
-
-                arcpy.SelectLayerByAttribute_management(inLayer, "NEW_SELECTION", theSQL)
-
-                iCnt = int(arcpy.GetCount_management(inLayer).getOutput(0))
-                arcpy.SetProgressor("step", "Reading polygon geometry for " + inField.name + " value:  " + str(val)  + "...",  0, iCnt, 1)
+            for val, polygonCnt, sumAcres, pointCnt, avgInterval, iSeg, iPartCnt in reportRows:
 
-                if val.strip() == "":
+                if val is None or val.strip() == "":
                     # if some values aren't populated, insert string 'NULL' into report table
                     val = "<NULL>"
 
-                #PrintMsg(" \nSummarizing polygon statistics for " + inField.name + " value: '" + val + "'", 1)
-                # initialize variables for the current value (eg. NE109)
-                iSeg = 1000000  # use an arbitrarily high segment length to initialize segment length
-                polygonCnt = 0
-                sumArea = 0
-                sumAcres = 0
-                pointCnt = 0
-                sumPerimeter = 0
+                if inFieldName != "":
+                    outRow = [val, sumAcres, pointCnt,avgInterval,iSeg,iPartCnt]
 
-                with arcpy.da.SearchCursor(inLayer, fieldList, "", outputSR) as sCursor:
-
-                    # Select polgyons with the current attribute value and process the geometry for each
-                    iPartCnt = 0
-
-                    for row in sCursor:
-                        # Process a polygon record. row[1] is the same as feat
-                        fid, feat, theArea, thePerimeter = row # do I need to worry about NULL geometry here?
-
-                        if not feat is None:
-                            polygonCnt += 1
-
-                            if feat.partCount > 1:
-                                iPartCnt += 1
-                                bHasMultiPart = True
-
-                            elif feat.partCount == 0:
-                                raise MyError, "Bad geometry for polygon #" + str(fid)
-
-                            iPnts = feat.pointCount
-
-                            if iPnts > maxV:
-                                bigPolyList.append(str(fid))
-
-                            pointCnt += iPnts
-                            sumArea += theArea
-                            sumPerimeter += thePerimeter
-
-                            for part in feat:
-                                # accumulate 2 points for each segment
-                                pntList = []  # initialize points list for polygon
-
-                                for pnt in part:
-                                    if pnt:
-                                        # add vertice or to-node coordinates to list
-
-                                        if len(pntList) == 2:
-                                            # calculate current segment length using 2 points
-                                            dist = math.hypot(pntList[0][0] - pntList[1][0], pntList[0][1] - pntList[1][1] )
-
-                                            if dist < iSeg:
-                                                iSeg = dist
-
-                                            # then drop the first point from the list
-                                            pntList.pop(0)
-
-                                        # add the next point
-                                        pntList.append((pnt.X,pnt.Y))
-
-                                    else:
-                                        # interior ring encountered
-                                        #PrintMsg("\t\t\tInterior Ring...", 0)
-                                        pntList = []  # reset points list for interior ring
-
-                            arcpy.SetProgressorPosition()
-
-                        else:
-                            raise MyError, "Null geometry for polygon #" + str(fid)
-
-                    # convert mapunit area to acres
-                    if theUnits == "meters":
-                        sumAcres = sumArea / 4046.85643
-
-                    elif theUnits == "feet_us":
-                        sumAcres = sumArea / 43560.0
-
-                    else:
-                        PrintMsg(" \nFailed to calculate acre value using unit: " + theUnits, 2)
-                        return False
-
-                    # calculate average vertex interval for this polygon
-                    avi = sumPerimeter / pointCnt
-
-                    if iSeg < minDist:
-                        minDist = iSeg
-
-                    if inFieldName != "":
-                        outRow = [val, sumAcres, pointCnt,avi,iSeg,iPartCnt]
-
-                    else:
-                        outRow = [sumAcres, pointCnt,avi,iSeg,iPartCnt]
-
-                    iCursor.insertRow(outRow)
-
-                    arcpy.ResetProgressor()
+                else:
+                    outRow = [sumAcres, pointCnt,avgInterval,iSeg,iPartCnt]
 
-                # calculate average vertex interval for the current value
-                avgInterval = sumPerimeter / pointCnt
-                polygonTotal += polygonCnt
-                totalAcres += sumAcres
-                pointTotal += pointCnt
-                totalPerimeter += sumPerimeter
+                iCursor.insertRow(outRow)
 
                 # print statistics to console window
                 #
@@ -556,27 +445,16 @@ def ProcessLayerBySum(inLayer, inField, outputSR):
 
                 PrintMsg(newMsg, 0)
 
-                #arcpy.SetProgressorPosition()
-
         else:
             PrintMsg(" \nFailed to create list of unique " + inFieldName + " values", 2)
             return False
 
         arcpy.ResetProgressor()
 
-        # calculate average vertex interval for entire dataset
-        # if the cursor selection fails, this will throw a divide-by-zero error
-        if pointTotal > 0:
-            avgInterval = totalPerimeter / pointTotal
-
-        else:
-            avgInterval = -1
-
-        # get minimum segment length for entire dataset
-        if iSeg < minDist:
-            minDist = iSeg
-
         # print final summary statistics for entire dataset
+        # average vertex interval for entire dataset is -1 when no vertices were read
+        avgInterval = totals[3]
+
         if bHasMultiPart:
             totalMsg = ["",Number_Format(polygonTotal, 0, True), Number_Format(totalAcres, 1, True), Number_Format(pointTotal, 0, True), Number_Format(avgInterval, 3, True), Number_Format(minDist, 3, True), "Has Multipart!"]
 
@@ -600,7 +478,6 @@ def ProcessLayerBySum(inLayer, inField, outputSR):
         # Add QA_VertexReport table to ArcMap TOC
         PrintMsg(" \nPolygon statistics saved to " + statsTbl, 0)
         arcpy.SetParameter(3, statsTbl)
-        arcpy.SelectLayerByAttribute_management(inLayer, "CLEAR_SELECTION")
 
         return True
 
@@ -773,7 +650,9 @@ def elapsedTime(start):
 ## ===================================================================================
 ## MAIN
 import sys, string, os, locale, time, math, operator, traceback, collections, arcpy
+import numpy as np
 from arcpy import env
+import QA_Geometry, QA_Checks
 
 try:
     # Set formatting for numbers
@@ -122,6 +122,18 @@ def RTSDprojectExists(prjRecordFCpath,selectedProjects):
         errorMsg()
 
 
+## ===================================================================================
+def getMukeyDomain(ssurgoMUpoly):
+    # Return the set of MUKEY values in the ssurgoInput layer. The set is read with one cursor
+    # the first time and kept in mukeyDomains, so checking out several projects against the
+    # same layer only reads it once.
+
+    if not ssurgoMUpoly in mukeyDomains:
+        mukeyField = FindField(ssurgoMUpoly, "MUKEY")
+        mukeyDomains[ssurgoMUpoly] = set([row[0] for row in arcpy.da.SearchCursor(ssurgoMUpoly, (mukeyField))])
+
+    return mukeyDomains[ssurgoMUpoly]
+
 ## ===================================================================================
 def getNasisMukeys(theURL, theProject, ssurgoMUpoly):
     # Create a list of NASIS MUKEY values (keys) & project names (values)
@@ -129,8 +141,7 @@ def getNasisMukeys(theURL, theProject, ssurgoMUpoly):
 
     try:
         nasisMUKEYs = []  # List of MUKEYs pertaining to the project and parsed from the NASIS report
-        mukeyMissing = [] # List of missing MUKEYs from ssurgoInput layer
-        mukeyAvailable = [] # list of available MUKEYs in ssurgoInput layer
+        nasisSet = set()  # same MUKEYs, used to skip duplicates
 
         AddMsgAndPrint(" \nRetrieving mapunits for '" + theProject + "' from NASIS", 0)
 
@@ -138,13 +149,15 @@ def getNasisMukeys(theURL, theProject, ssurgoMUpoly):
         theURL = theURL + '&p1='  + theProject.replace(" ","%20") # + "*"
 
         # Open a network object using the URL with the search string already concatenated
+        # and read the whole report
         theReport = urllib.urlopen(theURL)
+        theLines = theReport.read().splitlines()
+        theReport.close()
 
         bValidRecord = False # boolean that marks the starting point of the mapunits listed in the project
-        mukeyField = FindField(ssurgoMUpoly, "MUKEY")
 
         # iterate through the report until a valid record is found
-        for theValue in theReport:
+        for theValue in theLines:
 
             theValue = theValue.strip() # removes whitespace characters
 
@@ -160,16 +173,10 @@ def getNasisMukeys(theURL, theProject, ssurgoMUpoly):
                     theMUKEY = theRec[1]
 
                     # Add MUKEY to the nasisMUKEY list if it doesn't already exist
-                    if not theMUKEY in nasisMUKEYs:
+                    if not theMUKEY in nasisSet:
+                        nasisSet.add(theMUKEY)
                         nasisMUKEYs.append(theMUKEY)
 
-                        # Check if MUKEY is found in ssurgoInput layer
-                        expression = arcpy.AddFieldDelimiters(ssurgoMUpoly,mukeyField) + " = '" + theMUKEY + "'"
-                        if not len([row[0] for row in arcpy.da.SearchCursor(ssurgoMUpoly, (mukeyField), where_clause=expression)]):
-                            mukeyMissing.append(theMUKEY)
-                        else:
-                            mukeyAvailable.append(theMUKEY)
-
             else:
                 if theValue.startswith('<div id="ReportData">BEGIN'):
                     bValidRecord = True
@@ -181,6 +188,11 @@ def getNasisMukeys(theURL, theProject, ssurgoMUpoly):
         else:
             AddMsgAndPrint(" \tIdentified " + Number_Format(len(nasisMUKEYs), 0, True) + " mapunits from NASIS belonging to this project", 0)
 
+        # Check which MUKEYs are found in ssurgoInput layer
+        mukeyDomain = getMukeyDomain(ssurgoMUpoly)
+        mukeyAvailable = [theMUKEY for theMUKEY in nasisMUKEYs if theMUKEY in mukeyDomain]   # list of available MUKEYs in ssurgoInput layer
+        mukeyMissing = [theMUKEY for theMUKEY in nasisMUKEYs if not theMUKEY in mukeyDomain] # List of missing MUKEYs from ssurgoInput layer
+
         #All MUKEYS are missing from ssurgoInput Layer; Warn user and return False
         if len(mukeyMissing) == len(nasisMUKEYs):
             AddMsgAndPrint(" \tAll MUKEYs from this project are missing from your SSURGO MUPOLYGON layer",2)
@@ -190,7 +202,7 @@ def getNasisMukeys(theURL, theProject, ssurgoMUpoly):
             AddMsgAndPrint( " \t The following " + str(len(mukeyMissing)) + " MUKEYS are missing from the SSURGO MUPOLYGON layer:", 1)
             AddMsgAndPrint(" \t\t" + str(mukeyMissing),1)
 
-        del theURL, theReport, bValidRecord
+        del theURL, theReport, theLines, bValidRecord
         return mukeyAvailable
 
     except IOError:
@@ -202,14 +214,19 @@ def getNasisMukeys(theURL, theProject, ssurgoMUpoly):
         return ""
 
 ## ===================================================================================
-def appendToProjectRecord(nasisMUKEYs, prjRecordFC, regionOwnership, ssurgoInput, currentProject):
+def checkOutProjects(verifiedProjects, dProjects, prjRecordFC, regionOwnership, ssurgoInput):
+# Check out every project in verifiedProjects, in that order, in one pass. dProjects is
+# {project name: list of NASIS MUKEYs}.
+# The project mapunit polygons are read with one cursor, checked against the region
+# ownership and Project_Record polygons using in-memory extent grids (QA_Geometry.ExtentGrid)
+# and then added to the Project_Record feature class with one insert cursor.
+# A layer file is saved for each project. Returns the list of projects that were checked out.
 
     try:
         arcpy.env.overwriteOutput = True
         rtsdDB = GetWorkspace(prjRecordFC)
-        rtsdDir = os.path.dirname(rtsdDB)
-        ssurgoInputLayer = arcpy.ValidateTableName(currentProject)
         env.workspace = rtsdDB
+        projectList = [project for project in verifiedProjects if len(dProjects[project])]
 
         # Parse Region # from the RTSD FGDB name
         try:
@@ -217,170 +234,158 @@ def appendToProjectRecord(nasisMUKEYs, prjRecordFC, regionOwnership, ssurgoInput
         except:
             userRegion = "XX"   # could not parse number; set it to XX
 
-        # Create query expression from available MUKEYS in SSURGO MUPOLYGON
-        bRest = False
-        mukeyField = FindField(ssurgoInput, "MUKEY")
-        sMUKEYS = ""
-
-        for theMUKEY in nasisMUKEYs:
-
-            if bRest:
-                # rest of records only
-                sMUKEYS = sMUKEYS + ",'" + theMUKEY + "'"
-            else:
-                # first record
-                sMUKEYS = "('" + theMUKEY + "'"
-                bRest = True
-
-        sMUKEYS = sMUKEYS + ")"
-        sQuery = '"' + mukeyField + '" IN ' + sMUKEYS
-        arcpy.MakeFeatureLayer_management(ssurgoInput, ssurgoInputLayer, sQuery)  # Create feature layer from MUPOLY using the nasis MUKEYs
-        projectCnt = int(arcpy.GetCount_management(ssurgoInputLayer).getOutput(0))
-
-        spatialRef = str(arcpy.CreateSpatialReference_management("#",ssurgoInput,"#","#","#","#"))
-        env.outputCoordinateSystem = spatialRef
+        # All of the geometry is compared in the Project_Record coordinate system
+        prjRecordSR = arcpy.Describe(prjRecordFC).spatialReference
 
         # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-        # Intersect the mapunits and the region ownership to determine if mapunits extend beyond user's region
-        arcpy.FeatureToPoint_management(ssurgoInputLayer, "tempPnt", "INSIDE")
-        arcpy.Intersect_analysis(["tempPnt",regionOwnership], "tempInt", "ALL")
-        regionValues = set([row[0] for row in arcpy.da.SearchCursor("tempInt", ("Region"))])   #set([10, 5])
-
-        # notify user if mapunits extend beyond user's region
-        if len(regionValues) > 1:
+        # Read the SSURGO mapunit polygons of every project with one cursor
+        AddMsgAndPrint(" \nReading mapunit polygons for " + str(len(projectList)) + " project(s)", 0)
+        mukeyField = FindField(ssurgoInput, "MUKEY")
+        areasymField = FindField(ssurgoInput, "AREASYMBOL")
+        musymField = FindField(ssurgoInput, "MUSYM")
+        dMukeyProjects = dict()   # MUKEY: projects that include it
 
-            for region in regionValues:
+        for project in projectList:
+            for theMUKEY in dProjects[project]:
+                dMukeyProjects.setdefault(theMUKEY, list()).append(project)
 
-                if not region == userRegion:
-                    expression = arcpy.AddFieldDelimiters("tempInt", "Region") + " = " + str(region)
-                    regionCount = [row[0] for row in arcpy.da.SearchCursor("tempInt", ("Region"), where_clause=expression)]
-                    AddMsgAndPrint(" \tThere are " + str(Number_Format(len(regionCount), 0, True)) + " out of " + str(Number_Format(projectCnt, 0, True)) + " project mapunit polygons that extend into Region " + str(region),1)
-                    del expression, regionCount
+        dPolygons = dict([(project, list()) for project in projectList])   # project: list of (areasymbol, musym, shape)
+        mukeyList = sorted(dMukeyProjects.keys())
+        theFields = [mukeyField, areasymField or "OID@", musymField or "OID@", "SHAPE@"]
 
-        # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-        # Intersect the mapunits and the project record fc to determine if there is overlapping mapunits from a different project
-        arcpy.Intersect_analysis([ssurgoInputLayer,prjRecordFC], "tempInt2", "ALL")
-        prjRecValues = set([row[0] for row in arcpy.da.SearchCursor("tempInt2", ("PROJECT_NAME"))])   #set(['SDJR - MLRA 53B - Williams-Bowbells loams (Complexes > 3 percent slope)','SDJR - MLRA 53B - Wabek Complexes'])
+        for i in range(0, len(mukeyList), 1000):
+            sQuery = '"' + mukeyField + '" IN (' + ",".join(["'" + theMUKEY + "'" for theMUKEY in mukeyList[i:i + 1000]]) + ")"
 
-        if len(prjRecValues) > 0:
+            with arcpy.da.SearchCursor(ssurgoInput, theFields, sQuery, prjRecordSR) as cursor:
+                for row in cursor:
+                    if row[3] is None:
+                        continue
 
-            for project in prjRecValues:
+                    theAreasym = row[1] if areasymField else None
+                    theMusym = row[2] if musymField else None
 
-                if not project == currentProject:
-                    expression = arcpy.AddFieldDelimiters("tempInt2", "PROJECT_NAME") + " = '" + project + "'"
-                    prjMuCnt = [row[0] for row in arcpy.da.SearchCursor("tempInt2", ("PROJECT_NAME"), where_clause=expression)]
-                    AddMsgAndPrint(" \tThere are " + str(Number_Format(len(prjMuCnt), 0, True)) + " mapunit polygons that overlap with '" + project + "'",1)
-                    del expression, prjMuCnt
-
-        # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-        # Need to write the SSURGO project mapunits to a fc in order to add fields otherwise schema locks are encountered
-        # Need to write the SSURGO project mapunits to a fc in order to add fields otherwise schema locks are encountered
-        tempPrjMapunits = theDB + os.sep + arcpy.ValidateTableName(currentProject.replace(" ","_"))
+                    for project in dMukeyProjects[row[0]]:
+                        dPolygons[project].append((theAreasym, theMusym, row[3]))
 
-        if arcpy.Exists(tempPrjMapunits):
-            arcpy.Delete_management(tempPrjMapunits)
+        # Grid cell size from the average extent of the project mapunit polygons
+        extents = [shape.extent for project in projectList for (theAreasym, theMusym, shape) in dPolygons[project]]
 
-        arcpy.CopyFeatures_management(ssurgoInputLayer, tempPrjMapunits)
-        arcpy.AddField_management(tempPrjMapunits,"PROJECT_NAME", "TEXT", "", "", 254)
-        arcpy.AddField_management(tempPrjMapunits,"STATUS", "TEXT", "", "", 20)
-        arcpy.AddField_management(tempPrjMapunits,"RECERT_NEEDED", "TEXT", "", "", 5)
+        if len(extents) == 0:
+            AddMsgAndPrint(" \tNo mapunit polygons were found for the selected projects", 2)
+            return list()
 
-        arcpy.CalculateField_management(tempPrjMapunits, "PROJECT_NAME", "\"" + currentProject + "\"", "PYTHON_9.3")
-        arcpy.CalculateField_management(tempPrjMapunits,"STATUS", "\"Complete\"","PYTHON_9.3")
-        arcpy.CalculateField_management(tempPrjMapunits, "RECERT_NEEDED", "\"No\"","PYTHON_9.3")
+        cellSize = max(sum([max(ext.width, ext.height) for ext in extents]) / len(extents), 1.0)
+        batchExtent = (min([ext.XMin for ext in extents]) - cellSize, min([ext.YMin for ext in extents]) - cellSize, \
+                       max([ext.XMax for ext in extents]) + cellSize, max([ext.YMax for ext in extents]) + cellSize)
 
-        fieldMap = GetFieldInfo(tempPrjMapunits)
+        # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+        # Load the region ownership polygons and the Project_Record polygons near the projects into extent grids
+        regionGrid = None
 
-        arcpy.Append_management(tempPrjMapunits, prjRecordFC, "NO_TEST",fieldMap)
-        outLayer = theDir + os.sep + arcpy.ValidateTableName(currentProject)
+        with arcpy.da.SearchCursor(regionOwnership, ["Region", "SHAPE@"], spatial_reference=prjRecordSR) as cursor:
+            regionPolys = [(row[0], row[1]) for row in cursor if not row[1] is None]
 
-        if arcpy.Exists(outLayer):
-            arcpy.Delete_management(outLayer)
+        if len(regionPolys):
+            regionGrid = QA_Geometry.ExtentGrid(max([max(shape.extent.width, shape.extent.height) for region, shape in regionPolys]) / 4.0)
 
-        arcpy.SaveToLayerFile_management(ssurgoInputLayer,outLayer,"ABSOLUTE")
+            for region, shape in regionPolys:
+                ext = shape.extent
+                regionGrid.Add((ext.XMin, ext.YMin, ext.XMax, ext.YMax), (region, shape))
 
-        AddMsgAndPrint("\tSuccessfully added " + str(Number_Format(projectCnt, 0, True)) + " mapunit polygons to the ProjectRecord feature class", 0)
+        prjGrid = QA_Geometry.ExtentGrid(cellSize)
 
-        del rtsdDB, rtsdDir, bRest, sMUKEYS, mukeyField, sQuery, spatialRef, regionValues
+        with arcpy.da.SearchCursor(prjRecordFC, ["PROJECT_NAME", "SHAPE@"], spatial_reference=prjRecordSR) as cursor:
+            for row in cursor:
+                if row[1] is None:
+                    continue
 
-        if arcpy.Exists("tempPnt"):
-            arcpy.Delete_management("tempPnt")
+                ext = row[1].extent
 
-        if arcpy.Exists("tempInt"):
-            arcpy.Delete_management("tempInt")
+                if ext.XMin <= batchExtent[2] and ext.XMax >= batchExtent[0] and ext.YMin <= batchExtent[3] and ext.YMax >= batchExtent[1]:
+                    prjGrid.Add((ext.XMin, ext.YMin, ext.XMax, ext.YMax), (row[0], row[1]))
 
-        if arcpy.Exists("tempInt2"):
-            arcpy.Delete_management("tempInt2")
+        # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+        # Check each project in the order they were selected. Projects checked out earlier in the batch
+        # are added to the Project_Record grid so that overlaps between them are reported as well.
+        newRows = list()
+        checkedOut = list()
 
-        if arcpy.Exists(tempPrjMapunits):
-            arcpy.Delete_management(tempPrjMapunits)
+        for currentProject in projectList:
+            AddMsgAndPrint(" \nChecking out '" + currentProject + "'", 0)
+            polygons = dPolygons[currentProject]
+            projectCnt = len(polygons)
+            dRegionCnt = dict()   # region: number of project polygons with their inside point in that region
+            dPrjMuCnt = dict()    # project: number of overlapping polygon pairs
 
-        if arcpy.Exists(ssurgoInputLayer):
-            arcpy.Delete_management(ssurgoInputLayer)
+            for theAreasym, theMusym, shape in polygons:
+                ext = shape.extent
+                polyExtent = (ext.XMin, ext.YMin, ext.XMax, ext.YMax)
 
-        return True
-
-    except:
-        errorMsg()
+                # Region ownership of the polygon's inside point
+                if not regionGrid is None:
+                    pnt = shape.labelPoint
+                    pntGeom = arcpy.PointGeometry(pnt, prjRecordSR)
 
-        if arcpy.Exists("tempPnt"):
-            arcpy.Delete_management("tempPnt")
+                    for i in regionGrid.Overlapping((pnt.X, pnt.Y, pnt.X, pnt.Y)):
+                        region, regionShape = regionGrid.values[i]
 
-        if arcpy.Exists("tempInt"):
-            arcpy.Delete_management("tempInt")
+                        if regionShape.contains(pntGeom):
+                            dRegionCnt[region] = dRegionCnt.get(region, 0) + 1
 
-        if arcpy.Exists("tempInt2"):
-            arcpy.Delete_management("tempInt2")
+                # Overlapping mapunits from the project record, touching boundaries don't count
+                for i in prjGrid.Overlapping(polyExtent):
+                    project, prjShape = prjGrid.values[i]
 
-        if arcpy.Exists(tempPrjMapunits):
-            arcpy.Delete_management(tempPrjMapunits)
+                    if not shape.disjoint(prjShape) and not shape.touches(prjShape):
+                        dPrjMuCnt[project] = dPrjMuCnt.get(project, 0) + 1
 
-        if arcpy.Exists(ssurgoInputLayer):
-            arcpy.Delete_management(ssurgoInputLayer)
+            # notify user if mapunits extend beyond user's region
+            if len(dRegionCnt) > 1:
 
-        return False
+                for region in sorted(dRegionCnt.keys()):
 
-## ===================================================================================
-def GetFieldInfo(fc):
+                    if not region == userRegion:
+                        AddMsgAndPrint(" \tThere are " + str(Number_Format(dRegionCnt[region], 0, True)) + " out of " + str(Number_Format(projectCnt, 0, True)) + " project mapunit polygons that extend into Region " + str(region),1)
 
-    # Create and return FieldMapping object containing valid project record fields. Fields
-    # that are not part of project record feature class will not be appended to the project
-    # record fc.
+            for project in sorted(dPrjMuCnt.keys()):
 
-    try:
+                if not project == currentProject:
+                    AddMsgAndPrint(" \tThere are " + str(Number_Format(dPrjMuCnt[project], 0, True)) + " mapunit polygons that overlap with '" + project + "'",1)
 
-        outFields = ['AREASYMBOL','MUSYM','PROJECT_NAME','STATUS','RECERT_NEEDED']
+            for theAreasym, theMusym, shape in polygons:
+                newRows.append((shape, theAreasym, theMusym, currentProject, "Complete", "No"))
+                ext = shape.extent
+                prjGrid.Add((ext.XMin, ext.YMin, ext.XMax, ext.YMax), (currentProject, shape))
 
-        # Create required FieldMappings object and add the fc table as a
-        # FieldMap object
-        fms = arcpy.FieldMappings()
-        fms.addTable(fc)
+            # Save a layer file of the project mapunits for reference
+            ssurgoInputLayer = arcpy.ValidateTableName(currentProject)
+            sQuery = '"' + mukeyField + '" IN (' + ",".join(["'" + theMUKEY + "'" for theMUKEY in dProjects[currentProject]]) + ")"
+            arcpy.MakeFeatureLayer_management(ssurgoInput, ssurgoInputLayer, sQuery)  # Create feature layer from MUPOLY using the nasis MUKEYs
+            outLayer = theDir + os.sep + arcpy.ValidateTableName(currentProject)
 
-        # loop through each field in FieldMappings object
-        for fm in fms.fieldMappings:
+            if arcpy.Exists(outLayer):
+                arcpy.Delete_management(outLayer)
 
-            # Field object containing the properties for the field (aliasName...)
-            outFld = fm.outputField
+            arcpy.SaveToLayerFile_management(ssurgoInputLayer,outLayer,"ABSOLUTE")
+            arcpy.Delete_management(ssurgoInputLayer)
+            checkedOut.append(currentProject)
 
-            # Name of the field
-            fldName = outFld.name
+        # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+        # Append the mapunit polygons of every project to the Project_Record feature class
+        arcpy.SetProgressorLabel("Adding " + Number_Format(len(newRows), 0, True) + " mapunit polygons to the ProjectRecord feature class")
 
-            # remove field from FieldMapping object if it is 'OID' or 'Geometry'
-            # or not in dFieldInfo dictionary (SSURGO schema)
-            if not fldName in outFields:
-                fms.removeFieldMap(fms.findFieldMapIndex(fldName))
+        with arcpy.da.InsertCursor(prjRecordFC, ["SHAPE@", "AREASYMBOL", "MUSYM", "PROJECT_NAME", "STATUS", "RECERT_NEEDED"]) as cursor:
+            for row in newRows:
+                cursor.insertRow(row)
 
-        for fldName in outFields:
-            newFM = fms.getFieldMap(fms.findFieldMapIndex(fldName))
-            fms.removeFieldMap(fms.findFieldMapIndex(fldName))
-            fms.addFieldMap(newFM)
+        AddMsgAndPrint(" \n\tSuccessfully added " + str(Number_Format(len(newRows), 0, True)) + " mapunit polygons for " + str(len(checkedOut)) + " project(s) to the ProjectRecord feature class", 0)
 
-        return fms
+        del rtsdDB, mukeyField, dMukeyProjects, dPolygons, extents, regionPolys, regionGrid, prjGrid, newRows
+        return checkedOut
 
     except:
         errorMsg()
-        fms = arcpy.FieldMappings()
-        return fms
+        return list()
 
 ## ===================================================================================
 def FindField(ssurgoInput, chkField):
@@ -437,6 +442,10 @@ def Number_Format(num, places=0, bCommas=True):
 # Import modules
 import sys, string, os, locale, arcgisscripting, traceback, urllib, re, arcpy
 from arcpy import env
+import QA_Geometry
+
+# MUKEY values of each ssurgoInput layer, read once per session (getMukeyDomain)
+mukeyDomains = dict()
 
 try:
     if __name__ == '__main__':
@@ -468,24 +477,24 @@ try:
             AddMsgAndPrint("\n\tAll selected projects are already checked out!",2)
             os.exit()
 
-        for project in verifiedProjects:
+        # Create dictionary of project name & MUKEY values for every project
+        dProjects = dict()
 
-            # Create dictionary of MUKEY & project name values based on the project
-            nasisMUKEYs = getNasisMukeys(theURL, project, ssurgoInput)
-
-            if len(nasisMUKEYs):
-
-                bCheckOut = appendToProjectRecord(nasisMUKEYs, prjRecordFC, regionOwnership, ssurgoInput, project)
-
-                if bCheckOut:
-                    try:
-                        mxd = arcpy.mapping.MapDocument("CURRENT")
-                        df = arcpy.mapping.ListDataFrames(mxd)[0]
-                        lyr = os.path.join(theDir,project) + ".lyr"
-                        newLayer = arcpy.mapping.Layer(lyr)
-                        arcpy.mapping.AddLayer(df, newLayer, "TOP")
-                    except:
-                        AddMsgAndPrint("\n" + project + ".lyr file was created for reference",0)
+        for project in verifiedProjects:
+            dProjects[project] = getNasisMukeys(theURL, project, ssurgoInput)
+
+        # Check out all of the projects in one pass
+        checkedOut = checkOutProjects(verifiedProjects, dProjects, prjRecordFC, regionOwnership, ssurgoInput)
+
+        for project in checkedOut:
+            try:
+                mxd = arcpy.mapping.MapDocument("CURRENT")
+                df = arcpy.mapping.ListDataFrames(mxd)[0]
+                lyr = os.path.join(theDir,arcpy.ValidateTableName(project)) + ".lyr"
+                newLayer = arcpy.mapping.Layer(lyr)
+                arcpy.mapping.AddLayer(df, newLayer, "TOP")
+            except:
+                AddMsgAndPrint("\n" + project + ".lyr file was created for reference",0)
 
         AddMsgAndPrint(" \n",0)
 
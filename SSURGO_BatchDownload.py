@@ -67,6 +67,13 @@
 # ID604, ID670, WA651
 #
 # 2016-12-16 Converted the SOAP request to POST-REST request to SDaccess.  A.D.
+#
+# 2026-10-18 Surveys are downloaded by a pool of threads (maxThreads) while the main thread unzips
+#            and imports the surveys that have already arrived. Each zip file is written to disk in
+#            chunks through a .part file, which is resumed with an HTTP Range request after a dropped
+#            connection. Each survey gets up to maxTries attempts with an exponential backoff.
+# 2026-10-18 Download, wait and import times and the number of HTTP bytes received are tracked by
+#            ToolTiming.RunTimer. A JSON timing report is saved when SSURGO_TIMING_REPORT is set.
 
 ## ===================================================================================
 def errorMsg():
@@ -390,95 +397,156 @@ def GetTabularDate(newFolder):
         return tabDate
 
 ## ===================================================================================
-def GetDownload(areasym, surveyDate, importDB):
+def GetDownload(areaSym, surveyDate, outputFolder, msgs):
     # download survey from Web Soil Survey URL and return name of the zip file
-    # want to set this up so that download will retry several times in case of error
-    # return empty string in case of complete failure. Allow main to skip a failed
+    # Retries several times in case of error with an increasing wait between attempts.
+    # Return empty string in case of complete failure. Allow main to skip a failed
     # survey, but keep a list of failures
     #
     # Only the version of zip file without a Template database is downloaded. The user
     # must have a locale copy of the Template database that has been modified to allow
     # automatic tabular imports.
+    #
+    # This runs in a download thread, so arcpy is not used here. Messages are saved to
+    # msgs as (message, severity) and written by the main thread.
+    #
+    # The response is written to a .part file in chunks instead of being held in memory.
+    # If a .part file was left by an earlier attempt (or an earlier run), only the rest
+    # of the file is requested using an HTTP Range header. The survey date is part of the
+    # zip file name, so a .part file is never resumed against a newer version.
 
     # create URL string from survey string and WSS 3.0 cache URL
     baseURL = "https://websoilsurvey.sc.egov.usda.gov/DSD/Download/Cache/SSA/"
 
-    try:
-        # List of states that use a Template database other than US_2003.
-        # This list will have to be updated in the future if it is used to
-        # get downloads with the Template database included in the zipfile.
-        dbInfo = {'AK':'AK', 'CT':'CT', 'FL':'FL', 'GA':'GA', 'HI':'HI', 'IA':'IA', \
-        'ID':'ID', 'IN':'IN', 'ME':'ME', 'MI':'MI', 'MN':'MN', 'MT':'MT', 'NC':'NC', \
-        'NE':'NE', 'NJ':'NJ', 'OH':'OH', 'OR':'OR', 'PA':'PA', 'SD':'SD', 'UT':'UT', \
-        'VT':'VT', 'WA':'WA', 'WI':'WI', 'WV':'WV', 'WY':'WY', 'FM':'HI', 'PB':'HI'}
-
-        # Incorporate the name of the Template database into the URL
-        st = areaSym[0:2]
-        if st in dbInfo:
-            db = "_soildb_" + dbInfo[st] + "_2003"
-        else:
-            db = "_soildb_US_2003"
+    # Use this zipfile for downloads without the Template database
+    zipDate = str(surveyDate)[0:4] + "-" + str(surveyDate)[4:6] + "-" + str(surveyDate)[6:8]
+    zipName = "wss_SSA_" + areaSym + "_[" + str(zipDate) + "].zip"
+    zipURL = baseURL + zipName
 
-        # Use this zipfile for downloads without the Template database
-        zipDate = str(surveyDate)[0:4] + "-" + str(surveyDate)[4:6] + "-" + str(surveyDate)[6:8]
-        zipName = "wss_SSA_" + areaSym + "_[" + str(zipDate) + "].zip"
+    # set the download's output location and filename
+    local_zip = os.path.join(outputFolder, zipName)
+    part_zip = local_zip + ".part"
 
-        # Use this URL for downloads with the state or US_2003 database
-        #zipName = "wss_SSA_" + areaSym + db + "_[" + surveyDate + "].zip"
+    for iTry in range(maxTries):
+        if bStop.is_set():
+            # main thread is bailing out
+            return ""
 
-        zipURL = baseURL + zipName
+        if iTry > 0:
+            # wait 2, 4, 8... seconds before trying again
+            sleep(2 ** iTry)
 
-        AddMsgAndPrint("\tDownloading survey " + areaSym + " from Web Soil Survey...", 0)
+        try:
+            # make sure the output zip file doesn't already exist
+            if os.path.isfile(local_zip):
+                os.remove(local_zip)
 
-        # Open request to Web Soil Survey for that zip file
-        request = urlopen(zipURL)
+            if os.path.isfile(part_zip):
+                partSize = os.path.getsize(part_zip)
 
-        # set the download's output location and filename
-        local_zip = os.path.join(outputFolder, zipName)
+            else:
+                partSize = 0
 
-        # make sure the output zip file doesn't already exist
-        if os.path.isfile(local_zip):
-            os.remove(local_zip)
+            # Open request to Web Soil Survey for that zip file
+            request = Request(zipURL)
 
-        # save the download file to the specified folder
-        output = open(local_zip, "wb")
-        output.write(request.read())
-        output.close()
-        del request
-        del output
+            if partSize > 0:
+                request.add_header("Range", "bytes=" + str(partSize) + "-")
+                msgs.append(("\tResuming download of " + areaSym + " at " + Number_Format(partSize / (1024.0 * 1024.0), 3, True) + " MB", 0))
 
-        # if we get this far then the download succeeded
-        return zipName
+            try:
+                response = urlopen(request, timeout=60)
 
-    except URLError, e:
-        if hasattr(e, 'reason'):
-            AddMsgAndPrint("\t\t" + areaSym + " - URL Error: " + str(e.reason), 1)
+            except HTTPError, e:
+                if e.code == 416 and partSize > 0:
+                    # requested range starts at the end of the file, so the .part file is already complete
+                    os.rename(part_zip, local_zip)
+                    return zipName
 
-        elif hasattr(e, 'code'):
-            AddMsgAndPrint("\t\t" + zipName + " - " + e.msg + " (errorcode " + str(e.code) + ")", 1)
+                raise
 
-        return ""
+            if partSize > 0 and response.getcode() == 206:
+                # server is sending the rest of the file
+                mode = "ab"
 
-    except socket.timeout, e:
-        AddMsgAndPrint("\t\t" + areaSym + " - server timeout error", 1)
-        return ""
+            else:
+                # new download, or server ignored the Range header. Start over.
+                mode = "wb"
+                partSize = 0
 
-    except socket.error, e:
-        AddMsgAndPrint("\t\t" + areasym + " - Web Soil Survey connection failure", 1)
-        return ""
+            contentLength = response.info().getheader("Content-Length")
 
-    except httplib.BadStatusLine:
-        AddMsgAndPrint("\t\t" + areasym + " - Web Soil Survey connection failure", 1)
-        return ""
+            # save the download file to the specified folder, one chunk at a time
+            with open(part_zip, mode) as output:
+                while True:
+                    chunk = response.read(chunkSize)
 
-    except:
-        # problem deleting partial zip file after connection error?
-        # saw some locked, zero-byte zip files associated with connection errors
-        AddMsgAndPrint("\tFailed to download zipfile", 0)
-        errorMsg()
-        return ""
-        sleep(1)
-        return ""
+                    if not chunk:
+                        break
+
+                    output.write(chunk)
+                    timer.Count("HTTP bytes", len(chunk))
+
+            response.close()
+
+            if contentLength is not None and os.path.getsize(part_zip) < partSize + int(contentLength):
+                # connection dropped before the whole file arrived. Keep the .part file and resume.
+                msgs.append(("\t\t" + areaSym + " - incomplete download (" + Number_Format(os.path.getsize(part_zip) / (1024.0 * 1024.0), 3, True) + " MB)", 1))
+                continue
+
+            # if we get this far then the download succeeded
+            os.rename(part_zip, local_zip)
+            timer.Count("surveys downloaded")
+            msgs.append(("\tDownloaded survey " + areaSym + " from Web Soil Survey (" + Number_Format(os.path.getsize(local_zip) / (1024.0 * 1024.0), 3, True) + " MB)", 0))
+            return zipName
+
+        except HTTPError, e:
+            msgs.append(("\t\t" + zipName + " - " + str(e.msg) + " (errorcode " + str(e.code) + ")", 1))
+
+            if e.code == 404:
+                # zip file is not in the WSS cache, no point trying again
+                return ""
+
+        except URLError, e:
+            msgs.append(("\t\t" + areaSym + " - URL Error: " + str(e.reason), 1))
+
+        except socket.timeout, e:
+            msgs.append(("\t\t" + areaSym + " - server timeout error", 1))
+
+        except (socket.error, httplib.HTTPException), e:
+            msgs.append(("\t\t" + areaSym + " - Web Soil Survey connection failure", 1))
+
+        except:
+            # problem deleting partial zip file after connection error?
+            # saw some locked, zero-byte zip files associated with connection errors
+            msgs.append(("\tFailed to download zipfile for " + areaSym + " \n" + traceback.format_exc(), 1))
+
+    return ""
+
+## ===================================================================================
+def DownloadWorker(outputFolder, getQueue, doneQueue):
+    # Download thread. Takes (areaSym, surveyDate) from getQueue until it is empty and
+    # puts (areaSym, zipName, msgs) on doneQueue for the main thread to unzip and import.
+
+    while not bStop.is_set():
+        try:
+            areaSym, surveyDate = getQueue.get_nowait()
+
+        except Queue.Empty:
+            return
+
+        msgs = list()
+
+        try:
+            # download time is the total for all threads
+            with timer.Phase("download"):
+                zipName = GetDownload(areaSym, surveyDate, outputFolder, msgs)
+
+        except:
+            msgs.append((traceback.format_exc(), 2))
+            zipName = ""
+
+        doneQueue.put((areaSym, zipName, msgs))
 
 ## ===================================================================================
 def CheckExistingDataset(areaSym, surveyDate, newFolder, newDB):
@@ -569,14 +637,14 @@ def CheckExistingDataset(areaSym, surveyDate, newFolder, newDB):
         return False
 
 ## ===================================================================================
-def ProcessSurvey(outputFolder, importDB, areaSym, bImport, bRemoveTXT, iGet, iTotal):
-    # Download and import the specified SSURGO dataset
+def CheckSurvey(outputFolder, areaSym, bImport):
+    # Get the survey date, name, output folder and database for the specified SSURGO dataset
+    # and check it against any existing local copy. The download is queued only if bNewer.
+    # bNewer is None if the survey could not be checked.
 
     try:
         survey = asDict[areaSym]
-        env.workspace = outputFolder
         surveyInfo = survey.split(",")
-        areaSym = surveyInfo[0].strip().upper()
 
         # get date string
         surveyDate = int(surveyInfo[1].strip().replace("-", ""))
@@ -603,49 +671,46 @@ def ProcessSurvey(outputFolder, importDB, areaSym, bImport, bRemoveTXT, iGet, iT
         #
         bNewer = CheckExistingDataset(areaSym, surveyDate, newFolder, newDB)
 
-        if bNewer:
-            # Get new SSURGO download or replace an older version of the same survey
-            # Otherwise skip download
-            #
-            AddMsgAndPrint(" \nProcessing survey " + areaSym + " (" + str(iGet) + " of " + str(iTotal) + "):  " + surveyName, 0)
+        return surveyDate, surveyName, newFolder, newDB, bNewer
 
-            # First attempt to download zip file
-            zipName = GetDownload(areaSym, surveyDate, importDB)
+    except:
+        errorMsg()
+        return 0, "", "", "", None
 
-            if zipName == "" or zipName is None:
-                # Try downloading zip file a second time
-                sleep(5)
-                zipName = GetDownload(areaSym, surveyDate, importDB)
+## ===================================================================================
+def ProcessSurvey(outputFolder, importDB, areaSym, zipName, bImport, bRemoveTXT, iGet, iTotal):
+    # Unzip and import the downloaded SSURGO dataset
 
-                if zipName == "" or zipName is None:
-                    # Failed second attempt to download zip file
-                    # Give up on this survey
-                    return "Failed"
+    try:
+        surveyDate, surveyName, newFolder, newDB = dSurveys[areaSym]
+        env.workspace = outputFolder
 
-            bZip = UnzipDownload(outputFolder, newFolder, importDB, zipName)
+        AddMsgAndPrint(" \nProcessing survey " + areaSym + " (" + str(iGet) + " of " + str(iTotal) + "):  " + surveyName, 0)
 
-            if not bZip:
-                # Try unzipping a second time
-                sleep(1)
-                bZip = UnzipDownload(outputFolder, newFolder, importDB, zipName)
+        if zipName == "" or zipName is None:
+            # Failed all attempts to download zip file
+            # Give up on this survey
+            return "Failed"
 
-                if not bZip:
-                    # Failed second attempt to unzip
-                    # Give up on this survey
-                    return "Failed"
+        bZip = UnzipDownload(outputFolder, newFolder, importDB, zipName)
 
-            # Import tabular. Only try once.
-            if bImport:
-                if not ImportTabular(areaSym, newFolder, importDB, newDB, bRemoveTXT):
-                    # Bail clear out of the whole download process
-                    return "Failed"
+        if not bZip:
+            # Try unzipping a second time
+            sleep(1)
+            bZip = UnzipDownload(outputFolder, newFolder, importDB, zipName)
 
-            return "Successful"
+            if not bZip:
+                # Failed second attempt to unzip
+                # Give up on this survey
+                return "Failed"
 
-        else:
-            # Existing local dataset is same age or newer than downloaded version
-            # skip it
-            return "Skipped"
+        # Import tabular. Only try once.
+        if bImport:
+            if not ImportTabular(areaSym, newFolder, importDB, newDB, bRemoveTXT):
+                # Bail clear out of the whole download process
+                return "Failed"
+
+        return "Successful"
 
     except:
         errorMsg()
@@ -698,7 +763,7 @@ def UnzipDownload(outputFolder, newFolder, importDB, zipName ):
             else:
                 # Downloaded a zero-byte zip file
                 # download for this survey failed, may try again
-                AddMsgAndPrint("\tEmpty zip file downloaded for " + areaSym + ": " + surveyName, 1)
+                AddMsgAndPrint("\tEmpty zip file downloaded for " + areaSym, 1)
                 os.remove(local_zip)
 
             return True
@@ -1196,15 +1261,17 @@ def AddMuName(newFolder):
 ## ===================================================================================
 # main
 # Import system modules
-import arcpy, sys, os, locale, string, traceback, shutil, zipfile, subprocess, glob, socket, csv, re
-from urllib2 import urlopen, URLError, HTTPError
+import arcpy, sys, os, locale, string, traceback, shutil, zipfile, subprocess, glob, socket, csv, re, httplib, threading, Queue
+from urllib2 import urlopen, Request, URLError, HTTPError
 from arcpy import env
 from _winreg import *
 from datetime import datetime
 from time import sleep
+import ToolTiming
 
 try:
     arcpy.overwriteOutput = True
+    timer = ToolTiming.RunTimer("SSURGO_BatchDownload")
 
     # Script arguments...
     wc = arcpy.GetParameter(0)
@@ -1248,28 +1315,67 @@ try:
 
     asList.sort()
 
-    arcpy.SetProgressor("step", "Downloading SSURGO data...",  0, len(asList), 1)
+    # Download settings. Several surveys are downloaded at once by a pool of threads while
+    # the main thread unzips and imports the surveys that have already arrived.
+    maxThreads = 4           # number of simultaneous Web Soil Survey downloads
+    maxTries = 5             # download attempts per survey
+    chunkSize = 1024 * 1024  # bytes read from the response and written to disk at a time
+    bStop = threading.Event()
+
+    # Check each survey against the existing local datasets and queue the new ones for download
+    dSurveys = dict()
+    getQueue = Queue.Queue()
+    doneQueue = Queue.Queue()
+
+    arcpy.SetProgressorLabel("Checking for existing SSURGO datasets...")
 
-    # Proccess list of areasymbols
-    #
     for areaSym in asList:
-        #
-        # Run import process in order of listed Areasymbol values
-        #
+        with timer.Phase("check existing datasets"):
+            surveyDate, surveyName, newFolder, newDB, bNewer = CheckSurvey(outputFolder, areaSym, bImport)
+
+        if bNewer is None:
+            # Check failed, report it with the failed downloads
+            failedList.append(areaSym)
+
+        elif bNewer:
+            # Get new SSURGO download or replace an older version of the same survey
+            dSurveys[areaSym] = (surveyDate, surveyName, newFolder, newDB)
+            getQueue.put((areaSym, surveyDate))
+
+        else:
+            # Existing local dataset is same age or newer than downloaded version
+            # skip it
+            skippedList.append(areaSym)
+
+    iTotal = len(dSurveys)
+
+    for i in range(min(maxThreads, iTotal)):
+        worker = threading.Thread(target=DownloadWorker, args=(outputFolder, getQueue, doneQueue))
+        worker.daemon = True
+        worker.start()
+
+    arcpy.SetProgressor("step", "Downloading SSURGO data...",  0, iTotal, 1)
+
+    # Proccess the surveys in the order their downloads finish
+    #
+    while iGet < iTotal:
+        with timer.Phase("wait for download"):
+            areaSym, zipName, msgs = doneQueue.get()
+
         iGet += 1
 
+        for msg, severity in msgs:
+            AddMsgAndPrint(msg, severity)
+
         # Run import process
-        iTotal = len(asList)
-        arcpy.SetProgressorLabel("Downloading survey " + areaSym + " from Web Soil Survey  (number " + str(iGet) + " of " + str(len(asList)) + " total)")
-        bProcessed = ProcessSurvey(outputFolder, importDB, areaSym, bImport, bRemoveTXT, iGet, iTotal)
+        arcpy.SetProgressorLabel("Importing survey " + areaSym + " (number " + str(iGet) + " of " + str(iTotal) + " total)")
+        with timer.Phase("unzip and import"):
+            bProcessed = ProcessSurvey(outputFolder, importDB, areaSym, zipName, bImport, bRemoveTXT, iGet, iTotal)
 
         if bProcessed == "Failed":
             failedList.append(areaSym)
             failedCnt += 1
 
-        elif bProcessed == "Skipped":
-            skippedList.append(areaSym)
-
         elif bProcessed == "Successful":
             # download successful
             failedCnt = 0
@@ -1296,10 +1402,23 @@ try:
     arcpy.SetProgressorLabel("Processing complete...")
     env.workspace = outputFolder
 
+    AddMsgAndPrint(" \n" + timer.Summary(), 0)
+    reportPath = timer.Save()
+
+    if reportPath != "":
+        AddMsgAndPrint("Timing report saved to " + reportPath, 0)
+
 except:
     errorMsg()
 
 finally:
+    try:
+        # stop any download threads that are still running
+        bStop.set()
+
+    except:
+        pass
+
     if len(failedList) > 0:
         AddMsgAndPrint(" \n\tWSS download failed for: " + ", ".join(failedList), 2)
 
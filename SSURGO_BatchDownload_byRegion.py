@@ -19,6 +19,10 @@
 # Steve Peaslee and Adolfo Diaz
 #
 # Updated: 2016-12-16 Converted the SOAP request to POST-REST request to SDaccess. -- AD
+#
+# Updated: 2026-10-18 Areaname and version dates are requested from SDaccess for the whole region at once
+#                     (300 areasymbols per request) instead of one request per areasymbol. Results are
+#                     cached in the temp folder for 24 hours (cacheHours) so reruns skip the request.
 
 ## ===================================================================================
 def errorMsg():
@@ -105,42 +109,104 @@ def getRegionalAreaSymbolList(ssaTable, masterTable, userRegionChoice):
         return ""
 
 ## ===================================================================================
-def getSDMaccessDict(areaSymbol):
+def getSDMaccessDict(areaSymbolList):
+    """ Returns a dictionary of Areasymbol, Version Date and Areaname from the SASTATUSMAP table
+        for every areasymbol in areaSymbolList {u'WI001': 'WI001|2011-08-10|Adams County, Wisconsin'}
+
+        Areasymbols are sent to SDaccess in sets of 300 using an IN clause, so a region costs one
+        or two requests instead of one per survey.  Results are saved to a cache file
+        (SSURGO_SASTATUSMAP_Cache.json) in the temp folder and reused until they are older
+        than cacheHours.  Areasymbols that SDaccess did not return, or whose request failed, are
+        left out of the dictionary; the cached entries and the sets that did succeed are still
+        returned."""
 
-    import httplib
+    sdmAccessDict = dict()
 
     try:
 
-        # Create empty list that will contain list of 'Areasymbol, AreaName
-        sdmAccessDict = dict()
+        # Read the cache file and keep the entries that have not expired {u'WI001': [u'WI001|2011-08-10|Adams County, Wisconsin', 1476748800.0]}
+        cacheFile = os.path.join(tempfile.gettempdir(), "SSURGO_SASTATUSMAP_Cache.json")
+        cacheDict = dict()
+        now = time.time()
+
+        if os.path.isfile(cacheFile):
+            try:
+                with open(cacheFile, "r") as f:
+                    cacheDict = json.load(f)
+
+            except:
+                # corrupt or partial cache file; ignore it and query SDaccess
+                cacheDict = dict()
+
+        for areaSymbol in areaSymbolList:
+            if areaSymbol in cacheDict and now - cacheDict[areaSymbol][1] < cacheHours * 3600:
+                sdmAccessDict[areaSymbol] = str(cacheDict[areaSymbol][0])
+
+        getList = [areaSymbol for areaSymbol in areaSymbolList if not areaSymbol in sdmAccessDict]
+
+        if len(sdmAccessDict) > 0:
+            AddMsgAndPrint("\tUsing cached SD Access information for " + str(len(sdmAccessDict)) + " of " + str(len(areaSymbolList)) + " areasymbols", 0)
 
-        #sQuery = "SELECT AREASYMBOL, AREANAME, CONVERT(varchar(10), [SAVEREST], 126) AS SAVEREST FROM SASTATUSMAP WHERE AREASYMBOL LIKE '" + areaSymbol + "' AND SAPUBSTATUSCODE = 2 ORDER BY AREASYMBOL"
-        sQuery = "SELECT AREASYMBOL, AREANAME, CONVERT(varchar(10), [SAVEREST], 126) AS SAVEREST FROM SASTATUSMAP WHERE AREASYMBOL LIKE '" + areaSymbol + "' ORDER BY AREASYMBOL"
+        if len(getList) == 0:
+            return sdmAccessDict
 
         theURL = "https://sdmdataaccess.nrcs.usda.gov"
         url = theURL + "/Tabular/SDMTabularService/post.rest"
 
-        # Create request using JSON, return data as JSON
-        dRequest = dict()
-        dRequest["format"] = "JSON"
-        dRequest["query"] = sQuery
-        jData = json.dumps(dRequest)  # {"QUERY": "SELECT AREASYMBOL, AREANAME, CONVERT(varchar(10), [SAVEREST], 126) AS SAVEREST FROM SASTATUSMAP WHERE AREASYMBOL LIKE \'WI025\' ORDER BY AREASYMBOL", "FORMAT": "JSON"}
+        for valueList in SSURGO_Web.SplitList(getList, 300):
+
+            # convert the list into a comma seperated string
+            values = str(valueList)[1:-1]
+
+            #sQuery = "SELECT AREASYMBOL, AREANAME, CONVERT(varchar(10), [SAVEREST], 126) AS SAVEREST FROM SASTATUSMAP WHERE AREASYMBOL IN (" + values + ") AND SAPUBSTATUSCODE = 2 ORDER BY AREASYMBOL"
+            sQuery = "SELECT AREASYMBOL, AREANAME, CONVERT(varchar(10), [SAVEREST], 126) AS SAVEREST FROM SASTATUSMAP WHERE AREASYMBOL IN (" + values + ") ORDER BY AREASYMBOL"
+
+            # Create request using JSON, return data as JSON
+            dRequest = dict()
+            dRequest["format"] = "JSON"
+            dRequest["query"] = sQuery
+            jData = json.dumps(dRequest)  # {"QUERY": "SELECT AREASYMBOL, AREANAME, CONVERT(varchar(10), [SAVEREST], 126) AS SAVEREST FROM SASTATUSMAP WHERE AREASYMBOL IN ('WI001', 'WI025') ORDER BY AREASYMBOL", "FORMAT": "JSON"}
+
+            # Send request to SDA Tabular service using urllib2 library; You get 2 Attempts
+            req = urllib2.Request(url, jData)
+
+            try:
+                try:
+                    resp = urllib2.urlopen(req)
+
+                except:
+                    AddMsgAndPrint("\t2nd attempt at requesting data from SD Access", 1)
+                    sleep(3)
+                    resp = urllib2.urlopen(req)
 
-        # Send request to SDA Tabular service using urllib2 library
-        req = urllib2.Request(url, jData)
-        resp = urllib2.urlopen(req)
-        jsonString = resp.read()      # {"Table":[["WI025","Dane County, Wisconsin","2016-09-27"]]}
+                jsonString = resp.read()      # {"Table":[["WI001","Adams County, Wisconsin","2011-08-10"],["WI025","Dane County, Wisconsin","2016-09-27"]]}
 
-        # Convert the returned JSON string into a Python dictionary.
-        data = json.loads(jsonString)  # {u'Table': [[u'WI025', u'Dane County, Wisconsin', u'2016-09-27']]}
+                # Convert the returned JSON string into a Python dictionary.
+                data = json.loads(jsonString)
 
-        areasym = data['Table'][0][0]
-        areaname = data['Table'][0][1]
-        date = data['Table'][0][2]
+            except:
+                # Leave this set of areasymbols out of the dictionary and carry on with the next set
+                errorMsg()
+                AddMsgAndPrint(" \n" + sQuery, 1)
+                continue
+
+            if not "Table" in data:
+                continue
 
-        sdmAccessDict[areaSymbol] = (areasym + "|" + str(date) + "|" + areaname)
+            for areasym, areaname, date in data['Table']:
+                areasym = areasym.upper()
+                sdmAccessDict[areasym] = (areasym + "|" + str(date) + "|" + areaname)
+                cacheDict[areasym] = [sdmAccessDict[areasym], now]
 
-        del sQuery,theURL,url,dRequest,jData,req,resp,jsonString,data,areasym,areaname,date
+        # Save the cache for the next run
+        try:
+            with open(cacheFile, "w") as f:
+                json.dump(cacheDict, f)
+
+        except:
+            AddMsgAndPrint("\tUnable to save SD Access cache file (" + cacheFile + ")", 1)
+
+        del theURL,url,getList,cacheDict
 
         return sdmAccessDict
 
@@ -225,14 +291,9 @@ def getSDMaccessDict(areaSymbol):
 ##                # then reformat to match SQL query
 ##                date = str(rec.text).split(" ")[0]
 
-    except urllib2.HTTPError:
-        errorMsg()
-        AddMsgAndPrint(" \n" + sQuery, 1)
-        return ""
-
     except:
         errorMsg()
-        return ""
+        return sdmAccessDict
 
 ## ===================================================================================
 def GetDownload(areasym, surveyDate):
@@ -329,10 +390,11 @@ def GetDownload(areasym, surveyDate):
         return ""
 ## =====================================  MAIN BODY    ==============================================
 # Import system modules
-import arcpy, sys, os, locale, string, traceback, shutil, zipfile, glob, socket, json,urllib2
+import arcpy, sys, os, locale, string, traceback, shutil, zipfile, glob, socket, json, urllib2, tempfile, time
 from urllib2 import urlopen, URLError, HTTPError
 from arcpy import env
 from time import sleep
+import SSURGO_Web
 
 if __name__ == '__main__':
 
@@ -379,29 +441,32 @@ if __name__ == '__main__':
 
         asList.sort()
 
+        # Query SDMaccess Areaname and Spatial Version Date for all of the areasymbols at once; return a dictionary
+        cacheHours = 24  # hours before a cached SDMaccess date is requested again
+        sdaDict = getSDMaccessDict(asList)  #{u'WI001': 'WI001|2011-08-10|Adams County, Wisconsin'}
+
+        # if any areasymbols came back empty, try to retrieve their information again
+        missingList = [SSA for SSA in asList if not SSA in sdaDict]
+
+        if len(missingList) > 0:
+            sdaDict.update(getSDMaccessDict(missingList))
+
         for SSA in asList:
 
             AddMsgAndPrint("\nAttempting connection and download for: " + SSA,1)
 
             iGet += 1
 
-            # Query SDMaccess Areaname and Spatial Version Date for a given areasymobl; return a dictionary
-            asDict = getSDMaccessDict(SSA)  #{u'WI001': 'WI001,  2011-08-10,  Adams County, Wisconsin'}
-
-            # if asDict came back empty, try to retrieve information again
-            if len(asDict) < 1:
-                asDict = getSDMaccessDict(SSA)
-
             # Could not get SDaccess info for this SSA - cannot continue
-            if len(asDict) < 1:
+            if not SSA in sdaDict:
                 AddMsgAndPrint("\tCould not get information for " + SSA + " from SD Access",2)
                 failedList.append(SSA)
                 continue
 
-            survey = asDict[SSA]
+            survey = sdaDict[SSA]
             surveyInfo = survey.split("|")
 
-            # Get Areasymbol, Date, and Survey Name from 'asDict'
+            # Get Areasymbol, Date, and Survey Name from 'sdaDict'
             areaSym = surveyInfo[0].strip().upper()  # Why get areaSym again???
             surveyDate = surveyInfo[1].strip()    # Don't need this since we will always get the most current
             surveyName = surveyInfo[2].strip()    # Adams County, Wisconsin
@@ -516,7 +581,7 @@ if __name__ == '__main__':
                 AddMsgAndPrint("\n\tDownload failed for " + areaSym + ": " + surveyName, 2)
                 failedList.append(SSA)
 
-            del asDict, survey, surveyInfo, areaSym, surveyDate, surveyName, newFolder, iTry
+            del survey, surveyInfo, areaSym, surveyDate, surveyName, newFolder, iTry
             arcpy.SetProgressorPosition()
 
         if len(failedList) > 0:
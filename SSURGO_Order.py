@@ -0,0 +1,164 @@
+# SSURGO_Order.py
+#
+# ArcGIS 10.1, numpy
+#
+# USDA-NRCS National Soil Survey Center
+#
+# Space-filling curve ordering of soil surveys and features, shared by the scripts that merge
+# SSURGO shapefiles into one geodatabase (Generate_MLRA_SSURGO_Datasets and
+# Generate_Regional_Transactional_FGDB).
+#
+#   HilbertKeys   Hilbert curve distance of each x,y within an extent. Points that are close
+#                 along the curve are close on the ground.
+#   SurveyOrder   AREASYMBOL values ordered by the Hilbert key of each survey's center, ties
+#                 are ordered by AREASYMBOL. Used as the order of the shapefiles passed to
+#                 Merge or Append, so that neighbouring surveys are written next to each other.
+#   SortFeatures  rewrite the features of a featureclass in Hilbert order of their centroids,
+#                 so that the spatial index and later spatial queries read neighbouring
+#                 polygons together.
+#
+# Typical use:
+#
+#   dExtents = {"WI025": (xmin, ymin, xmax, ymax), "WI027": (...)}
+#   for SSA in SSURGO_Order.SurveyOrder(dExtents):
+#       ...
+#
+#   SSURGO_Order.SortFeatures(soilFCpath)
+#
+# arcpy is only needed for SortFeatures.
+#
+# 10-18-2026 Original coding
+# 10-18-2026 SortFeatures checks the sorted copy before the featureclass is truncated, puts the
+#            copy back if the Append fails and always removes the key field and the copy.
+
+import os
+import numpy as np
+
+try:
+    import arcpy
+
+except ImportError:
+    arcpy = None
+
+## ===================================================================================
+def HilbertKeys(x, y, extent, order=16):
+    # Return the Hilbert curve distance (int64 array) of each x, y. extent (xmin, ymin, xmax,
+    # ymax) is divided into a 2^order by 2^order grid; points outside it are moved to the edge.
+    #
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    n = 2 ** order
+    xmin, ymin, xmax, ymax = extent
+    size = max(xmax - xmin, ymax - ymin, 1e-9)
+    ix = np.clip(np.floor((x - xmin) / size * n), 0, n - 1).astype(np.int64)
+    iy = np.clip(np.floor((y - ymin) / size * n), 0, n - 1).astype(np.int64)
+    d = np.zeros(len(ix), dtype=np.int64)
+    s = n // 2
+
+    while s > 0:
+        rx = ((ix & s) > 0).astype(np.int64)
+        ry = ((iy & s) > 0).astype(np.int64)
+        d += s * s * ((3 * rx) ^ ry)
+
+        # rotate the quadrant so that the curve is continuous
+        bFlip = (ry == 0) & (rx == 1)
+        ix = np.where(bFlip, n - 1 - ix, ix)
+        iy = np.where(bFlip, n - 1 - iy, iy)
+        bSwap = ry == 0
+        ix, iy = np.where(bSwap, iy, ix), np.where(bSwap, ix, iy)
+        s //= 2
+
+    return d
+
+## ===================================================================================
+def SurveyOrder(dExtents, order=16):
+    # Return the keys of dExtents {AREASYMBOL: (xmin, ymin, xmax, ymax)} ordered by the
+    # Hilbert key of the center of each extent. Surveys with the same key are ordered by
+    # AREASYMBOL, so the order is the same on every run.
+    #
+    names = sorted(dExtents.keys())
+
+    if len(names) == 0:
+        return list()
+
+    extents = np.array([dExtents[name] for name in names], dtype=float).reshape(-1, 4)
+    fullExtent = (extents[:, 0].min(), extents[:, 1].min(), extents[:, 2].max(), extents[:, 3].max())
+    keys = HilbertKeys((extents[:, 0] + extents[:, 2]) / 2.0, (extents[:, 1] + extents[:, 3]) / 2.0, fullExtent, order)
+
+    return [name for key, name in sorted(zip(keys.tolist(), names))]
+
+## ===================================================================================
+def SortFeatures(fc, keyField="HILBERT_KEY", order=16):
+    # Rewrite the features of fc in the Hilbert order of their centroids. The key is written
+    # to a temporary field, the features are sorted on it into the scratch geodatabase, and
+    # fc is truncated and the sorted features appended back. fc keeps its schema, indexes and
+    # feature dataset; the ObjectIDs are renumbered. Returns the number of features.
+    #
+    # fc is only truncated once the sorted copy has every feature. If the Append fails, fc is
+    # truncated again and the copy appended without the sort order being checked. If that
+    # fails too, the copy is kept and a RuntimeError gives its path.
+    #
+    desc = arcpy.Describe(fc)
+    ext = desc.extent
+    oids = list()
+    xs = list()
+    ys = list()
+
+    # centroids; features without geometry go to the end of the curve
+    with arcpy.da.SearchCursor(fc, ["OID@", "SHAPE@XY"]) as cursor:
+        for oid, xy in cursor:
+            oids.append(oid)
+
+            if xy is None or xy[0] is None:
+                xs.append(ext.XMax)
+                ys.append(ext.YMax)
+
+            else:
+                xs.append(xy[0])
+                ys.append(xy[1])
+
+    if len(oids) < 2:
+        return len(oids)
+
+    dKeys = dict(zip(oids, HilbertKeys(xs, ys, (ext.XMin, ext.YMin, ext.XMax, ext.YMax), order).tolist()))
+    tempFC = arcpy.CreateUniqueName("xSortFeatures", arcpy.env.scratchGDB)
+    bKeepCopy = False
+
+    try:
+        arcpy.AddField_management(fc, keyField, "DOUBLE")
+
+        with arcpy.da.UpdateCursor(fc, ["OID@", keyField]) as cursor:
+            for row in cursor:
+                row[1] = dKeys[row[0]]
+                cursor.updateRow(row)
+
+        arcpy.Sort_management(fc, tempFC, [[keyField, "ASCENDING"]])
+
+        if int(arcpy.GetCount_management(tempFC).getOutput(0)) != len(oids):
+            raise RuntimeError("Sorted copy of " + fc + " is incomplete, features were not sorted")
+
+        arcpy.TruncateTable_management(fc)
+
+        try:
+            arcpy.Append_management(tempFC, fc, "NO_TEST")
+
+        except:
+            # put the copy back; the original error is raised once fc is whole again
+            try:
+                arcpy.TruncateTable_management(fc)
+                arcpy.Append_management(tempFC, fc, "NO_TEST")
+
+            except:
+                bKeepCopy = True
+                raise RuntimeError("Unable to restore " + fc + ", the features are saved in " + tempFC)
+
+            raise
+
+    finally:
+        if arcpy.Exists(tempFC) and not bKeepCopy:
+            arcpy.Delete_management(tempFC)
+
+        if len(arcpy.ListFields(fc, keyField)) > 0:
+            arcpy.DeleteField_management(fc, keyField)
+
+    return len(oids)
@@ -0,0 +1,345 @@
+# SSURGO_Shapefile.py
+#
+# Python 2.7 or 3, numpy
+#
+# USDA-NRCS National Soil Survey Center
+#
+# Reader for the shapefiles in the Web Soil Survey downloads (spatial/soilmu_a_*.shp,
+# soilsf_p_*.shp...) that does not need arcpy.
+#
+# The .shp and .shx files are memory-mapped. The record offsets come from the .shx file and
+# the part and point arrays of each record are returned as numpy views into the mapped file,
+# so no Point objects are created and nothing is copied until a batch is built. Polygon records
+# can be read as QA_Geometry.PolygonArrays batches, so the QA_Geometry functions used by the QA
+# tools run directly on a folder of downloaded surveys.
+#
+# The .dbf file is also memory-mapped and read one column at a time through a numpy record
+# array.
+#
+# Shapefile polygons do not record which part a ring belongs to. As in ArcGIS, exterior rings
+# run clockwise and holes run counter-clockwise. Each hole is assigned to the exterior ring
+# before it.
+#
+# Usage (summary of the polygon geometry for every survey in a folder):
+#   python SSURGO_Shapefile.py <folder> [minimum angle] [minimum segment length]
+#
+# 10-18-2026 Original coding
+# 10-18-2026 Added ShapefileReader.ExteriorRingCounts for the QA_MultipartPolygons shapefile scan
+
+from __future__ import print_function
+
+import sys, os, mmap, struct, glob, time
+import numpy as np
+import QA_Geometry
+
+# Shape types with a polygon (part and point arrays) record layout
+polygonTypes = (5, 15, 25)
+
+## ===================================================================================
+def _MapFile(filePath):
+    # Memory-map a whole file for reading
+    with open(filePath, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+## ===================================================================================
+def _GatherInt32(buf, offsets, byteOrder="<"):
+    # Read a 32-bit integer at each byte offset of a uint8 array
+    offsets = np.asarray(offsets, dtype=np.int64)
+    return buf[offsets[:, np.newaxis] + np.arange(4)].copy().view(byteOrder + "i4").ravel()
+
+## ===================================================================================
+class ShapefileReader(object):
+    # Memory-mapped .shp and .shx files
+    #
+    #   shapeType   shapefile shape type (5 = Polygon, 1 = Point, 3 = Polyline...)
+    #   bbox        (xmin, ymin, xmax, ymax) from the file header
+    #   numRecords  number of records, records are numbered from 0 like the FID
+    #   dbf         DbfReader for the attribute table, or None if there is no .dbf
+    #
+    def __init__(self, shpPath):
+        basePath = os.path.splitext(shpPath)[0]
+        self.shpPath = basePath + ".shp"
+        self._shp = _MapFile(self.shpPath)
+        self._shx = _MapFile(basePath + ".shx")
+        self._buf = np.frombuffer(self._shp, dtype=np.uint8)
+
+        fileCode = struct.unpack(">i", self._shp[0:4])[0]
+
+        if fileCode != 9994:
+            raise ValueError(self.shpPath + " is not a shapefile")
+
+        self.shapeType = struct.unpack("<i", self._shp[32:36])[0]
+        self.bbox = struct.unpack("<4d", self._shp[36:68])
+
+        # .shx records are (offset, content length) pairs in 16-bit words, big-endian
+        shx = np.frombuffer(self._shx, dtype=">i4", offset=100).reshape(-1, 2)
+        self.numRecords = len(shx)
+        self._contents = shx[:, 0].astype(np.int64) * 2 + 8
+        self._recordTypes = _GatherInt32(self._buf, self._contents)
+
+        if self.shapeType in polygonTypes or self.shapeType in (3, 13, 23):
+            # count of parts and points for every record, null shapes have none
+            bShape = self._recordTypes != 0
+            self._numParts = np.zeros(self.numRecords, dtype=np.int64)
+            self._numPoints = np.zeros(self.numRecords, dtype=np.int64)
+            self._numParts[bShape] = _GatherInt32(self._buf, self._contents[bShape] + 36)
+            self._numPoints[bShape] = _GatherInt32(self._buf, self._contents[bShape] + 40)
+
+        dbfPath = basePath + ".dbf"
+
+        if os.path.isfile(dbfPath):
+            self.dbf = DbfReader(dbfPath)
+
+        else:
+            self.dbf = None
+
+    def __len__(self):
+        return self.numRecords
+
+    def Record(self, i):
+        # Return (parts, xy) for a polygon or polyline record: the start index of each
+        # part (ring) and an (n, 2) view of the coordinates. Returns None for a null shape.
+        # Point records return a (1, 2) view in xy and an empty parts array.
+        #
+        content = int(self._contents[i])
+
+        if self._recordTypes[i] == 0:
+            return None
+
+        if self.shapeType in (1, 11, 21):
+            return np.zeros(0, dtype=np.int32), np.frombuffer(self._shp, dtype="<f8", count=2, offset=content + 4).reshape(1, 2)
+
+        numParts = int(self._numParts[i])
+        numPoints = int(self._numPoints[i])
+        parts = np.frombuffer(self._shp, dtype="<i4", count=numParts, offset=content + 44)
+        xy = np.frombuffer(self._shp, dtype="<f8", count=numPoints * 2, offset=content + 44 + 4 * numParts).reshape(numPoints, 2)
+        return parts, xy
+
+    def ReadPolygonArrays(self, fields=(), maxVertices=1000000):
+        # Generator that returns the polygon records as QA_Geometry.PolygonArrays batches of
+        # about maxVertices vertices each. The values of the dbf fields are saved to
+        # PolygonArrays.values and null shapes to PolygonArrays.badOids.
+        #
+        if not self.shapeType in polygonTypes:
+            raise ValueError(self.shpPath + " is not a polygon shapefile")
+
+        columns = [self.dbf.Column(fld, bNone=True) for fld in fields]
+        cumPoints = np.cumsum(self._numPoints)
+        first = 0
+
+        while first < self.numRecords:
+            # records in this batch, at least one
+            done = cumPoints[first - 1] if first > 0 else 0
+            last = min(max(first + 1, np.searchsorted(cumPoints, done + maxVertices, "right")), self.numRecords)
+            yield self._MakeBatch(first, last, columns)
+            first = last
+
+    def ExteriorRingCounts(self):
+        # Return the number of parts (exterior rings) of every polygon record as ArcGIS counts
+        # them, or -1 for a null shape. NumParts in the record header counts every ring, so
+        # the coordinates are only read for the records with more than one ring, to tell the
+        # holes from the other parts by their orientation.
+        #
+        if not self.shapeType in polygonTypes:
+            raise ValueError(self.shpPath + " is not a polygon shapefile")
+
+        counts = self._numParts.copy()
+        counts[(self._recordTypes == 0) | (self._numPoints == 0)] = -1
+
+        for i in np.nonzero(counts > 1)[0]:
+            parts, xy = self.Record(i)
+            bExterior = QA_Geometry.SignedRingAreas(xy, np.append(parts, len(xy))) < 0
+            bExterior[0] = True
+            counts[i] = bExterior.sum()
+
+        return counts
+
+    def _MakeBatch(self, first, last, columns):
+        batch = QA_Geometry.PolygonArrays()
+        records = np.arange(first, last)
+        bShape = (self._recordTypes[first:last] != 0) & (self._numPoints[first:last] > 0)
+        batch.badOids = [int(i) for i in records[~bShape]]
+        records = records[bShape]
+        batch.oids = records.astype(int)
+        batch.values = [tuple([column[i] for column in columns]) for i in records]
+
+        xyList = list()
+        ringStarts = list()
+        iVertices = 0
+
+        for i in records:
+            parts, xy = self.Record(i)
+            xyList.append(xy)
+            ringStarts.append(parts.astype(np.int64) + iVertices)
+            iVertices += len(xy)
+
+        if len(xyList) > 0:
+            batch.xy = np.concatenate(xyList)
+            ringStarts = np.concatenate(ringStarts)
+
+        else:
+            batch.xy = np.zeros((0, 2))
+            ringStarts = np.zeros(0, dtype=np.int64)
+
+        batch.numVertices = len(batch.xy)
+        batch.ringOffsets = np.append(ringStarts, iVertices).astype(int)
+        batch.ringPolys = np.repeat(np.arange(len(records)), self._numParts[records]).astype(int)
+
+        # Clockwise rings (negative area) start a new part, holes belong to the part before them
+        bFirst = np.ones(len(ringStarts), dtype=bool)
+        bFirst[1:] = batch.ringPolys[1:] != batch.ringPolys[:-1]
+        bExterior = (QA_Geometry.SignedRingAreas(batch.xy, batch.ringOffsets) < 0) | bFirst
+        partCount = np.cumsum(bExterior)
+        batch.ringParts = (partCount - partCount[bFirst][batch.ringPolys]).astype(int)
+        return batch
+
+    def Close(self):
+        self._buf = None
+        self._shp.close()
+        self._shx.close()
+
+        if not self.dbf is None:
+            self.dbf.Close()
+
+## ===================================================================================
+class DbfReader(object):
+    # Memory-mapped dBASE table. The records are viewed as a numpy record array with one
+    # fixed width text column per field, so each field is converted in a single operation.
+    #
+    #   fields      list of (name, type, length, decimals)
+    #   numRecords  number of records
+    #   encoding    from the .cpg file when there is one, otherwise cp1252
+    #
+    def __init__(self, dbfPath):
+        self.dbfPath = dbfPath
+        self._dbf = _MapFile(dbfPath)
+        self.numRecords, headerLength, recordLength = struct.unpack("<IHH", self._dbf[4:12])
+        self.fields = list()
+        offsets = list()
+        offset = 1  # deletion flag
+
+        for pos in range(32, headerLength - 1, 32):
+            if self._dbf[pos:pos + 1] == b"\r":
+                break
+
+            name = self._dbf[pos:pos + 11].split(b"\0")[0].decode("ascii")
+            fldType = self._dbf[pos + 11:pos + 12].decode("ascii")
+            length = ord(self._dbf[pos + 16:pos + 17])
+            decimals = ord(self._dbf[pos + 17:pos + 18])
+            self.fields.append((name, fldType, length, decimals))
+            offsets.append(offset)
+            offset += length
+
+        self.encoding = "cp1252"
+        cpgPath = os.path.splitext(dbfPath)[0] + ".cpg"
+
+        if os.path.isfile(cpgPath):
+            with open(cpgPath, "r") as f:
+                cpg = f.read().strip()
+
+            if cpg != "":
+                self.encoding = cpg
+
+        dt = np.dtype({"names":["f" + str(i) for i in range(len(self.fields))], \
+        "formats":["S" + str(fld[2]) for fld in self.fields], "offsets":offsets, "itemsize":recordLength})
+        self._records = np.frombuffer(self._dbf, dtype=dt, count=self.numRecords, offset=headerLength)
+
+    def FieldIndex(self, fieldName):
+        for i, fld in enumerate(self.fields):
+            if fld[0].upper() == fieldName.upper():
+                return i
+
+        raise KeyError(fieldName + " not found in " + self.dbfPath)
+
+    def Column(self, fieldName, bNone=False):
+        # Return the values of one field for every record. Numeric fields are returned as
+        # a float array with NaN for blank values. Other fields are returned as a list of
+        # stripped text values. With bNone, numeric fields are also returned as a list with
+        # None for blank values.
+        #
+        i = self.FieldIndex(fieldName)
+        name, fldType, length, decimals = self.fields[i]
+        raw = np.char.strip(self._records["f" + str(i)])
+
+        if fldType in ("N", "F"):
+            bBlank = (raw == b"") | (np.char.strip(raw, b"*") == b"")
+            values = np.empty(self.numRecords)
+            values.fill(np.nan)
+            values[~bBlank] = raw[~bBlank].astype(float)
+
+            if bNone:
+                if decimals == 0:
+                    return [None if bBlank[j] else int(values[j]) for j in range(self.numRecords)]
+
+                return [None if bBlank[j] else float(values[j]) for j in range(self.numRecords)]
+
+            return values
+
+        if fldType == "L":
+            return [value[0:1] in (b"T", b"t", b"Y", b"y") for value in raw]
+
+        return [value.decode(self.encoding) for value in raw]
+
+    def Close(self):
+        self._records = None
+        self._dbf.close()
+
+## ===================================================================================
+def SummarizeSurvey(shpPath, minAngle, minDist):
+    # Polygon count, vertex count, multipart polygons, sliver angles and short segments
+    # for one soil polygon shapefile
+    #
+    shp = ShapefileReader(shpPath)
+    numPolys = 0
+    numVertices = 0
+    numMultipart = 0
+    numSlivers = 0
+    numShort = 0
+    badOids = list()
+
+    try:
+        for batch in shp.ReadPolygonArrays():
+            badOids.extend(batch.badOids)
+            stats = QA_Geometry.GetPolygonStatistics(batch, minDist)
+            angles = QA_Geometry.GetVertexAngles(batch.xy, batch.ringOffsets)[0]
+            numPolys += len(batch.oids)
+            numVertices += len(batch.xy)
+            numMultipart += int(stats.multipart.sum())
+            numSlivers += int((np.round(angles) <= minAngle).sum())
+            numShort += int(stats.shortExterior.sum())
+
+    finally:
+        shp.Close()
+
+    return numPolys, numVertices, numMultipart, numSlivers, numShort, badOids
+
+## ===================================================================================
+def main(argv):
+    if len(argv) < 2:
+        print("Usage: python SSURGO_Shapefile.py <folder> [minimum angle] [minimum segment length]")
+        return 1
+
+    folder = argv[1]
+    minAngle = float(argv[2]) if len(argv) > 2 else 5.0
+    minDist = float(argv[3]) if len(argv) > 3 else 0.0
+    shpList = sorted(glob.glob(os.path.join(folder, "soilmu_a_*.shp")) + glob.glob(os.path.join(folder, "*", "spatial", "soilmu_a_*.shp")))
+
+    if len(shpList) == 0:
+        print("No soilmu_a_*.shp files found in " + folder)
+        return 1
+
+    print("%-14s %10s %12s %10s %8s %8s %8s" % ("Survey", "Polygons", "Vertices", "Seconds", "Multi", "Slivers", "Short"))
+
+    for shpPath in shpList:
+        start = time.time()
+        numPolys, numVertices, numMultipart, numSlivers, numShort, badOids = SummarizeSurvey(shpPath, minAngle, minDist)
+        areaSym = os.path.basename(shpPath)[9:-4].upper()
+        print("%-14s %10d %12d %10.2f %8d %8d %8d" % (areaSym, numPolys, numVertices, time.time() - start, numMultipart, numSlivers, numShort))
+
+        if len(badOids) > 0:
+            print("    Null geometry for FID: " + ", ".join([str(oid) for oid in badOids]))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
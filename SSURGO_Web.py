@@ -0,0 +1,340 @@
+# SSURGO_Web.py
+#
+# Python 2.7 or 3
+#
+# USDA-NRCS National Soil Survey Center
+#
+# HTTP functions shared by the tools that read the NASIS online reports (LIMS report server).
+#
+#   ConnectionPool   keep-alive HTTP and HTTPS connections that are shared by the request threads
+#   FetchAll         send a list of requests using a few threads and parse each response, with
+#                    optional retries after a jittered exponential backoff
+#   ResponseCache    parsed responses saved to a SQLite file, used until they are older than ttl seconds
+#   NASISLegends     MUSYM:MUKEY legend for each survey area from the WEB-MapunitsAreaMustatus report
+#   SplitList        split a list of values into the sets sent with one SDA IN (...) query
+#
+# Typical use:
+#
+#   cache = SSURGO_Web.ResponseCache(SSURGO_Web.CachePath(), 3600)
+#   dLegends = SSURGO_Web.NASISLegends(["WI025", "WI027"], reportURL, muStatus, cache)
+#   cache.Close()
+#
+#   for areaSym, (dNASIS, errMsg) in dLegends.items():
+#       ...
+#
+# None of the functions in this module use arcpy. The report URL is passed in, so the functions
+# can be run against a local stand-in server that serves saved report pages.
+#
+# 10-18-2026 Original coding
+# 10-18-2026 Added FetchAll retries and headers, ResponseCache.GetMany and PutMany (AddNatMusym)
+# 10-18-2026 Added SplitList, shared by AddNatMusym and SSURGO_BatchDownload_byRegion
+# 10-18-2026 Added the NASISLegends bRefresh option, which skips the cached legends
+
+import os, time, json, random, socket, sqlite3, tempfile, threading
+
+try:
+    # Python 2
+    import httplib, Queue
+    from urlparse import urlsplit
+    from HTMLParser import HTMLParser
+
+except ImportError:
+    import http.client as httplib
+    import queue as Queue
+    from urllib.parse import urlsplit
+    from html.parser import HTMLParser
+
+## ===================================================================================
+class ConnectionPool(object):
+    # Idle keep-alive connections by (scheme, host). A thread takes a connection from the pool
+    # for each request and puts it back afterwards, so a few threads can send many requests
+    # over the same handful of connections.
+    #
+    def __init__(self, timeout=60):
+        self.timeout = timeout
+        self._idle = dict()
+        self._lock = threading.Lock()
+
+    def Request(self, url, body=None, headers=None):
+        # Send a GET request, or a POST request when there is a body. Returns the HTTP status
+        # and the response body. A connection that was closed by the server while it was idle
+        # is replaced and the request is sent once more.
+        #
+        parts = urlsplit(url)
+        key = (parts.scheme.lower(), parts.netloc)
+        path = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+
+        if body is None:
+            method = "GET"
+
+        else:
+            method = "POST"
+
+        for iTry in range(2):
+            conn, bReused = self._Get(key)
+
+            try:
+                conn.request(method, path, body, headers or dict())
+                resp = conn.getresponse()
+                data = resp.read()
+
+            except (httplib.HTTPException, socket.error):
+                conn.close()
+
+                if bReused and iTry == 0:
+                    continue
+
+                raise
+
+            if resp.getheader("Connection", "").lower() == "close":
+                conn.close()
+
+            else:
+                self._Put(key, conn)
+
+            return resp.status, data
+
+    def _Get(self, key):
+        # Return an idle connection (True) or a new one (False)
+        with self._lock:
+            idle = self._idle.get(key)
+
+            if idle:
+                return idle.pop(), True
+
+        scheme, host = key
+
+        if scheme == "https":
+            return httplib.HTTPSConnection(host, timeout=self.timeout), False
+
+        return httplib.HTTPConnection(host, timeout=self.timeout), False
+
+    def _Put(self, key, conn):
+        with self._lock:
+            self._idle.setdefault(key, list()).append(conn)
+
+    def Close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                for conn in idle:
+                    conn.close()
+
+            self._idle = dict()
+
+## ===================================================================================
+def FetchAll(requests, parse, pool=None, maxThreads=4, headers=None, retries=0, backoff=1.0):
+    # Send the requests using maxThreads threads and parse each response in the thread that
+    # received it. requests is a list of (key, url, body) with body None for a GET request.
+    # headers are sent with every request.
+    #
+    # A request that fails with a connection error or a server error (HTTP status 500 or
+    # higher) is sent again up to retries times. The thread waits backoff seconds before the
+    # first retry and twice as long before each one after that, plus or minus half, so the
+    # threads don't all retry at the same moment.
+    #
+    # Returns a dictionary of {key: (parsed value, error message)}. The value is None and the
+    # message is set when the request failed or the response could not be parsed.
+    #
+    if pool is None:
+        pool = ConnectionPool()
+        bClose = True
+
+    else:
+        bClose = False
+
+    getQueue = Queue.Queue()
+    dResults = dict()
+
+    for request in requests:
+        getQueue.put(request)
+
+    def Worker():
+        while True:
+            try:
+                key, url, body = getQueue.get_nowait()
+
+            except Queue.Empty:
+                return
+
+            for iTry in range(retries + 1):
+                if iTry > 0:
+                    time.sleep(backoff * (2 ** (iTry - 1)) * random.uniform(0.5, 1.5))
+
+                try:
+                    status, data = pool.Request(url, body, headers)
+
+                except Exception as e:
+                    dResults[key] = (None, e.__class__.__name__ + ": " + str(e))
+                    continue
+
+                if status != 200:
+                    dResults[key] = (None, "HTTP status " + str(status))
+
+                    if status >= 500:
+                        continue
+
+                    break
+
+                try:
+                    dResults[key] = (parse(data), "")
+
+                except Exception as e:
+                    dResults[key] = (None, e.__class__.__name__ + ": " + str(e))
+
+                break
+
+    threads = [threading.Thread(target=Worker) for i in range(min(maxThreads, len(requests)))]
+
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    if bClose:
+        pool.Close()
+
+    return dResults
+
+## ===================================================================================
+def SplitList(valueList, limit=1000):
+    # Return a list of lists of at most limit values, as strings, in the order of valueList.
+    # SDA queries are sent with no more than 1000 MUKEYs or 300 areasymbols in an IN clause.
+    #
+    values = [str(value) for value in valueList]
+    return [values[i:i + limit] for i in range(0, len(values), limit)]
+
+## ===================================================================================
+def CachePath():
+    # Default location of the response cache, shared by all of the tools
+    return os.path.join(tempfile.gettempdir(), "SSURGO_Web_Cache.sqlite")
+
+## ===================================================================================
+class ResponseCache(object):
+    # Parsed responses saved as JSON in a SQLite file, by request key (usually the URL).
+    # Each value expires ttl seconds after it was saved. The file can be shared by tools
+    # that use a different ttl. Only used from the main thread.
+    #
+    def __init__(self, cachePath, ttl=3600):
+        self.cachePath = cachePath
+        self.ttl = ttl
+        self.hits = 0
+        self._conn = sqlite3.connect(cachePath)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS web_cache (key TEXT PRIMARY KEY, expires REAL NOT NULL, value TEXT)")
+
+    def Get(self, key):
+        # Return the cached value, or None if there is none or it has expired
+        row = self._conn.execute("SELECT expires, value FROM web_cache WHERE key = ?", (key,)).fetchone()
+
+        if row is None or row[0] < time.time():
+            return None
+
+        self.hits += 1
+        return json.loads(row[1])
+
+    def GetMany(self, keys):
+        # Return a dictionary of {key: value} for the keys that have a cached value
+        dValues = dict()
+        now = time.time()
+
+        for key in keys:
+            row = self._conn.execute("SELECT expires, value FROM web_cache WHERE key = ?", (key,)).fetchone()
+
+            if not row is None and row[0] >= now:
+                dValues[key] = json.loads(row[1])
+
+        self.hits += len(dValues)
+        return dValues
+
+    def Put(self, key, value):
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO web_cache VALUES (?, ?, ?)", (key, time.time() + self.ttl, json.dumps(value)))
+
+    def PutMany(self, items):
+        # Save a list of (key, value) pairs in one transaction
+        expires = time.time() + self.ttl
+
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO web_cache VALUES (?, ?, ?)", [(key, expires, json.dumps(value)) for key, value in items])
+
+    def Close(self):
+        # Remove the expired values and close the file
+        with self._conn:
+            self._conn.execute("DELETE FROM web_cache WHERE expires < ?", (time.time(),))
+
+        self._conn.close()
+
+## ===================================================================================
+class LegendParser(HTMLParser):
+    # Get the data block within the html returned by the NASIS online legend report. Each
+    # block of text is a MUSYM and MUKEY pair.
+    #
+    def __init__(self):
+        HTMLParser.__init__(self)
+        self.dataDict = dict()
+
+    def handle_data(self, data):
+
+        if str(data).strip():
+            # load the data into a dictionary
+            musym, mukey = data.split()
+            musym = musym.strip()
+            mukey = mukey.replace(",","").strip()
+            self.dataDict[musym] = mukey
+
+## ===================================================================================
+def ParseLegendReport(page):
+    # Return a dictionary of {MUSYM: MUKEY} from a NASIS legend report page
+    if not isinstance(page, str):
+        page = page.decode("utf-8", "replace")
+
+    parser = LegendParser()
+    parser.feed(page)
+    parser.close()
+    return parser.dataDict
+
+## ===================================================================================
+def NASISLegends(areaSymbols, reportURL, muStatus, cache=None, maxThreads=4, bRefresh=False):
+    # Get the NASIS legend for each survey area. The surveys that are not in the cache are
+    # requested at the same time over a few keep-alive connections. With bRefresh every legend
+    # is requested and the cache is only used to save the new legends.
+    #
+    # reportURL is the report address up to the area symbol, muStatus the mapunit status
+    # options that follow it (&mx1=0&mx2=0&mx3=3&mx4=0).
+    #
+    # Returns a dictionary of {AREASYMBOL: ({MUSYM: MUKEY}, error message)}. Empty legends
+    # are not cached, so they are requested again on the next run.
+    #
+    dLegends = dict()
+    requests = list()
+
+    for areaSym in set(areaSymbols):
+        url = reportURL + areaSym + muStatus
+        dNASIS = None
+
+        if not cache is None and not bRefresh:
+            dNASIS = cache.Get(url)
+
+        if dNASIS is None:
+            requests.append((areaSym, url, None))
+
+        else:
+            dLegends[areaSym] = (dNASIS, "")
+
+    if len(requests) > 0:
+        dResults = FetchAll(requests, ParseLegendReport, maxThreads=maxThreads)
+
+        for areaSym, url, body in requests:
+            dNASIS, errMsg = dResults[areaSym]
+
+            if dNASIS is None:
+                dLegends[areaSym] = (dict(), errMsg)
+
+            else:
+                dLegends[areaSym] = (dNASIS, "")
+
+                if not cache is None and len(dNASIS) > 0:
+                    cache.Put(url, dNASIS)
+
+    return dLegends
@@ -0,0 +1,209 @@
+# ToolTiming.py
+#
+# ArcGIS 10.1
+#
+# USDA-NRCS National Soil Survey Center
+#
+# Progress and timing instrumentation shared by the QA and SSURGO tools.
+#
+#   Progress   step progressor that only updates the ArcGIS dialog every interval seconds,
+#              so the hot loops can report every row without paying for a UI call each time
+#   RunTimer   named phase spans (read geometry, compute, write output, geoprocessing...)
+#              and counters (rows, vertices, flags, HTTP bytes) for one run of a tool. The
+#              timings can be saved as a JSON report at the end of the run.
+#
+# The JSON report is only written when the SSURGO_TIMING_REPORT environment variable is set to
+# the folder for the reports (any other value uses the system temp folder), or when a folder
+# is passed to RunTimer.Save. Otherwise the tools only print the timing summary.
+#
+# A phase that runs once per row should not open a Phase span for each row. Add up the time
+# in a local variable and pass the total to AddTime once.
+#
+# Typical use:
+#
+#   timer = ToolTiming.RunTimer("QA_SliverFinder")
+#
+#   with timer.Phase("read geometry"):
+#       progress = ToolTiming.Progress("Reading polygon geometry...", iSelection)
+#
+#       for row in cursor:
+#           ...
+#           timer.Count("rows")
+#           progress.Update(iRow)
+#
+#       progress.Finish()
+#
+#   PrintMsg(timer.Summary(), 0)
+#   timer.Save()
+#
+# arcpy is optional, without it the progressor calls are skipped.
+#
+# 10-18-2026 Original coding
+# 10-18-2026 The JSON report is only saved when SSURGO_TIMING_REPORT is set. AddTime registers a
+#            new phase, so a total that was added up in the caller can be recorded once.
+
+import os, sys, time, json, tempfile, threading, platform
+
+try:
+    import arcpy
+
+except ImportError:
+    arcpy = None
+
+## ===================================================================================
+class Progress(object):
+    # Step progressor with time-throttled updates. Update can be called for every row, the
+    # progressor position and label are only sent to ArcGIS when interval seconds have passed.
+    #
+    def __init__(self, label, total=0, interval=0.5):
+        self.label = label
+        self.total = total
+        self.interval = interval
+        self.position = 0
+        self._lastUpdate = 0.0
+
+        if arcpy is not None:
+            if total > 0:
+                arcpy.SetProgressor("step", label, 0, total, 1)
+
+            else:
+                arcpy.SetProgressor("default", label)
+
+    def Update(self, position=None, label=None):
+        # position is the number of items done. Without it the position moves up by one.
+        if position is None:
+            self.position += 1
+
+        else:
+            self.position = position
+
+        now = time.time()
+
+        if now - self._lastUpdate < self.interval:
+            return False
+
+        self._lastUpdate = now
+
+        if arcpy is not None:
+            if label is not None:
+                arcpy.SetProgressorLabel(label)
+
+            if self.total > 0:
+                arcpy.SetProgressorPosition(min(self.position, self.total))
+
+        return True
+
+    def Finish(self):
+        if arcpy is not None:
+            arcpy.ResetProgressor()
+
+## ===================================================================================
+class _Span(object):
+    # One phase of a RunTimer. Used as a context manager, or with Start and Stop when the
+    # phase does not fit in a with block.
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def Start(self):
+        self.start = time.time()
+        return self
+
+    def Stop(self):
+        self.timer.AddTime(self.name, time.time() - self.start)
+
+    def __enter__(self):
+        return self.Start()
+
+    def __exit__(self, excType, excValue, tb):
+        self.Stop()
+        return False
+
+## ===================================================================================
+class RunTimer(object):
+    # Phase times and counters for one run of a tool. Phases with the same name are added
+    # together and are listed in the order they first started. A phase can be timed inside
+    # another one ("check angles" within "read geometry"), its time is then included in both.
+    # Counters can be updated from worker threads.
+    #
+    def __init__(self, toolName):
+        self.toolName = toolName
+        self.started = time.time()
+        self.phases = list()
+        self._phaseTimes = dict()
+        self._phaseCalls = dict()
+        self.counters = dict()
+        self._lock = threading.Lock()
+
+    def Phase(self, name):
+        # Return a context manager that times one phase
+        with self._lock:
+            if not name in self._phaseTimes:
+                self.phases.append(name)
+                self._phaseTimes[name] = 0.0
+                self._phaseCalls[name] = 0
+
+        return _Span(self, name)
+
+    def AddTime(self, name, seconds):
+        with self._lock:
+            if not name in self._phaseTimes:
+                self.phases.append(name)
+                self._phaseTimes[name] = 0.0
+                self._phaseCalls[name] = 0
+
+            self._phaseTimes[name] += seconds
+            self._phaseCalls[name] += 1
+
+    def Count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def Report(self):
+        # Return the timings as a dictionary for the JSON report
+        elapsed = time.time() - self.started
+        report = {"tool":self.toolName, "started":time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)), \
+        "elapsed":elapsed, "host":platform.node(), "python":platform.python_version(), "counters":dict(self.counters), \
+        "phases":[{"name":name, "seconds":self._phaseTimes[name], "calls":self._phaseCalls[name]} for name in self.phases]}
+
+        # items per second for the counters, over the whole run
+        report["rates"] = dict([(name, value / elapsed) for name, value in self.counters.items() if elapsed > 0])
+        return report
+
+    def Summary(self):
+        # Return the phase times as text lines for the tool messages
+        elapsed = time.time() - self.started
+        lines = ["Elapsed time " + "%.1f" % elapsed + " seconds"]
+
+        for name in self.phases:
+            seconds = self._phaseTimes[name]
+            lines.append("\t" + name + ": " + "%.1f" % seconds + " seconds (" + "%.0f" % (100.0 * seconds / max(elapsed, 1e-9)) + "%)")
+
+        for name in sorted(self.counters.keys()):
+            lines.append("\t" + name + ": " + str(self.counters[name]))
+
+        return "\n".join(lines)
+
+    def Save(self, folder=None):
+        # Write the JSON report to <folder>/<tool>_timing_<date>_<time>.json and return the
+        # path. Without a folder the report is only written when SSURGO_TIMING_REPORT is set.
+        # Returns "" if the report is turned off or can't be saved.
+        if folder is None:
+            folder = os.environ.get("SSURGO_TIMING_REPORT", "")
+
+            if folder == "":
+                return ""
+
+            if not os.path.isdir(folder):
+                folder = tempfile.gettempdir()
+
+        reportPath = os.path.join(folder, self.toolName + "_timing_" + time.strftime("%Y%m%d_%H%M%S", time.localtime(self.started)) + ".json")
+
+        try:
+            with open(reportPath, "w") as f:
+                json.dump(self.Report(), f, indent=1, sort_keys=True)
+
+            return reportPath
+
+        except (IOError, OSError):
+            return ""